@@ -42,6 +42,21 @@ except Exception:
     HAS_PYKRX = False
     pk_stock = None
 
+try:
+    import supply_cache  # 스캐너와 공유하는 pykrx 수급 조회 캐시(거래일별 디스크 보관)
+except Exception:
+    supply_cache = None
+
+try:
+    import flow_store  # 종목×일자 투자자 거래대금 저장소(월 파티션, 빈 구간만 pykrx 조회)
+except Exception:
+    flow_store = None
+
+try:
+    import forward_paths  # 신호 이후 보유일 수익률/선도달 판정을 이벤트 묶음으로 계산하는 공용 엔진
+except Exception:
+    forward_paths = None
+
 try:
     import gspread
     from oauth2client.service_account import ServiceAccountCredentials
@@ -124,7 +139,10 @@ def _check_bb_bottom(row: pd.Series, df: pd.DataFrame) -> dict:
     lower40 = float(bb40['lower'].iloc[-1]) if not pd.isna(bb40['lower'].iloc[-1]) else 0.0
     mid40 = float(bb40['mid'].iloc[-1]) if not pd.isna(bb40['mid'].iloc[-1]) else 0.0
     width40 = float(bb40['width'].iloc[-1]) if not pd.isna(bb40['width'].iloc[-1]) else 0.0
+    return _bb_bottom_state(close, lower40, mid40, width40)
 
+
+def _bb_bottom_state(close: float, lower40: float, mid40: float, width40: float) -> dict:
     if lower40 <= 0:
         return {
             'bb40_near': False,
@@ -262,10 +280,14 @@ def _check_envelope_bottom(row: pd.Series, df: pd.DataFrame) -> dict:
 
     env20 = _calc_envelope(df, 20, 10)
     lower20 = float(env20['lower'].iloc[-1]) if not pd.isna(env20['lower'].iloc[-1]) else 0.0
-    env20_pct = ((close - lower20) / lower20 * 100) if lower20 > 0 else 999.0
 
     env40 = _calc_envelope(df, 40, 10)
     lower40 = float(env40['lower'].iloc[-1]) if not pd.isna(env40['lower'].iloc[-1]) else 0.0
+    return _envelope_bottom_state(close, lower20, lower40)
+
+
+def _envelope_bottom_state(close: float, lower20: float, lower40: float) -> dict:
+    env20_pct = ((close - lower20) / lower20 * 100) if lower20 > 0 else 999.0
     env40_pct = ((close - lower40) / lower40 * 100) if lower40 > 0 else 999.0
 
     return {
@@ -297,11 +319,15 @@ SUMMARY_TAB_PREFIX = '종가배팅_'
 FLOW_SNAPSHOT_CSV = Path(os.environ.get('CLOSING_BET_FLOW_SNAPSHOT_CSV', './closing_bet_logs/closing_bet_flow_snapshots.csv'))
 FLOW_SNAPSHOT_LOOKUP: dict[str, dict] = {}
 INVESTOR_FLOW_CACHE: dict = {}
+# flow_store 미보유 구간을 만나면 이 범위(백테스트 전체 기간)까지 한 번에 채운다. main()에서 설정.
+INVESTOR_FLOW_FILL_RANGE: tuple = (None, None)
 AI_GSHEET_NAME = '사령부_통합_상황판'
 AI_JUDGMENT_TAB_NAME = '종가배팅_AI판정'
 AI_BACKFILL_TAB_NAME = '종가배팅_AI판정_백필'
 BACKTEST_BASELINE_VERSION = 'validated_integrated_v2_optional_flow'
 FLOW_FILTER_MODE = 'off'
+# 1=전 구간 벡터 판정(기본), 0=기존 날짜별 부분 시계열 판정
+VECTOR_EVAL = str(os.environ.get('CLOSING_BET_VECTOR_EVAL', '1')).strip().lower() in {'1', 'true', 'yes', 'on'}
 
 
 PRETTY_RAW_COLUMNS = {
@@ -751,19 +777,8 @@ def _compute_common_state(sub_df: pd.DataFrame) -> dict | None:
 
     vma20 = _safe_float(row.get('VMA20', sub_df['Volume'].rolling(20).mean().iloc[-1]))
     ma20 = _safe_float(row.get('MA20', sub_df['Close'].rolling(20).mean().iloc[-1]))
-    disp = (close / ma20 * 100) if ma20 > 0 else 100.0
     high20 = _safe_float(sub_df['High'].rolling(20).max().iloc[-1])
-    near20 = (close / high20 * 100) if high20 > 0 else 0.0
     rsi = _safe_float(row.get('RSI', 50), 50.0)
-    upper_wick = _safe_float(_calc_upper_wick_ratio(row), 0.0)
-
-    total = max(high - low, 1e-9)
-    body_top = max(open_p, close)
-    body_bot = min(open_p, close)
-    body_size = max(abs(close - open_p), 1e-9)
-    upper_wick_len = max(0.0, high - body_top)
-    lower_wick_len = max(0.0, body_bot - low)
-    close_to_high = (close / high * 100) if high > 0 else 0.0
 
     env = _check_envelope_bottom(row, sub_df)
     bb = _check_bb_bottom(row, sub_df)
@@ -781,6 +796,22 @@ def _compute_common_state(sub_df: pd.DataFrame) -> dict | None:
     maejip_5d = int(((recent5['Volume'] > vma10_val) & (recent5['Close'] > recent5['Open'])).sum()) if vma10_val > 0 else 0
 
     atr = _safe_float(row.get('ATR', 0), 0.0)
+    return _common_state_from_values(row, close, open_p, high, low, vol, vma20, ma20, high20, rsi, env, bb, obv_rising, maejip_5d, atr)
+
+
+def _common_state_from_values(row, close, open_p, high, low, vol, vma20, ma20, high20, rsi, env, bb, obv_rising, maejip_5d, atr) -> dict:
+    amount = close * vol
+    disp = (close / ma20 * 100) if ma20 > 0 else 100.0
+    near20 = (close / high20 * 100) if high20 > 0 else 0.0
+    upper_wick = _safe_float(_calc_upper_wick_ratio(row), 0.0)
+
+    total = max(high - low, 1e-9)
+    body_top = max(open_p, close)
+    body_bot = min(open_p, close)
+    body_size = max(abs(close - open_p), 1e-9)
+    upper_wick_len = max(0.0, high - body_top)
+    lower_wick_len = max(0.0, body_bot - low)
+    close_to_high = (close / high * 100) if high > 0 else 0.0
     atr_pct = (atr / close * 100) if close > 0 else 0.0
 
     return {
@@ -852,7 +883,16 @@ def _get_band_recommendation(
     bb_width = float(bb.get('bb40_width', 0) or 0)
     amount_b_series = (sub_df['Close'] * sub_df['Volume']) / 1e8
     amount20_b = float(amount_b_series.rolling(20).mean().iloc[-1]) if len(amount_b_series) >= 20 else 0.0
+    return _band_recommendation_from_values(bb_width, atr_pct, amount20_b, index_label, is_top_mcap)
 
+
+def _band_recommendation_from_values(
+    bb_width: float,
+    atr_pct: float,
+    amount20_b: float,
+    index_label: str = '',
+    is_top_mcap: bool = False,
+) -> dict:
     if index_label == '코스피200':
         recommended_band = 'ENV'
         base_reason = '코스피200 기본값'
@@ -919,7 +959,13 @@ def _get_investor_flow_df(code: str, start: str, end: str) -> pd.DataFrame:
         return INVESTOR_FLOW_CACHE[cache_key]
 
     try:
-        df = pk_stock.get_market_trading_value_by_date(start.replace('-', ''), end.replace('-', ''), code)
+        if flow_store is not None and flow_store.enabled():
+            fill_start, fill_end = INVESTOR_FLOW_FILL_RANGE
+            df = flow_store.frame(code, start, end, fill_start=fill_start, fill_end=fill_end)
+        elif supply_cache is not None and supply_cache.enabled():
+            df = supply_cache.trading_value(code, start, end)
+        else:
+            df = pk_stock.get_market_trading_value_by_date(start.replace('-', ''), end.replace('-', ''), code)
         if df is None or df.empty:
             INVESTOR_FLOW_CACHE[cache_key] = pd.DataFrame()
             return INVESTOR_FLOW_CACHE[cache_key]
@@ -1079,6 +1125,11 @@ def _check_conditions_on_date(df: pd.DataFrame, date_idx: int, code: str = '') -
     state['index_label'] = _pick_index_label(code)
     is_top_mcap = str(code).zfill(6) in TOP_MCAP_SET
     band_rec = _get_band_recommendation(code, sub_df, state['row'], state['index_label'], is_top_mcap)
+    return _pick_conditions(state, band_rec)
+
+
+def _pick_conditions(state: dict, band_rec: dict) -> dict | None:
+    """공통 상태(state) + 추천밴드(band_rec)로 A/B1/B2 판정 후 최고점 전략 1개를 고른다."""
     close = state['close']
     open_p = state['open']
     rsi = state['rsi']
@@ -1199,24 +1250,236 @@ def _check_conditions_on_date(df: pd.DataFrame, date_idx: int, code: str = '') -
 
 
 # =============================================================
-# 실전형 판정 유틸 (최대 15일 / +2% 선도달 / -3% 손절)
+# 전 구간 벡터 판정 (종목당 rolling 1회 → 후보일만 스칼라 확정)
 # =============================================================
+# 기존 경로는 날짜마다 df.iloc[:i+1].copy() 후 rolling을 다시 계산해 종목당 O(n²)였다.
+# rolling/cumsum은 인과적(causal)이라 전체 시계열에서 한 번 계산한 i번째 값이
+# 부분 시계열 마지막 값과 비트 단위로 같다. 판정/라벨 생성은 _pick_conditions 등
+# 기존 함수를 그대로 재사용하므로 결과 dict가 per-date 경로와 동일하다.
+def _condition_features(df: pd.DataFrame) -> dict:
+    """A/B1/B2 판정에 필요한 시계열을 전체 구간에서 한 번만 계산한다."""
+    close_s = df['Close']
+    vol_s = df['Volume']
+    vma10 = vol_s.rolling(10).mean().to_numpy(dtype=float)
+    bb40 = _calc_bollinger(df, 40, 2.0)
+    env20 = _calc_envelope(df, 20, 10)
+    env40 = _calc_envelope(df, 40, 10)
+    obv = (
+        close_s.diff().apply(lambda x: 1 if x > 0 else (-1 if x < 0 else 0))
+        * vol_s
+    ).cumsum()
 
-def _evaluate_trade_window(df: pd.DataFrame, signal_idx: int, entry_price: float) -> dict:
-    """
-    signal_idx 당일 종가에 진입하고, 다음 거래일부터 최대 15거래일을 추적.
+    o = df['Open'].to_numpy(dtype=float)
+    c = close_s.to_numpy(dtype=float)
+    v = vol_s.to_numpy(dtype=float)
+    n = len(df)
+    # 최근 5봉 매집 카운트: 기준선(vma10)은 판정일 값 하나를 5봉 모두에 적용한다.
+    maejip = np.zeros(n, dtype=int)
+    if n >= 5:
+        win_v = np.lib.stride_tricks.sliding_window_view(v, 5)
+        win_bull = np.lib.stride_tricks.sliding_window_view(c > o, 5)
+        base = vma10[4:]
+        with np.errstate(invalid='ignore'):
+            cnt = ((win_v > base[:, None]) & win_bull).sum(axis=1)
+        maejip[4:] = np.where(base > 0, cnt, 0)
+
+    def _col(name, fallback):
+        return (df[name] if name in df.columns else fallback).to_numpy(dtype=float)
 
-    최근 구간도 제외하지 않고, 가능한 구간까지만 부분 평가한다.
-    - 15거래일이 모두 있으면 진행상태='완료'
-    - 부족하면 진행상태='부분평가'
-    - 0거래일이면 진행상태='미평가'
+    return {
+        'n': n,
+        'open': o,
+        'high': df['High'].to_numpy(dtype=float),
+        'low': df['Low'].to_numpy(dtype=float),
+        'close': c,
+        'vol': v,
+        'vma20': _col('VMA20', vol_s.rolling(20).mean()),
+        'ma20': _col('MA20', close_s.rolling(20).mean()),
+        'high20': df['High'].rolling(20).max().to_numpy(dtype=float),
+        'rsi': _col('RSI', pd.Series(50.0, index=df.index)),
+        'atr': _col('ATR', pd.Series(0.0, index=df.index)),
+        'env_lower20': env20['lower'].to_numpy(dtype=float),
+        'env_lower40': env40['lower'].to_numpy(dtype=float),
+        'bb_lower40': bb40['lower'].to_numpy(dtype=float),
+        'bb_mid40': bb40['mid'].to_numpy(dtype=float),
+        'bb_width40': bb40['width'].to_numpy(dtype=float),
+        'obv_ma5': obv.rolling(5).mean().to_numpy(dtype=float),
+        'obv_ma10': obv.rolling(10).mean().to_numpy(dtype=float),
+        'maejip_5d': maejip,
+        'amount20_b': ((close_s * vol_s) / 1e8).rolling(20).mean().to_numpy(dtype=float),
+    }
 
-    판정 우선순위
-    1) +2% 먼저 도달(고가 기준) -> 승
-    2) -3% 먼저 도달 -> 손절
-    3) 둘 다 없으면 현재 확보 가능한 마지막 종가가 진입가보다 높으면 승(종가), 낮으면 패(종가)
-    """
-    result = {
+
+def _vector_candidate_mask(feat: dict) -> np.ndarray:
+    """A/B1/B2 중 하나라도 걸릴 수 있는 행(상위집합). 반올림 경계/결측 행은 후보로 남긴다."""
+    n = feat['n']
+    o, h, l, c, v = feat['open'], feat['high'], feat['low'], feat['close'], feat['vol']
+    z = lambda a, d=0.0: np.where(np.isnan(a), d, a)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gate = (np.arange(n) >= 60) & (z(c) >= MIN_PRICE) & (z(c) * z(v) >= MIN_AMOUNT)
+        loose = np.isnan(o) | np.isnan(h) | np.isnan(l)
+
+        vma20, ma20, high20 = z(feat['vma20']), z(feat['ma20']), z(feat['high20'])
+        rsi = z(feat['rsi'], 50.0)
+        body_top = np.maximum(o, c)
+        upper_wick = np.maximum(0.0, h - body_top) / np.maximum(np.abs(c - o), 1e-9)
+        near20 = np.where(high20 > 0, c / high20 * 100, 0.0)
+        disp = np.where(ma20 > 0, c / ma20 * 100, 100.0)
+        bull = c >= o
+        strong = bull | (np.where(h > 0, c / h * 100, 0.0) >= 95)
+        obv_rising = z(feat['obv_ma5']) > z(feat['obv_ma10'])
+        maejip_ok = feat['maejip_5d'] >= 1
+        wick25 = upper_wick <= 0.25
+
+        a_score = (
+            ((near20 >= NEAR_HIGH20_MIN) & (near20 <= NEAR_HIGH20_MAX)).astype(int)
+            + (upper_wick <= UPPER_WICK_MAX)
+            + ((vma20 > 0) & (v >= vma20 * VOL_MULT))
+            + bull
+            + ((disp >= DISPARITY_MIN) & (disp <= DISPARITY_MAX))
+            + ((ma20 > 0) & (c >= ma20))
+        )
+
+        lower20, lower40 = z(feat['env_lower20']), z(feat['env_lower40'])
+        env20_pct = np.where(lower20 > 0, (c - lower20) / lower20 * 100, 999.0)
+        env40_pct = np.where(lower40 > 0, (c - lower40) / lower40 * 100, 999.0)
+        env20_near = (env20_pct >= -2.0) & (env20_pct <= 2.0)
+        env40_near = (env40_pct >= -10.0) & (env40_pct <= 10.0)
+        b1_score = (
+            env20_near.astype(int) + env40_near + (rsi <= 40) + obv_rising + maejip_ok + strong + wick25
+        )
+
+        bb_lower = z(feat['bb_lower40'])
+        bb_pct = np.where(bb_lower > 0, (c - bb_lower) / bb_lower * 100, 999.0)
+        bb_near = (bb_pct >= -BB40_NEAR_PCT) & (bb_pct <= BB40_NEAR_PCT)
+        # BB폭/ATR%는 반올림 후 비교하므로 경계 근처는 넉넉히 통과시킨다.
+        atr_pct = np.where(c > 0, z(feat['atr']) / c * 100, 0.0)
+        vola = (z(feat['bb_width40']) >= 13.9) | (atr_pct >= 2.9)
+        b2_score = (
+            bb_near.astype(int) + (rsi <= 45) + obv_rising + maejip_ok + strong + wick25 + vola
+        )
+
+        hit = (
+            (a_score >= 4)
+            | (env20_near & env40_near & (b1_score >= 4))
+            | (bb_near & (b2_score >= 4))
+        )
+    return gate & (hit | loose)
+
+
+def _conditions_from_features(feat: dict, i: int, code: str = '', row=None) -> dict | None:
+    """_check_conditions_on_date(df, i)와 같은 결과를 사전계산 배열에서 부분 시계열 복사 없이 만든다."""
+    if i < 60 or feat['n'] < 60:
+        return None
+    close = _safe_float(feat['close'][i])
+    open_p = _safe_float(feat['open'][i])
+    high = _safe_float(feat['high'][i])
+    low = _safe_float(feat['low'][i])
+    vol = _safe_float(feat['vol'][i])
+    if close < MIN_PRICE or close * vol < MIN_AMOUNT:
+        return None
+    if row is None:
+        row = {'Open': float(feat['open'][i]), 'High': float(feat['high'][i]), 'Close': float(feat['close'][i])}
+
+    def _last(key):
+        x = feat[key][i]
+        return 0.0 if pd.isna(x) else float(x)
+
+    env = _envelope_bottom_state(close, _last('env_lower20'), _last('env_lower40'))
+    bb = _bb_bottom_state(close, _last('bb_lower40'), _last('bb_mid40'), _last('bb_width40'))
+    obv_rising = _safe_float(feat['obv_ma5'][i]) > _safe_float(feat['obv_ma10'][i])
+    atr = _safe_float(feat['atr'][i], 0.0)
+    state = _common_state_from_values(
+        row, close, open_p, high, low, vol,
+        _safe_float(feat['vma20'][i]), _safe_float(feat['ma20'][i]), _safe_float(feat['high20'][i]),
+        _safe_float(feat['rsi'][i], 50.0), env, bb, obv_rising, int(feat['maejip_5d'][i]), atr,
+    )
+    state['index_label'] = _pick_index_label(code)
+    is_top_mcap = str(code).zfill(6) in TOP_MCAP_SET
+    bb_width = float(bb.get('bb40_width', 0) or 0)
+    atr_pct = (atr / close * 100) if close > 0 else 0.0
+    band_rec = _band_recommendation_from_values(
+        bb_width, atr_pct, float(feat['amount20_b'][i]), state['index_label'], is_top_mcap,
+    )
+    return _pick_conditions(state, band_rec)
+
+
+def _scan_condition_hits(df: pd.DataFrame, code: str = '', lo: int = 60, hi: int | None = None) -> dict:
+    """[lo, hi) 구간에서 신호가 난 행 번호 → 판정 dict. 후보 마스크 밖의 행은 판정 자체를 생략한다."""
+    hi = len(df) if hi is None else min(int(hi), len(df))
+    if len(df) < 60 or hi <= lo:
+        return {}
+    feat = _condition_features(df)
+    mask = _vector_candidate_mask(feat)
+    out = {}
+    for i in np.flatnonzero(mask[lo:hi]) + lo:
+        cond = _conditions_from_features(feat, int(i), code=code)
+        if cond is not None:
+            out[int(i)] = cond
+    return out
+
+
+def _cond_value_equal(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and np.isnan(a) and np.isnan(b):
+        return True
+    return a == b
+
+
+def verify_vectorized_conditions(df: pd.DataFrame, code: str = '') -> dict:
+    """per-date 경로(_check_conditions_on_date)와 벡터 경로의 결과가 모든 행에서 같은지 비교한다."""
+    hits = _scan_condition_hits(df, code=code)
+    mismatches = []
+    n_ref = 0
+    for i in range(60, len(df)):
+        ref = _check_conditions_on_date(df, i, code=code)
+        got = hits.get(i)
+        n_ref += ref is not None
+        if ref is None or got is None:
+            if ref is not got:
+                mismatches.append((i, 'hit' if ref is not None else 'miss', 'hit' if got is not None else 'miss'))
+            continue
+        bad = [k for k in ref if k not in got or not _cond_value_equal(ref[k], got[k])]
+        if bad or set(got) != set(ref):
+            mismatches.append((i, bad[:5], sorted(set(got) ^ set(ref))[:5]))
+    return {'code': code, 'rows': max(0, len(df) - 60), 'hits': n_ref, 'vector_hits': len(hits), 'mismatches': mismatches}
+
+
+def _verify_vectorized_for_codes(codes: list, start: str, end: str) -> bool:
+    ok = True
+    for code in codes:
+        try:
+            load_start = (datetime.strptime(start, '%Y-%m-%d') - timedelta(days=700)).strftime('%Y-%m-%d')
+            df_raw = fdr.DataReader(code, start=load_start, end=end)
+            if df_raw is None or len(df_raw) < 260:
+                continue
+            df = get_indicators(df_raw.copy()).reset_index()
+        except Exception as e:
+            log_error(f"[verify/{code}] 데이터 로드 실패: {e}")
+            continue
+        t0 = time.perf_counter()
+        res = verify_vectorized_conditions(df, code=code)
+        mark = 'OK' if not res['mismatches'] else 'MISMATCH'
+        log_info(
+            f"[verify/{code}] {mark} rows={res['rows']} hits={res['hits']} vector_hits={res['vector_hits']} "
+            f"({time.perf_counter() - t0:.2f}s) {res['mismatches'][:3] if res['mismatches'] else ''}"
+        )
+        ok = ok and not res['mismatches']
+        if forward_paths is not None:
+            pres = verify_vectorized_paths(df, code=code)
+            log_info(
+                f"[verify/{code}] paths {'OK' if not pres['mismatches'] else 'MISMATCH'} rows={pres['rows']} "
+                f"vector={pres['vector_sec']}s loop={pres['loop_sec']}s {pres['mismatches'][:3] if pres['mismatches'] else ''}"
+            )
+            ok = ok and not pres['mismatches']
+    return ok
+
+
+# =============================================================
+# 실전형 판정 유틸 (최대 15일 / +2% 선도달 / -3% 손절)
+# =============================================================
+
+def _empty_trade_eval() -> dict:
+    return {
         '평가완료일수': 0,
         '진행상태': '미평가',
         '15일판정': 'N/A',
@@ -1235,6 +1498,23 @@ def _evaluate_trade_window(df: pd.DataFrame, signal_idx: int, entry_price: float
         '실전청산사유': '',
     }
 
+
+def _evaluate_trade_window(df: pd.DataFrame, signal_idx: int, entry_price: float) -> dict:
+    """
+    signal_idx 당일 종가에 진입하고, 다음 거래일부터 최대 15거래일을 추적.
+
+    최근 구간도 제외하지 않고, 가능한 구간까지만 부분 평가한다.
+    - 15거래일이 모두 있으면 진행상태='완료'
+    - 부족하면 진행상태='부분평가'
+    - 0거래일이면 진행상태='미평가'
+
+    판정 우선순위
+    1) +2% 먼저 도달(고가 기준) -> 승
+    2) -3% 먼저 도달 -> 손절
+    3) 둘 다 없으면 현재 확보 가능한 마지막 종가가 진입가보다 높으면 승(종가), 낮으면 패(종가)
+    """
+    result = _empty_trade_eval()
+
     if entry_price <= 0 or signal_idx + 1 >= len(df):
         return result
 
@@ -1340,6 +1620,154 @@ def _evaluate_trade_window(df: pd.DataFrame, signal_idx: int, entry_price: float
     return result
 
 
+def _forward_return_fields(ret) -> dict:
+    return {'수익률': round(ret, 2), '승패': '승' if ret >= PROFIT_TARGET else ('손절' if ret <= STOP_LOSS else '보합')}
+
+
+def _trade_paths_batch(df: pd.DataFrame, idxs) -> dict:
+    """신호 행 번호들 → (forward_returns, trade_eval). 행마다 HOLD_DAYS_LIST 루프 + _evaluate_trade_window를
+    돌린 결과와 같은 dict를 forward_paths 행렬 한 번으로 만든다. 진입가(당일 종가)가 0 이하인 행은 뺀다."""
+    if forward_paths is None or df is None or len(df) == 0:
+        return {}
+    idx = np.array(sorted(int(i) for i in idxs), dtype=np.int64)
+    if idx.size == 0:
+        return {}
+    n = len(df)
+    px = forward_paths.ohlc_arrays(df, ('High', 'Low', 'Close'))
+    close0 = np.nan_to_num(px['Close'], nan=0.0)  # _safe_float: NaN → 0
+    entry = close0[idx]
+    keep = entry > 0
+    idx, entry = idx[keep], entry[keep]
+    if idx.size == 0:
+        return {}
+
+    # 보유일별 종가 수익률(범위 밖은 N/A, 결측 종가는 기존처럼 0원으로 본다)
+    fwd = {}
+    for hold in HOLD_DAYS_LIST:
+        fut = idx + hold
+        fc = close0[np.minimum(fut, n - 1)]
+        fwd[hold] = (fut < n, (fc - entry) / entry * 100)
+
+    L = MAX_HOLD_DAYS
+    avail = forward_paths.available_days(n, idx, L)
+    vm = forward_paths.valid_mask(avail, L)
+    H = np.where(vm, forward_paths.forward_windows(px['High'], idx, L), np.nan)
+    Lo = np.where(vm, forward_paths.forward_windows(px['Low'], idx, L), np.nan)
+    C = np.where(vm, forward_paths.forward_windows(px['Close'], idx, L), np.nan)
+    target = entry * (1 + TARGET_HIT_PCT / 100.0)
+    stop = entry * (1 + STOP_LOSS / 100.0)
+    max_high = np.nan_to_num(forward_paths.nan_reduce(H, 'max'), nan=0.0)
+    min_low = np.nan_to_num(forward_paths.nan_reduce(Lo, 'min'), nan=0.0)
+    final_close = np.nan_to_num(forward_paths.last_valid(C, avail), nan=0.0)
+    # 실전 판정 루프는 결측 고가/저가를 0으로 읽는다(저가 결측 = 손절 터치).
+    hit_t = vm & (np.nan_to_num(H, nan=0.0) >= target[:, None])
+    hit_s = vm & (np.nan_to_num(Lo, nan=0.0) <= stop[:, None])
+    exit_day = forward_paths.first_day(hit_t | hit_s)
+    rows = np.arange(idx.size)
+    at = np.maximum(exit_day - 1, 0)
+    exit_t, exit_s = hit_t[rows, at], hit_s[rows, at]
+    high_day = forward_paths.first_day(H >= target[:, None])
+    close_day = forward_paths.first_day(C >= target[:, None])
+    stop_day = forward_paths.first_day(Lo <= stop[:, None])
+
+    out = {}
+    for j, i in enumerate(idx.tolist()):
+        e = float(entry[j])
+        fr = {}
+        for hold in HOLD_DAYS_LIST:
+            ok, ret = fwd[hold]
+            if not ok[j]:
+                fr[f'수익률_{hold}일'] = None
+                fr[f'승패_{hold}일'] = 'N/A'
+                continue
+            f = _forward_return_fields(float(ret[j]))
+            fr[f'수익률_{hold}일'] = f['수익률']
+            fr[f'승패_{hold}일'] = f['승패']
+
+        res = _empty_trade_eval()
+        days = int(avail[j])
+        if days > 0:
+            res['평가완료일수'] = days
+            res['진행상태'] = '완료' if days >= MAX_HOLD_DAYS else '부분평가'
+            res['15일최고수익률%'] = round((float(max_high[j]) - e) / e * 100, 2)
+            res['15일최저수익률%'] = round((float(min_low[j]) - e) / e * 100, 2)
+            res['15일종가수익률%'] = round((float(final_close[j]) - e) / e * 100, 2)
+            d = int(exit_day[j])
+            if d:
+                if exit_t[j] and exit_s[j]:
+                    first_target = SAME_DAY_EXIT_POLICY == 'target_first'
+                    res['15일판정'] = '승' if first_target else '손절'
+                    res['실전청산사유'] = '동일봉_익절우선' if first_target else '동일봉_손절우선'
+                elif exit_t[j]:
+                    res['15일판정'] = '승'
+                    res['실전청산사유'] = '2%도달(고가기준)'
+                else:
+                    res['15일판정'] = '손절'
+                    res['실전청산사유'] = '손절터치'
+                res['실전청산일'] = d
+            if high_day[j]:
+                res['15일내2%도달'] = 'Y'
+                res['2%도달일'] = int(high_day[j])
+                res['15일내2%도달_고가기준'] = 'Y'
+                res['2%도달일_고가기준'] = int(high_day[j])
+            if close_day[j]:
+                res['15일내2%도달_종가기준'] = 'Y'
+                res['2%도달일_종가기준'] = int(close_day[j])
+            if stop_day[j]:
+                res['15일내손절터치'] = 'Y'
+                res['손절터치일'] = int(stop_day[j])
+            if res['15일판정'] == 'N/A':
+                fc = float(final_close[j])
+                res['실전청산일'] = days
+                if fc > e:
+                    res['15일판정'], res['실전청산사유'] = '승(종가)', '현재구간종가상승'
+                elif fc < e:
+                    res['15일판정'], res['실전청산사유'] = '패(종가)', '현재구간종가하락'
+                else:
+                    res['15일판정'], res['실전청산사유'] = '보합', '현재구간종가보합'
+        out[i] = (fr, res)
+    return out
+
+
+def _forward_returns_one(df: pd.DataFrame, i: int, entry_price: float) -> dict:
+    forward_returns = {}
+    for hold in HOLD_DAYS_LIST:
+        future_idx = i + hold
+        if future_idx >= len(df):
+            forward_returns[f'수익률_{hold}일'] = None
+            forward_returns[f'승패_{hold}일'] = 'N/A'
+            continue
+
+        future_close = _safe_float(df['Close'].iloc[future_idx])
+        ret = (future_close - entry_price) / entry_price * 100
+        forward_returns[f'수익률_{hold}일'] = round(ret, 2)
+        forward_returns[f'승패_{hold}일'] = (
+            '승' if ret >= PROFIT_TARGET else ('손절' if ret <= STOP_LOSS else '보합')
+        )
+    return forward_returns
+
+
+def verify_vectorized_paths(df: pd.DataFrame, code: str = '') -> dict:
+    """_trade_paths_batch와 행 단위 경로(_forward_returns_one + _evaluate_trade_window)가 모든 행에서 같은지 비교한다."""
+    rows = list(range(60, len(df)))
+    t0 = time.perf_counter()
+    batch = _trade_paths_batch(df, rows)
+    t_vec = time.perf_counter() - t0
+    mismatches = []
+    t0 = time.perf_counter()
+    for i in rows:
+        entry_price = _safe_float(df['Close'].iloc[i])
+        if entry_price <= 0:
+            if i in batch:
+                mismatches.append((i, 'entry<=0'))
+            continue
+        ref = (_forward_returns_one(df, i, entry_price), _evaluate_trade_window(df, i, entry_price))
+        got = batch.get(i)
+        if got is None or list(got[0].items()) != list(ref[0].items()) or list(got[1].items()) != list(ref[1].items()):
+            mismatches.append((i, [k for k in ref[1] if got is None or got[1].get(k) != ref[1][k]][:5]))
+    return {'code': code, 'rows': len(rows), 'mismatches': mismatches, 'vector_sec': round(t_vec, 3), 'loop_sec': round(time.perf_counter() - t0, 3)}
+
+
 # =============================================================
 # 단일 종목 백테스트
 # =============================================================
@@ -1434,6 +1862,9 @@ def backtest_ticker(code: str, start: str, end: str) -> list:
         end_dt = datetime.strptime(end, '%Y-%m-%d')
 
         stage = {"date_in_range": 0, "cond_hit": 0, "flow_pass": 0, "record_appended": 0}
+        hits = _scan_condition_hits(df, code=code) if VECTOR_EVAL else None
+        # 신호 행 전체의 보유일 수익률/15일 판정을 한 번에 계산한다(없거나 엔진 미설치면 행 단위 경로).
+        paths = _trade_paths_batch(df, hits) if hits else {}
         for i in range(60, len(df)):
             row_date = pd.to_datetime(df[date_col].iloc[i])
             row_dt = row_date.to_pydatetime().replace(tzinfo=None)
@@ -1441,7 +1872,7 @@ def backtest_ticker(code: str, start: str, end: str) -> list:
                 continue
             stage["date_in_range"] += 1
 
-            cond = _check_conditions_on_date(df, i, code=code)
+            cond = hits.get(i) if hits is not None else _check_conditions_on_date(df, i, code=code)
             if cond is None:
                 continue
             stage["cond_hit"] += 1
@@ -1457,22 +1888,11 @@ def backtest_ticker(code: str, start: str, end: str) -> list:
             if entry_price <= 0:
                 continue
 
-            forward_returns = {}
-            for hold in HOLD_DAYS_LIST:
-                future_idx = i + hold
-                if future_idx >= len(df):
-                    forward_returns[f'수익률_{hold}일'] = None
-                    forward_returns[f'승패_{hold}일'] = 'N/A'
-                    continue
-
-                future_close = _safe_float(df['Close'].iloc[future_idx])
-                ret = (future_close - entry_price) / entry_price * 100
-                forward_returns[f'수익률_{hold}일'] = round(ret, 2)
-                forward_returns[f'승패_{hold}일'] = (
-                    '승' if ret >= PROFIT_TARGET else ('손절' if ret <= STOP_LOSS else '보합')
-                )
-
-            trade_eval = _evaluate_trade_window(df, i, entry_price)
+            if i in paths:
+                forward_returns, trade_eval = paths[i]
+            else:
+                forward_returns = _forward_returns_one(df, i, entry_price)
+                trade_eval = _evaluate_trade_window(df, i, entry_price)
             snapshot_info = _get_flow_snapshot_info(row_dt.strftime('%Y-%m-%d'), code, cond.get('mode', ''))
             records.append(_build_signal_record(
                 df, i, code, cond,
@@ -1512,6 +1932,7 @@ def replay_ticker(code: str, start: str, end: str) -> list:
         end_dt = datetime.strptime(end, '%Y-%m-%d')
 
         stage = {"date_in_range": 0, "cond_hit": 0, "flow_pass": 0, "record_appended": 0}
+        hits = _scan_condition_hits(df, code=code) if VECTOR_EVAL else None
         for i in range(60, len(df)):
             row_date = pd.to_datetime(df[date_col].iloc[i])
             row_dt = row_date.to_pydatetime().replace(tzinfo=None)
@@ -1519,7 +1940,7 @@ def replay_ticker(code: str, start: str, end: str) -> list:
                 continue
             stage["date_in_range"] += 1
 
-            cond = _check_conditions_on_date(df, i, code=code)
+            cond = hits.get(i) if hits is not None else _check_conditions_on_date(df, i, code=code)
             if cond is None:
                 continue
             stage["cond_hit"] += 1
@@ -2273,10 +2694,13 @@ def main():
     parser.add_argument('--flow-filter', default='off', choices=['off', 'soft', 'strict'], help='최근3일 외인/기관 수급 필터: off=미적용, soft=점수2이상, strict=점수3이상')
     parser.add_argument('--ai-backfill', default='off', choices=['off', 'missing', 'all'], help='과거 신호에 AI 백필판정 부여: off=미사용, missing=없는 것만, all=강제 재생성')
     parser.add_argument('--ai-backfill-per-day', type=int, default=7, help='AI 백필 시 하루당 최대 판정 종목 수')
+    parser.add_argument('--verify-vectorized', type=int, default=0, metavar='N', help='상위 N종목에서 벡터 판정/보유 경로 == 날짜별 계산 일치 검증 후 종료')
     args = parser.parse_args()
 
-    global FLOW_FILTER_MODE
+    global FLOW_FILTER_MODE, INVESTOR_FLOW_FILL_RANGE
     FLOW_FILTER_MODE = args.flow_filter
+    # _calc_investor_flow_features는 신호일 20일 전부터 조회한다.
+    INVESTOR_FLOW_FILL_RANGE = ((pd.Timestamp(args.start) - pd.Timedelta(days=30)).strftime('%Y-%m-%d'), args.end)
 
     log_info(f"백테스트 기준본 버전: {BACKTEST_BASELINE_VERSION}")
     _load_flow_snapshot_lookup()
@@ -2285,6 +2709,11 @@ def main():
         log_error('분석할 종목이 없습니다.')
         sys.exit(1)
 
+    if args.verify_vectorized > 0:
+        ok = _verify_vectorized_for_codes(codes[:args.verify_vectorized], args.start, args.end)
+        log_info(f"벡터 판정 검증: {'일치' if ok else '불일치 발견'}")
+        sys.exit(0 if ok else 1)
+
     log_info(f"실행 시작: {args.start} ~ {args.end} | {len(codes)}개 | mode={args.mode} | flow_filter={args.flow_filter} | ai_backfill={args.ai_backfill}")
 
     all_records = []
@@ -2305,6 +2734,10 @@ def main():
             if done % 20 == 0:
                 log_info(f"진행: {done}/{len(codes)} | 레코드: {len(all_records)}")
 
+    if flow_store is not None and flow_store.enabled():
+        flow_store.flush()
+        log_info(flow_store.format_stats())
+
     if not all_records:
         log_info('백테스트 결과 없음')
         sys.exit(0)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import gzip
 import hashlib
+import io
 import json
 import os
 import pickle
@@ -10,12 +11,24 @@ import re
 import shutil
 import tarfile
 import tempfile
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Iterable
 
+import numpy as np
 import pandas as pd
 
+import direct_replay_performance_v20 as v20_perf
+import price_chunk_store
+
+try:  # optional columnar backend; without it dates fall back to the legacy per-date pickle
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except Exception:  # pragma: no cover
+    pa = None
+    pa_ipc = None
+
 VERSION = "V73.3.6.6.23"
 RESEARCH_ONLY = True
 LIVE_LOGIC_CHANGED = False
@@ -34,11 +47,24 @@ PARENT_PREFLIGHT_JSON = "v73_v23_parent_preflight.json"
 PARENT_PREFLIGHT_REPORT = "v73_v23_parent_preflight_report.txt"
 REPORT_FILE = "v73_v23_zero_recompute_report.txt"
 
+# Columnar layout, one pair per as-of date under v23_materialized/:
+#   date_YYYYMMDD.ipc  - each table as a zstd-compressed Arrow IPC file segment plus one gzip-pickled "extras"
+#                        segment (non-scalar columns, missing-key positions, runtime sidecars, pickle-fallback tables)
+#   date_YYYYMMDD.json - identity, row counts, segment offsets/columns and the pack sha256 (content_sha256)
+# Handoff/merge/preflight decide from the JSON alone; readers memory-map the pack and decode only the
+# segments/columns they ask for. Whole-segment compression beats per-buffer IPC compression on these
+# few-hundred-row tables.
+PARTITION_SCHEMA = "V23_MATERIALIZED_PARTITION_1"
+HANDOFF_INDEX_JSON = "v23_handoff_index.json"
+ROW_TABLES = ("candidate_rows", "capture_rows", "attempt_rows")
+FRAME_TABLES = ("universe_membership", "universe_summary", "universe_availability")
+
 CACHE_DIRS = (
     ".cache/v20_price_history",
     ".cache/v20_asof_snapshots",
     ".cache/v20_replay_checkpoint",
 )
+PRICE_CACHE_DIR = CACHE_DIRS[0]
 
 
 def _utc_now() -> str:
@@ -101,17 +127,46 @@ def _norm_date(v: Any) -> pd.Timestamp:
     return pd.Timestamp(v).normalize()
 
 
+def partition_costs() -> dict[str, float] | None:
+    """Recorded per-date replay seconds from V23_PARTITION_COST_FILE (a v20 date-cost ledger), if set.
+
+    Every shard must read the same ledger, otherwise their partitions disagree; the manifest records
+    the ledger hash (partition_mode) and the parent merge reports whether all shards agreed.
+    """
+    path = str(os.getenv("V23_PARTITION_COST_FILE", "")).strip()
+    if not path:
+        return None
+    return v20_perf.load_date_costs(path) or None
+
+
+def partition_mode(costs: dict[str, float] | None = None) -> str:
+    costs = partition_costs() if costs is None else costs
+    if not costs:
+        return "EQUAL_COUNT"
+    raw = json.dumps(sorted((k, round(float(v), 3)) for k, v in costs.items()), separators=(",", ":"))
+    return "COST_BALANCED:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+
 def partition_dates(
     dates: Iterable[Any],
     shard_index: int,
     shard_count: int,
     *,
     newest_first: bool = True,
+    costs: dict[str, float] | None = None,
 ) -> list[pd.Timestamp]:
-    """Balanced contiguous date shards; each shard executes newest-first."""
+    """Balanced contiguous date shards; each shard executes newest-first.
+
+    Without costs the shards hold equal date counts. With recorded per-date seconds (``costs`` or
+    V23_PARTITION_COST_FILE) the contiguous cut points minimize the slowest shard instead.
+    """
     ds = sorted({_norm_date(x) for x in dates})
     n = max(1, int(shard_count))
     i = max(0, min(int(shard_index), n - 1))
+    costs = partition_costs() if costs is None else costs
+    if costs:
+        out = v20_perf.balanced_contiguous_blocks(ds, n, costs)[i]
+        return list(reversed(out)) if newest_first else out
     q, r = divmod(len(ds), n)
     start = i * q + min(i, r)
     size = q + (1 if i < r else 0)
@@ -187,10 +242,31 @@ def _materialized_root(output_dir: str | Path) -> Path:
     return Path(explicit) if explicit else Path(output_dir or "reports") / MATERIALIZED_DIRNAME
 
 
-def materialized_path(output_dir: str | Path, asof_date: Any) -> Path:
+def columnar_enabled() -> bool:
+    fmt = str(os.getenv("V23_MATERIALIZED_FORMAT", "arrow")).strip().lower()
+    return pa is not None and fmt not in {"pickle", "pkl", "legacy"}
+
+
+def partition_path(output_dir: str | Path, asof_date: Any) -> Path:
+    """Manifest of the columnar pack; the data sits next to it as ``.ipc``."""
+    return _materialized_root(output_dir) / f"date_{_norm_date(asof_date).strftime('%Y%m%d')}.json"
+
+
+def legacy_materialized_path(output_dir: str | Path, asof_date: Any) -> Path:
     return _materialized_root(output_dir) / f"date_{_norm_date(asof_date).strftime('%Y%m%d')}.pkl.gz"
 
 
+def materialized_path(output_dir: str | Path, asof_date: Any) -> Path:
+    """Existing columnar manifest, else existing legacy pickle, else where the active format would write."""
+    part = partition_path(output_dir, asof_date)
+    if part.exists():
+        return part
+    legacy = legacy_materialized_path(output_dir, asof_date)
+    if legacy.exists() or not columnar_enabled():
+        return legacy
+    return part
+
+
 def _atomic_pickle(path: Path, payload: Any) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
@@ -212,6 +288,250 @@ def file_sha256(path: str | Path) -> str:
     return h.hexdigest()
 
 
+def _segment_codec() -> Any:
+    want = str(os.getenv("V23_ARROW_COMPRESSION", "zstd")).strip().lower() or "zstd"
+    for name in (want, "lz4"):
+        if name == "uncompressed":
+            return None
+        if pa.Codec.is_available(name):
+            if name == "zstd":
+                return pa.Codec(name, compression_level=max(1, min(19, _env_int("V23_ZSTD_LEVEL", 6))))
+            return pa.Codec(name)
+    return None
+
+
+# Python/numpy scalar types that survive an Arrow round trip unchanged (numpy scalars come back as Python scalars).
+_NATIVE_TYPES = {bool, int, float, str, np.bool_, np.int32, np.int64, np.float32, np.float64, np.str_}
+
+
+def _rows_to_table(rows: list[dict[str, Any]]) -> tuple[Any, dict[str, list[Any]], dict[str, list[int]], list[str]]:
+    """list[dict] -> (Arrow table of single-type scalar columns, other columns as lists, missing-key rows, key order).
+
+    Keeping missing keys and non-scalar/mixed-type columns aside makes the round trip restore the exact rows.
+    """
+    n = len(rows)
+    seen: dict[str, int] = {}
+    for r in rows:
+        if not isinstance(r, dict):
+            raise TypeError("row must be dict")
+        for k in r:
+            seen[k] = seen.get(k, 0) + 1
+    names, arrays, objects, absent = [], [], {}, {}
+    for k, cnt in seen.items():
+        if not isinstance(k, str):
+            raise TypeError("row keys must be str")
+        vals = [r.get(k) for r in rows]
+        if cnt < n:
+            absent[k] = [i for i, r in enumerate(rows) if k not in r]
+        kinds = set(map(type, vals))
+        kinds.discard(type(None))
+        arr = None
+        if len(kinds) <= 1 and kinds <= _NATIVE_TYPES:
+            try:
+                arr = pa.array(vals)
+            except Exception:
+                arr = None
+        if arr is None:
+            objects[k] = vals
+        else:
+            names.append(k)
+            arrays.append(arr)
+    return pa.Table.from_arrays(arrays, names=names), objects, absent, list(seen)
+
+
+def _table_to_rows(table: Any, objects: dict[str, list[Any]], absent: dict[str, list[int]], spec: dict[str, Any]) -> list[dict[str, Any]]:
+    cols = {name: table.column(name).to_pylist() for name in table.column_names}
+    cols.update(objects)
+    names = [c for c in spec.get("columns") or [] if c in cols]
+    if not names:
+        return [{} for _ in range(int(spec.get("rows") or 0))]
+    rows = [dict(zip(names, vs)) for vs in zip(*(cols[c] for c in names))]
+    for name, miss in absent.items():
+        if name in cols:
+            for i in miss:
+                rows[i].pop(name, None)
+    return rows
+
+
+def _select_columns(obj: Any, want: set[str] | None) -> Any:
+    if want is None:
+        return obj
+    if isinstance(obj, pd.DataFrame):
+        return obj[[c for c in obj.columns if c in want]]
+    if isinstance(obj, list):
+        return [{k: v for k, v in r.items() if k in want} for r in obj]
+    return obj
+
+
+def _ipc_segment(table: Any, codec: Any) -> tuple[Any, int]:
+    sink = pa.BufferOutputStream()
+    with pa_ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    raw = sink.getvalue()
+    return (raw if codec is None else codec.compress(raw)), raw.size
+
+
+def _write_partition(manifest_path: Path, payload: dict[str, Any]) -> dict[str, Any]:
+    codec = _segment_codec()
+    tables: dict[str, dict[str, Any]] = {}
+    extras: dict[str, Any] = {"objects": {}, "absent": {}, "pickled": {}, "runtime_sidecars": payload["runtime_sidecars"]}
+    segments: list[tuple[str, Any]] = []
+    for name in ROW_TABLES + FRAME_TABLES:
+        obj = payload[name]
+        spec: dict[str, Any] = {"kind": "rows" if name in ROW_TABLES else "frame", "rows": len(obj)}
+        if len(obj) == 0 and (name in ROW_TABLES or (len(obj.columns) == 0 and isinstance(obj.index, pd.RangeIndex))):
+            tables[name] = {**spec, "format": "empty"}
+            continue
+        try:
+            if name in ROW_TABLES:
+                table, objects, absent, order = _rows_to_table(obj)
+                spec.update(columns=order, object_columns=list(objects), extras=bool(objects or absent))
+                if objects:
+                    extras["objects"][name] = objects
+                if absent:
+                    extras["absent"][name] = absent
+            else:
+                table = pa.Table.from_pandas(obj, preserve_index=True)
+                spec["columns"] = list(table.column_names)
+            seg, spec["raw_bytes"] = _ipc_segment(table, codec)
+            segments.append((name, seg))
+            spec["format"] = "arrow"
+        except Exception:
+            # Mixed-type frames etc.: this table rides in the extras segment as a pickle.
+            extras["objects"].pop(name, None)
+            extras["absent"].pop(name, None)
+            extras["pickled"][name] = obj
+            spec = {"kind": spec["kind"], "rows": spec["rows"], "format": "pickle"}
+        tables[name] = spec
+    segments.append(("__extras__", gzip.compress(pickle.dumps(extras, protocol=pickle.HIGHEST_PROTOCOL), compresslevel=3)))
+
+    pack = manifest_path.with_suffix(".ipc")
+    pack.parent.mkdir(parents=True, exist_ok=True)
+    tmp = pack.with_name(pack.name + f".{os.getpid()}.tmp")
+    h = hashlib.sha256()
+    offsets: dict[str, list[int]] = {}
+    with open(tmp, "wb") as fh:
+        for name, seg in segments:
+            data = memoryview(seg)
+            offsets[name] = [fh.tell(), data.nbytes]
+            fh.write(data)
+            h.update(data)
+    for name, spec in tables.items():
+        if name in offsets:
+            spec["segment"] = offsets[name]
+    meta = {k: v for k, v in payload.items() if k not in tables and k != "runtime_sidecars"}
+    meta.update(
+        partition_schema=PARTITION_SCHEMA,
+        segment_codec=codec.name if codec is not None else "uncompressed",
+        pack_file=pack.name,
+        pack_bytes=tmp.stat().st_size,
+        content_sha256=h.hexdigest(),
+        extras_segment=offsets["__extras__"],
+        tables=tables,
+        runtime_sidecar_count=len(payload["runtime_sidecars"]),
+    )
+    os.replace(tmp, pack)
+    mtmp = manifest_path.with_name(manifest_path.name + f".{os.getpid()}.tmp")
+    mtmp.write_text(json.dumps(meta, ensure_ascii=False, separators=(",", ":"), default=str), encoding="utf-8")
+    os.replace(mtmp, manifest_path)
+    return meta
+
+
+def read_partition_manifest(path: str | Path) -> dict[str, Any] | None:
+    try:
+        meta = json.loads(Path(path).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(meta, dict) or meta.get("partition_schema") != PARTITION_SCHEMA or not isinstance(meta.get("tables"), dict):
+        return None
+    return meta
+
+
+def _verify_pack(manifest_path: Path, meta: dict[str, Any], *, full_hash: bool) -> str:
+    """'' when the pack next to the manifest matches it (size always, sha256 when full_hash)."""
+    pack = manifest_path.parent / str(meta.get("pack_file", ""))
+    if not pack.is_file():
+        return "missing pack"
+    if pack.stat().st_size != int(meta.get("pack_bytes", -1)):
+        return "pack size"
+    if full_hash and file_sha256(pack) != meta.get("content_sha256"):
+        return "pack sha256"
+    return ""
+
+
+def _read_partition(manifest_path: Path, meta: dict[str, Any], names: Iterable[str], columns: Iterable[str] | None = None) -> dict[str, Any]:
+    """Decode the requested tables (and optionally only ``columns``) from a memory-mapped pack."""
+    pack = manifest_path.parent / str(meta["pack_file"])
+    want = None if columns is None else set(columns)
+    out: dict[str, Any] = {}
+    buf = extras = None
+    for name in names:
+        spec = meta["tables"].get(name) or {}
+        if extras is None and (name == "runtime_sidecars" or spec.get("format") == "pickle" or spec.get("extras")):
+            off, n = meta["extras_segment"]
+            with open(pack, "rb") as fh:
+                fh.seek(off)
+                extras = pickle.loads(gzip.decompress(fh.read(n)))
+        if name == "runtime_sidecars":
+            out[name] = extras["runtime_sidecars"]
+            continue
+        if not spec:
+            continue
+        fmt = spec.get("format")
+        if fmt == "empty":
+            out[name] = [] if spec.get("kind") == "rows" else pd.DataFrame()
+            continue
+        if fmt == "pickle":
+            out[name] = _select_columns(extras["pickled"][name], want)
+            continue
+        if pa is None:
+            raise RuntimeError("pyarrow is required to read a columnar materialized partition")
+        if buf is None:
+            buf = pa.memory_map(str(pack)).read_buffer()
+        off, n = spec["segment"]
+        have = spec.get("columns") or []
+        seg = buf.slice(off, n)
+        if meta.get("segment_codec", "uncompressed") != "uncompressed":
+            seg = pa.Codec(meta["segment_codec"]).decompress(seg, decompressed_size=int(spec["raw_bytes"]))
+        if want is None:
+            table = pa_ipc.open_file(seg).read_all()
+        else:
+            schema = pa_ipc.open_file(seg).schema
+            if spec.get("kind") == "rows":
+                obj_cols = set(spec.get("object_columns") or [])
+                fields = [c for c in have if c not in obj_cols and c in want]
+            else:
+                # Index fields keep their own name when the index is named ("date"), so take them from the
+                # pandas metadata rather than the "__index_level_N" pattern; RangeIndex entries are dicts.
+                index_cols = {c for c in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)}
+                fields = [c for c in have if c in want or c in index_cols]
+            opts = pa_ipc.IpcReadOptions(included_fields=[schema.get_field_index(c) for c in fields])
+            table = pa_ipc.open_file(seg, options=opts).read_all()
+        if spec.get("kind") == "frame":
+            out[name] = table.to_pandas()
+            continue
+        objects = {k: v for k, v in (extras or {}).get("objects", {}).get(name, {}).items() if want is None or k in want}
+        out[name] = _table_to_rows(table, objects, (extras or {}).get("absent", {}).get(name, {}), spec)
+    return out
+
+
+def read_materialized_table(output_dir: str | Path, asof_date: Any, table: str, columns: Iterable[str] | None = None) -> Any:
+    """Read one table (optionally a column subset) of a materialized date without decoding the others.
+
+    Row tables come back as list[dict] restricted to ``columns``; frame tables as DataFrame. None if absent.
+    """
+    p = materialized_path(output_dir, asof_date)
+    meta = read_partition_manifest(p) if p.suffix == ".json" else None
+    if meta is None:
+        z = load_materialized_date(output_dir, asof_date, require_current_identity=False)
+        if z is None or table not in z:
+            return None
+        return _select_columns(z[table], None if columns is None else set(columns))
+    if table != "runtime_sidecars" and table not in meta["tables"]:
+        return None
+    return _read_partition(p, meta, [table], columns)[table]
+
+
 def write_materialized_date(
     output_dir: str | Path,
     asof_date: Any,
@@ -243,9 +563,17 @@ def write_materialized_date(
         "upstream_checkpoint_schema": checkpoint.get("schema", ""),
         "upstream_checkpoint_signature": checkpoint.get("signature", ""),
     }
-    p = materialized_path(output_dir, asof_date)
-    _atomic_pickle(p, payload)
-    sha = file_sha256(p)
+    if columnar_enabled():
+        p = partition_path(output_dir, asof_date)
+        sha = _write_partition(p, payload)["content_sha256"]
+        legacy_materialized_path(output_dir, asof_date).unlink(missing_ok=True)
+    else:
+        p = legacy_materialized_path(output_dir, asof_date)
+        _atomic_pickle(p, payload)
+        sha = file_sha256(p)
+        stale = partition_path(output_dir, asof_date)
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".ipc").unlink(missing_ok=True)
     return {
         "signal_date": ds,
         "file": p.name,
@@ -259,45 +587,76 @@ def write_materialized_date(
     }
 
 
-def load_materialized_date(output_dir: str | Path, asof_date: Any, *, require_current_identity: bool = True) -> dict[str, Any] | None:
+def load_materialized_date(
+    output_dir: str | Path,
+    asof_date: Any,
+    *,
+    require_current_identity: bool = True,
+    tables: Iterable[str] | None = None,
+) -> dict[str, Any] | None:
+    """Validated payload for one date. ``tables`` limits which tables are read from a columnar
+    partition (``()`` = manifest only); ``table_rows`` always carries every table's row count."""
     p = materialized_path(output_dir, asof_date)
     if not p.exists():
         return None
-    try:
-        z = _load_pickle(p)
-    except Exception:
-        return None
-    if not isinstance(z, dict) or z.get("schema") != SCHEMA or z.get("version") != VERSION:
+    if p.suffix == ".json":
+        meta = read_partition_manifest(p)
+        if meta is None or _verify_pack(p, meta, full_hash=False):
+            return None
+        z = {k: v for k, v in meta.items() if k != "tables"}
+        z["table_rows"] = {k: int(v.get("rows") or 0) for k, v in meta["tables"].items()}
+        z["table_rows"]["runtime_sidecars"] = int(meta.get("runtime_sidecar_count") or 0)
+    else:
+        meta = None
+        try:
+            z = _load_pickle(p)
+        except Exception:
+            return None
+        if not isinstance(z, dict) or not isinstance(z.get("candidate_rows"), list):
+            return None
+        z["table_rows"] = {k: len(z.get(k)) if hasattr(z.get(k), "__len__") else 0 for k in ROW_TABLES + FRAME_TABLES + ("runtime_sidecars",)}
+    if z.get("schema") != SCHEMA or z.get("version") != VERSION:
         return None
     if str(z.get("signal_date")) != _norm_date(asof_date).strftime("%Y-%m-%d"):
         return None
-    if not isinstance(z.get("candidate_rows"), list):
-        return None
     if require_current_identity:
         ident = current_identity()
         if z.get("source_fingerprint") != ident["source_fingerprint"] or z.get("config_fingerprint") != ident["config_fingerprint"]:
             return None
+    if meta is not None:
+        names = list(meta["tables"]) + ["runtime_sidecars"]
+        try:
+            z.update(_read_partition(p, meta, names if tables is None else [n for n in names if n in set(tables)]))
+        except Exception:
+            return None
+        if "candidate_rows" in z and not isinstance(z["candidate_rows"], list):
+            return None
     return z
 
 
+def _materialized_sha(p: Path, z: dict[str, Any]) -> str:
+    return str(z.get("content_sha256") or "") if p.suffix == ".json" else file_sha256(p)
+
+
 def _date_file_stats(output_dir: str | Path, selected_dates: Iterable[Any]) -> tuple[list[dict[str, Any]], list[str]]:
     rows: list[dict[str, Any]] = []
     missing: list[str] = []
     for d in selected_dates:
         ds = _norm_date(d).strftime("%Y-%m-%d")
         p = materialized_path(output_dir, d)
-        z = load_materialized_date(output_dir, d, require_current_identity=True)
+        z = load_materialized_date(output_dir, d, require_current_identity=True, tables=())
         if z is None:
             missing.append(ds)
             continue
+        n = z["table_rows"]
         rows.append({
             "signal_date": ds,
             "file": p.name,
-            "sha256": file_sha256(p),
-            "candidate_rows": len(z.get("candidate_rows") or []),
-            "capture_rows": len(z.get("capture_rows") or []),
-            "attempt_rows": len(z.get("attempt_rows") or []),
-            "universe_rows": len(z.get("universe_membership")) if isinstance(z.get("universe_membership"), pd.DataFrame) else 0,
+            "sha256": _materialized_sha(p, z),
+            "candidate_rows": n.get("candidate_rows", 0),
+            "capture_rows": n.get("capture_rows", 0),
+            "attempt_rows": n.get("attempt_rows", 0),
+            "universe_rows": n.get("universe_membership", 0),
         })
     return rows, missing
 
@@ -342,6 +701,7 @@ def write_shard_manifest(
         "errors": errs,
         "elapsed_sec": float(elapsed_sec or 0.0),
         "newest_first": True,
+        "partition_mode": partition_mode(),
         "zero_recompute_parent": True,
     }
     (out / SHARD_MANIFEST_JSON).write_text(json.dumps(manifest, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
@@ -377,19 +737,27 @@ def write_shard_manifest(
     return manifest
 
 
-def _safe_extract(tar_path: Path, dest: Path) -> None:
-    dest.mkdir(parents=True, exist_ok=True)
-    with tarfile.open(tar_path, "r:gz") as tf:
-        root = dest.resolve()
-        for m in tf.getmembers():
-            target = (dest / m.name).resolve()
-            if root not in target.parents and target != root:
-                raise RuntimeError(f"unsafe tar member: {m.name}")
-        tf.extractall(dest)
+def _check_members(members: list[tarfile.TarInfo], dest: Path) -> None:
+    root = dest.resolve()
+    for m in members:
+        target = (dest / m.name).resolve()
+        if root not in target.parents and target != root:
+            raise RuntimeError(f"unsafe tar member: {m.name}")
+        if m.issym() or m.islnk():
+            raise RuntimeError(f"unsafe tar link: {m.name}")
+
+
+def _is_partition_member(name: str, suffix: str) -> bool:
+    p = Path(name)
+    return p.parent.name == MATERIALIZED_DIRNAME and p.name.startswith("date_") and p.name.endswith(suffix)
 
 
 def create_handoff_archive(output_dir: str | Path, archive_path: str | Path) -> Path:
-    """Create a same-run handoff containing selected materialized dates plus reusable V20 caches."""
+    """Create a same-run handoff containing selected materialized dates plus reusable V20 caches.
+
+    Partitions and caches stream straight into the tar (no staging copy); the embedded
+    HANDOFF_INDEX_JSON lists each date's content hash so the parent can merge by manifest.
+    """
     out = Path(output_dir or "reports")
     mp = out / SHARD_MANIFEST_JSON
     if not mp.exists():
@@ -397,28 +765,47 @@ def create_handoff_archive(output_dir: str | Path, archive_path: str | Path) ->
     manifest = json.loads(mp.read_text(encoding="utf-8"))
     selected = [str(x) for x in manifest.get("selected_dates") or []]
     arc = Path(archive_path); arc.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.TemporaryDirectory(prefix="v23handoff_") as td:
-        stage = Path(td) / "reports"
-        stage.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    index: dict[str, Any] = {"version": VERSION, "created_at": _utc_now(), "dates": {}}
+    # Partition tables are already zstd/gzip compressed; a light outer gzip keeps the .tar.gz contract cheap.
+    level = max(0, min(9, _env_int("V23_HANDOFF_GZIP_LEVEL", 1)))
+    tmp = arc.with_name(arc.name + f".{os.getpid()}.tmp")
+    with tarfile.open(tmp, "w:gz", compresslevel=level) as tf:
         # Selected materialized results only: prevents stale rolling-window files from crossing shards.
-        mroot = stage / MATERIALIZED_DIRNAME; mroot.mkdir(parents=True, exist_ok=True)
         for ds in selected:
             src = materialized_path(out, ds)
-            if src.exists():
-                shutil.copy2(src, mroot / src.name)
+            if not src.exists():
+                continue
+            meta = read_partition_manifest(src) if src.suffix == ".json" else None
+            # Manifest before its pack so the parent can decide from the manifest while streaming.
+            tf.add(src, arcname=f"reports/{MATERIALIZED_DIRNAME}/{src.name}")
+            if meta is not None:
+                pack = src.parent / str(meta["pack_file"])
+                tf.add(pack, arcname=f"reports/{MATERIALIZED_DIRNAME}/{pack.name}")
+            index["dates"][ds] = {"entry": src.name, "content_sha256": meta.get("content_sha256") if meta else file_sha256(src)}
         # V20 caches are reusable by parent diagnostics/evaluation and future resume.
         for rel in CACHE_DIRS:
             src_dir = out / rel
-            if src_dir.exists():
-                dst_dir = stage / rel
-                shutil.copytree(src_dir, dst_dir, dirs_exist_ok=True)
+            if not src_dir.exists():
+                continue
+            if rel == PRICE_CACHE_DIR and price_chunk_store.has_store(src_dir):
+                # Chunked price cache: this run's refs plus only the chunks this run created.
+                for name, item in price_chunk_store.handoff_members(src_dir):
+                    if isinstance(item, Path):
+                        tf.add(item, arcname=f"reports/{rel}/{name}")
+                    else:
+                        info = tarfile.TarInfo(f"reports/{rel}/{name}"); info.size = len(item); info.mtime = int(time.time())
+                        tf.addfile(info, io.BytesIO(item))
+                continue
+            tf.add(src_dir, arcname=f"reports/{rel}", recursive=True)
         for name in (SHARD_MANIFEST_JSON, SHARD_MANIFEST_CSV, SHARD_MANIFEST_REPORT):
             src = out / name
-            if src.exists(): shutil.copy2(src, stage / name)
-        with tarfile.open(arc, "w:gz", compresslevel=3) as tf:
-            for p in stage.rglob("*"):
-                if p.is_file():
-                    tf.add(p, arcname=str(p.relative_to(stage)))
+            if src.exists(): tf.add(src, arcname=f"reports/{name}")
+        index["elapsed_sec"] = round(time.perf_counter() - t0, 3)
+        raw = json.dumps(index, ensure_ascii=False, indent=1).encode("utf-8")
+        info = tarfile.TarInfo(f"reports/{HANDOFF_INDEX_JSON}"); info.size = len(raw); info.mtime = int(time.time())
+        tf.addfile(info, io.BytesIO(raw))
+    os.replace(tmp, arc)
     return arc
 
 
@@ -457,6 +844,15 @@ def _copy_materialized(src: Path, dst: Path) -> tuple[str, str]:
     return "CONFLICT", f"sha {dsha[:12]} != {ssha[:12]}"
 
 
+def _other_format(mroot: Path, name: str) -> Path | None:
+    """The parent's file for the same date in the other materialized format (pack manifest vs legacy pickle), if any."""
+    if name.endswith(".pkl.gz"):
+        other = mroot / (name[: -len(".pkl.gz")] + ".json")
+    else:
+        other = mroot / (Path(name).stem + ".pkl.gz")
+    return other if other.exists() else None
+
+
 def merge_handoff_archives(download_root: str | Path, output_dir: str | Path) -> dict[str, Any]:
     src_root = Path(download_root)
     out = Path(output_dir or "reports"); out.mkdir(parents=True, exist_ok=True)
@@ -466,16 +862,73 @@ def merge_handoff_archives(download_root: str | Path, output_dir: str | Path) ->
     errors = conflicts = copied = replaced = kept = 0
     mroot = _materialized_root(out); mroot.mkdir(parents=True, exist_ok=True)
     shard_manifest_root = out / "v23_shard_manifests"; shard_manifest_root.mkdir(parents=True, exist_ok=True)
-    with tempfile.TemporaryDirectory(prefix="v23merge_") as td:
+    t0 = time.perf_counter()
+    partitions_kept = partitions_installed = 0
+    chunk_totals: dict[str, int] = {}
+    # Extract next to the destination so new partitions are installed with a rename, not a copy.
+    with tempfile.TemporaryDirectory(prefix=".v23merge_", dir=str(out)) as td:
         troot = Path(td)
         for ai, arc in enumerate(archives):
             ex = troot / f"a{ai}"
+            ex.mkdir(parents=True, exist_ok=True)
+            incoming: list[tuple[Path, dict[str, Any]]] = []
             try:
-                _safe_extract(arc, ex)
+                # One streaming pass: each date manifest precedes its pack, so a pack whose content hash
+                # already sits in the parent (or conflicts with it) is skipped without being written.
+                skip: set[str] = set()
+                with tarfile.open(arc, "r|*") as tf:
+                    for m in tf:
+                        _check_members([m], ex)
+                        if m.name in skip:
+                            continue
+                        if m.isfile() and _is_partition_member(m.name, ".json"):
+                            raw = tf.extractfile(m).read()
+                            meta = json.loads(raw.decode("utf-8"))
+                            if not isinstance(meta, dict) or meta.get("partition_schema") != PARTITION_SCHEMA:
+                                raise RuntimeError(f"bad partition manifest: {m.name}")
+                            name = Path(m.name).name
+                            pack_member = str(Path(m.name).parent / str(meta.get("pack_file", "")))
+                            have = read_partition_manifest(mroot / name)
+                            twin = _other_format(mroot, name)
+                            if have is None and twin is not None:
+                                # The formats hash differently, so the contents cannot be compared: a conflict.
+                                skip.add(pack_member)
+                                conflicts += 1
+                                file_rows.append({"archive": arc.name, "kind": MATERIALIZED_DIRNAME, "file": name, "status": "CONFLICT",
+                                                  "detail": f"format: {twin.name} already present"})
+                                continue
+                            if have is None:
+                                dst = ex / m.name
+                                dst.parent.mkdir(parents=True, exist_ok=True)
+                                dst.write_bytes(raw)
+                                incoming.append((dst, meta))
+                                continue
+                            skip.add(pack_member)
+                            if have.get("content_sha256") == meta.get("content_sha256"):
+                                kept += 1; partitions_kept += 1
+                                file_rows.append({"archive": arc.name, "kind": MATERIALIZED_DIRNAME, "file": name, "status": "KEPT", "detail": "identical manifest"})
+                            else:
+                                # Same date with different content is a hard provenance conflict; never choose arbitrarily.
+                                conflicts += 1
+                                file_rows.append({"archive": arc.name, "kind": MATERIALIZED_DIRNAME, "file": name, "status": "CONFLICT",
+                                                  "detail": f"content {str(have.get('content_sha256'))[:12]} != {str(meta.get('content_sha256'))[:12]}"})
+                            continue
+                        tf.extract(m, ex)
             except Exception as exc:
                 errors += 1
                 file_rows.append({"archive": arc.name, "kind": "ARCHIVE", "file": "", "status": "ERROR", "detail": f"{type(exc).__name__}:{exc}"})
                 continue
+            for src, meta in incoming:
+                bad = _verify_pack(src, meta, full_hash=True)
+                if bad:
+                    errors += 1
+                    file_rows.append({"archive": arc.name, "kind": MATERIALIZED_DIRNAME, "file": src.name, "status": "ERROR", "detail": bad})
+                    continue
+                # Pack first, manifest last: a reader never sees a manifest without its data.
+                os.replace(src.parent / str(meta["pack_file"]), mroot / str(meta["pack_file"]))
+                os.replace(src, mroot / src.name)
+                copied += 1; partitions_installed += 1
+                file_rows.append({"archive": arc.name, "kind": MATERIALIZED_DIRNAME, "file": src.name, "status": "COPIED", "detail": "new partition"})
             mps = list(ex.rglob(SHARD_MANIFEST_JSON))
             for mp in mps:
                 try:
@@ -491,7 +944,11 @@ def merge_handoff_archives(download_root: str | Path, output_dir: str | Path) ->
                 if MATERIALIZED_DIRNAME not in src.parts:
                     continue
                 dst = mroot / src.name
-                st, det = _copy_materialized(src, dst)
+                twin = _other_format(mroot, src.name)
+                if twin is not None:
+                    st, det = "CONFLICT", f"format: {twin.name} already present"
+                else:
+                    st, det = _copy_materialized(src, dst)
                 if st == "COPIED": copied += 1
                 elif st == "KEPT": kept += 1
                 else: conflicts += 1
@@ -503,8 +960,25 @@ def merge_handoff_archives(download_root: str | Path, output_dir: str | Path) ->
                     continue
                 src_dir = candidates[0]
                 dst_dir = out / rel
+                chunked = rel == PRICE_CACHE_DIR and price_chunk_store.has_store(src_dir)
+                if chunked:
+                    # Manifest union: copy absent chunks, keep the later-covering ref; nothing is unpickled.
+                    try:
+                        ms = price_chunk_store.merge_store(src_dir, dst_dir)
+                        copied += ms["objects_copied"]; kept += ms["objects_present"]; replaced += ms["refs_updated"]
+                        chunk_totals = {k: chunk_totals.get(k, 0) + v for k, v in ms.items()}
+                        file_rows.append({"archive": arc.name, "kind": rel, "file": price_chunk_store.REFS_FILE, "status": "MERGED", "detail": json.dumps(ms, sort_keys=True)})
+                    except Exception as exc:
+                        errors += 1
+                        file_rows.append({"archive": arc.name, "kind": rel, "file": price_chunk_store.REFS_FILE, "status": "ERROR", "detail": f"{type(exc).__name__}:{exc}"})
                 for src in src_dir.rglob("*"):
                     if not src.is_file(): continue
+                    if chunked and price_chunk_store.is_store_path(src.relative_to(src_dir)): continue
+                    if src.name == v20_perf.DATE_COST_FILE:
+                        # Per-date cost ledgers are unioned so the parent cache learns every shard's timings.
+                        n = v20_perf.merge_date_cost_files(src, dst_dir / src.relative_to(src_dir))
+                        file_rows.append({"archive": arc.name, "kind": rel, "file": src.name, "status": "MERGED", "detail": f"dates={n}"})
+                        continue
                     dst = dst_dir / src.relative_to(src_dir)
                     try:
                         st, det = _copy_cache_file(src, dst)
@@ -527,6 +1001,7 @@ def merge_handoff_archives(download_root: str | Path, output_dir: str | Path) ->
     config_set = sorted({str(m.get("config_fingerprint", "")) for m in manifests if str(m.get("config_fingerprint", ""))})
     ident = current_identity()
     current_identity_match = source_set == [ident["source_fingerprint"]] and config_set == [ident["config_fingerprint"]]
+    partition_modes = sorted({str(m.get("partition_mode", "EQUAL_COUNT") or "EQUAL_COUNT") for m in manifests})
     mode = str(os.getenv("V25_COHORT_MODE", "ROLLING")).strip().upper()
     manifest_cohorts = sorted({str(m.get("cohort_id", "ROLLING") or "ROLLING").strip().upper() for m in manifests})
     cohort_set_ok = (manifest_cohorts == sorted(expected_cohorts)) if mode == "ALL" else True
@@ -534,7 +1009,7 @@ def merge_handoff_archives(download_root: str | Path, output_dir: str | Path) ->
     missing_materialized = []
     invalid_materialized = []
     for ds in selected_unique:
-        z = load_materialized_date(out, ds, require_current_identity=True)
+        z = load_materialized_date(out, ds, require_current_identity=True, tables=())
         if z is None:
             p = materialized_path(out, ds)
             (invalid_materialized if p.exists() else missing_materialized).append(ds)
@@ -583,11 +1058,17 @@ def merge_handoff_archives(download_root: str | Path, output_dir: str | Path) ->
         "current_source_fingerprint": ident["source_fingerprint"],
         "current_config_fingerprint": ident["config_fingerprint"],
         "current_identity_match": current_identity_match,
+        "partition_modes": partition_modes,
+        "partition_consensus": len(partition_modes) <= 1,
         "files_copied": copied,
         "files_replaced": replaced,
         "files_kept": kept,
         "errors": errors,
         "conflicts": conflicts,
+        "partitions_installed": partitions_installed,
+        "partitions_kept": partitions_kept,
+        "price_chunk_merge": chunk_totals,
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
         "zero_recompute_parent": True,
     }
     (out / MERGE_AUDIT_JSON).write_text(json.dumps(audit, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -597,8 +1078,12 @@ def merge_handoff_archives(download_root: str | Path, output_dir: str | Path) ->
         f"dates={len(selected_unique)}/{expected_dates} materialized={len(materialized_expected)} duplicate_dates={duplicate_selected}",
         f"cohorts mode={mode} expected={','.join(expected_cohorts)} manifest={','.join(manifest_cohorts)} set_ok={cohort_set_ok}",
         f"identity source_consensus={len(source_set)==1} config_consensus={len(config_set)==1} current_match={current_identity_match}",
+        f"partition modes={','.join(partition_modes) or '-'} consensus={len(partition_modes) <= 1}",
         f"copy={copied} replace={replaced} keep={kept} errors={errors} conflicts={conflicts}",
+        f"partitions installed={partitions_installed} kept_by_manifest={partitions_kept} elapsed_sec={audit['elapsed_sec']}",
     ]
+    if chunk_totals:
+        lines.append("price_chunks " + " ".join(f"{k}={v}" for k, v in sorted(chunk_totals.items())))
     if missing_materialized: lines.append("missing=" + ",".join(missing_materialized))
     if invalid_materialized: lines.append("invalid=" + ",".join(invalid_materialized))
     (out / MERGE_AUDIT_REPORT).write_text("\n".join(lines) + "\n", encoding="utf-8")
@@ -617,14 +1102,14 @@ def verify_parent_materialized(output_dir: str | Path, expected_dates: Iterable[
     candidate_total = capture_total = attempt_total = 0
     for ds in expected:
         p = materialized_path(out, ds)
-        z = load_materialized_date(out, ds, require_current_identity=True)
+        z = load_materialized_date(out, ds, require_current_identity=True, tables=())
         if z is None:
             (invalid if p.exists() else missing).append(ds)
             continue
         valid.append(ds)
-        candidate_total += len(z.get("candidate_rows") or [])
-        capture_total += len(z.get("capture_rows") or [])
-        attempt_total += len(z.get("attempt_rows") or [])
+        candidate_total += z["table_rows"].get("candidate_rows", 0)
+        capture_total += z["table_rows"].get("capture_rows", 0)
+        attempt_total += z["table_rows"].get("attempt_rows", 0)
     merge_selected = sorted(set(str(x) for x in (merge.get("selected_dates") or [])))
     date_set_match = merge_selected == expected
     ok = (
@@ -712,8 +1197,9 @@ def _cli() -> int:
     ap.add_argument("--require-complete", action="store_true")
     args = ap.parse_args()
     if args.package_handoff:
+        t0 = time.perf_counter()
         p = create_handoff_archive(args.output_dir, args.package_handoff)
-        print(f"V23_HANDOFF_ARCHIVE {p} sha256={file_sha256(p)}")
+        print(f"V23_HANDOFF_ARCHIVE {p} sha256={file_sha256(p)} bytes={p.stat().st_size} elapsed_sec={time.perf_counter() - t0:.2f}")
         return 0
     if args.merge_handoffs:
         m = merge_handoff_archives(args.merge_handoffs, args.output_dir)
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import importlib
+import json
+import multiprocessing as mp
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+import direct_replay_performance_v20 as v20_perf
+
+VERSION = "V73.3.6.6.26"
+RESEARCH_ONLY = True
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+HEADER = "🧵 [Direct Replay 로컬 병렬 date 워커 × 비용모델 큐 · RESEARCH_ONLY]"
+AUDIT_CSV = "v73_v26_parallel_replay_audit.csv"
+SUMMARY_JSON = "v73_v26_parallel_replay_summary.json"
+REPORT_FILE = "v73_v26_parallel_replay_report.txt"
+
+# Local driver: one as-of date per task, executed by warm worker processes.
+# - Each worker imports the replay callable and runs the optional init callable once (price cache,
+#   universe panel, indicator state), then keeps that state for every date it picks up.
+# - The queue is ordered by the v20 per-date cost ledger (longest first) and fed one task at a time,
+#   so an idle worker always takes the costliest remaining date; a slow event-expansion day no longer
+#   pins a whole static shard.
+# - Measured seconds go back into the ledger, which also drives cost-balanced shard partitions.
+# The replay callable owns per-date checkpointing (v20 save_checkpoint); the driver changes ordering
+# and concurrency only, never what a date computes.
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(str(os.getenv(name, default)).strip()))
+    except Exception:
+        return int(default)
+
+
+def _log(msg: str, log_fn: Callable[[str], Any] | None = None) -> None:
+    try:
+        if callable(log_fn):
+            log_fn(msg)
+        else:
+            print(msg, flush=True)
+    except Exception:
+        pass
+
+
+def _ds(v: Any) -> str:
+    return pd.Timestamp(v).normalize().strftime("%Y-%m-%d")
+
+
+def resolve_callable(spec: str | Callable[..., Any] | None) -> Callable[..., Any] | None:
+    """``"package.module:function"`` (importable in a spawned worker) or a picklable top-level callable."""
+    if spec is None or callable(spec):
+        return spec
+    mod, _, attr = str(spec).partition(":")
+    if not mod or not attr:
+        raise ValueError(f"callable spec must be 'module:function', got {spec!r}")
+    obj: Any = importlib.import_module(mod)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    if not callable(obj):
+        raise TypeError(f"{spec} is not callable")
+    return obj
+
+
+def plan_queue(dates: Iterable[Any], costs: dict[str, float] | None = None) -> list[tuple[str, float]]:
+    """(date, estimated seconds), costliest first; ties newest-first so the widest price fetch runs early."""
+    ds = sorted({_ds(d) for d in dates})
+    est = v20_perf.estimate_date_costs(ds, costs)
+    return sorted(((d, est[d]) for d in ds), key=lambda x: (-x[1], [-ord(c) for c in x[0]]))
+
+
+def simulate_makespan(task_costs: Iterable[float], workers: int) -> float:
+    """Finish time when ``workers`` identical workers pull tasks in the given order."""
+    heap = [0.0] * max(1, int(workers))
+    for c in task_costs:
+        t = heapq.heappop(heap)
+        heapq.heappush(heap, t + float(c))
+    return max(heap) if heap else 0.0
+
+
+def plan_shards(dates: Iterable[Any], shard_count: int, costs: dict[str, float] | None = None) -> pd.DataFrame:
+    """Per-shard date ranges and estimated seconds for equal-count vs cost-balanced contiguous partitions."""
+    ds = sorted({pd.Timestamp(d).normalize() for d in dates})
+    est = v20_perf.estimate_date_costs(ds, costs)
+    rows = []
+    for mode, blocks in (
+        ("EQUAL_COUNT", v20_perf.balanced_contiguous_blocks(ds, shard_count, None)),
+        ("COST_BALANCED", v20_perf.balanced_contiguous_blocks(ds, shard_count, costs)),
+    ):
+        for i, b in enumerate(blocks):
+            rows.append({
+                "mode": mode,
+                "shard_index": i,
+                "dates": len(b),
+                "first": b[0].strftime("%Y-%m-%d") if b else "",
+                "last": b[-1].strftime("%Y-%m-%d") if b else "",
+                "est_sec": round(sum(est[x.strftime("%Y-%m-%d")] for x in b), 1),
+            })
+    return pd.DataFrame(rows)
+
+
+# -------------------------------------------------------------
+# worker side
+# -------------------------------------------------------------
+_WORKER: dict[str, Any] = {}
+
+
+def _worker_init(replay_spec: Any, init_spec: Any, env: dict[str, str]) -> None:
+    os.environ.update(env)
+    t0 = time.perf_counter()
+    _WORKER["replay"] = resolve_callable(replay_spec)
+    init = resolve_callable(init_spec)
+    _WORKER["init_error"] = ""
+    if init is not None:
+        try:
+            init()
+        except Exception as exc:
+            _WORKER["init_error"] = f"{type(exc).__name__}:{exc}"
+    _WORKER["warm_sec"] = round(time.perf_counter() - t0, 3)
+    _WORKER["tasks"] = 0
+
+
+def _rows_of(result: Any) -> int:
+    if isinstance(result, dict):
+        for k in ("rows", "candidates", "candidate_rows"):
+            v = result.get(k)
+            if isinstance(v, (int, float)):
+                return int(v)
+            if isinstance(v, (list, tuple)):
+                return len(v)
+    if isinstance(result, (list, tuple, pd.DataFrame)):
+        return len(result)
+    return 0
+
+
+def _worker_run(ds: str) -> dict[str, Any]:
+    first = _WORKER.get("tasks", 0) == 0
+    _WORKER["tasks"] = _WORKER.get("tasks", 0) + 1
+    row = {"date": ds, "pid": os.getpid(), "worker_task": _WORKER["tasks"], "warm_sec": _WORKER.get("warm_sec", 0.0) if first else 0.0}
+    if _WORKER.get("init_error"):
+        return {**row, "status": "ERROR", "sec": 0.0, "rows": 0, "error": "init:" + _WORKER["init_error"]}
+    t0 = time.perf_counter()
+    try:
+        res = _WORKER["replay"](pd.Timestamp(ds))
+        return {**row, "status": "OK", "sec": round(time.perf_counter() - t0, 3), "rows": _rows_of(res), "error": ""}
+    except Exception as exc:
+        tb = traceback.format_exc(limit=3).strip().splitlines()[-1:]
+        return {**row, "status": "ERROR", "sec": round(time.perf_counter() - t0, 3), "rows": 0, "error": f"{type(exc).__name__}:{exc} | {' '.join(tb)}"[:500]}
+
+
+# -------------------------------------------------------------
+# driver
+# -------------------------------------------------------------
+def run_parallel(
+    dates: Iterable[Any],
+    replay: str | Callable[[pd.Timestamp], Any],
+    *,
+    init: str | Callable[[], Any] | None = None,
+    workers: int | None = None,
+    output_dir: str | Path = "reports",
+    costs: dict[str, float] | None = None,
+    cost_root: str | Path | None = None,
+    log_fn: Callable[[str], Any] | None = None,
+) -> dict[str, Any]:
+    """Replay ``dates`` on warm worker processes fed from a longest-expected-first queue.
+
+    ``replay(asof: Timestamp)`` runs one date (and checkpoints it); its return value may report the
+    candidate count as ``rows``. ``init()`` runs once per worker before its first date. Costs default to
+    the v20 ledger under ``cost_root`` (the checkpoint dir) and measured timings are written back there.
+    """
+    out = Path(output_dir or "reports"); out.mkdir(parents=True, exist_ok=True)
+    cost_root = Path(cost_root) if cost_root is not None else Path(os.getenv("V20_REPLAY_CHECKPOINT_DIR", str(out / ".cache/v20_replay_checkpoint")))
+    costs = v20_perf.load_date_costs(cost_root) if costs is None else costs
+    queue = plan_queue(dates, costs)
+    n_workers = max(1, min(len(queue) or 1, int(workers or _env_int("V26_REPLAY_WORKERS", max(1, (os.cpu_count() or 2) - 1)))))
+    est_total = sum(c for _, c in queue)
+    predicted = simulate_makespan([c for _, c in queue], n_workers)
+    ctx = mp.get_context(os.getenv("V26_MP_START", "spawn"))
+    env = {k: v for k, v in os.environ.items() if k.startswith(("V1", "V2", "V4", "V7", "GITHUB_"))}
+    _log(f"🧵 V26 parallel replay start | dates={len(queue)} | workers={n_workers} | known_costs={sum(1 for d, _ in queue if d in (costs or {}))} | est_makespan={predicted/60:.1f}m (sequential {est_total/60:.1f}m)", log_fn)
+
+    rows: list[dict[str, Any]] = []
+    t0 = time.monotonic()
+    remaining_est = est_total
+    pending = list(reversed(queue))
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx, initializer=_worker_init, initargs=(replay, init, env)) as ex:
+        # Exactly one task in flight per worker: the next idle worker takes the costliest remaining date.
+        running: dict[Any, tuple[str, float]] = {}
+        while pending or running:
+            while pending and len(running) < n_workers:
+                ds, est = pending.pop()
+                running[ex.submit(_worker_run, ds)] = (ds, est)
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                ds, est = running.pop(fut)
+                try:
+                    row = fut.result()
+                except Exception as exc:  # worker process died
+                    row = {"date": ds, "pid": -1, "worker_task": 0, "warm_sec": 0.0, "status": "ERROR", "sec": 0.0, "rows": 0, "error": f"{type(exc).__name__}:{exc}"}
+                row["est_sec"] = round(est, 3)
+                row["finished_at_sec"] = round(time.monotonic() - t0, 3)
+                rows.append(row)
+                remaining_est -= est
+                elapsed = time.monotonic() - t0
+                eta = max(0.0, remaining_est) / n_workers
+                _log(f"🧵 [V26 PROGRESS] done {len(rows)}/{len(queue)} | {ds} | {row['status']} | date={row['sec']:.1f}s (est {est:.1f}s) | candidates={row['rows']} | pid={row['pid']} | total={elapsed/60:.1f}m | ETA~{eta/60:.1f}m", log_fn)
+    makespan = time.monotonic() - t0
+
+    ok = [r for r in rows if r["status"] == "OK"]
+    if ok:
+        v20_perf.record_date_costs([(r["date"], r["sec"], r["rows"]) for r in ok], cost_root)
+    busy = sum(r["sec"] for r in rows)
+    summary = {
+        "version": VERSION,
+        "created_at": _utc_now(),
+        "dates": len(queue),
+        "ok": len(ok),
+        "errors": len(rows) - len(ok),
+        "workers": n_workers,
+        "makespan_sec": round(makespan, 3),
+        "busy_sec": round(busy, 3),
+        "warm_sec": round(sum(r.get("warm_sec", 0.0) for r in rows), 3),
+        "parallel_efficiency": round(busy / max(1e-9, makespan * n_workers), 3),
+        "speedup_vs_sequential": round(busy / max(1e-9, makespan), 2),
+        "predicted_makespan_sec": round(predicted, 3),
+        "known_cost_dates": sum(1 for d, _ in queue if d in (costs or {})),
+        "cost_ledger": str(v20_perf.date_cost_path(cost_root)),
+        "research_only": True,
+        "live_logic_changed": False,
+        "real_order_changed": False,
+    }
+    audit = pd.DataFrame(rows, columns=["date", "status", "sec", "est_sec", "rows", "pid", "worker_task", "warm_sec", "finished_at_sec", "error"])
+    audit.sort_values("date").to_csv(out / AUDIT_CSV, index=False, encoding="utf-8-sig")
+    (out / SUMMARY_JSON).write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    lines = [
+        HEADER,
+        f"- dates {summary['dates']} | ok {summary['ok']} | errors {summary['errors']} | workers {n_workers}",
+        f"- makespan {makespan/60:.1f}m (예측 {predicted/60:.1f}m) | 작업합 {busy/60:.1f}m | 병렬효율 {summary['parallel_efficiency']:.0%} | 순차 대비 ×{summary['speedup_vs_sequential']}",
+        f"- 비용 원장: {summary['cost_ledger']} (기록된 date {summary['known_cost_dates']}/{summary['dates']})",
+        "- 안전계약: date별 계산/체크포인트는 replay 함수 그대로이며 실행 순서와 동시성만 바꿉니다.",
+    ]
+    errs = [r for r in rows if r["status"] != "OK"]
+    if errs:
+        lines.append("- 오류: " + " | ".join(f"{r['date']}:{r['error'][:120]}" for r in errs[:5]))
+    (out / REPORT_FILE).write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return summary
+
+
+def _date_list(spec: str) -> list[pd.Timestamp]:
+    """``2026-01-05,2026-01-06`` or ``START:END`` (business days, inclusive)."""
+    spec = str(spec or "").strip()
+    if ":" in spec and "," not in spec:
+        a, b = spec.split(":", 1)
+        return list(pd.bdate_range(a, b))
+    return [pd.Timestamp(x.strip()).normalize() for x in spec.split(",") if x.strip()]
+
+
+def _cli() -> int:
+    ap = argparse.ArgumentParser(description="V26 local parallel direct replay driver")
+    ap.add_argument("--dates", default="", help="YYYY-MM-DD,... or START:END (business days)")
+    ap.add_argument("--replay", default="", help="module:function taking one as-of Timestamp")
+    ap.add_argument("--init", default="", help="module:function run once per worker (warm caches)")
+    ap.add_argument("--workers", type=int, default=0)
+    ap.add_argument("--output-dir", default="reports")
+    ap.add_argument("--cost-file", default="", help="date-cost ledger (default: checkpoint dir ledger)")
+    ap.add_argument("--plan-shards", type=int, default=0, help="print equal-count vs cost-balanced shard plans")
+    args = ap.parse_args()
+    dates = _date_list(args.dates)
+    root = Path(args.cost_file) if args.cost_file else Path(os.getenv("V20_REPLAY_CHECKPOINT_DIR", str(Path(args.output_dir) / ".cache/v20_replay_checkpoint")))
+    if args.plan_shards:
+        plan = plan_shards(dates, args.plan_shards, v20_perf.load_date_costs(root))
+        print(plan.to_string(index=False))
+        for mode, g in plan.groupby("mode", sort=False):
+            print(f"{mode}: slowest shard {g['est_sec'].max()/60:.1f}m | fastest {g['est_sec'].min()/60:.1f}m")
+        return 0
+    if not dates or not args.replay:
+        ap.print_help(); return 0
+    summary = run_parallel(dates, args.replay, init=args.init or None, workers=args.workers or None, output_dir=args.output_dir, cost_root=root)
+    print(json.dumps(summary, ensure_ascii=False, sort_keys=True))
+    return 0 if not summary["errors"] else 194
+
+
+if __name__ == "__main__":
+    raise SystemExit(_cli())
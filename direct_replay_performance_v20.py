@@ -15,6 +15,8 @@ from typing import Any, Callable, Iterable
 
 import pandas as pd
 
+import price_chunk_store
+
 VERSION = "V73.3.6.6.20"
 RESEARCH_ONLY = True
 LIVE_LOGIC_CHANGED = False
@@ -119,6 +121,12 @@ def configure(
     _CACHE_ROOT.mkdir(parents=True, exist_ok=True)
     _CHECKPOINT_ROOT.mkdir(parents=True, exist_ok=True)
     _prune_files(_CACHE_ROOT, "*.pkl.gz", _env_int("V20_PRICE_CACHE_MAX_FILES", 1800))
+    price_chunk_store.configure(_CACHE_ROOT)
+    if price_chunk_store.enabled():
+        try:
+            price_chunk_store.prune(_CACHE_ROOT, max_refs=_env_int("V20_PRICE_CACHE_MAX_FILES", 1800))
+        except Exception:
+            pass
     _prune_files(_CHECKPOINT_ROOT, "*.pkl.gz", _env_int("V20_CHECKPOINT_MAX_FILES", 120))
     return cached_price_reader
 
@@ -173,8 +181,31 @@ def cached_price_reader(ticker: str, days: int = 900) -> pd.DataFrame:
             _STATS["memory_hit"] += 1
         return mem
 
+    disk_on = _env_bool("V20_PRICE_DISK_CACHE_ENABLE", True)
+    chunked = disk_on and price_chunk_store.enabled()
+    if chunked:
+        # Coverage is decided from the ref's last date, so stale entries never decode their chunks.
+        ref = price_chunk_store.get_ref(code, days_i)
+        if ref is not None:
+            if ref.get("code") not in (None, "") and _norm_code(ref.get("code")) != code:
+                with _LOCK:
+                    _STATS["code_identity_reject"] += 1
+                    _STATS["disk_invalid"] += 1
+            elif price_chunk_store.ref_covers(ref, _REQUIRED_ASOF):
+                df = price_chunk_store.read(code, days_i, ref)
+                if isinstance(df, pd.DataFrame) and _frame_covers_required(df):
+                    with _LOCK:
+                        _MEMORY[key] = df
+                        _STATS["disk_hit"] += 1
+                    return df
+                with _LOCK:
+                    _STATS["disk_invalid"] += 1
+            else:
+                with _LOCK:
+                    _STATS["disk_invalid"] += 1
+
     path = _cache_file(code, days_i)
-    if _env_bool("V20_PRICE_DISK_CACHE_ENABLE", True) and path.exists():
+    if disk_on and path.exists():
         try:
             payload = _load_dump(path)
             if isinstance(payload, dict) and payload.get("code") not in (None, ""):
@@ -185,6 +216,12 @@ def cached_price_reader(ticker: str, days: int = 900) -> pd.DataFrame:
                         _STATS["disk_invalid"] += 1
                     payload = None
             df = payload.get("frame") if isinstance(payload, dict) else payload
+            if chunked and payload is not None and isinstance(df, pd.DataFrame) and not df.empty:
+                # One-time migration of the per-(code, days) pickle into the chunk store.
+                fetched_at = payload.get("fetched_at") if isinstance(payload, dict) else None
+                if price_chunk_store.put(code, days_i, df, fetched_at=fetched_at, legacy=True) is not None:
+                    try: path.unlink()
+                    except Exception: pass
             if isinstance(df, pd.DataFrame) and _frame_covers_required(df):
                 with _LOCK:
                     _MEMORY[key] = df
@@ -208,7 +245,9 @@ def cached_price_reader(ticker: str, days: int = 900) -> pd.DataFrame:
         with _LOCK:
             _STATS["network_fetch"] += 1
             _MEMORY[key] = df
-        if not df.empty and _env_bool("V20_PRICE_DISK_CACHE_ENABLE", True):
+        if not df.empty and chunked and price_chunk_store.put(code, days_i, df) is not None:
+            return df
+        if not df.empty and disk_on:
             try:
                 _atomic_dump(path, {
                     "schema": SCHEMA,
@@ -371,6 +410,137 @@ def read_universe_rows(output_dir: str | Path, asof_date: Any) -> tuple[pd.DataF
     )
 
 
+# Per-date replay cost ledger. progress_done() records the wall time of every recomputed date next to
+# the checkpoints (so it rides the same Actions cache and shard handoff); the parallel driver orders its
+# queue by it and partition planners balance shards on it. Timings are hints only: a lost or stale
+# entry changes scheduling, never results.
+DATE_COST_FILE = "v20_date_costs.json"
+DATE_COST_SCHEMA = "V20_DATE_COSTS_1"
+
+
+def date_cost_path(root: str | Path | None = None) -> Path:
+    p = Path(root) if root is not None else _CHECKPOINT_ROOT
+    return p if p.suffix == ".json" else p / DATE_COST_FILE
+
+
+def _read_cost_doc(path: Path) -> dict[str, dict[str, Any]]:
+    try:
+        doc = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(doc, dict) and doc.get("schema") == DATE_COST_SCHEMA and isinstance(doc.get("dates"), dict):
+            return doc["dates"]
+    except Exception:
+        pass
+    return {}
+
+
+def _write_cost_doc(path: Path, dates: dict[str, dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps({"schema": DATE_COST_SCHEMA, "dates": dict(sorted(dates.items()))}, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_date_costs(root: str | Path | None = None) -> dict[str, float]:
+    """{YYYY-MM-DD: seconds} from the ledger (checkpoint dir, a directory, or a ledger .json path)."""
+    out = {}
+    for ds, rec in _read_cost_doc(date_cost_path(root)).items():
+        try:
+            sec = float(rec.get("sec"))
+            if sec > 0: out[ds] = sec
+        except Exception:
+            continue
+    return out
+
+
+def record_date_costs(entries: Iterable[tuple[Any, float, int]], root: str | Path | None = None) -> int:
+    """Merge (date, seconds, candidate_rows) measurements into the ledger; returns entries written."""
+    path = date_cost_path(root)
+    now = datetime.now(timezone.utc).isoformat()
+    with _LOCK:
+        dates = _read_cost_doc(path)
+        n = 0
+        for d, sec, rows in entries:
+            try:
+                ds = pd.Timestamp(d).normalize().strftime("%Y-%m-%d")
+                dates[ds] = {"sec": round(float(sec), 3), "rows": int(rows or 0), "at": now, "source": _SOURCE_FINGERPRINT[:16]}
+                n += 1
+            except Exception:
+                continue
+        if n:
+            try:
+                _write_cost_doc(path, dates)
+            except Exception:
+                return 0
+    return n
+
+
+def merge_date_cost_files(src: str | Path, dst: str | Path) -> int:
+    """Union two ledgers; for the same date the later measurement wins. Returns dates taken from src."""
+    src_p, dst_p = date_cost_path(src), date_cost_path(dst)
+    with _LOCK:
+        theirs, ours = _read_cost_doc(src_p), _read_cost_doc(dst_p)
+        n = 0
+        for ds, rec in theirs.items():
+            cur = ours.get(ds)
+            if not isinstance(rec, dict): continue
+            if cur is None or str(rec.get("at", "")) > str(cur.get("at", "")):
+                ours[ds] = rec; n += 1
+        if n:
+            _write_cost_doc(dst_p, ours)
+    return n
+
+
+def estimate_date_costs(dates: Iterable[Any], costs: dict[str, float] | None) -> dict[str, float]:
+    """Cost per date: the recorded seconds, else the median of recorded dates, else 1.0 (equal weights)."""
+    known = {k: float(v) for k, v in (costs or {}).items() if v and float(v) > 0}
+    default = float(pd.Series(list(known.values())).median()) if known else 1.0
+    out = {}
+    for d in dates:
+        ds = pd.Timestamp(d).normalize().strftime("%Y-%m-%d")
+        out[ds] = known.get(ds, default)
+    return out
+
+
+def balanced_contiguous_blocks(dates: Iterable[Any], block_count: int, costs: dict[str, float] | None = None) -> list[list[pd.Timestamp]]:
+    """Split chronologically sorted dates into ``block_count`` contiguous blocks minimizing the costliest block.
+
+    Exact linear-partition DP over prefix sums; deterministic (earliest split on ties), and no block is
+    empty while there are at least as many dates as blocks. With no costs it reduces to equal-count
+    blocks, so every shard that sees the same ledger computes the same partition.
+    """
+    ds = sorted({pd.Timestamp(x).normalize() for x in dates})
+    k = max(1, int(block_count))
+    if not ds:
+        return [[] for _ in range(k)]
+    if not costs:
+        q, r = divmod(len(ds), k)
+        return [ds[i * q + min(i, r): i * q + min(i, r) + q + (1 if i < r else 0)] for i in range(k)]
+    est = estimate_date_costs(ds, costs)
+    w = [est[d.strftime("%Y-%m-%d")] for d in ds]
+    m = len(ds)
+    kk = min(k, m)
+    pre = [0.0]
+    for x in w:
+        pre.append(pre[-1] + x)
+    inf = float("inf")
+    # best[j][i]: minimal max-block cost placing the first i dates into j non-empty blocks.
+    best = [[inf] * (m + 1) for _ in range(kk + 1)]
+    cut = [[0] * (m + 1) for _ in range(kk + 1)]
+    best[0][0] = 0.0
+    for j in range(1, kk + 1):
+        for i in range(j, m - (kk - j) + 1):
+            for t in range(j - 1, i):
+                v = max(best[j - 1][t], pre[i] - pre[t])
+                if v < best[j][i] - 1e-9:
+                    best[j][i] = v; cut[j][i] = t
+    bounds = []
+    i = m
+    for j in range(kk, 0, -1):
+        t = cut[j][i]; bounds.append((t, i)); i = t
+    blocks = [ds[a:b] for a, b in reversed(bounds)]
+    return blocks + [[] for _ in range(k - kk)]
+
+
 def progress_start(asof_date: Any, total_dates: int, cache_hit: bool, log_fn: Callable[[str], Any] | None = None) -> int:
     global _DATE_COUNT
     with _LOCK:
@@ -389,6 +559,8 @@ def progress_done(asof_date: Any, idx: int, total_dates: int, rows: int, cache_h
     elapsed_date = max(0.001, time.monotonic() - started)
     rate = idx / elapsed_total if idx else 0
     eta = (max(total_dates, idx) - idx) / rate if rate > 0 else 0
+    if not cache_hit and _env_bool("V20_DATE_COST_LEDGER_ENABLE", True):
+        record_date_costs([(asof_date, elapsed_date, rows)])
     _log(
         f"⚡ [V20 PROGRESS] done {idx}/{max(idx,total_dates)} | {pd.Timestamp(asof_date).strftime('%Y-%m-%d')} | candidates={rows} | checkpoint={'HIT' if cache_hit else 'MISS'} | date={elapsed_date/60:.1f}m | total={elapsed_total/60:.1f}m | ETA={max(0,eta)/60:.1f}m",
         log_fn,
@@ -401,6 +573,7 @@ def reset_run_stats() -> None:
     _DATE_COUNT = 0
     with _LOCK:
         for k in list(_STATS): _STATS[k] = 0
+    price_chunk_store.reset_stats()
 
 
 def stats_snapshot() -> dict[str, Any]:
@@ -409,6 +582,12 @@ def stats_snapshot() -> dict[str, Any]:
     z["elapsed_sec"] = round(max(0.0, time.monotonic() - _RUN_START), 3)
     z["memory_entries"] = len(_MEMORY)
     z["price_cache_files"] = len(list(_CACHE_ROOT.glob("*.pkl.gz"))) if _CACHE_ROOT.exists() else 0
+    if price_chunk_store.enabled():
+        chunks = price_chunk_store.stats_snapshot()
+        z["price_cache_files"] += int(chunks["refs"])
+        z["price_chunk_written"] = int(chunks["chunk_written"])
+        z["price_chunk_dedup"] = int(chunks["chunk_dedup"])
+        z["price_legacy_imported"] = int(chunks["legacy_imported"])
     z["checkpoint_files"] = len(list(_CHECKPOINT_ROOT.glob("*.pkl.gz"))) if _CHECKPOINT_ROOT.exists() else 0
     return z
 
@@ -455,6 +634,7 @@ def finalize(output_dir: str | Path = "reports", base_report: str = "") -> tuple
         f"📌 {VERSION} · persistent price cache + as-of snapshot cache + per-date resumable checkpoint + progress/ETA",
         f"- 실행시간: {st['elapsed_sec']/60:.1f}분 | checkpoint hit {int(st['checkpoint_hit'])} / miss {int(st['checkpoint_miss'])} / saved {int(st['checkpoint_saved'])}",
         f"- 가격캐시: memory hit {int(st['memory_hit'])} | disk hit {int(st['disk_hit'])} | network {int(st['network_fetch'])} | error {int(st['network_error'])} | identity reject {int(st.get('code_identity_reject', 0))} | files {int(st['price_cache_files'])}",
+        f"- {price_chunk_store.format_stats()}" if price_chunk_store.enabled() else "- 가격 청크: 꺼짐(V20_PRICE_CHUNK_STORE_ENABLE=0)",
         asof_line,
         f"- Prefetch: requested {int(st['prefetch_codes'])} | completed {int(st['prefetch_completed'])} | workers {os.getenv('V20_PRICE_PREFETCH_WORKERS','6')}",
         f"- 재개 체크포인트 파일: {int(st['checkpoint_files'])} | 소스 fingerprint {str(_SOURCE_FINGERPRINT)[:16]}",
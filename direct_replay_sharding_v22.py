@@ -18,6 +18,9 @@ from typing import Any, Iterable
 
 import pandas as pd
 
+import direct_replay_performance_v20 as v20_perf
+import price_chunk_store
+
 VERSION = "V73.3.6.6.22"
 RESEARCH_ONLY = True
 LIVE_LOGIC_CHANGED = False
@@ -82,19 +85,24 @@ def partition_dates(
     *,
     contiguous: bool = True,
     newest_first: bool = True,
+    costs: dict[str, float] | None = None,
 ) -> list[pd.Timestamp]:
     """Deterministically partition replay dates without overlap.
 
     Contiguous blocks keep each runner's dates clustered. Every block is processed newest-first so
     the first 900-day price fetch covers all older dates inside that shard. The final parent run
-    still reports the original chronological date list.
+    still reports the original chronological date list. ``costs`` ({date: recorded seconds}, see
+    direct_replay_performance_v20.load_date_costs) moves the contiguous cut points so shards finish
+    together instead of holding equal date counts.
     """
     ds = sorted({pd.Timestamp(x).normalize() for x in dates})
     n = max(1, int(shard_count))
     i = max(0, min(int(shard_index), n - 1))
     if not ds:
         return []
-    if contiguous:
+    if contiguous and costs:
+        out = v20_perf.balanced_contiguous_blocks(ds, n, costs)[i]
+    elif contiguous:
         # Balanced contiguous partition, first shards may receive one extra date.
         q, r = divmod(len(ds), n)
         start = i * q + min(i, r)
@@ -157,7 +165,7 @@ def write_shard_manifest(
         "candidate_total": int(sum((candidate_counts or {}).values())),
         "errors": list(errors or []),
         "elapsed_sec": float(elapsed_sec or 0.0),
-        "price_cache_files": len(list(price_root.glob("*.pkl.gz"))) if price_root.exists() else 0,
+        "price_cache_files": (len(list(price_root.glob("*.pkl.gz"))) + price_chunk_store.ref_count(price_root)) if price_root.exists() else 0,
         "asof_cache_files": len([p for p in asof_root.rglob("*") if p.is_file()]) if asof_root.exists() else 0,
         "checkpoint_files": len(list(cp_root.glob("*.pkl.gz"))) if cp_root.exists() else 0,
         "newest_first": True,
@@ -259,10 +267,26 @@ def merge_handoff_archives(download_root: str | Path, output_dir: str | Path) ->
                 if not src_dir.exists():
                     continue
                 dst_dir = out / rel
+                chunked = rel == CACHE_DIRS[0] and price_chunk_store.has_store(src_dir)
+                if chunked:
+                    # Content-addressed price cache: union chunks, keep later-covering refs (no unpickling).
+                    try:
+                        ms = price_chunk_store.merge_store(src_dir, dst_dir)
+                        copied += ms["objects_copied"]; kept += ms["objects_present"]; replaced += ms["refs_updated"]
+                        file_rows.append({"archive": arc.name, "kind": rel, "file": price_chunk_store.REFS_FILE, "status": "MERGED", "detail": json.dumps(ms, sort_keys=True)})
+                    except Exception as exc:
+                        errors += 1
+                        file_rows.append({"archive": arc.name, "kind": rel, "file": price_chunk_store.REFS_FILE, "status": "ERROR", "detail": f"{type(exc).__name__}:{exc}"})
                 for src in src_dir.rglob("*"):
                     if not src.is_file():
                         continue
                     relf = src.relative_to(src_dir)
+                    if chunked and price_chunk_store.is_store_path(relf):
+                        continue
+                    if src.name == v20_perf.DATE_COST_FILE:
+                        n = v20_perf.merge_date_cost_files(src, dst_dir / relf)
+                        file_rows.append({"archive": arc.name, "kind": rel, "file": str(relf), "status": "MERGED", "detail": f"dates={n}"})
+                        continue
                     dst = dst_dir / relf
                     try:
                         st, det = _copy_cache_file(src, dst)
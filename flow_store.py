@@ -0,0 +1,453 @@
+from __future__ import annotations
+
+import atexit
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+VERSION = "FLOW_STORE_V1"
+SCHEMA = "FLOW_STORE_NPZ_1"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# 종목별 일자별 투자자 거래대금(순매수/매수/매도 × 주체) 저장소.
+# - 월 단위 파티션 flow_YYYYMM.npz 에 (code, date) 행 × "구분|주체" 열을 열 지향 배열로 보관한다.
+# - coverage.json 에 (종목, 구분)별로 이미 조회한 날짜 구간을 남겨, 비어 있는 구간만 pykrx 1회로 채운다.
+# - 확정되지 않은 당일분(FLOW_STORE_FINAL_HHMM 이전)은 돌려주되 조회 완료 구간에는 넣지 않아 다음 조회 때 다시 받는다.
+ONS = ("순매수", "매수", "매도")
+KST = timezone(timedelta(hours=9))
+
+_LOCK = threading.RLock()
+_ROOT = Path(os.getenv("FLOW_STORE_DIR", "reports/.cache/flow_store"))
+_FETCHER: Callable[[str, str, str, str], pd.DataFrame] | None = None
+_PARTS: dict[str, dict[str, pd.DataFrame]] = {}
+_DIRTY: set[str] = set()
+_COVER: dict[str, list[list[str]]] | None = None
+_COVER_DIRTY = False
+_KEY_LOCKS: dict[str, threading.Lock] = {}
+_RUN_START = time.monotonic()
+_STATS: dict[str, float] = {
+    "queries": 0,
+    "local": 0,
+    "fetches": 0,
+    "fetch_rows": 0,
+    "fetch_sec": 0.0,
+    "empty": 0,
+    "errors": 0,
+    "parts_loaded": 0,
+    "parts_written": 0,
+    "bytes_read": 0,
+    "bytes_written": 0,
+}
+
+
+def _reinit_after_fork() -> None:
+    """fork 자식: _LOCK을 새로 만들고, 부모의 조회 스레드가 pykrx 응답을 기다리며 잡고 있을 수 있는 _KEY_LOCKS는 늘 비운다.
+    fork 순간 _LOCK이 잡혀 있었으면 적재 중이던 월 파티션 _PARTS와 _COVER 구간도 버려 npz/coverage.json에서 다시 읽는다.
+    _DIRTY/_COVER_DIRTY도 함께 지워 자식의 atexit flush가 반쯤 고친 파티션을 덮어쓰지 않게 한다."""
+    global _LOCK, _KEY_LOCKS, _PARTS, _DIRTY, _COVER, _COVER_DIRTY
+    held = not _LOCK.acquire(blocking=False)
+    _LOCK = threading.RLock()
+    _KEY_LOCKS = {}
+    if held:
+        _PARTS = {}
+        _DIRTY = set()
+        _COVER = None
+        _COVER_DIRTY = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = str(os.getenv(name, "1" if default else "0")).strip().lower()
+    return v in {"1", "true", "yes", "y", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(str(os.getenv(name, default)).strip()))
+    except Exception:
+        return int(default)
+
+
+def _norm_code(v: Any) -> str:
+    """Canonical KRX ticker identity; preserves 6-char alphanumeric tickers (e.g. 0126Z0)."""
+    raw = str(v or "").strip().upper()
+    if raw.endswith(".0") and raw[:-2].isdigit():
+        raw = raw[:-2]
+    for suffix in (".KS", ".KQ", ".KRX"):
+        if raw.endswith(suffix):
+            raw = raw[:-len(suffix)]
+            break
+    s = "".join(ch for ch in raw if ch in "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    if len(s) == 7 and s.startswith("A"):
+        s = s[1:]
+    if s.isdigit() and len(s) <= 6:
+        return s.zfill(6)
+    if len(s) >= 6:
+        return s[-6:]
+    return s
+
+
+def enabled() -> bool:
+    return _env_bool("FLOW_STORE_ENABLE", True)
+
+
+def _default_fetcher(start: str, end: str, code: str, on: str) -> pd.DataFrame:
+    from pykrx import stock
+
+    return stock.get_market_trading_value_by_date(start, end, code, on=on)
+
+
+def configure(fetcher: Callable[[str, str, str, str], pd.DataFrame] | None = None, root: str | Path | None = None) -> None:
+    """Install the per-ticker fetcher (``fetcher(start, end, code, on)``, pykrx frame) and/or the store directory."""
+    global _FETCHER, _ROOT, _COVER, _COVER_DIRTY
+    with _LOCK:
+        if fetcher is not None:
+            _FETCHER = fetcher
+        if root is not None:
+            _ROOT = Path(root)
+            _PARTS.clear()
+            _DIRTY.clear()
+            _COVER = None
+            _COVER_DIRTY = False
+
+
+def _now_kst() -> datetime:
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def _ymd(v: Any) -> str:
+    return pd.Timestamp(str(v)).strftime("%Y%m%d")
+
+
+def _shift(ymd: str, days: int) -> str:
+    return (pd.Timestamp(ymd) + pd.Timedelta(days=days)).strftime("%Y%m%d")
+
+
+def last_final_day(now: datetime | None = None) -> str:
+    """투자자 거래대금이 확정된 마지막 날짜(YYYYMMDD). 당일은 FLOW_STORE_FINAL_HHMM 이후부터 확정으로 본다."""
+    now = now or _now_kst()
+    hh, mm = divmod(max(0, _env_int("FLOW_STORE_FINAL_HHMM", 1800)), 100)
+    d = now.date() if now.hour * 60 + now.minute >= hh * 60 + mm else now.date() - timedelta(days=1)
+    return d.strftime("%Y%m%d")
+
+
+# -------------------------------------------------------------
+# coverage
+# -------------------------------------------------------------
+def _cover_file() -> Path:
+    return _ROOT / "coverage.json"
+
+
+def _cover() -> dict[str, list[list[str]]]:
+    global _COVER
+    if _COVER is None:
+        _COVER = {}
+        try:
+            obj = json.loads(_cover_file().read_text(encoding="utf-8"))
+            if obj.get("schema") == SCHEMA:
+                _COVER = {k: [list(iv) for iv in v] for k, v in (obj.get("ranges") or {}).items()}
+        except Exception:
+            pass
+    return _COVER
+
+
+def _merge(ranges: Iterable[list[str]]) -> list[list[str]]:
+    out: list[list[str]] = []
+    for s, e in sorted(ranges):
+        if out and s <= _shift(out[-1][1], 1):
+            out[-1][1] = max(out[-1][1], e)
+        else:
+            out.append([s, e])
+    return out
+
+
+def _gaps(key: str, start: str, end: str) -> list[list[str]]:
+    gaps, cur = [], start
+    for s, e in _cover().get(key, []):
+        if e < cur:
+            continue
+        if s > end:
+            break
+        if s > cur:
+            gaps.append([cur, min(end, _shift(s, -1))])
+        cur = max(cur, _shift(e, 1))
+        if cur > end:
+            break
+    if cur <= end:
+        gaps.append([cur, end])
+    return gaps
+
+
+def _mark(key: str, start: str, end: str) -> None:
+    global _COVER_DIRTY
+    if start > end:
+        return
+    cov = _cover()
+    cov[key] = _merge(cov.get(key, []) + [[start, end]])
+    _COVER_DIRTY = True
+
+
+def covered(code: Any, start: Any, end: Any, on: str = "순매수") -> bool:
+    with _LOCK:
+        return not _gaps(f"{_norm_code(code)}|{on}", _ymd(start), _ymd(end))
+
+
+# -------------------------------------------------------------
+# partitions
+# -------------------------------------------------------------
+def _part_file(month: str) -> Path:
+    return _ROOT / f"flow_{month}.npz"
+
+
+def _part(month: str) -> dict[str, pd.DataFrame]:
+    part = _PARTS.get(month)
+    if part is not None:
+        return part
+    part = {}
+    p = _part_file(month)
+    if p.exists():
+        try:
+            raw = p.read_bytes()
+            with np.load(io.BytesIO(raw), allow_pickle=False) as z:
+                if str(z["schema"]) != SCHEMA:
+                    raise ValueError("schema mismatch")
+                codes = z["codes"].astype("<U6")
+                dates = z["dates"].astype("datetime64[D]").astype("datetime64[ns]")
+                cols = [str(c) for c in z["cols"].tolist()]
+                vals = z["values"].astype("float64")
+            order = np.argsort(codes, kind="stable")
+            codes, dates, vals = codes[order], dates[order], vals[order]
+            uniq, first = np.unique(codes, return_index=True)
+            bounds = list(first) + [len(codes)]
+            for j, c in enumerate(uniq.tolist()):
+                lo, hi = bounds[j], bounds[j + 1]
+                part[c] = pd.DataFrame(vals[lo:hi], index=pd.DatetimeIndex(dates[lo:hi], name="날짜"), columns=cols).sort_index()
+            _STATS["parts_loaded"] += 1
+            _STATS["bytes_read"] += len(raw)
+        except Exception:
+            part = {}
+    _PARTS[month] = part
+    return part
+
+
+def _save_part(month: str, part: dict[str, pd.DataFrame]) -> None:
+    cols: list[str] = []
+    for df in part.values():
+        cols.extend(c for c in df.columns if c not in cols)
+    codes, dates, blocks = [], [], []
+    for code, df in part.items():
+        if df.empty:
+            continue
+        codes.append(np.full(len(df), code, dtype="<U6"))
+        dates.append(df.index.values.astype("datetime64[D]"))
+        blocks.append(df.reindex(columns=cols).to_numpy(dtype="float64"))
+    if not blocks:
+        return
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf,
+        schema=np.array(SCHEMA),
+        codes=np.concatenate(codes),
+        dates=np.concatenate(dates),
+        cols=np.array(cols),
+        values=np.vstack(blocks),
+        saved_at=np.array(time.time()),
+    )
+    p = _part_file(month)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(buf.getvalue())
+    os.replace(tmp, p)
+    _STATS["parts_written"] += 1
+    _STATS["bytes_written"] += buf.tell()
+
+
+def _months(start: str, end: str) -> list[str]:
+    return [p.strftime("%Y%m") for p in pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq="M")]
+
+
+def _ingest(code: str, on: str, raw: pd.DataFrame) -> int:
+    df = raw.copy()
+    df.index = pd.to_datetime(df.index, errors="coerce")
+    df = df[~df.index.isna()]
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df = df.apply(pd.to_numeric, errors="coerce").astype("float64")
+    df.columns = [f"{on}|{c}" for c in df.columns]
+    df.index.name = "날짜"
+    for month, chunk in df.groupby(df.index.strftime("%Y%m")):
+        part = _part(month)
+        old = part.get(code)
+        part[code] = chunk if old is None else chunk.combine_first(old)
+        _DIRTY.add(month)
+    return len(df)
+
+
+def _read(code: str, on: str, start: str, end: str) -> pd.DataFrame:
+    prefix = f"{on}|"
+    frames = []
+    for month in _months(start, end):
+        df = _part(month).get(code)
+        if df is None:
+            continue
+        sub = df[[c for c in df.columns if c.startswith(prefix)]]
+        if not sub.empty:
+            frames.append(sub)
+    if not frames:
+        return pd.DataFrame()
+    out = pd.concat(frames).sort_index()
+    out = out.loc[(out.index >= pd.Timestamp(start)) & (out.index <= pd.Timestamp(end))].dropna(how="all")
+    out.columns = [c[len(prefix):] for c in out.columns]
+    return out.dropna(axis=1, how="all")
+
+
+def _has_weekday(start: str, end: str) -> bool:
+    return bool(len(pd.bdate_range(pd.Timestamp(start), pd.Timestamp(end))))
+
+
+# -------------------------------------------------------------
+# public API
+# -------------------------------------------------------------
+def frame(
+    code: Any,
+    start: Any,
+    end: Any,
+    on: str = "순매수",
+    fill_start: Any = None,
+    fill_end: Any = None,
+    fetcher: Callable[[str, str, str, str], pd.DataFrame] | None = None,
+) -> pd.DataFrame:
+    """[start, end] 일자별 투자자 거래대금(pykrx get_market_trading_value_by_date 모양).
+
+    조회하지 않은 구간이 있으면 그 구간(그리고 fill_start~fill_end가 주어지면 그 범위까지 넓혀) pykrx 1회로 채운다.
+    백테스트처럼 같은 종목을 여러 신호일로 조회할 때 fill_* 로 전체 기간을 한 번에 받아 두면 이후는 로컬 조회다.
+    fetcher 예외는 그대로 올린다.
+    """
+    code_s, s, e = _norm_code(code), _ymd(start), _ymd(end)
+    key = f"{code_s}|{on}"
+    with _LOCK:
+        _STATS["queries"] += 1
+        klock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    with klock:
+        with _LOCK:
+            gaps = _gaps(key, s, e)
+        if not gaps:
+            with _LOCK:
+                _STATS["local"] += 1
+                return _read(code_s, on, s, e)
+        today = _now_kst().strftime("%Y%m%d")
+        fs = min(gaps[0][0], _ymd(fill_start)) if fill_start is not None else gaps[0][0]
+        fe = max(gaps[-1][1], _ymd(fill_end)) if fill_end is not None else gaps[-1][1]
+        fe = min(fe, today)
+        fetch = fetcher or _FETCHER or _default_fetcher
+        t0 = time.perf_counter()
+        try:
+            raw = fetch(fs, fe, code_s, on)
+        except Exception:
+            with _LOCK:
+                _STATS["errors"] += 1
+                _STATS["fetch_sec"] += time.perf_counter() - t0
+            raise
+        final = min(fe, last_final_day())
+        with _LOCK:
+            _STATS["fetches"] += 1
+            _STATS["fetch_sec"] += time.perf_counter() - t0
+            if isinstance(raw, pd.DataFrame) and not raw.empty:
+                _STATS["fetch_rows"] += _ingest(code_s, on, raw)
+                _mark(key, fs, final)
+            else:
+                # 빈 결과는 주말만 걸친 구간일 때만 '조회 완료'로 본다(KRX 일시 빈값 재시도).
+                _STATS["empty"] += 1
+                if not _has_weekday(fs, final):
+                    _mark(key, fs, final)
+            return _read(code_s, on, s, e)
+
+
+def prefetch(codes: Iterable[Any], start: Any, end: Any, on: str = "순매수", workers: int | None = None) -> dict[str, int]:
+    """여러 종목의 [start, end] 구간을 병렬로 채운다(이미 채워진 종목은 건너뜀)."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    todo = [c for c in dict.fromkeys(_norm_code(c) for c in codes) if not covered(c, start, end, on)]
+    result = {"requested": len(todo), "filled": 0, "errors": 0}
+    if not todo:
+        return result
+
+    def _one(c: str) -> bool:
+        try:
+            frame(c, start, end, on=on)
+            return True
+        except Exception:
+            return False
+
+    n = max(1, min(workers or _env_int("FLOW_STORE_WORKERS", 4), len(todo)))
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        for ok in ex.map(_one, todo):
+            result["filled" if ok else "errors"] += 1
+    flush()
+    return result
+
+
+def flush() -> int:
+    """변경된 월 파티션과 coverage.json을 원자적으로 다시 쓴다. 쓴 파티션 수를 돌려준다."""
+    global _COVER_DIRTY
+    written = 0
+    with _LOCK:
+        for month in sorted(_DIRTY):
+            try:
+                _save_part(month, _PARTS.get(month) or {})
+                written += 1
+            except Exception:
+                continue
+        _DIRTY.clear()
+        if _COVER_DIRTY and _COVER is not None:
+            p = _cover_file()
+            try:
+                p.parent.mkdir(parents=True, exist_ok=True)
+                tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp.write_text(json.dumps({"schema": SCHEMA, "ranges": _COVER}, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, p)
+                _COVER_DIRTY = False
+            except Exception:
+                pass
+    return written
+
+
+atexit.register(flush)
+
+
+def reset_stats() -> None:
+    global _RUN_START
+    _RUN_START = time.monotonic()
+    with _LOCK:
+        for k in list(_STATS):
+            _STATS[k] = 0
+
+
+def stats_snapshot() -> dict[str, Any]:
+    with _LOCK:
+        z = dict(_STATS)
+        z["parts_in_memory"] = len(_PARTS)
+        z["tickers_covered"] = len({k.split("|", 1)[0] for k in (_COVER or {})})
+    z["fetch_sec"] = round(z["fetch_sec"], 2)
+    z["elapsed_sec"] = round(max(0.0, time.monotonic() - _RUN_START), 3)
+    return z
+
+
+def format_stats() -> str:
+    st = stats_snapshot()
+    return (
+        f"🗂️ 수급 저장소: 조회 {int(st['queries'])} (로컬 {int(st['local'])}) | pykrx {int(st['fetches'])}회 · {int(st['fetch_rows'])}행 · "
+        f"{st['fetch_sec']}초 · 빈값 {int(st['empty'])} · 오류 {int(st['errors'])} | 파티션 읽기 {int(st['parts_loaded'])} · 쓰기 {int(st['parts_written'])}"
+    )
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+VERSION = "FORWARD_PATHS_V1"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# 신호 이후 N일 수익률 / MFE·MAE / 목표·손절 선도달 / 청산가를 이벤트 묶음 단위로 계산하는 공용 엔진.
+# - 가격 시계열 끝에 NaN을 덧대고 sliding_window_view(복사 없는 strided 창)에서 신호 위치 행만 모아
+#   (이벤트 × 보유일) 행렬 하나로 만든다. 이후 판정은 전부 행렬 연산이다.
+# - NaN 비교는 False(미도달)다. 기존 함수가 NaN을 0으로 보는 곳은 호출부가 fill 값을 넘긴다.
+# - 보고서별 어댑터(Closing_bet_backtest, v49.76, v25)는 이 행렬로 기존 dict/컬럼을 그대로 만든다.
+#   기존 행 단위 함수는 엔진이 없을 때의 대체 경로이자 대조 기준으로 남긴다
+#   (tests/test_forward_paths.py, test_closing_bet_backtest.py, test_v49_76_forward_paths.py,
+#    test_v25_core224_daily_episode_replay.py 가 어댑터마다 행 단위 함수와 값을 대조한다).
+PRICE_FIELDS = ("Open", "High", "Low", "Close")
+
+
+def forward_windows(values: Any, pos: Any, length: int, start: int = 1, fill: float = np.nan) -> np.ndarray:
+    """``values[pos+start : pos+start+length]`` 를 이벤트마다 모은 (k, length) float 행렬. 끝을 넘는 칸은 ``fill``."""
+    v = np.asarray(values, dtype="float64")
+    p = np.asarray(pos, dtype=np.int64).reshape(-1)
+    length = max(0, int(length))
+    if length == 0 or p.size == 0:
+        return np.empty((p.size, length), dtype="float64")
+    lead = max(0, -int(start))
+    padded = np.concatenate([np.full(lead, fill), v, np.full(length + max(0, int(start)), fill)])
+    view = sliding_window_view(padded, length)
+    return view[np.clip(p + int(start) + lead, 0, len(view) - 1)].copy()
+
+
+def available_days(n_rows: int, pos: Any, length: int, start: int = 1) -> np.ndarray:
+    """각 이벤트 창에서 실제 봉이 있는 칸 수(0..length)."""
+    p = np.asarray(pos, dtype=np.int64).reshape(-1)
+    return np.clip(int(n_rows) - (p + int(start)), 0, max(0, int(length))).astype(np.int64)
+
+
+def valid_mask(avail: Any, length: int) -> np.ndarray:
+    return np.arange(max(0, int(length)))[None, :] < np.asarray(avail, dtype=np.int64).reshape(-1, 1)
+
+
+def column_matrix(df: pd.DataFrame, names: Iterable[str]) -> np.ndarray:
+    """``d1_high_ret, d2_high_ret, ...`` 처럼 날짜별로 펼쳐진 컬럼들을 (행 × 일) float 행렬로. 없는 컬럼은 NaN."""
+    names = list(names)
+    out = np.full((len(df), len(names)), np.nan)
+    for j, c in enumerate(names):
+        if c in df.columns:
+            out[:, j] = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64")
+    return out
+
+
+def pct_from_entry(win: np.ndarray, entry: Any) -> np.ndarray:
+    """(가격 / 진입가 - 1) * 100. 기존 스칼라 계산과 같은 연산 순서라 비트 단위로 같다."""
+    e = np.asarray(entry, dtype="float64").reshape(-1, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (win / e - 1.0) * 100.0
+
+
+def first_day(mask: np.ndarray) -> np.ndarray:
+    """행마다 처음 True인 칸의 1-기준 번호, 없으면 0."""
+    m = np.asarray(mask, dtype=bool)
+    if m.shape[1] == 0:
+        return np.zeros(m.shape[0], dtype=np.int64)
+    return np.where(m.any(axis=1), m.argmax(axis=1) + 1, 0).astype(np.int64)
+
+
+def ordered_first(target_day: Any, stop_day: Any) -> dict[str, np.ndarray]:
+    """첫 도달일(0=미도달) 두 개로 선도달/동일일/무도달 플래그를 만든다."""
+    t = np.asarray(target_day, dtype=np.int64)
+    s = np.asarray(stop_day, dtype=np.int64)
+    return {
+        "target_first": ((t > 0) & ((s == 0) | (t < s))).astype(np.int64),
+        "stop_first": ((s > 0) & ((t == 0) | (s < t))).astype(np.int64),
+        "same_day": ((t > 0) & (s > 0) & (t == s)).astype(np.int64),
+        "none": ((t == 0) & (s == 0)).astype(np.int64),
+    }
+
+
+def nan_reduce(win: np.ndarray, how: str = "max", upto: Any = None) -> np.ndarray:
+    """행별 NaN 제외 max/min(``upto`` 칸까지). 값이 하나도 없으면 NaN이고 경고를 내지 않는다."""
+    w = np.asarray(win, dtype="float64")
+    if upto is not None:
+        w = np.where(valid_mask(upto, w.shape[1]), w, np.nan)
+    ok = ~np.isnan(w)
+    if w.shape[1] == 0:
+        return np.full(w.shape[0], np.nan)
+    if how == "max":
+        out = np.where(ok, w, -np.inf).max(axis=1)
+    else:
+        out = np.where(ok, w, np.inf).min(axis=1)
+    return np.where(ok.any(axis=1), out, np.nan)
+
+
+def last_valid(win: np.ndarray, avail: Any) -> np.ndarray:
+    """각 행의 마지막 실제 봉 값(avail==0이면 NaN)."""
+    a = np.asarray(avail, dtype=np.int64)
+    idx = np.clip(a - 1, 0, max(0, win.shape[1] - 1))
+    out = win[np.arange(win.shape[0]), idx] if win.shape[1] else np.full(win.shape[0], np.nan)
+    return np.where(a > 0, out, np.nan)
+
+
+def last_notna(win: np.ndarray) -> np.ndarray:
+    """각 행에서 NaN이 아닌 마지막 값(없으면 NaN)."""
+    ok = ~np.isnan(win)
+    if win.shape[1] == 0:
+        return np.full(win.shape[0], np.nan)
+    idx = win.shape[1] - 1 - ok[:, ::-1].argmax(axis=1)
+    return np.where(ok.any(axis=1), win[np.arange(win.shape[0]), idx], np.nan)
+
+
+def take_day(win: np.ndarray, day: Any) -> np.ndarray:
+    """1-기준 ``day`` 칸 값(0 또는 범위 밖이면 NaN)."""
+    d = np.asarray(day, dtype=np.int64)
+    ok = (d > 0) & (d <= win.shape[1])
+    out = np.full(win.shape[0], np.nan)
+    out[ok] = win[np.flatnonzero(ok), d[ok] - 1]
+    return out
+
+
+def ohlc_arrays(df: pd.DataFrame, fields: Iterable[str] = PRICE_FIELDS, exact: bool = False) -> dict[str, np.ndarray]:
+    """프레임 가격 컬럼을 float64 배열로(같은 이름 우선, exact=False면 대소문자 무관). 없는 컬럼은 NaN."""
+    cols = {} if exact else {str(c).lower(): c for c in df.columns}
+    out = {}
+    for f in fields:
+        c = f if f in df.columns else cols.get(f.lower())
+        out[f] = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64") if c is not None else np.full(len(df), np.nan)
+    return out
+
+
+class PricePanel:
+    """여러 종목 가격을 한 배열로 이어 붙인 패널. 종목 사이에 NaN 칸을 넣어 창이 다음 종목으로 넘어가지 않는다."""
+
+    def __init__(self, frames: Mapping[str, pd.DataFrame], gap: int = 64):
+        self.gap = max(1, int(gap))
+        self.offset: dict[str, int] = {}
+        self.length: dict[str, int] = {}
+        parts: dict[str, list[np.ndarray]] = {f: [] for f in PRICE_FIELDS}
+        at = 0
+        for code, df in frames.items():
+            arr = ohlc_arrays(df)
+            n = len(df)
+            self.offset[str(code)] = at
+            self.length[str(code)] = n
+            for f in PRICE_FIELDS:
+                parts[f].append(arr[f])
+                parts[f].append(np.full(self.gap, np.nan))
+            at += n + self.gap
+        self.arrays = {f: (np.concatenate(p) if p else np.empty(0)) for f, p in parts.items()}
+        self.rows = at
+
+    def locate(self, codes: Iterable[Any], pos: Any) -> tuple[np.ndarray, np.ndarray]:
+        """(종목, 종목 내 위치) → (패널 위치, 해당 종목 끝 위치)."""
+        codes = [str(c) for c in codes]
+        p = np.asarray(pos, dtype=np.int64).reshape(-1)
+        off = np.array([self.offset.get(c, -1) for c in codes], dtype=np.int64)
+        end = np.array([self.offset.get(c, 0) + self.length.get(c, 0) for c in codes], dtype=np.int64)
+        return np.where(off >= 0, off + p, -1), end
+
+
+def evaluate_events(
+    prices: pd.DataFrame | PricePanel,
+    events: pd.DataFrame,
+    horizon: int,
+    *,
+    holds: Iterable[int] = (),
+    start: int = 1,
+    same_day: str = "stop_first",
+) -> pd.DataFrame:
+    """이벤트 표(code?, signal_idx, entry, stop?, target?, max_hold?)의 경로 지표를 한 번에 계산한다.
+
+    창은 신호 다음 봉(start=1)부터 ``min(horizon, max_hold)`` 봉. 목표는 고가 ≥ target, 손절은 저가 ≤ stop.
+    반환 컬럼: days_available, ret_{h}d(신호봉 기준 h봉 뒤 종가), mfe_pct, mae_pct, last_close_ret_pct,
+    target_day, stop_day, close_target_day (1-기준, 0=미도달), exit_day, exit_reason, exit_price.
+    """
+    ev = events.reset_index(drop=True)
+    k = len(ev)
+    pos = pd.to_numeric(ev["signal_idx"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+    if isinstance(prices, PricePanel):
+        gpos, end = prices.locate(ev["code"], pos)
+        arr = prices.arrays
+    else:
+        arr = ohlc_arrays(prices)
+        gpos, end = pos, np.full(k, len(prices), dtype=np.int64)
+    entry = pd.to_numeric(ev["entry"], errors="coerce").to_numpy(dtype="float64")
+    stop = pd.to_numeric(ev["stop"], errors="coerce").to_numpy(dtype="float64") if "stop" in ev else np.full(k, np.nan)
+    target = pd.to_numeric(ev["target"], errors="coerce").to_numpy(dtype="float64") if "target" in ev else np.full(k, np.nan)
+    hold = pd.to_numeric(ev["max_hold"], errors="coerce").fillna(horizon).to_numpy(dtype=np.int64) if "max_hold" in ev else np.full(k, int(horizon))
+    hold = np.clip(hold, 0, int(horizon))
+    avail = np.minimum(np.clip(end - (gpos + start), 0, None), hold)
+    avail[gpos < 0] = 0
+    vm = valid_mask(avail, horizon)
+    win = {f: np.where(vm, forward_windows(arr[f], np.maximum(gpos, 0), horizon, start), np.nan) for f in PRICE_FIELDS}
+    hi_r = pct_from_entry(win["High"], entry)
+    lo_r = pct_from_entry(win["Low"], entry)
+    out = pd.DataFrame({"days_available": avail}, index=events.index)
+    for h in holds:
+        c = forward_windows(arr["Close"], np.maximum(gpos, 0), 1, int(h))[:, 0]
+        c = np.where((gpos >= 0) & (gpos + int(h) < end), c, np.nan)
+        out[f"ret_{int(h)}d"] = pct_from_entry(c.reshape(-1, 1), entry)[:, 0]
+    out["mfe_pct"] = nan_reduce(hi_r, "max")
+    out["mae_pct"] = nan_reduce(lo_r, "min")
+    out["last_close_ret_pct"] = pct_from_entry(last_valid(win["Close"], avail).reshape(-1, 1), entry)[:, 0]
+    t_day = first_day(win["High"] >= target.reshape(-1, 1))
+    s_day = first_day(win["Low"] <= stop.reshape(-1, 1))
+    out["target_day"] = t_day
+    out["stop_day"] = s_day
+    out["close_target_day"] = first_day(win["Close"] >= target.reshape(-1, 1))
+    flags = ordered_first(t_day, s_day)
+    tie_target = same_day == "target_first"
+    take_target = (flags["target_first"] == 1) | ((flags["same_day"] == 1) & tie_target)
+    take_stop = (flags["stop_first"] == 1) | ((flags["same_day"] == 1) & ~tie_target)
+    exit_day = np.where(take_target, t_day, np.where(take_stop, s_day, avail))
+    reason = np.where(take_target, "TARGET", np.where(take_stop, "STOP", np.where(avail > 0, "HORIZON", "NO_DATA")))
+    reason = np.where((flags["same_day"] == 1), np.where(tie_target, "SAME_DAY_TARGET", "SAME_DAY_STOP"), reason)
+    exit_price = np.where(take_target, target, np.where(take_stop, stop, last_valid(win["Close"], avail)))
+    out["exit_day"] = exit_day
+    out["exit_reason"] = reason
+    out["exit_price"] = np.where(avail > 0, exit_price, np.nan)
+    return out
+
+
+# -------------------------------------------------------------
+# self-check against a plain per-event loop
+# -------------------------------------------------------------
+def _reference_one(df: pd.DataFrame, i: int, entry: float, stop: float, target: float, horizon: int, same_day: str) -> dict[str, Any]:
+    w = df.iloc[i + 1:i + 1 + horizon]
+    r: dict[str, Any] = {"days_available": len(w)}
+    t_day = s_day = 0
+    for d, (_, b) in enumerate(w.iterrows(), 1):
+        if not t_day and b["High"] >= target:
+            t_day = d
+        if not s_day and b["Low"] <= stop:
+            s_day = d
+    r.update(target_day=t_day, stop_day=s_day)
+    if t_day and (not s_day or t_day < s_day or (t_day == s_day and same_day == "target_first")):
+        r.update(exit_day=t_day, exit_price=target)
+    elif s_day:
+        r.update(exit_day=s_day, exit_price=stop)
+    else:
+        r.update(exit_day=len(w), exit_price=float(w["Close"].iloc[-1]) if len(w) else np.nan)
+    r["mfe_pct"] = (float(w["High"].max()) / entry - 1.0) * 100.0 if len(w) else np.nan
+    r["mae_pct"] = (float(w["Low"].min()) / entry - 1.0) * 100.0 if len(w) else np.nan
+    return r
+
+
+def self_check(n_rows: int = 800, n_events: int = 400, horizon: int = 15, seed: int = 0) -> dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n_rows)))
+    df = pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.005, n_rows)),
+        "High": close * (1 + np.abs(rng.normal(0, 0.02, n_rows))),
+        "Low": close * (1 - np.abs(rng.normal(0, 0.02, n_rows))),
+        "Close": close,
+    })
+    idx = np.sort(rng.choice(n_rows, n_events, replace=False))
+    entry = df["Close"].to_numpy()[idx]
+    ev = pd.DataFrame({"signal_idx": idx, "entry": entry, "stop": entry * 0.97, "target": entry * 1.05})
+    t0 = time.perf_counter()
+    got = evaluate_events(df, ev, horizon)
+    t_vec = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ref = [_reference_one(df, int(i), float(e), float(s), float(t), horizon, "stop_first") for i, e, s, t in zip(idx, entry, ev["stop"], ev["target"])]
+    t_ref = time.perf_counter() - t0
+    bad = 0
+    for j, r in enumerate(ref):
+        for key, v in r.items():
+            g = got.iloc[j][key]
+            if not ((pd.isna(v) and pd.isna(g)) or v == g):
+                bad += 1
+    return {"events": n_events, "mismatches": bad, "vector_sec": round(t_vec, 4), "loop_sec": round(t_ref, 4)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="forward path engine self-check (vector vs per-event loop)")
+    ap.add_argument("--events", type=int, default=400)
+    ap.add_argument("--horizon", type=int, default=15)
+    args = ap.parse_args(argv)
+    res = self_check(n_events=args.events, n_rows=max(args.events * 2, 100), horizon=args.horizon)
+    print(res)
+    return 0 if res["mismatches"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
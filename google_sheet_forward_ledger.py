@@ -32,6 +32,8 @@ DEFAULT_EXPECTED_SERVICE_ACCOUNT = (
 STORAGE_AUDIT_FILE = "v73_google_sheet_storage_audit.csv"
 SYNC_AUDIT_FILE = "v73_google_sheet_sync_audit.csv"
 STORAGE_REPORT_FILE = "v73_google_sheet_storage_report.txt"
+SYNC_INDEX_FILE = "v73_google_sheet_sync_index.json"
+SYNC_INDEX_VERSION = "SHEET_SYNC_INDEX_V1"
 
 MAX_CELL_CHARS = 45000
 DEFAULT_TAB_ROWS = 2000
@@ -48,6 +50,13 @@ DEFAULT_RETRY_MAX = 5
 DEFAULT_RETRY_BASE_SEC = 5.0
 DEFAULT_RETRY_MAX_SEC = 65.0
 
+# Incremental sync index.  A SYNC-only run reads each indexed tab as header +
+# tail (A{last_synced_row}:ZZ) instead of A:ZZ.  The first tail row must match
+# the stored anchor digest of the last synced row; otherwise (rows deleted,
+# sorted or rewritten) that tab falls back to a full read and the index entry
+# is rebuilt.  Any run that already reads full values (HYDRATE) refreshes the
+# index for free.  GOOGLE_SHEET_FULL_RECONCILE=1 / --full-reconcile ignores it.
+
 _GOOGLE_IO_STATS: dict[str, int] = {
     "metadata_reads": 0,
     "batch_read_requests": 0,
@@ -200,6 +209,9 @@ STORAGE_AUDIT_COLUMNS = RUN_AUDIT_COLUMNS + [
     "quota_deferred",
     "deferred_reason",
     "deferred_local_safe",
+    "index_tail_tabs",
+    "index_full_tabs",
+    "index_reconciled_tabs",
 ]
 
 SYNC_AUDIT_COLUMNS = [
@@ -218,6 +230,7 @@ SYNC_AUDIT_COLUMNS = [
     "status",
     "error_type",
     "error_message",
+    "read_mode",
 ]
 
 
@@ -605,28 +618,53 @@ def _batch_add_missing_worksheets(spreadsheet, worksheet_map: dict[str, Any], de
     return worksheet_map
 
 
-def _batch_read_values(spreadsheet, titles: list[str], *, header_only: bool = False) -> dict[str, list[list[str]]]:
+def _batch_read_values(
+    spreadsheet,
+    titles: list[str],
+    *,
+    header_only: bool = False,
+    tail_from: dict[str, int] | None = None,
+) -> dict[str, list[list[str]]]:
+    """Read tab values in batches.
+
+    ``tail_from`` maps a title to a 1-based sheet row; those tabs return the
+    header row followed by the rows from that row onward (header + tail).
+    """
     if not titles:
         return {}
     batch_size = _env_int("GOOGLE_SHEET_BATCH_READ_SIZE", DEFAULT_BATCH_READ_SIZE, 1)
     result: dict[str, list[list[str]]] = {title: [] for title in titles}
+    tail_from = {t: int(r) for t, r in (tail_from or {}).items() if int(r) > 1} if not header_only else {}
 
     if _truthy(os.environ.get("GOOGLE_SHEET_BATCH_READ_ENABLE", "1"), True) and hasattr(spreadsheet, "values_batch_get"):
         for start in range(0, len(titles), batch_size):
             chunk = titles[start : start + batch_size]
-            ranges = [
-                f"{_quote_sheet_title(title)}!A1:ZZ1" if header_only else f"{_quote_sheet_title(title)}!A:ZZ"
-                for title in chunk
-            ]
+            ranges = []
+            for title in chunk:
+                if header_only or title in tail_from:
+                    ranges.append(f"{_quote_sheet_title(title)}!A1:ZZ1")
+                if title in tail_from:
+                    ranges.append(f"{_quote_sheet_title(title)}!A{tail_from[title]}:ZZ")
+                elif not header_only:
+                    ranges.append(f"{_quote_sheet_title(title)}!A:ZZ")
             payload = _google_call(
                 f"values_batch_get:{start // batch_size + 1}",
                 lambda r=ranges: spreadsheet.values_batch_get(r, params={"majorDimension": "ROWS"}),
             )
             _GOOGLE_IO_STATS["batch_read_requests"] += 1
             value_ranges = list((payload or {}).get("valueRanges", []) or [])
-            for idx, title in enumerate(chunk):
-                vr = value_ranges[idx] if idx < len(value_ranges) else {}
-                result[title] = list((vr or {}).get("values", []) or [])
+            pos = 0
+            for title in chunk:
+                parts = 2 if title in tail_from else 1
+                values: list[list[str]] = []
+                for idx in range(pos, pos + parts):
+                    vr = value_ranges[idx] if idx < len(value_ranges) else {}
+                    part = list((vr or {}).get("values", []) or [])
+                    if parts == 2 and idx == pos:
+                        part = part[:1] or [[]]
+                    values.extend(part)
+                pos += parts
+                result[title] = values
         return result
 
     # Compatibility fallback: throttle single-tab reads so old gspread does not
@@ -639,7 +677,12 @@ def _batch_read_values(spreadsheet, titles: list[str], *, header_only: bool = Fa
         ws = worksheet_map[title]
         values = _google_call(f"single_get:{title}", lambda w=ws: w.get_all_values())
         _GOOGLE_IO_STATS["single_read_fallback_requests"] += 1
-        result[title] = values[:1] if header_only else values
+        if header_only:
+            result[title] = values[:1]
+        elif title in tail_from:
+            result[title] = (values[:1] or [[]]) + values[tail_from[title] - 1 :]
+        else:
+            result[title] = values
         if delay > 0 and idx + 1 < len(titles):
             time.sleep(delay)
     return result
@@ -798,13 +841,23 @@ def _append_rows(worksheet, headers: list[str], rows: list[dict[str, Any]]) -> i
         appended += len(chunk)
     return appended
 
-def _append_only_delta(spec: TabSpec, headers: list[str], remote: pd.DataFrame, local: pd.DataFrame) -> list[dict[str, Any]]:
-    remote_rows = _rows_from_frame(remote.reindex(columns=headers, fill_value=""))
+def _remote_key_hashes(spec: TabSpec, headers: list[str], remote: pd.DataFrame) -> set[str]:
+    return {_key_hash(spec, row, headers) for row in _rows_from_frame(remote.reindex(columns=headers, fill_value=""))}
+
+
+def _append_only_delta(
+    spec: TabSpec,
+    headers: list[str],
+    remote: pd.DataFrame,
+    local: pd.DataFrame,
+    known_keys: set[str] | None = None,
+) -> list[dict[str, Any]]:
     local_rows = _rows_from_frame(local.reindex(columns=headers, fill_value=""))
     # Prefer the declared causal/business key so harmless representation changes
     # (boolean casing, timezone normalization, blank optional columns) do not
     # create duplicate sheet rows. Exact row hashing remains the fail-closed fallback.
-    existing_keys = {_key_hash(spec, row, headers) for row in remote_rows}
+    # known_keys comes from the sync index and already covers ``remote`` (tail rows).
+    existing_keys = set(known_keys) if known_keys is not None else _remote_key_hashes(spec, headers, remote)
     delta: list[dict[str, Any]] = []
     for row in local_rows:
         h = _key_hash(spec, row, headers)
@@ -814,6 +867,88 @@ def _append_only_delta(spec: TabSpec, headers: list[str], remote: pd.DataFrame,
     return delta
 
 
+def _cells_digest(cells: Iterable[Any]) -> str:
+    """Digest of one sheet row as the values API returns it (trailing blanks trimmed)."""
+    text = [_clean_cell(c) for c in cells]
+    while text and not text[-1]:
+        text.pop()
+    return hashlib.sha256("\x1f".join(text).encode("utf-8")).hexdigest()
+
+
+def _keys_digest(keys: Iterable[str]) -> str:
+    return hashlib.sha256("\n".join(sorted(keys)).encode("utf-8")).hexdigest()
+
+
+def _load_sync_index(out: Path, spreadsheet_id: str) -> dict[str, dict[str, Any]]:
+    """Per-tab sync index; entries whose key checksum does not verify are dropped."""
+    path = out / SYNC_INDEX_FILE
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != SYNC_INDEX_VERSION or payload.get("spreadsheet_id") != spreadsheet_id:
+        return {}
+    tabs: dict[str, dict[str, Any]] = {}
+    for title, entry in (payload.get("tabs") or {}).items():
+        try:
+            keys = set(entry["keys"])
+            if _keys_digest(keys) != entry["keys_digest"] or int(entry["row_count"]) < 0:
+                continue
+            tabs[str(title)] = {
+                "headers": [str(h) for h in entry["headers"]],
+                "row_count": int(entry["row_count"]),
+                "anchor": str(entry["anchor"]),
+                "keys": keys,
+            }
+        except Exception:
+            continue
+    return tabs
+
+
+def _save_sync_index(out: Path, spreadsheet_id: str, tabs: dict[str, dict[str, Any]]) -> None:
+    payload = {
+        "version": SYNC_INDEX_VERSION,
+        "spreadsheet_id": spreadsheet_id,
+        "saved_at": _now_iso(),
+        "tabs": {
+            title: {
+                "headers": list(entry["headers"]),
+                "row_count": int(entry["row_count"]),
+                "anchor": entry["anchor"],
+                "keys": sorted(entry["keys"]),
+                "keys_digest": _keys_digest(entry["keys"]),
+            }
+            for title, entry in tabs.items()
+        },
+    }
+    path = out / SYNC_INDEX_FILE
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _tail_anchor_ok(entry: dict[str, Any], values: list[list[str]], headers: list[str]) -> bool:
+    """True when the tail read still starts at the last synced row with the same schema."""
+    return list(entry.get("headers", [])) == list(headers) and len(values) >= 2 and _cells_digest(values[1]) == entry.get("anchor")
+
+
+def _index_after_append(entry: dict[str, Any], spec: TabSpec, headers: list[str], delta: list[dict[str, Any]], appended: int) -> None:
+    rows = delta[:appended]
+    if not rows:
+        return
+    entry["keys"].update(_key_hash(spec, row, headers) for row in rows)
+    entry["row_count"] += len(rows)
+    entry["anchor"] = _cells_digest(rows[-1].get(h, "") for h in headers)
+
+
+def _union_headers(headers: list[str], desired: list[str]) -> list[str]:
+    union_headers = list(headers)
+    for header in desired:
+        if header and header not in union_headers:
+            union_headers.append(header)
+    return union_headers or list(desired) or ["created_at"]
+
+
 def _base_run_row(phase: str) -> dict[str, Any]:
     return {
         "version": VERSION,
@@ -854,6 +989,9 @@ def _base_run_row(phase: str) -> dict[str, Any]:
         "quota_deferred": False,
         "deferred_reason": "",
         "deferred_local_safe": False,
+        "index_tail_tabs": 0,
+        "index_full_tabs": 0,
+        "index_reconciled_tabs": 0,
     }
 
 
@@ -876,6 +1014,7 @@ def _storage_report(row: dict[str, Any]) -> str:
         f"- quota guard: {row.get('quota_guard_version', QUOTA_GUARD_VERSION)}",
         f"- Google read: metadata={row.get('metadata_reads', 0)} batch={row.get('batch_read_requests', 0)} fallback={row.get('single_read_fallback_requests', 0)}",
         f"- Google retry: {row.get('quota_retries', 0)} / deferred={row.get('quota_deferred', False)} / local_safe={row.get('deferred_local_safe', False)}",
+        f"- sync index: tail={row.get('index_tail_tabs', 0)} full={row.get('index_full_tabs', 0)} reconciled={row.get('index_reconciled_tabs', 0)}",
         f"- 저장상태: {row.get('status', '')}",
         f"- 오류유형: {row.get('error_type', '') or '-'}",
         f"- 오류메시지: {row.get('error_message', '') or '-'}",
@@ -902,6 +1041,7 @@ def _sync_storage_audit_tab(
     worksheet_map: dict[str, Any] | None = None,
     header_map: dict[str, list[str]] | None = None,
     remote_frame_map: dict[str, pd.DataFrame] | None = None,
+    index_map: dict[str, dict[str, Any]] | None = None,
 ) -> int:
     spec = next(s for s in TAB_SPECS if s.title == "STORAGE_AUDIT")
     local = _read_csv(output_dir / STORAGE_AUDIT_FILE, STORAGE_AUDIT_COLUMNS)
@@ -922,8 +1062,16 @@ def _sync_storage_audit_tab(
             lambda: worksheet.update(range_name="A1", values=[union], value_input_option="RAW"),
         )
         headers = union
-    delta = _append_only_delta(spec, headers, remote, local)
-    return _append_rows(worksheet, headers, delta)
+    # STORAGE_AUDIT rows always carry their key columns, so indexed key hashes
+    # stay valid when the header row grows.
+    entry = (index_map or {}).get(spec.title)
+    if entry is not None:
+        entry["headers"] = list(headers)
+    delta = _append_only_delta(spec, headers, remote, local, entry["keys"] if entry is not None else None)
+    appended = _append_rows(worksheet, headers, delta)
+    if entry is not None:
+        _index_after_append(entry, spec, headers, delta, appended)
+    return appended
 
 
 def _local_deferred_quota_safe(out: Path, phase: str) -> tuple[bool, str]:
@@ -955,7 +1103,7 @@ def _local_deferred_quota_safe(out: Path, phase: str) -> tuple[bool, str]:
     restored = _truthy(os.environ.get("V73_CACHE_RESTORE_MATCHED", "0"), False)
     return (restored, "RESTORED_STATE" if restored else "BOOTSTRAP_NO_RESTORED_STATE")
 
-def run_storage(phase: str, output_dir: str | Path, strict: bool = False) -> dict[str, Any]:
+def run_storage(phase: str, output_dir: str | Path, strict: bool = False, full_reconcile: bool = False) -> dict[str, Any]:
     out = Path(output_dir or "reports")
     out.mkdir(parents=True, exist_ok=True)
     _reset_google_io_stats()
@@ -965,6 +1113,9 @@ def run_storage(phase: str, output_dir: str | Path, strict: bool = False) -> dic
     worksheet_map: dict[str, Any] = {}
     header_map: dict[str, list[str]] = {}
     remote_frame_map: dict[str, pd.DataFrame] = {}
+    index_map: dict[str, dict[str, Any]] = {}
+    read_mode: dict[str, str] = {}
+    full_reconcile = bool(full_reconcile or _truthy(os.environ.get("GOOGLE_SHEET_FULL_RECONCILE", "0"), False))
 
     try:
         info, credential_source = load_service_account_info()
@@ -995,21 +1146,51 @@ def run_storage(phase: str, output_dir: str | Path, strict: bool = False) -> dic
         phase_u = str(phase).upper()
         needs_full_values = "HYDRATE" in phase_u or "SYNC" in phase_u
         read_titles = [spec.title for spec in TAB_SPECS]
-        values_map = _batch_read_values(spreadsheet, read_titles, header_only=not needs_full_values)
+        # SYNC without HYDRATE only needs rows appended since the last synced row.
+        prior_index: dict[str, dict[str, Any]] = {}
+        if "SYNC" in phase_u and "HYDRATE" not in phase_u and not full_reconcile:
+            prior_index = _load_sync_index(out, spreadsheet_id)
+        tail_from = {t: e["row_count"] + 1 for t, e in prior_index.items() if t in desired_map and e["row_count"] > 0}
+        values_map = _batch_read_values(spreadsheet, read_titles, header_only=not needs_full_values, tail_from=tail_from)
+        stale = []
+        for title in tail_from:
+            headers, _ = _headers_frame_from_values(values_map.get(title, [])[:1])
+            if _tail_anchor_ok(prior_index[title], values_map.get(title, []), _union_headers(headers, desired_map[title])):
+                values_map[title] = values_map[title][:1] + values_map[title][2:]
+                read_mode[title] = "TAIL"
+            else:
+                stale.append(title)
+        if stale:
+            values_map.update(_batch_read_values(spreadsheet, stale))
+            for title in stale:
+                read_mode[title] = "RECONCILED"
+        if needs_full_values:
+            for title in read_titles:
+                read_mode.setdefault(title, "FULL")
 
         header_updates: dict[str, list[str]] = {}
         needed_cols: dict[str, int] = {}
         ready_tabs: list[str] = []
         for spec in TAB_SPECS:
-            headers, frame = _headers_frame_from_values(values_map.get(spec.title, []))
+            values = values_map.get(spec.title, [])
+            headers, frame = _headers_frame_from_values(values)
             remote_frame_map[spec.title] = frame
-            union_headers = list(headers)
-            for header in desired_map[spec.title]:
-                if header and header not in union_headers:
-                    union_headers.append(header)
-            if not union_headers:
-                union_headers = list(desired_map[spec.title]) or ["created_at"]
+            union_headers = _union_headers(headers, desired_map[spec.title])
             header_map[spec.title] = union_headers
+            if read_mode.get(spec.title) == "TAIL":
+                entry = prior_index[spec.title]
+                entry["keys"] |= _remote_key_hashes(spec, union_headers, frame)
+                if len(values) > 1:
+                    entry["row_count"] += len(values) - 1
+                    entry["anchor"] = _cells_digest(values[-1])
+                index_map[spec.title] = entry
+            elif spec.title in read_mode:
+                index_map[spec.title] = {
+                    "headers": list(union_headers),
+                    "row_count": max(0, len(values) - 1),
+                    "anchor": _cells_digest(values[-1]) if len(values) > 1 else "",
+                    "keys": _remote_key_hashes(spec, union_headers, frame),
+                }
             needed_cols[spec.title] = len(union_headers)
             if headers != union_headers:
                 header_updates[spec.title] = union_headers
@@ -1056,6 +1237,7 @@ def run_storage(phase: str, output_dir: str | Path, strict: bool = False) -> dic
                         "status": "HYDRATED" if gained else "NO_REMOTE_DELTA",
                         "error_type": "",
                         "error_message": "",
+                        "read_mode": read_mode.get(spec.title, ""),
                     }
                 )
 
@@ -1069,8 +1251,12 @@ def run_storage(phase: str, output_dir: str | Path, strict: bool = False) -> dic
                 worksheet = worksheet_map[spec.title]
                 headers = list(header_map.get(spec.title, [])) or list(local.columns) or list(spec.key_columns) or ["created_at"]
                 remote = remote_frame_map.get(spec.title, pd.DataFrame())
-                delta = _append_only_delta(spec, headers, remote, local)
+                entry = index_map.get(spec.title)
+                sheet_rows_before = entry["row_count"] if entry is not None else len(remote)
+                delta = _append_only_delta(spec, headers, remote, local, entry["keys"] if entry is not None else None)
                 appended = _append_rows(worksheet, headers, delta)
+                if entry is not None:
+                    _index_after_append(entry, spec, headers, delta, appended)
                 total_appended += appended
                 sync_audits.append(
                     {
@@ -1081,14 +1267,15 @@ def run_storage(phase: str, output_dir: str | Path, strict: bool = False) -> dic
                         "tab": spec.title,
                         "source_file": spec.source_file,
                         "local_rows_before": len(local),
-                        "sheet_rows_before": len(remote),
+                        "sheet_rows_before": sheet_rows_before,
                         "merged_local_rows": len(local),
                         "rows_appended": appended,
-                        "sheet_rows_after_estimate": len(remote) + appended,
+                        "sheet_rows_after_estimate": sheet_rows_before + appended,
                         "headers_added": len(header_updates.get(spec.title, [])),
                         "status": "APPENDED" if appended else "NO_LOCAL_DELTA",
                         "error_type": "",
                         "error_message": "",
+                        "read_mode": read_mode.get(spec.title, ""),
                     }
                 )
 
@@ -1109,13 +1296,18 @@ def run_storage(phase: str, output_dir: str | Path, strict: bool = False) -> dic
         run_ws = worksheet_map["RUN_AUDIT"]
         run_headers = header_map["RUN_AUDIT"]
         run_remote = remote_frame_map.get("RUN_AUDIT", pd.DataFrame())
+        run_entry = index_map.get("RUN_AUDIT")
         run_delta = _append_only_delta(
             run_spec,
             run_headers,
             run_remote,
             pd.DataFrame([{c: row.get(c, "") for c in RUN_AUDIT_COLUMNS}]),
+            run_entry["keys"] if run_entry is not None else None,
         )
-        total_appended += _append_rows(run_ws, run_headers, run_delta)
+        run_appended = _append_rows(run_ws, run_headers, run_delta)
+        if run_entry is not None:
+            _index_after_append(run_entry, run_spec, run_headers, run_delta, run_appended)
+        total_appended += run_appended
         row["rows_appended"] = total_appended
 
     except Exception as exc:
@@ -1157,6 +1349,10 @@ def run_storage(phase: str, output_dir: str | Path, strict: bool = False) -> dic
         "quota_retries",
     ):
         row[key] = int(_GOOGLE_IO_STATS.get(key, 0))
+    modes = list(read_mode.values())
+    row["index_tail_tabs"] = modes.count("TAIL")
+    row["index_full_tabs"] = modes.count("FULL")
+    row["index_reconciled_tabs"] = modes.count("RECONCILED")
 
     # The local audit is always persisted, including deferred quota events.
     _append_local_audit(out / STORAGE_AUDIT_FILE, row, STORAGE_AUDIT_COLUMNS)
@@ -1175,14 +1371,25 @@ def run_storage(phase: str, output_dir: str | Path, strict: bool = False) -> dic
                 worksheet_map=worksheet_map,
                 header_map=header_map,
                 remote_frame_map=remote_frame_map,
+                index_map=index_map,
             )
             row["rows_appended"] = int(row.get("rows_appended", 0) or 0) + mirrored
         except Exception as exc:
+            # The mirror tab may now hold rows the index does not know about.
+            index_map.pop("STORAGE_AUDIT", None)
             print(
                 f"[GOOGLE_SHEET_STORAGE_AUDIT_MIRROR_ERROR] type={type(exc).__name__} message={exc}",
                 file=sys.stderr,
             )
 
+    # Persist the sync index only after a completed pass; a stale index is still
+    # safe because the next tail read re-learns rows appended after its anchor.
+    if index_map and row["status"] in {"SHEET_PRIMARY_OK", "SHEET_HYDRATE_OK"}:
+        try:
+            _save_sync_index(out, _spreadsheet_id(), index_map)
+        except Exception as exc:
+            print(f"[GOOGLE_SHEET_SYNC_INDEX_ERROR] type={type(exc).__name__} message={exc}", file=sys.stderr)
+
     report = _storage_report(row)
     (out / STORAGE_REPORT_FILE).write_text(report + "\n", encoding="utf-8")
     print(report)
@@ -1200,6 +1407,7 @@ def main() -> int:
     parser.add_argument("--sync", action="store_true")
     parser.add_argument("--output-dir", default="reports")
     parser.add_argument("--strict", action="store_true")
+    parser.add_argument("--full-reconcile", action="store_true", help="ignore the local sync index and read every tab in full")
     args = parser.parse_args()
 
     selected = [args.bootstrap, args.hydrate, args.sync]
@@ -1218,19 +1426,19 @@ def main() -> int:
     # batch values are read once. The old implementation ran BOOTSTRAP and then
     # HYDRATE/SYNC as separate full 64-tab passes.
     if args.bootstrap and args.hydrate and args.sync:
-        run_storage("BOOTSTRAP_HYDRATE_SYNC", args.output_dir, strict=effective_strict)
+        run_storage("BOOTSTRAP_HYDRATE_SYNC", args.output_dir, strict=effective_strict, full_reconcile=args.full_reconcile)
     elif args.bootstrap and args.hydrate:
-        run_storage("BOOTSTRAP_HYDRATE", args.output_dir, strict=effective_strict)
+        run_storage("BOOTSTRAP_HYDRATE", args.output_dir, strict=effective_strict, full_reconcile=args.full_reconcile)
     elif args.bootstrap and args.sync:
-        run_storage("BOOTSTRAP_SYNC", args.output_dir, strict=effective_strict)
+        run_storage("BOOTSTRAP_SYNC", args.output_dir, strict=effective_strict, full_reconcile=args.full_reconcile)
     elif args.hydrate and args.sync:
-        run_storage("HYDRATE_SYNC", args.output_dir, strict=effective_strict)
+        run_storage("HYDRATE_SYNC", args.output_dir, strict=effective_strict, full_reconcile=args.full_reconcile)
     elif args.hydrate:
-        run_storage("HYDRATE", args.output_dir, strict=effective_strict)
+        run_storage("HYDRATE", args.output_dir, strict=effective_strict, full_reconcile=args.full_reconcile)
     elif args.sync:
-        run_storage("SYNC", args.output_dir, strict=effective_strict)
+        run_storage("SYNC", args.output_dir, strict=effective_strict, full_reconcile=args.full_reconcile)
     else:
-        run_storage("BOOTSTRAP", args.output_dir, strict=effective_strict)
+        run_storage("BOOTSTRAP", args.output_dir, strict=effective_strict, full_reconcile=args.full_reconcile)
     return 0
 
 if __name__ == "__main__":
@@ -1,18 +1,34 @@
 from __future__ import annotations
 
+import argparse
 import json
 import math
 import os
 import re
 import hashlib
+import tempfile
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Iterable
 
 import numpy as np
 import pandas as pd
 
+try:  # shared KRX session calendar; without it the index is read per as-of date
+    import krx_calendar
+except Exception:  # pragma: no cover
+    krx_calendar = None
+
+try:  # optional binary snapshot backend; without it snapshots stay gzip CSV
+    import pyarrow as pa
+    import pyarrow.feather as pa_feather
+except Exception:  # pragma: no cover
+    pa = None
+    pa_feather = None
+
 VERSION = "V73.3.6.6.24"
 PATCH_VERSION = "V73.3.6.6.25.2.1"
 RESEARCH_ONLY = True
@@ -31,7 +47,7 @@ CAUSAL_GEO_MODES = {"FORWARD_CAUSAL", "OFFICIAL_ARCHIVE_CAUSAL"}
 # V20 persistent raw-data cache. These files are causal source snapshots only; they do not
 # contain strategy outcomes and are safe to reuse across repeated Direct Replay runs.
 _CACHE_ROOT = Path(os.getenv("V20_ASOF_CACHE_DIR", "reports/.cache/v20_asof_snapshots"))
-_CACHE_STATS = {"listing_hit":0,"listing_miss":0,"market_hit":0,"market_miss":0,"cap_hit":0,"cap_miss":0,"name_hit":0,"name_miss":0}
+_CACHE_STATS = {"listing_hit":0,"listing_miss":0,"market_hit":0,"market_miss":0,"market_mem_hit":0,"cap_hit":0,"cap_miss":0,"name_hit":0,"name_miss":0}
 _TICKER_NAME_MEM: dict[str,str] = {}
 _NAME_MAP_LOADED = False
 
@@ -41,18 +57,66 @@ def _set_cache_root(output_dir: str | Path) -> Path:
     _CACHE_ROOT.mkdir(parents=True, exist_ok=True)
     return _CACHE_ROOT
 
+# Snapshot files are Arrow IPC (Feather v2, zstd) when pyarrow is present: typed columns, no text
+# parsing, memory-mapped reads of only the requested columns. Legacy .csv.gz snapshots are still
+# read and are rewritten as .feather on first touch (V20_ASOF_CACHE_FORMAT=csv keeps the old format).
+SNAPSHOT_KINDS = ("listing", "market", "cap")
+
+
+def _binary_cache_enabled() -> bool:
+    return pa_feather is not None and str(os.getenv("V20_ASOF_CACHE_FORMAT", "feather")).strip().lower() != "csv"
+
+
 def _cache_csv(kind: str, ymd: str) -> Path:
     _CACHE_ROOT.mkdir(parents=True, exist_ok=True)
     return _CACHE_ROOT / kind / f"{ymd}.csv.gz"
 
-def _read_cache(kind: str, ymd: str) -> pd.DataFrame:
+def _cache_feather(kind: str, ymd: str) -> Path:
+    _CACHE_ROOT.mkdir(parents=True, exist_ok=True)
+    return _CACHE_ROOT / kind / f"{ymd}.feather"
+
+def _read_feather(p: Path, columns: Iterable[str] | None = None) -> pd.DataFrame:
+    cols = None
+    if columns is not None:
+        with pa.memory_map(str(p), "r") as src:
+            names = set(pa.ipc.open_file(src).schema.names)
+        cols = [c for c in columns if c in names]
+    return pa_feather.read_table(str(p), columns=cols, memory_map=True).to_pandas()
+
+def _write_feather(p: Path, df: pd.DataFrame) -> None:
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + f".{os.getpid()}.tmp")
+    pa_feather.write_feather(df.reset_index(drop=True), str(tmp), compression=os.getenv("V20_ASOF_CACHE_COMPRESSION", "zstd"))
+    os.replace(tmp, p)
+
+def _read_cache(kind: str, ymd: str, columns: Iterable[str] | None = None) -> pd.DataFrame:
+    binary = _binary_cache_enabled()
+    if pa_feather is not None:
+        p = _cache_feather(kind, ymd)
+        if p.exists():
+            try: return _read_feather(p, columns)
+            except Exception: pass
     p = _cache_csv(kind, ymd)
     if not p.exists(): return pd.DataFrame()
-    try: return pd.read_csv(p, dtype={"Code":str,"code":str})
+    try: df = pd.read_csv(p, dtype={"Code":str,"code":str})
     except Exception: return pd.DataFrame()
+    if binary and not df.empty:
+        # Lazy migration: the parsed CSV becomes the binary snapshot; the CSV is dropped once written.
+        try:
+            _write_feather(_cache_feather(kind, ymd), df)
+            p.unlink()
+        except Exception: pass
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
 
 def _write_cache(kind: str, ymd: str, df: pd.DataFrame) -> None:
     if df is None or df.empty: return
+    if _binary_cache_enabled():
+        _write_feather(_cache_feather(kind, ymd), df)
+        try: _cache_csv(kind, ymd).unlink(missing_ok=True)
+        except Exception: pass
+        return
     p = _cache_csv(kind, ymd); p.parent.mkdir(parents=True, exist_ok=True)
     tmp = p.with_name(p.name + f".{os.getpid()}.tmp")
     df.to_csv(tmp, index=False, compression="gzip")
@@ -97,6 +161,15 @@ def _env_bool(name: str, default: bool = False) -> bool:
 
 def _norm_code(v: Any) -> str:
     """Canonical KRX ticker identity; preserves 6-char alphanumeric tickers (e.g. 0126Z0)."""
+    # Every as-of build maps the full D-1 cross-section (~2.6k codes) several times; memoize.
+    try:
+        return _norm_code_cached(v)
+    except TypeError:
+        return _norm_code_cached(str(v))
+
+
+@lru_cache(maxsize=1 << 16, typed=True)
+def _norm_code_cached(v: Any) -> str:
     raw = str(v or "").strip().upper()
     if raw.endswith(".0") and raw[:-2].isdigit():
         raw = raw[:-2]
@@ -448,6 +521,12 @@ def _get_cap_snapshot(stock_module: Any, ymd: str) -> tuple[pd.DataFrame, str]:
 
 def _calendar_before(asof_date: Any, n: int, fdr_reader: Callable[..., pd.DataFrame] | None = None) -> list[pd.Timestamp]:
     d = pd.Timestamp(asof_date).normalize()
+    if krx_calendar is not None:
+        # Shared session calendar: the index is fetched once per uncovered span (and cached on disk),
+        # not once per as-of date.
+        lookback = d - pd.Timedelta(days=max(90, n * 4))
+        krx_calendar.ensure_observed(lookback, d - pd.Timedelta(days=1), fdr_reader)
+        return krx_calendar.sessions_before(d, n)
     if callable(fdr_reader):
         start = (d - pd.Timedelta(days=max(90, n * 4))).strftime("%Y-%m-%d")
         end = d.strftime("%Y-%m-%d")
@@ -463,6 +542,119 @@ def _calendar_before(asof_date: Any, n: int, fdr_reader: Callable[..., pd.DataFr
     return list(pd.bdate_range(end=d - pd.Timedelta(days=1), periods=n))
 
 
+_LIQ_PART_COLS = ["amount_sum", "amount_n", "volume_sum", "volume_n", "obs_days"]
+
+
+def _liquidity_part(z: pd.DataFrame) -> pd.DataFrame:
+    q = pd.DataFrame({
+        "code": z["code"],
+        "amount": pd.to_numeric(z["amount"], errors="coerce"),
+        "volume": pd.to_numeric(z["volume"], errors="coerce"),
+    })
+    g = q.groupby("code")
+    part = pd.DataFrame({
+        "amount_sum": g["amount"].sum(),
+        "amount_n": g["amount"].count(),
+        "volume_sum": g["volume"].sum(),
+        "volume_n": g["volume"].count(),
+    }).astype(float)
+    part["obs_days"] = 1.0
+    return part
+
+
+class RollingLiquidityWindow:
+    """Date x code window of D-1.. market snapshots with running per-code amount/volume sums.
+
+    ``sync`` slides the window to exactly the requested dates (in either direction): held dates
+    are reused, new dates are loaded once and added, dropped dates are subtracted, so each step
+    costs O(codes) per changed date instead of re-reading and re-aggregating the whole window.
+    ``liquidity`` returns the avg_amount20/avg_volume20/obs_days frame that
+    ``build_asof_universe_from_snapshots`` would otherwise aggregate from the concatenated window.
+    Only snapshots with reported trading value are held; legacy/proxy snapshots are re-requested on
+    every build exactly as before. KRX amounts/volumes are integral, so the running sums are exact;
+    they are still re-summed from the per-date parts after every full window turnover.
+    """
+
+    def __init__(self, key: str = ""):
+        self.key = key
+        self.frames: dict[pd.Timestamp, tuple[pd.DataFrame, str]] = {}
+        self._parts: dict[pd.Timestamp, pd.DataFrame] = {}
+        self._totals = pd.DataFrame(columns=_LIQ_PART_COLS, dtype=float)
+        self._changed = 0
+        self.stats = {"reused": 0, "loaded": 0, "evicted": 0, "resync": 0}
+
+    def _add(self, dt: pd.Timestamp, z: pd.DataFrame, src: str) -> None:
+        part = _liquidity_part(z)
+        self.frames[dt] = (z, src)
+        self._parts[dt] = part
+        self._totals = self._totals.add(part, fill_value=0.0)
+        self._changed += 1
+
+    def _drop(self, dt: pd.Timestamp) -> None:
+        self.frames.pop(dt, None)
+        part = self._parts.pop(dt)
+        tot = self._totals.sub(part, fill_value=0.0)
+        self._totals = tot[tot["obs_days"].gt(0.5)]
+        self._changed += 1
+
+    def _resync(self) -> None:
+        parts = [self._parts[d] for d in sorted(self._parts)]
+        self._totals = pd.concat(parts).groupby(level=0).sum() if parts else pd.DataFrame(columns=_LIQ_PART_COLS, dtype=float)
+        self._changed = 0
+        self.stats["resync"] += 1
+
+    def sync(self, dates: Iterable[Any], loader: Callable[[str], tuple[pd.DataFrame, str]]) -> list[tuple[pd.Timestamp, pd.DataFrame, str]]:
+        """Slide to ``dates``; returns (date, snapshot, source) for every non-empty snapshot in order."""
+        want = [pd.Timestamp(d).normalize() for d in dates]
+        keep = set(want)
+        for dt in [d for d in self._parts if d not in keep]:
+            self._drop(dt)
+            self.stats["evicted"] += 1
+        rows: list[tuple[pd.Timestamp, pd.DataFrame, str]] = []
+        for dt in want:
+            held = self.frames.get(dt)
+            if held is not None:
+                _CACHE_STATS["market_hit"] += 1
+                _CACHE_STATS["market_mem_hit"] += 1
+                self.stats["reused"] += 1
+                rows.append((dt, held[0], held[1]))
+                continue
+            z, src = loader(dt.strftime("%Y%m%d"))
+            if z.empty:
+                continue
+            if "code" in z.columns and {"amount", "volume"} <= set(z.columns) and _actual_snapshot_rows(z) > 0:
+                self._add(dt, z, src)
+                self.stats["loaded"] += 1
+            rows.append((dt, z, src))
+        if self._changed >= max(1, len(self._parts)):
+            self._resync()
+        return rows
+
+    def liquidity(self, dates: Iterable[Any]) -> pd.DataFrame | None:
+        """Aggregated window liquidity, or None unless ``dates`` are exactly the held dates (caller aggregates)."""
+        if {pd.Timestamp(d).normalize() for d in dates} != set(self._parts):
+            return None
+        tot = self._totals
+        return pd.DataFrame({
+            "code": tot.index.astype(str),
+            "avg_amount20": (tot["amount_sum"] / tot["amount_n"]).where(tot["amount_n"].gt(0)).to_numpy(),
+            "avg_volume20": (tot["volume_sum"] / tot["volume_n"]).where(tot["volume_n"].gt(0)).to_numpy(),
+            "obs_days": tot["obs_days"].round().astype("int64").to_numpy(),
+        })
+
+
+_ROLLING: RollingLiquidityWindow | None = None
+
+
+def _rolling_window() -> RollingLiquidityWindow:
+    """Process-wide window; replaced when the snapshot cache root changes."""
+    global _ROLLING
+    key = str(_CACHE_ROOT.resolve())
+    if _ROLLING is None or _ROLLING.key != key:
+        _ROLLING = RollingLiquidityWindow(key)
+    return _ROLLING
+
+
 def _official_geo_codes(out: Path, cutoff: pd.Timestamp) -> set[str]:
     p = out / "v73_geo_official_archive_ledger.csv"
     if not p.exists():
@@ -508,11 +700,14 @@ def build_asof_universe_from_snapshots(
     event_prev_ret_pct: float = 5.0,
     event_min_amount: float = 10_000_000_000.0,
     official_geo_codes: set[str] | None = None,
+    liquidity: pd.DataFrame | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Pure deterministic constructor used by runtime and synthetic validation.
 
     history_snapshots must contain only dates strictly before asof_date. The final date in
-    the mapping is D-1. No signal-day OHLCV is consumed by this function.
+    the mapping is D-1. No signal-day OHLCV is consumed by this function. ``liquidity`` may
+    carry the per-code avg_amount20/avg_volume20/obs_days already aggregated over exactly these
+    snapshots (RollingLiquidityWindow); otherwise it is aggregated here.
     """
     asof = pd.Timestamp(asof_date).normalize()
     listing = _filter_security_names(listing)
@@ -523,25 +718,27 @@ def build_asof_universe_from_snapshots(
         t = pd.Timestamp(dt).normalize()
         if t >= asof:
             continue
-        z = raw.copy() if isinstance(raw, pd.DataFrame) else pd.DataFrame()
+        z = raw if isinstance(raw, pd.DataFrame) else pd.DataFrame()
         if z.empty:
             continue
         if "code" not in z.columns:
             z = _normalize_market_snapshot(z)
         if not z.empty:
-            z["date"] = t
             clean_hist.append((t, z))
     if not clean_hist:
         return pd.DataFrame(), pd.DataFrame()
     clean_hist.sort(key=lambda x: x[0])
-    prior = pd.concat([z for _, z in clean_hist], ignore_index=True)
     last_date = clean_hist[-1][0]
     prev = clean_hist[-1][1].drop(columns=["date"], errors="ignore").copy()
-    avg = prior.groupby("code", as_index=False).agg(
-        avg_amount20=("amount", "mean"),
-        avg_volume20=("volume", "mean"),
-        obs_days=("date", "nunique"),
-    )
+    if liquidity is not None:
+        avg = liquidity
+    else:
+        prior = pd.concat([z.assign(date=t) for t, z in clean_hist], ignore_index=True)
+        avg = prior.groupby("code", as_index=False).agg(
+            avg_amount20=("amount", "mean"),
+            avg_volume20=("volume", "mean"),
+            obs_days=("date", "nunique"),
+        )
     base = listing[[c for c in ["Code", "Name", "Market"] if c in listing.columns]].copy()
     base = base.rename(columns={"Code": "code", "Name": "name", "Market": "market"})
     if "market" not in base.columns:
@@ -678,11 +875,20 @@ class HistoricalUniverseRuntime:
         dates = _calendar_before(asof, liq_days, self.fdr_reader)
         snapshots: dict[pd.Timestamp, pd.DataFrame] = {}
         snapshot_sources: list[str] = []
-        for dt in dates:
-            z, src = _get_market_snapshot(self.stock_module, pd.Timestamp(dt).strftime("%Y%m%d"))
-            if not z.empty:
-                snapshots[pd.Timestamp(dt).normalize()] = z
+        liquidity: pd.DataFrame | None = None
+        if _env_bool("V20_ASOF_ROLLING_ENABLE", True):
+            # Consecutive replay dates share liq_days-1 snapshots: slide the window instead of rebuilding it.
+            window = _rolling_window()
+            for dt, z, src in window.sync(dates, lambda ymd: _get_market_snapshot(self.stock_module, ymd)):
+                snapshots[dt] = z
                 snapshot_sources.append(src)
+            liquidity = window.liquidity(snapshots)
+        else:
+            for dt in dates:
+                z, src = _get_market_snapshot(self.stock_module, pd.Timestamp(dt).strftime("%Y%m%d"))
+                if not z.empty:
+                    snapshots[pd.Timestamp(dt).normalize()] = z
+                    snapshot_sources.append(src)
         actual_snapshot_days = 0
         proxy_snapshot_days = 0
         for _dt, _snap in snapshots.items():
@@ -753,7 +959,7 @@ class HistoricalUniverseRuntime:
             core_n=core_n, event_max=event_max, min_price=min_price, min_marcap=min_marcap,
             event_amount_ratio=amount_ratio, event_volume_ratio=volume_ratio,
             event_prev_ret_pct=ret_pct, event_min_amount=event_min_amount,
-            official_geo_codes=geo_codes,
+            official_geo_codes=geo_codes, liquidity=liquidity,
         )
 
         mode = "HISTORICAL_ASOF_TOP500_EVENT_EXPANSION"
@@ -822,6 +1028,7 @@ class HistoricalUniverseRuntime:
             "v20_listing_cache_hit": int(_CACHE_STATS["listing_hit"] - cache_before.get("listing_hit",0)),
             "v20_market_cache_hit": int(_CACHE_STATS["market_hit"] - cache_before.get("market_hit",0)),
             "v20_market_cache_miss": int(_CACHE_STATS["market_miss"] - cache_before.get("market_miss",0)),
+            "v20_market_mem_hit": int(_CACHE_STATS["market_mem_hit"] - cache_before.get("market_mem_hit",0)),
             "v20_cap_cache_hit": int(_CACHE_STATS["cap_hit"] - cache_before.get("cap_hit",0)),
             "v20_cap_cache_miss": int(_CACHE_STATS["cap_miss"] - cache_before.get("cap_miss",0)),
             "v20_name_cache_hit": int(_CACHE_STATS["name_hit"] - cache_before.get("name_hit",0)),
@@ -1011,3 +1218,102 @@ def force_report(text: str, output_dir: str | Path = "reports") -> str:
     if HEADER in raw:
         raw = raw.split(HEADER)[0].rstrip()
     return (raw.rstrip() + "\n\n" + block).strip() if raw.strip() else block
+
+
+def migrate_snapshot_cache(output_dir: str | Path = "reports") -> dict[str, Any]:
+    """Rewrite every legacy .csv.gz snapshot under the V20 as-of cache as .feather (idempotent)."""
+    root = _set_cache_root(_out_dir(output_dir))
+    out = {"root": str(root), "converted": 0, "failed": 0, "csv_bytes": 0, "feather_bytes": 0}
+    if not _binary_cache_enabled():
+        out["skipped"] = "pyarrow missing or V20_ASOF_CACHE_FORMAT=csv"
+        return out
+    for kind in SNAPSHOT_KINDS:
+        for p in sorted((root / kind).glob("*.csv.gz")):
+            ymd = p.name[: -len(".csv.gz")]
+            size = p.stat().st_size
+            try:
+                df = pd.read_csv(p, dtype={"Code": str, "code": str})
+                if df.empty:
+                    continue
+                _write_feather(_cache_feather(kind, ymd), df)
+                p.unlink()
+                out["converted"] += 1
+                out["csv_bytes"] += size
+                out["feather_bytes"] += _cache_feather(kind, ymd).stat().st_size
+            except Exception:
+                out["failed"] += 1
+    return out
+
+
+def bench_snapshot_cache(output_dir: str | Path = "reports", kind: str = "market", limit: int = 120, columns: Iterable[str] | None = None) -> dict[str, Any]:
+    """Read-throughput of the cached snapshots: gzip CSV parse vs Feather (all columns and ``columns``).
+
+    Uses up to ``limit`` cached dates of ``kind``; each is re-encoded in a temp dir in both formats
+    so the comparison is on identical frames regardless of which format the cache currently holds.
+    """
+    root = _set_cache_root(_out_dir(output_dir))
+    files = sorted((root / kind).glob("*.feather")) + sorted((root / kind).glob("*.csv.gz"))
+    seen: dict[str, Path] = {}
+    for p in files:
+        seen.setdefault(p.name.split(".")[0], p)
+    picked = [seen[k] for k in sorted(seen)[-max(1, int(limit)):]]
+    res: dict[str, Any] = {"kind": kind, "files": len(picked), "rows": 0}
+    if not picked or pa_feather is None:
+        res["skipped"] = "no snapshots" if not picked else "pyarrow missing"
+        return res
+    with tempfile.TemporaryDirectory(prefix="asof_bench_") as td:
+        t = Path(td)
+        csvs, fths = [], []
+        for i, p in enumerate(picked):
+            df = _read_feather(p) if p.suffix == ".feather" else pd.read_csv(p, dtype={"Code": str, "code": str})
+            res["rows"] += len(df)
+            c, f = t / f"{i}.csv.gz", t / f"{i}.feather"
+            df.to_csv(c, index=False, compression="gzip")
+            _write_feather(f, df)
+            csvs.append(c); fths.append(f)
+
+        def _timed(fn: Callable[[Path], pd.DataFrame], paths: list[Path]) -> float:
+            t0 = time.perf_counter()
+            for q in paths:
+                fn(q)
+            return max(1e-9, time.perf_counter() - t0)
+
+        sec_csv = _timed(lambda q: pd.read_csv(q, dtype={"Code": str, "code": str}), csvs)
+        sec_fth = _timed(_read_feather, fths)
+        res.update({
+            "csv_sec": round(sec_csv, 3),
+            "feather_sec": round(sec_fth, 3),
+            "csv_rows_per_sec": int(res["rows"] / sec_csv),
+            "feather_rows_per_sec": int(res["rows"] / sec_fth),
+            "csv_bytes": sum(q.stat().st_size for q in csvs),
+            "feather_bytes": sum(q.stat().st_size for q in fths),
+            "speedup": round(sec_csv / sec_fth, 2),
+        })
+        if columns:
+            cols = list(columns)
+            sec_cols = _timed(lambda q: _read_feather(q, cols), fths)
+            res.update({"columns": cols, "feather_columns_sec": round(sec_cols, 3), "columns_speedup": round(sec_csv / sec_cols, 2)})
+    return res
+
+
+def _cli() -> int:
+    ap = argparse.ArgumentParser(description="V20 as-of snapshot cache maintenance")
+    ap.add_argument("--output-dir", default="reports")
+    ap.add_argument("--migrate-cache", action="store_true", help="convert legacy .csv.gz snapshots to .feather")
+    ap.add_argument("--bench-cache", action="store_true", help="gzip CSV vs Feather read throughput")
+    ap.add_argument("--kind", default="market", choices=SNAPSHOT_KINDS)
+    ap.add_argument("--limit", type=int, default=120)
+    ap.add_argument("--columns", default="code,amount,volume", help="column subset for the projected read")
+    args = ap.parse_args()
+    if not (args.migrate_cache or args.bench_cache):
+        ap.print_help(); return 0
+    if args.migrate_cache:
+        print(json.dumps(migrate_snapshot_cache(args.output_dir), ensure_ascii=False, sort_keys=True))
+    if args.bench_cache:
+        cols = [c for c in args.columns.split(",") if c.strip()]
+        print(json.dumps(bench_snapshot_cache(args.output_dir, args.kind, args.limit, cols), ensure_ascii=False, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_cli())
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+VERSION = "HTTP_POOL_V1"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# 호스트별 초당 요청 한도(토큰버킷). HTTP_RATE_<HOST(점→밑줄, 대문자)> 로 덮어쓸 수 있다.
+# 예) HTTP_RATE_FINANCE_NAVER_COM=5
+DEFAULT_HOST_RATES: dict[str, float] = {
+    "finance.naver.com": 8.0,
+    "m.stock.naver.com": 8.0,
+    "api.stock.naver.com": 8.0,
+    "polling.finance.naver.com": 10.0,
+    "fchart.stock.naver.com": 8.0,
+    "api.finance.naver.com": 8.0,
+    "search.naver.com": 4.0,
+    "query1.finance.yahoo.com": 4.0,
+    "query2.finance.yahoo.com": 4.0,
+    "data.krx.co.kr": 3.0,
+}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_LOCK = threading.RLock()
+_SESSIONS: dict[str, requests.Session] = {}
+_BUCKETS: dict[str, "_TokenBucket"] = {}
+_CACHE: dict[str, dict[str, Any]] = {}
+_RUN_START = time.monotonic()
+_STATS: dict[str, float] = {
+    "requests": 0,
+    "sessions": 0,
+    "cache_hit": 0,
+    "revalidated": 0,
+    "retries": 0,
+    "errors": 0,
+    "status_429": 0,
+    "throttle_wait_sec": 0.0,
+}
+_HOST_REQUESTS: dict[str, int] = {}
+
+
+def _reinit_after_fork() -> None:
+    """fork 자식: _LOCK을 새로 만들고, 부모와 keep-alive 소켓을 나눠 쓰지 않도록 _SESSIONS를,
+    각자 락을 가진 토큰버킷 _BUCKETS도 늘 비운다.
+    응답 캐시 _CACHE는 fork 순간 _LOCK이 잡혀 있었을 때만(항목을 쓰던 중이었을 수 있음) 비운다."""
+    global _LOCK, _SESSIONS, _BUCKETS, _CACHE
+    held = not _LOCK.acquire(blocking=False)
+    _LOCK = threading.RLock()
+    _SESSIONS = {}
+    _BUCKETS = {}
+    if held:
+        _CACHE = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = str(os.getenv(name, "1" if default else "0")).strip().lower()
+    return v in {"1", "true", "yes", "y", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(str(os.getenv(name, default)).strip()))
+    except Exception:
+        return int(default)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(str(os.getenv(name, default)).strip())
+    except Exception:
+        return float(default)
+
+
+def enabled() -> bool:
+    return _env_bool("HTTP_POOL_ENABLE", True)
+
+
+class _TokenBucket:
+    """초당 ``rate``개, 최대 ``burst``개까지 쌓이는 토큰버킷. acquire()는 토큰이 생길 때까지 잠든다."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(0.01, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                need = (1.0 - self.tokens) / self.rate
+            time.sleep(need)
+            waited += need
+
+
+def _host(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def _host_rate(host: str) -> float:
+    env_key = "HTTP_RATE_" + host.replace(".", "_").replace("-", "_").upper()
+    default = DEFAULT_HOST_RATES.get(host, _env_float("HTTP_RATE_DEFAULT", 10.0))
+    return _env_float(env_key, default)
+
+
+def _bucket(host: str) -> _TokenBucket:
+    with _LOCK:
+        b = _BUCKETS.get(host)
+        if b is None:
+            rate = _host_rate(host)
+            b = _BUCKETS[host] = _TokenBucket(rate, max(1.0, rate))
+        return b
+
+
+def session_for(url_or_host: str) -> requests.Session:
+    """호스트별 keep-alive 세션(연결 풀 공유). 스레드 간 공유해도 된다."""
+    host = _host(url_or_host) if "://" in url_or_host else url_or_host.lower()
+    with _LOCK:
+        s = _SESSIONS.get(host)
+        if s is None:
+            s = requests.Session()
+            size = max(4, _env_int("HTTP_POOL_MAXSIZE", 32))
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=size, max_retries=0)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _SESSIONS[host] = s
+            _STATS["sessions"] += 1
+        return s
+
+
+def _cache_key(url: str, params: Any) -> str:
+    if not params:
+        return url
+    try:
+        items = sorted(params.items()) if isinstance(params, dict) else list(params)
+        return url + ("&" if "?" in url else "?") + urlencode(items, doseq=True)
+    except Exception:
+        return url + "?" + repr(params)
+
+
+def _backoff(attempt: int, retry_after: str | None = None) -> float:
+    if retry_after:
+        try:
+            return min(30.0, max(0.0, float(retry_after)))
+        except Exception:
+            pass
+    base = _env_float("HTTP_RETRY_BASE_SEC", 0.4)
+    return min(15.0, base * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def get(
+    url: str,
+    params: Any = None,
+    headers: dict | None = None,
+    timeout: float | tuple = 10,
+    cache_ttl: float = 0,
+    retries: int | None = None,
+    encoding: str | None = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """``requests.get`` 대체. 호스트 세션 재사용 + 토큰버킷 + 지터 재시도 + 응답 캐시.
+
+    - cache_ttl>0: 같은 URL/params 응답을 ttl초 동안 네트워크 없이 재사용
+    - 캐시가 만료돼도 ETag/Last-Modified가 있으면 조건부 요청(304면 본문 재사용)
+    - 429/5xx/연결오류는 HTTP_RETRIES(기본 2)회까지 지터 백오프 후 재시도, 마지막 응답/예외는 그대로 돌려준다.
+    """
+    if not enabled():
+        res = requests.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+        if encoding:
+            res.encoding = encoding
+        return res
+
+    host = _host(url)
+    key = _cache_key(url, params)
+    entry = _CACHE.get(key) if cache_ttl or _env_bool("HTTP_POOL_REVALIDATE", True) else None
+    now = time.monotonic()
+    if entry is not None and cache_ttl and now - entry["at"] <= cache_ttl:
+        with _LOCK:
+            _STATS["cache_hit"] += 1
+        return entry["res"]
+
+    req_headers = dict(headers or {})
+    if entry is not None:
+        if entry.get("etag"):
+            req_headers.setdefault("If-None-Match", entry["etag"])
+        if entry.get("last_modified"):
+            req_headers.setdefault("If-Modified-Since", entry["last_modified"])
+
+    n_retry = _env_int("HTTP_RETRIES", 2) if retries is None else max(0, int(retries))
+    sess = session_for(host)
+    last_exc: Exception | None = None
+    res: requests.Response | None = None
+    for attempt in range(n_retry + 1):
+        waited = _bucket(host).acquire()
+        with _LOCK:
+            _STATS["requests"] += 1
+            _STATS["throttle_wait_sec"] += waited
+            _HOST_REQUESTS[host] = _HOST_REQUESTS.get(host, 0) + 1
+        try:
+            res = sess.get(url, params=params, headers=req_headers, timeout=timeout, **kwargs)
+            last_exc = None
+        except (requests.ConnectionError, requests.Timeout) as e:
+            last_exc = e
+            res = None
+        if res is not None and res.status_code not in RETRY_STATUS:
+            break
+        if res is not None and res.status_code == 429:
+            with _LOCK:
+                _STATS["status_429"] += 1
+        if attempt < n_retry:
+            with _LOCK:
+                _STATS["retries"] += 1
+            time.sleep(_backoff(attempt, res.headers.get("Retry-After") if res is not None else None))
+
+    if res is None:
+        with _LOCK:
+            _STATS["errors"] += 1
+        raise last_exc if last_exc is not None else requests.ConnectionError(url)
+
+    if res.status_code == 304 and entry is not None:
+        with _LOCK:
+            _STATS["revalidated"] += 1
+            entry["at"] = time.monotonic()
+        return entry["res"]
+
+    if encoding:
+        res.encoding = encoding
+    if res.ok:
+        etag = res.headers.get("ETag")
+        last_mod = res.headers.get("Last-Modified")
+        if cache_ttl or etag or last_mod:
+            if len(_CACHE) >= max(16, _env_int("HTTP_POOL_CACHE_MAX", 4096)):
+                with _LOCK:
+                    _CACHE.pop(next(iter(_CACHE)), None)
+            _CACHE[key] = {"res": res, "at": time.monotonic(), "etag": etag, "last_modified": last_mod}
+    return res
+
+
+def reset_stats() -> None:
+    global _RUN_START
+    _RUN_START = time.monotonic()
+    with _LOCK:
+        for k in list(_STATS):
+            _STATS[k] = 0
+        _HOST_REQUESTS.clear()
+
+
+def stats_snapshot() -> dict[str, Any]:
+    with _LOCK:
+        z = dict(_STATS)
+        z["by_host"] = dict(sorted(_HOST_REQUESTS.items(), key=lambda kv: -kv[1]))
+        z["cache_entries"] = len(_CACHE)
+    z["throttle_wait_sec"] = round(z["throttle_wait_sec"], 2)
+    z["elapsed_sec"] = round(max(0.0, time.monotonic() - _RUN_START), 3)
+    return z
+
+
+def format_stats() -> str:
+    st = stats_snapshot()
+    hosts = ", ".join(f"{h} {n}" for h, n in list(st["by_host"].items())[:4])
+    return (
+        f"🌐 HTTP pool: 요청 {int(st['requests'])} (세션 {int(st['sessions'])}) | 캐시 {int(st['cache_hit'])} · 304 {int(st['revalidated'])} | "
+        f"재시도 {int(st['retries'])} · 429 {int(st['status_429'])} · 오류 {int(st['errors'])} | 대기 {st['throttle_wait_sec']}초"
+        + (f" | {hosts}" if hosts else "")
+    )
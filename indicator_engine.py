@@ -20,6 +20,7 @@ import pandas as pd
 from datetime import datetime
 from auto_theme_news import analyze_market_issues
 from functools import lru_cache  # ✅ FIX 1: 캐시용
+import vector_indicators as _vind
 
 import io
 import warnings
@@ -359,24 +360,12 @@ def get_indicators(df):
     low   = df['Low']
     close = df['Close']
 
-    for n in [5, 10, 20, 40, 60, 112, 224, 448]:
-        df[f'MA{n}']    = close.rolling(window=min(count, n)).mean()
-        df[f'VMA{n}']   = df['Volume'].rolling(window=min(count, n)).mean()
-        df[f'Slope{n}'] = (df[f'MA{n}'] - df[f'MA{n}'].shift(3)) / df[f'MA{n}'].shift(3) * 100
+    # MA/VMA/Slope, BB20/40, 일목, OBV, RSI: vector_indicators 공용 엔진 (min(count, n) 창 유지)
+    df = _vind.apply_core(df, clamp_to_length=True)
 
     df['MA20_slope'] = (df['MA20'] - df['MA20'].shift(5)) / (df['MA20'].shift(5) + 1e-9) * 100
     df['MA40_slope'] = (df['MA40'] - df['MA40'].shift(5)) / (df['MA40'].shift(5) + 1e-9) * 100
 
-    std20 = close.rolling(20).std()
-    std40 = close.rolling(40).std()
-
-    df['BB_Upper']      = df['MA20'] + std20 * 2
-    df['BB_Lower']      = df['MA20'] - std20 * 2
-    df['BB20_Width']    = std20 * 4 / df['MA20'] * 100
-    df['BB40_Upper']    = df['MA40'] + std40 * 2
-    df['BB40_Lower']    = df['MA40'] - std40 * 2
-    df['BB40_Width']    = std40 * 4 / df['MA40'] * 100
-    df['BB40_PercentB'] = (close - df['BB40_Lower']) / (df['BB40_Upper'] - df['BB40_Lower'])
     df['BB_UP']  = df['BB40_Upper']
     df['BB_LOW'] = df['BB_Lower']
 
@@ -403,12 +392,6 @@ def get_indicators(df):
     df['ATR_Below_MA']   = (df['ATR'] < df['ATR_MA20']).astype(int)
     df['ATR_Below_Days'] = df['ATR_Below_MA'].rolling(10).sum()
 
-    df['Tenkan_sen'] = (high.rolling(9).max()  + low.rolling(9).min())  / 2
-    df['Kijun_sen']  = (high.rolling(26).max() + low.rolling(26).min()) / 2
-    df['Span_A']     = ((df['Tenkan_sen'] + df['Kijun_sen']) / 2).shift(26)
-    df['Span_B']     = ((high.rolling(52).max() + low.rolling(52).min()) / 2).shift(26)
-    df['Cloud_Top']  = df[['Span_A', 'Span_B']].max(axis=1)
-
     l_min, h_max = low.rolling(12).min(), high.rolling(12).max()
     df['Sto_K']  = (close - l_min) / (h_max - l_min) * 100
     df['Sto_D']  = df['Sto_K'].rolling(5).mean()
@@ -420,18 +403,11 @@ def get_indicators(df):
     df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
     df['MACD_Hist']   = df['MACD'] - df['MACD_Signal']
 
-    df['OBV']         = (np.sign(close.diff()) * df['Volume']).fillna(0).cumsum()
-    df['OBV_MA10']    = df['OBV'].rolling(10).mean()
     df['OBV_Rising']  = df['OBV'] > df['OBV_MA10']
     df['OBV_Slope']   = (df['OBV'] - df['OBV'].shift(5)) / df['OBV'].shift(5).abs() * 100
     df['OBV_Bullish'] = df['OBV_MA10'] > df['OBV_MA10'].shift(1)
     df['Base_Line']   = close.rolling(20).min().shift(5)
 
-    delta      = close.diff()
-    gain       = delta.where(delta > 0, 0).ewm(com=13, adjust=False).mean()
-    loss       = (-delta.where(delta < 0, 0)).ewm(com=13, adjust=False).mean()
-    df['RSI']  = 100 - (100 / (1 + gain / loss))
-
     typical_price     = (high + low + close) / 3
     money_flow        = typical_price * df['Volume']
     pos_flow          = money_flow.where(typical_price > typical_price.shift(1), 0).rolling(14).sum()
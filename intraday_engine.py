@@ -0,0 +1,821 @@
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+try:
+    import market_panel as _market_panel
+except Exception:
+    _market_panel = None
+
+try:
+    import ohlcv_store as _ohlcv_store
+except Exception:
+    _ohlcv_store = None
+
+try:
+    import krx_calendar as _krx_cal
+except Exception:
+    _krx_cal = None
+
+VERSION = "INTRADAY_ENGINE_V1"
+BASELINE_SCHEMA = "intraday_baseline_v1"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# 장중 스트리밍 엔진. 하루 동안 변하지 않는 것(종목표, 전일 봉, 일봉 이력에서 나온 기준값)은 장 시작 시 한 번,
+# 매 틱에는 전 종목 당일 시세(시장별 bulk 1회)만 받아 직전 틱과의 차이와 신호 상태를 갱신한다.
+# - 기준값: BB40 폭(직전 19거래일) + 마지막 39종가의 평균/편차제곱합, OBV 증분, 20일 합계(종가/거래량), ATR14 합계,
+#   전일/전전일 봉. 당일 종가 x·거래량 y가 들어오면 O(1) 갱신으로 원래의 60일 일봉 재계산과 같은 값이 된다.
+# - 이력: market_panel 날짜×종목 행렬 1회. 패널 깊이가 모자란 종목과 패널 구간에 기준가 조정(액면분할 등)이 있는
+#   종목만 ohlcv_store(없으면 FDR) 수정주가 이력으로 하루 한 번 받는다.
+# - surge_scanner / presurge_scanner 는 subscribe()로 붙어 같은 틱 스냅샷을 받는다.
+# - 장 마감 후 배치(write_baseline / --write-baseline)가 다음 거래일용 기준값 표를 종목코드 키 구조화 .npy 한 파일로
+#   남긴다. 장중에는 이 파일을 mmap으로 읽기만 하고, 09:00~15:30 사이에는 일봉 이력을 받지 않는다
+#   (파일이 없으면 직전 거래일 bulk 1회로 전일 종가/거래량만 채운다. INTRADAY_BASELINE_STRICT=0이면 기존처럼 이력 조회).
+#   파일이 아닌 기준값으로 연 세션은 한 번 경고(configure(warn=...))하고 format_stats에 남기며,
+#   이력이 없으면 history_ready()가 False라 선제 스캐너 ②/⑤는 종목별 조회로 계산한다.
+MARKETS = ("KOSPI", "KOSDAQ")
+KST = timezone(timedelta(hours=9))
+BB_WINDOW = 40
+BB_RANK_DAYS = 20
+# BB40 폭 20일 순위 = 오늘 + 직전 19일 → 직전 19일 각각에 40봉 창이 필요하므로 최소 58거래일 이력.
+BB_MIN_HISTORY = BB_WINDOW + BB_RANK_DAYS - 2
+ACC_MIN_HISTORY = 21
+BB_HIST_COLUMNS = tuple(f"bb_h{i}" for i in range(BB_RANK_DAYS - 1))
+
+_LOCK = threading.RLock()
+_BASELINE_ROOT = Path(os.getenv("INTRADAY_BASELINE_DIR", "reports/.cache/intraday_baseline"))
+_SNAPSHOT_FETCHER: Callable[[str, str], pd.DataFrame] | None = None
+_LISTING_LOADER: Callable[[], pd.DataFrame] | None = None
+_HISTORY_FETCHER: Callable[[str, pd.Timestamp, pd.Timestamp], pd.DataFrame] | None = None
+_WARN: Callable[[str], Any] | None = None
+_SESSION: dict[str, Any] | None = None
+_SUBSCRIBERS: dict[str, Callable[[pd.DataFrame], Any]] = {}
+_RUN_START = time.monotonic()
+_STATS: dict[str, float] = {
+    "sessions_opened": 0,
+    "panel_codes": 0,
+    "adjusted_codes": 0,
+    "history_fetches": 0,
+    "history_errors": 0,
+    "ticks": 0,
+    "tick_reused": 0,
+    "tick_errors": 0,
+    "bulk_calls": 0,
+    "state_rows_computed": 0,
+    "state_rows_reused": 0,
+    "dispatch_errors": 0,
+    "tick_sec": 0.0,
+    "baseline_loaded": 0,
+    "baseline_load_ms": 0.0,
+    "baseline_written": 0,
+    "degraded_sessions": 0,
+}
+
+_SNAPSHOT_RENAME = {
+    "티커": "code", "Ticker": "code", "종목코드": "code",
+    "시가": "open", "Open": "open",
+    "고가": "high", "High": "high",
+    "저가": "low", "Low": "low",
+    "종가": "close", "Close": "close", "현재가": "close",
+    "거래량": "volume", "Volume": "volume",
+    "거래대금": "amount", "Amount": "amount", "Turnover": "amount",
+    "등락률": "change_pct", "변동률": "change_pct", "ChangeRate": "change_pct",
+    "시가총액": "marcap", "Marcap": "marcap", "MarCap": "marcap",
+    "종목명": "name", "Name": "name",
+}
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = str(os.getenv(name, "1" if default else "0")).strip().lower()
+    return v in {"1", "true", "yes", "y", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(str(os.getenv(name, default)).strip()))
+    except Exception:
+        return int(default)
+
+
+def _norm_code(v: Any) -> str:
+    s = str(v or "").strip()
+    if s.endswith(".0"):
+        s = s[:-2]
+    return s.zfill(6) if s.isdigit() else s
+
+
+def enabled() -> bool:
+    return _env_bool("INTRADAY_ENGINE_ENABLE", True)
+
+
+def _default_snapshot_fetcher(ymd: str, market: str) -> pd.DataFrame:
+    from pykrx import stock
+
+    return stock.get_market_ohlcv(ymd, market=market)
+
+
+def _default_history_fetcher(code: str, start: pd.Timestamp, through: pd.Timestamp) -> pd.DataFrame:
+    if _ohlcv_store is not None and _ohlcv_store.enabled():
+        return _ohlcv_store.get_history(code, days=int((through - start).days) + 1, end=through)
+    import FinanceDataReader as fdr
+
+    return fdr.DataReader(code, start.strftime("%Y-%m-%d"), through.strftime("%Y-%m-%d"))
+
+
+def configure(
+    snapshot_fetcher: Callable[[str, str], pd.DataFrame] | None = None,
+    listing_loader: Callable[[], pd.DataFrame] | None = None,
+    history_fetcher: Callable[[str, pd.Timestamp, pd.Timestamp], pd.DataFrame] | None = None,
+    baseline_root: str | Path | None = None,
+    warn: Callable[[str], Any] | None = None,
+) -> None:
+    """Install the bulk snapshot fetcher (``fetcher('YYYYMMDD', market)``, pykrx frame), the listing loader,
+    the per-code daily-history fetcher (``fetcher(code, start, through)``, FDR-style frame), the baseline directory
+    and/or the warning sink (``warn(msg)``, e.g. log + telegram; default ``print``)."""
+    global _SNAPSHOT_FETCHER, _LISTING_LOADER, _HISTORY_FETCHER, _BASELINE_ROOT, _WARN
+    with _LOCK:
+        if warn is not None:
+            _WARN = warn
+        if baseline_root is not None:
+            _BASELINE_ROOT = Path(baseline_root)
+        if snapshot_fetcher is not None:
+            _SNAPSHOT_FETCHER = snapshot_fetcher
+        if listing_loader is not None:
+            _LISTING_LOADER = listing_loader
+        if history_fetcher is not None:
+            _HISTORY_FETCHER = history_fetcher
+
+
+def _now_kst() -> datetime:
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def _prev_session_day(day: pd.Timestamp) -> pd.Timestamp:
+    if _krx_cal is not None:
+        try:
+            prev = _krx_cal.prev_session(day)
+            if prev is not None:
+                return pd.Timestamp(prev).normalize()
+        except Exception:
+            pass
+    d = day - pd.Timedelta(days=1)
+    while d.weekday() >= 5:
+        d -= pd.Timedelta(days=1)
+    return d
+
+
+# =============================================================
+# 기준값 (장 시작 시 1회)
+# =============================================================
+def _right_align(close: np.ndarray, *others: np.ndarray) -> tuple[np.ndarray, ...]:
+    """열마다 유효 봉(종가>0)을 아래쪽으로 모은다. 종목별 일봉 이력(휴장·거래정지일 없음)과 같은 배열이 된다."""
+    valid = np.isfinite(close) & (close > 0)
+    order = np.argsort(valid, axis=0, kind="stable")
+    out = [np.where(np.take_along_axis(valid, order, axis=0), np.take_along_axis(x, order, axis=0), np.nan) for x in (close, *others)]
+    return (valid.sum(axis=0), *out)
+
+
+def _baselines(codes: list[str], o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray, v: np.ndarray) -> pd.DataFrame:
+    """T×N 일봉 행렬(당일 제외) → 종목별 기준값 표. 이력이 짧은 종목은 해당 항목이 NaN."""
+    n, c, o, h, l, v = _right_align(c, o, h, l, v)
+    T, N = c.shape
+    out = pd.DataFrame(index=pd.Index(codes, name="code"))
+    out["history"] = n
+    if T == 0:
+        return out
+    out["prev_open"] = o[-1]
+    out["prev_high"] = h[-1]
+    out["prev_low"] = l[-1]
+    out["prev_close"] = c[-1]
+    out["prev_volume"] = v[-1]
+    out["prev2_low"] = l[-2] if T >= 2 else np.nan
+
+    diff = np.diff(c, axis=0)
+    inc = np.sign(diff) * v[1:]
+
+    def tail_sum(x: np.ndarray, k: int) -> np.ndarray:
+        return x[-k:].sum(axis=0) if len(x) >= k else np.full(N, np.nan)
+
+    out["obv_inc3"] = tail_sum(inc, 3)
+    out["obv_up4"] = (inc[-4:] > 0).all(axis=0) if len(inc) >= 4 else False
+    out["close_sum19"] = tail_sum(c, 19)
+    out["volume_sum19"] = tail_sum(v, 19)
+    out["absdiff_sum13"] = tail_sum(np.abs(diff), 13)
+    if T >= BB_WINDOW - 1:
+        last = c[-(BB_WINDOW - 1):]
+        mean = last.mean(axis=0)
+        out["close_mean39"] = mean
+        out["close_m2_39"] = ((last - mean) ** 2).sum(axis=0)
+    else:
+        out["close_mean39"] = np.nan
+        out["close_m2_39"] = np.nan
+    bb = np.full((len(BB_HIST_COLUMNS), N), np.nan)
+    if T >= BB_WINDOW:
+        win = np.lib.stride_tricks.sliding_window_view(c, BB_WINDOW, axis=0)[-len(BB_HIST_COLUMNS):]
+        w = win.std(axis=-1, ddof=1) * 4 / win.mean(axis=-1) * 100
+        bb[-len(w):] = w
+    for k, col in enumerate(BB_HIST_COLUMNS):
+        out[col] = bb[k]
+    # 전일 봉 자체로 정해지는 매집 조건(양봉 마감 / 고저점 상승 / 윗꼬리 없음)
+    out["cond_bull_close"] = out["prev_close"] > out["prev_open"]
+    out["cond_higher_low"] = out["prev_low"] > out["prev2_low"]
+    out["cond_strong_close"] = (out["prev_high"] > 0) & (out["prev_close"] >= out["prev_high"] * 0.90)
+    return out
+
+
+def _panel_baselines(day: pd.Timestamp, sessions: int, now: datetime | None = None) -> tuple[pd.DataFrame | None, bool, pd.Timestamp | None, list[str]]:
+    """market_panel 최근 행렬에서 전 종목 기준값을 만든다. (표, 패널 깊이가 충분한지, 마지막 이력 거래일, 조정 종목)
+
+    패널은 미수정 가격이라 구간 안에 기준가 조정(액면분할·유무상증자 등)이 있거나 확인할 수 없는 종목은
+    전일 봉만 남기고(이력 1) 조정 종목으로 돌려준다. 호출자가 종목별 수정주가 이력으로 다시 만든다.
+    """
+    if _market_panel is None or not _market_panel.enabled():
+        return None, False, None, []
+    try:
+        mat = _market_panel.recent_matrix(sessions + 1, now)
+    except Exception:
+        return None, False, None, []
+    if not mat:
+        return None, False, None, []
+    keep = mat["Close"].index < day
+    frames = {k: mat[k].loc[keep].iloc[-sessions:] for k in ("Open", "High", "Low", "Close", "Volume", "Change") if k in mat}
+    if frames["Close"].empty:
+        return None, False, None, []
+    adjusted = _market_panel.action_codes(frames)
+    if adjusted:
+        for k in ("Open", "High", "Low", "Close", "Volume"):
+            frames[k] = frames[k].copy()
+            frames[k].iloc[:-1, frames[k].columns.get_indexer(adjusted)] = np.nan
+    codes = [_norm_code(c) for c in frames["Close"].columns]
+    base = _baselines(codes, *(frames[k].to_numpy(dtype="float64") for k in ("Open", "High", "Low", "Close", "Volume")))
+    _STATS["adjusted_codes"] = len(adjusted)
+    return (base[~base.index.duplicated(keep="last")], len(frames["Close"]) >= sessions, frames["Close"].index[-1],
+            [_norm_code(c) for c in adjusted])
+
+
+def _history_baseline(code: str, day: pd.Timestamp, sessions: int) -> pd.DataFrame | None:
+    fetcher = _HISTORY_FETCHER or _default_history_fetcher
+    through = _prev_session_day(day)
+    start = through - pd.Timedelta(days=int(sessions * 1.6) + 20)
+    try:
+        df = fetcher(code, start, through)
+    except Exception:
+        _STATS["history_errors"] += 1
+        return None
+    _STATS["history_fetches"] += 1
+    if df is None or df.empty or "Close" not in df.columns:
+        return None
+    df = df[pd.DatetimeIndex(df.index).normalize() < day].tail(sessions)
+    cols = [pd.to_numeric(df[k], errors="coerce").to_numpy(dtype="float64").reshape(-1, 1) if k in df.columns
+            else np.full((len(df), 1), np.nan) for k in ("Open", "High", "Low", "Close", "Volume")]
+    return _baselines([code], *cols)
+
+
+def _fetch_histories(codes: list[str], day: pd.Timestamp, sessions: int) -> list[pd.DataFrame]:
+    workers = max(1, _env_int("INTRADAY_ENGINE_HISTORY_WORKERS", 15))
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(codes)))) as ex:
+        return [r for r in ex.map(lambda c: _history_baseline(c, day, sessions), codes) if r is not None]
+
+
+def _prev_day_baselines(day: pd.Timestamp) -> pd.DataFrame | None:
+    """패널이 없을 때: 직전 거래일 전 종목 봉(시장별 bulk 1회)으로 전일 종가/거래량만 채운다."""
+    prev = _prev_session_day(day)
+    for _ in range(10):
+        snap = _fetch_snapshot(prev.strftime("%Y%m%d"))
+        if snap is not None and not snap.empty and (snap["close"] > 0).any():
+            snap = snap.drop_duplicates(subset="code", keep="last")
+            mats = [snap[k].to_numpy(dtype="float64").reshape(1, -1) for k in ("open", "high", "low", "close", "volume")]
+            return _baselines(snap["code"].tolist(), *mats)
+        prev = prev - pd.Timedelta(days=1)
+        while prev.weekday() >= 5:
+            prev -= pd.Timedelta(days=1)
+    return None
+
+
+def _normalize_listing(df: Any) -> pd.DataFrame:
+    cols = ["name_meta", "marcap_meta", "market_meta"]
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return pd.DataFrame(columns=cols, index=pd.Index([], name="code"))
+    rename = {}
+    for c in df.columns:
+        cs = str(c).strip()
+        if cs in ("Code", "code", "종목코드", "티커", "Ticker"):
+            rename[c] = "code"
+        elif cs in ("Name", "name", "종목명"):
+            rename[c] = "name_meta"
+        elif cs in ("Marcap", "MarCap", "marcap", "시가총액"):
+            rename[c] = "marcap_meta"
+        elif cs in ("Market", "market"):
+            rename[c] = "market_meta"
+    df = df.rename(columns=rename)
+    if "code" not in df.columns:
+        return pd.DataFrame(columns=cols, index=pd.Index([], name="code"))
+    df = df.loc[:, ~df.columns.duplicated()].copy()
+    df["code"] = [_norm_code(c) for c in df["code"].fillna("")]
+    for c in cols:
+        if c not in df.columns:
+            df[c] = np.nan
+    df["marcap_meta"] = pd.to_numeric(df["marcap_meta"], errors="coerce")
+    return df.drop_duplicates(subset="code").set_index("code")[cols]
+
+
+def _baseline_file(through: pd.Timestamp) -> Path:
+    return _BASELINE_ROOT / f"{BASELINE_SCHEMA}_{through.strftime('%Y%m%d')}.npy"
+
+
+def _required_columns() -> list[str]:
+    return list(_baselines(["000000"], *(np.full((1, 1), 1.0) for _ in range(5))).columns)
+
+
+def save_baseline(base: pd.DataFrame, through: pd.Timestamp) -> Path:
+    """기준값 표 → 종목코드 키 구조화 배열 .npy (np.load(mmap_mode='r')로 바로 열린다). tmp + os.replace."""
+    cols = list(base.columns)
+    dtype = [("code", "<U6")] + [(c, "?" if base[c].dtype == bool else "<f8") for c in cols]
+    arr = np.empty(len(base), dtype=dtype)
+    arr["code"] = base.index.astype(str)
+    for c in cols:
+        arr[c] = base[c].to_numpy(dtype=bool if base[c].dtype == bool else "float64")
+    p = _baseline_file(through)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, arr, allow_pickle=False)
+    os.replace(tmp, p)
+    for old in sorted(_BASELINE_ROOT.glob(f"{BASELINE_SCHEMA}_*.npy"))[:-max(1, _env_int("INTRADAY_BASELINE_KEEP", 5))]:
+        try:
+            old.unlink()
+        except Exception:
+            pass
+    _STATS["baseline_written"] += 1
+    return p
+
+
+def load_baseline(day: pd.Timestamp) -> tuple[pd.DataFrame | None, pd.Timestamp | None]:
+    """``day`` 직전 거래일까지의 기준값 파일을 mmap으로 읽는다. 없거나 오래됐거나 열 구성이 다르면 (None, None)."""
+    t0 = time.monotonic()
+    files = sorted(p for p in _BASELINE_ROOT.glob(f"{BASELINE_SCHEMA}_*.npy") if p.stem[-8:] < day.strftime("%Y%m%d"))
+    if not files:
+        return None, None
+    p = files[-1]
+    through = pd.Timestamp(p.stem[-8:])
+    if through < _prev_session_day(day):
+        return None, None
+    try:
+        arr = np.load(p, mmap_mode="r", allow_pickle=False)
+        names = arr.dtype.names or ()
+        if "code" not in names or not set(_required_columns()) <= set(names):
+            return None, None
+        base = pd.DataFrame({c: np.asarray(arr[c]) for c in names if c != "code"},
+                            index=pd.Index(np.asarray(arr["code"]).astype(str), name="code"))
+    except Exception:
+        return None, None
+    _STATS["baseline_loaded"] += 1
+    _STATS["baseline_load_ms"] = round((time.monotonic() - t0) * 1000, 3)
+    return base, through
+
+
+def build_baseline(day: pd.Timestamp, sessions: int | None = None, now: datetime | None = None) -> tuple[pd.DataFrame | None, pd.Timestamp | None]:
+    """``day`` 전날까지의 이력으로 전 종목 기준값 표를 만든다(장 마감 후 배치용).
+    기준가 조정 종목과 패널 깊이가 모자란 종목은 종목별 수정주가 이력으로 채운다."""
+    sessions = sessions or max(BB_MIN_HISTORY, _env_int("INTRADAY_ENGINE_HISTORY_SESSIONS", 60))
+    base, deep, through, adjusted = _panel_baselines(day, sessions, now)
+    if base is None:
+        return None, None
+    short = [] if deep else base.index[base["history"] < sessions].tolist()
+    todo = list(dict.fromkeys(adjusted + short))[:max(0, _env_int("INTRADAY_BASELINE_MAX_HISTORY_FETCH", 3000))]
+    rows = _fetch_histories(todo, day, sessions) if todo else []
+    if rows:
+        fresh = pd.concat(rows)
+        base = pd.concat([base.drop(index=fresh.index, errors="ignore"), fresh])
+    return base, through
+
+
+def write_baseline(now: datetime | None = None, force: bool = False) -> Path | None:
+    """장 마감 후 배치: 가장 최근 마감 거래일까지의 기준값을 파일로 남긴다. 장중이면 아무것도 받지 않고 None."""
+    now = now or _now_kst()
+    if market_hours(now) and not force:
+        return None
+    last = last_completed_session(now)
+    day = last + pd.Timedelta(days=1)
+    existing = sorted(_BASELINE_ROOT.glob(f"{BASELINE_SCHEMA}_*.npy"))
+    if not force and existing and existing[-1].stem[-8:] >= last.strftime("%Y%m%d"):
+        return existing[-1]
+    base, through = build_baseline(day, now=now)
+    if base is None or through is None or base.empty:
+        return None
+    return save_baseline(base, through)
+
+
+def last_completed_session(now: datetime | None = None) -> pd.Timestamp:
+    """가장 최근에 마감된 거래일 (장중/장전이면 직전 거래일)."""
+    now = now or _now_kst()
+    d = pd.Timestamp(now.date())
+    close_hhmm = _env_int("MARKET_PANEL_CLOSE_HHMM", 1540)
+    if d.weekday() < 5 and now.hour * 100 + now.minute >= close_hhmm and (_krx_cal is None or _krx_cal.is_session(d)):
+        return d
+    return _prev_session_day(d)
+
+
+def _degraded_reason(source: str, fetch_history: bool, codes: int) -> str:
+    """기준값 파일이 아닐 때 무엇이 빠졌는지. 파일이면 빈 문자열."""
+    if source == "FILE":
+        return ""
+    if codes == 0:
+        return f"{source} 기준값 없음 → 전일 거래량/BB/매집 모두 종목별 조회"
+    if source == "PREV_DAY" and not fetch_history:
+        return "전일 봉만 (일봉 이력 없음 → BB/매집 신호는 종목별 조회)"
+    return f"{source} + 종목별 이력 조회" if fetch_history else source
+
+
+def open_session(now: datetime | None = None, force: bool = False) -> dict[str, Any]:
+    """당일 기준값을 준비한다. 같은 거래일에는 한 번만 만들고, 날짜가 바뀌면 새로 만든다.
+
+    우선순위: 장 마감 후 배치 파일(mmap) → (장중·strict) 직전 거래일 bulk 1회 → 패널 + 종목별 이력.
+    파일이 아니면 세션마다 한 번 경고(configure(warn=...))하고 format_stats에 남긴다.
+    """
+    global _SESSION
+    now = now or _now_kst()
+    day = pd.Timestamp(now.date())
+    with _LOCK:
+        if _SESSION is not None and _SESSION["day"] == day and not force:
+            return _SESSION
+        sessions = max(BB_MIN_HISTORY, _env_int("INTRADAY_ENGINE_HISTORY_SESSIONS", 60))
+        base, through = load_baseline(day)
+        source = "FILE"
+        fetch_history = False
+        adjusted: list[str] = []
+        if base is None:
+            if market_hours(now) and _env_bool("INTRADAY_BASELINE_STRICT", True):
+                # 장중에는 일봉 이력을 받지 않는다: 전일 종가/거래량만.
+                base, source = _prev_day_baselines(day), "PREV_DAY"
+            else:
+                base, deep, through, adjusted = _panel_baselines(day, sessions, now)
+                source, fetch_history = "PANEL", not deep
+                if base is None:
+                    base, source, fetch_history = _prev_day_baselines(day), "PREV_DAY", True
+        if base is None:
+            base = _baselines([], *(np.zeros((0, 0)) for _ in range(5)))
+        _STATS["panel_codes"] = int(len(base)) if source == "PANEL" and not fetch_history else 0
+        listing = pd.DataFrame()
+        if _LISTING_LOADER is not None:
+            try:
+                listing = _LISTING_LOADER()
+            except Exception:
+                listing = pd.DataFrame()
+        degraded = _degraded_reason(source, fetch_history, len(base))
+        _SESSION = {
+            "day": day,
+            "sessions": sessions,
+            "base": base,
+            "source": source,
+            "through": through,
+            # 파일/패널이 충분히 깊으면 빠진·짧은 종목은 실제로 신규 상장 등이라 따로 받을 이력이 없다.
+            "fetch_history": fetch_history,
+            # 패널 구간에 기준가 조정이 있던 종목: 패널이 깊어도 처음 쓸 때 종목별 수정주가 이력으로 바꾼다.
+            "refetch": set(adjusted),
+            # 일봉 이력 기준값(BB/매집)을 쓸 수 있는지. strict 전일 bulk는 이력이 없고 받지도 않는다.
+            "history_ok": fetch_history or (source != "PREV_DAY" and len(base) > 0),
+            "degraded": degraded,
+            "fetched": set(),
+            "listing": _normalize_listing(listing),
+            "last_tick": None,
+            "last_tick_at": 0.0,
+            "state": pd.DataFrame(),
+        }
+        _STATS["sessions_opened"] += 1
+        if degraded:
+            _STATS["degraded_sessions"] += 1
+        ses, warn = _SESSION, _WARN or print
+    if degraded:
+        try:
+            warn(f"⚠️ 장중 엔진: {day.date()} 기준값 파일 없음 → {degraded}")
+        except Exception:
+            pass
+    return ses
+
+
+def history_ready(now: datetime | None = None) -> bool:
+    """오늘 세션의 기준값에 일봉 이력(BB40/VMA20/ATR 등)이 있거나 종목별로 채워지는지.
+    False면 signal_state의 이력 열은 전부 NaN이므로 호출자가 종목별 조회로 계산해야 한다."""
+    return bool(open_session(now)["history_ok"])
+
+
+def ensure_history(codes: Iterable[Any], now: datetime | None = None) -> pd.DataFrame:
+    """요청 종목 중 이력 기준값이 아직 없는 종목만 하루 한 번 받아 채운다. 반환: 해당 종목들의 기준값."""
+    ses = open_session(now)
+    want = list(dict.fromkeys(_norm_code(c) for c in codes))
+    with _LOCK:
+        todo = [c for c in want if c not in ses["fetched"] and (ses["fetch_history"] or c in ses["refetch"])]
+        ses["fetched"].update(todo)
+    if todo:
+        rows = _fetch_histories(todo, ses["day"], ses["sessions"])
+        if rows:
+            with _LOCK:
+                base = ses["base"]
+                fresh = pd.concat(rows)
+                # 이력으로 만든 기준값이 패널/전일 bulk 기준값을 대신한다.
+                base = pd.concat([base.drop(index=fresh.index, errors="ignore"), fresh])
+                ses["base"] = base
+                ses["state"] = ses["state"].drop(index=fresh.index, errors="ignore")
+    with _LOCK:
+        base = ses["base"]
+        return base.reindex([c for c in want if c in base.index])
+
+
+# =============================================================
+# 틱 (스냅샷 + 직전 틱 대비 변화)
+# =============================================================
+def _normalize_snapshot(df: Any, market: str) -> pd.DataFrame:
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return pd.DataFrame()
+    df = df.copy().reset_index()
+    df.columns = [str(c).strip() for c in df.columns]
+    df = df.rename(columns={c: _SNAPSHOT_RENAME[c] for c in df.columns if c in _SNAPSHOT_RENAME})
+    if "code" not in df.columns and "index" in df.columns:
+        df = df.rename(columns={"index": "code"})
+    df = df.loc[:, ~df.columns.duplicated()]
+    if "code" not in df.columns:
+        return pd.DataFrame()
+    df["code"] = [_norm_code(c) for c in df["code"].fillna("")]
+    df["market"] = market
+    for c in ("open", "high", "low", "close", "volume", "amount", "change_pct", "marcap"):
+        df[c] = pd.to_numeric(df[c], errors="coerce") if c in df.columns else np.nan
+    return df
+
+
+def _fetch_snapshot(ymd: str) -> pd.DataFrame | None:
+    fetcher = _SNAPSHOT_FETCHER or _default_snapshot_fetcher
+    frames = []
+    for market in MARKETS:
+        try:
+            raw = fetcher(ymd, market)
+        except Exception:
+            _STATS["tick_errors"] += 1
+            continue
+        _STATS["bulk_calls"] += 1
+        part = _normalize_snapshot(raw, market)
+        if not part.empty:
+            frames.append(part)
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def _assemble(raw: pd.DataFrame, ses: dict[str, Any]) -> pd.DataFrame:
+    snap = raw.drop_duplicates(subset="code", keep="last").reset_index(drop=True)
+    base = ses["base"]
+    snap["prev_close"] = snap["code"].map(base["prev_close"]) if "prev_close" in base.columns else np.nan
+    snap["prev_volume"] = snap["code"].map(base["prev_volume"]) if "prev_volume" in base.columns else np.nan
+    # 등락률/거래대금 보강 (surge_scanner._get_market_snapshot 과 같은 규칙)
+    mask = snap["change_pct"].isna() | (snap["change_pct"] == 0)
+    pc = snap["prev_close"].where(snap["prev_close"] != 0)
+    snap.loc[mask, "change_pct"] = (snap.loc[mask, "close"] - pc[mask]) / pc[mask] * 100
+    amt_mask = snap["amount"].isna() | (snap["amount"] <= 0)
+    snap.loc[amt_mask, "amount"] = snap.loc[amt_mask, "close"] * snap.loc[amt_mask, "volume"]
+    listing = ses["listing"]
+    if not listing.empty:
+        meta = listing.reindex(snap["code"])
+        names = meta["name_meta"].to_numpy()
+        if "name" in snap.columns:
+            snap["name"] = snap["name"].where(snap["name"].notna(), names)
+        else:
+            snap["name"] = names
+        snap["marcap"] = snap["marcap"].where(snap["marcap"].notna(), meta["marcap_meta"].to_numpy())
+    if "name" not in snap.columns:
+        snap["name"] = snap["code"]
+    snap["name"] = snap["name"].where(snap["name"].notna(), snap["code"])
+    for c in ("change_pct", "close", "amount", "volume", "open", "high", "low"):
+        snap[c] = pd.to_numeric(snap[c], errors="coerce").fillna(0.0)
+    return snap
+
+
+def _with_deltas(snap: pd.DataFrame, last: pd.DataFrame | None, gap_sec: float) -> pd.DataFrame:
+    if last is None or last.empty:
+        snap["volume_delta"] = np.nan
+        snap["amount_delta"] = np.nan
+        snap["change_delta"] = np.nan
+        snap["tick_gap_sec"] = np.nan
+        return snap
+    prev = last.set_index("code")
+    for col, src in (("volume_delta", "volume"), ("amount_delta", "amount"), ("change_delta", "change_pct")):
+        snap[col] = snap[src] - snap["code"].map(prev[src])
+    snap["tick_gap_sec"] = round(gap_sec, 3)
+    return snap
+
+
+def tick(now: datetime | None = None, max_age_sec: float | None = None) -> pd.DataFrame:
+    """전 종목 당일 스냅샷 1회 수집 + 직전 틱 대비 변화(volume_delta/amount_delta/change_delta).
+
+    ``max_age_sec`` 안에 받은 틱이 있으면 네트워크 없이 그 틱을 돌려준다(여러 구독자가 같은 틱 공유).
+    """
+    ses = open_session(now)
+    ttl = _env_int("INTRADAY_ENGINE_TICK_TTL_SEC", 20) if max_age_sec is None else max_age_sec
+    with _LOCK:
+        if ses["last_tick"] is not None and time.monotonic() - ses["last_tick_at"] < ttl:
+            _STATS["tick_reused"] += 1
+            return ses["last_tick"]
+    t0 = time.monotonic()
+    raw = _fetch_snapshot(ses["day"].strftime("%Y%m%d"))
+    if raw is None or raw.empty:
+        return pd.DataFrame()
+    with _LOCK:
+        snap = _assemble(raw, ses)
+        last_at = ses["last_tick_at"]
+        snap = _with_deltas(snap, ses["last_tick"], time.monotonic() - last_at if last_at else 0.0)
+        ses["last_tick"] = snap
+        ses["last_tick_at"] = time.monotonic()
+        _STATS["ticks"] += 1
+        _STATS["tick_sec"] += time.monotonic() - t0
+    return snap
+
+
+# =============================================================
+# 신호 상태 (틱마다 당일 종가/거래량만 반영)
+# =============================================================
+def _compute_state(base: pd.DataFrame, x: np.ndarray, y: np.ndarray) -> pd.DataFrame:
+    out = pd.DataFrame(index=base.index)
+    out["close_used"] = x
+    out["volume_used"] = y
+    n = base["history"].to_numpy(dtype="float64")
+    pc = base["prev_close"].to_numpy(dtype="float64")
+    inc = np.sign(x - pc) * y
+
+    # BB40 폭: 직전 39종가의 평균/편차제곱합에 당일 종가 1개를 더하는 Welford 갱신
+    mean39 = base["close_mean39"].to_numpy(dtype="float64")
+    m2 = base["close_m2_39"].to_numpy(dtype="float64")
+    mean40 = mean39 + (x - mean39) / BB_WINDOW
+    std40 = np.sqrt(np.maximum(m2 + (x - mean39) * (x - mean40), 0.0) / (BB_WINDOW - 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        width = std40 * 4 / mean40 * 100
+    hist = base[list(BB_HIST_COLUMNS)].to_numpy(dtype="float64")
+    rank = ((hist <= width[:, None]).sum(axis=1) + 1) / BB_RANK_DAYS
+    bb_ok = n >= BB_MIN_HISTORY
+    out["bb_width"] = np.where(bb_ok, width, np.nan)
+    out["bb_rank"] = np.where(bb_ok, rank, np.nan)
+    out["obv_rising"] = bb_ok & (base["obv_inc3"].to_numpy(dtype="float64") + inc > 0)
+
+    # 전일 매집 판단: 20일 평균은 당일 봉을 포함한다(원래 일봉 tail(20)/rolling(20)과 같음)
+    acc_ok = n >= ACC_MIN_HISTORY
+    out["acc_ok"] = acc_ok
+    out["vol_ma20"] = np.where(acc_ok, (base["volume_sum19"].to_numpy(dtype="float64") + y) / 20, np.nan)
+    out["ma20"] = np.where(acc_ok, (base["close_sum19"].to_numpy(dtype="float64") + x) / 20, np.nan)
+    out["atr14"] = np.where(acc_ok, (base["absdiff_sum13"].to_numpy(dtype="float64") + np.abs(x - pc)) / 14, np.nan)
+    out["obv_5d_rising"] = acc_ok & base["obv_up4"].astype(bool).to_numpy() & (inc > 0)
+    for c in ("prev_open", "prev_high", "prev_low", "prev_close", "prev_volume", "prev2_low",
+              "cond_bull_close", "cond_higher_low", "cond_strong_close"):
+        out[c] = base[c].to_numpy()
+    return out
+
+
+def signal_state(snapshot: pd.DataFrame, codes: Iterable[Any] | None = None, now: datetime | None = None) -> pd.DataFrame:
+    """종목별 신호 상태(code 인덱스). 당일 종가·거래량이 직전 틱과 같은 종목은 이전 상태를 그대로 쓴다.
+
+    열: bb_width, bb_rank, obv_rising, acc_ok, vol_ma20, ma20, atr14, obv_5d_rising, prev_*, cond_*.
+    이력이 모자란 종목은 bb_rank/vol_ma20 등이 NaN(False)이다.
+    """
+    if snapshot is None or snapshot.empty or "code" not in snapshot.columns:
+        return pd.DataFrame()
+    ses = open_session(now)
+    want = list(dict.fromkeys(_norm_code(c) for c in (codes if codes is not None else snapshot["code"])))
+    base = ensure_history(want, now)
+    if base.empty:
+        return pd.DataFrame()
+    live = snapshot.drop_duplicates(subset="code", keep="last").set_index("code").reindex(base.index)
+    x = pd.to_numeric(live["close"], errors="coerce").to_numpy(dtype="float64")
+    y = pd.to_numeric(live["volume"], errors="coerce").to_numpy(dtype="float64")
+    with _LOCK:
+        prev = ses["state"]
+        same = np.zeros(len(base), dtype=bool)
+        if not prev.empty:
+            old = prev.reindex(base.index)
+            same = (old["close_used"].to_numpy() == x) & (old["volume_used"].to_numpy() == y)
+        changed = base.index[~same]
+        if len(changed):
+            pos = ~same
+            fresh = _compute_state(base.loc[changed], x[pos], y[pos])
+            prev = fresh if prev.empty else pd.concat([prev.drop(index=changed, errors="ignore"), fresh])
+            ses["state"] = prev
+        _STATS["state_rows_computed"] += int(len(changed))
+        _STATS["state_rows_reused"] += int(same.sum())
+        return prev.reindex(base.index)
+
+
+# =============================================================
+# 구독 / 루프
+# =============================================================
+def subscribe(name: str, fn: Callable[[pd.DataFrame], Any]) -> None:
+    with _LOCK:
+        _SUBSCRIBERS[name] = fn
+
+
+def unsubscribe(name: str) -> None:
+    with _LOCK:
+        _SUBSCRIBERS.pop(name, None)
+
+
+def dispatch(snapshot: pd.DataFrame) -> dict[str, Any]:
+    with _LOCK:
+        subs = list(_SUBSCRIBERS.items())
+    out = {}
+    for name, fn in subs:
+        try:
+            out[name] = fn(snapshot)
+        except Exception as e:
+            _STATS["dispatch_errors"] += 1
+            out[name] = e
+    return out
+
+
+def market_hours(now: datetime) -> bool:
+    return now.weekday() < 5 and 900 <= now.hour * 100 + now.minute <= 1530
+
+
+def run_loop(interval_sec: float, active: Callable[[datetime], bool] | None = None, log: Callable[[str], Any] = print) -> None:
+    """장중 틱 루프. 틱 1회(시장별 bulk 1회)를 모든 구독자에게 나눠 준다. 기준값은 거래일이 바뀔 때만 다시 만든다."""
+    active = active or market_hours
+    interval_sec = max(10.0, float(interval_sec))
+    while True:
+        started = time.monotonic()
+        now = _now_kst()
+        try:
+            if active(now):
+                snap = tick(now, max_age_sec=0)
+                if snap.empty:
+                    log("⚠️ 장중 엔진: 스냅샷 수집 실패")
+                else:
+                    dispatch(snap)
+        except Exception as e:
+            _STATS["tick_errors"] += 1
+            log(f"⚠️ 장중 엔진 오류: {e}")
+        time.sleep(max(0.0, interval_sec - (time.monotonic() - started)))
+
+
+def reset_stats() -> None:
+    global _RUN_START
+    _RUN_START = time.monotonic()
+    with _LOCK:
+        for k in list(_STATS):
+            _STATS[k] = 0
+
+
+def stats_snapshot() -> dict[str, Any]:
+    with _LOCK:
+        z = dict(_STATS)
+        ses = _SESSION
+        z["day"] = str(ses["day"].date()) if ses is not None else ""
+        z["baseline_codes"] = int(len(ses["base"])) if ses is not None else 0
+        z["source"] = ses["source"] if ses is not None else ""
+        z["through"] = str(ses["through"].date()) if ses is not None and ses["through"] is not None else ""
+        z["degraded"] = ses["degraded"] if ses is not None else ""
+        z["subscribers"] = len(_SUBSCRIBERS)
+    z["avg_tick_sec"] = round(z["tick_sec"] / z["ticks"], 3) if z["ticks"] else 0.0
+    z["elapsed_sec"] = round(max(0.0, time.monotonic() - _RUN_START), 3)
+    return z
+
+
+def format_stats() -> str:
+    st = stats_snapshot()
+    return (
+        f"📡 장중 엔진: {st['day']} 기준값 {st['baseline_codes']}종목 (패널 {int(st['panel_codes'])}, 기준가 조정 {int(st['adjusted_codes'])}, 이력 조회 {int(st['history_fetches'])} 오류 {int(st['history_errors'])}) | "
+        f"틱 {int(st['ticks'])} (재사용 {int(st['tick_reused'])}, 평균 {st['avg_tick_sec']:.2f}초, bulk {int(st['bulk_calls'])}) | "
+        f"상태 계산 {int(st['state_rows_computed'])} / 재사용 {int(st['state_rows_reused'])} | 구독 {st['subscribers']} | "
+        f"기준값 {st['source'] or '-'} (~{st['through'] or '-'}, 로드 {st['baseline_load_ms']:.1f}ms, 저장 {int(st['baseline_written'])})"
+        + (f" | ⚠️ 저하: {st['degraded']}" if st["degraded"] else "")
+    )
+
+
+if __name__ == "__main__":
+    # 두 스캐너를 한 프로세스에서 같은 틱으로 돌린다: python intraday_engine.py --interval 2
+    parser = argparse.ArgumentParser(description="장중 스트리밍 엔진 (급등/선제 스캐너 공용 틱)")
+    parser.add_argument("--interval", default=2, type=float, help="틱 간격(분)")
+    parser.add_argument("--write-baseline", action="store_true", help="장 마감 후 배치: 다음 거래일용 기준값 파일 생성 후 종료")
+    parser.add_argument("--force", action="store_true", help="--write-baseline: 기존 파일/장중 여부와 무관하게 다시 생성")
+    args = parser.parse_args()
+
+    if args.write_baseline:
+        path = write_baseline(force=args.force)
+        print(f"📚 장중 기준값 파일: {path if path is not None else '생략(장중이거나 패널 없음)'}")
+        print(format_stats())
+        raise SystemExit(0)
+
+    import presurge_scanner
+    import surge_scanner
+
+    subscribe("surge", lambda snap: surge_scanner.run_surge_scan(snapshot=snap))
+    subscribe("presurge", lambda snap: presurge_scanner.run_presurge_scan(snapshot=snap))
+    try:
+        run_loop(args.interval * 60)
+    except KeyboardInterrupt:
+        print(format_stats())
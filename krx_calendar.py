@@ -0,0 +1,500 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+VERSION = "KRX_CALENDAR_V1"
+SCHEMA = "KRX_CALENDAR_JSON_1"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# KRX 거래일 달력. 정렬된 datetime64[D] 세션 배열 하나로 이전/다음/오프셋/구간 개수를 이진탐색(O(log n))한다.
+# - 관측 구간: 지수 일봉(FDR KS11 등)이나 시장 스냅샷으로 확인한 실제 세션. 그 안의 평일 휴장일을 기억한다.
+# - 관측 밖: 평일 − 고정 양력 휴장일(신정/삼일절/근로자의날/어린이날/현충일/광복절/개천절/한글날/성탄절/연말휴장).
+#   음력 명절·대체공휴일·선거일은 관측으로만 알 수 있으므로, 관측이 없으면 기존 평일 계산과 같다.
+# - 관측 결과는 reports/.cache/krx_calendar/calendar.json 에 남겨 다음 실행은 네트워크 없이 쓴다.
+_LOCK = threading.RLock()
+_ROOT = Path(os.getenv("KRX_CALENDAR_DIR", "reports/.cache/krx_calendar"))
+_STATE: dict[str, Any] | None = None
+_SESSIONS: np.ndarray | None = None
+_RUN_START = time.monotonic()
+_STATS: dict[str, float] = {
+    "queries": 0,
+    "vector_queries": 0,
+    "rebuilds": 0,
+    "fetches": 0,
+    "fetch_errors": 0,
+    "fetch_sec": 0.0,
+    "learned_sessions": 0,
+    "learned_holidays": 0,
+}
+
+# (월, 일) — KRX 정규 휴장 양력 공휴일. 한글날은 2013년부터, 근로자의날은 KRX 휴장.
+_FIXED_HOLIDAYS = ((1, 1), (3, 1), (5, 1), (5, 5), (6, 6), (8, 15), (10, 3), (10, 9), (12, 25))
+_SPAN_START = np.datetime64("2000-01-01", "D")
+
+
+def _reinit_after_fork() -> None:
+    """fork 자식: _LOCK을 새로 만든다. fork 순간 잡혀 있었으면 달력을 재구성하던 중이었을 수 있으므로
+    _STATE와 거래일 배열 _SESSIONS를 버려 첫 조회 때 디스크에서 다시 만들게 한다."""
+    global _LOCK, _STATE, _SESSIONS
+    held = not _LOCK.acquire(blocking=False)
+    _LOCK = threading.RLock()
+    if held:
+        _STATE = None
+        _SESSIONS = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = str(os.getenv(name, "1" if default else "0")).strip().lower()
+    return v in {"1", "true", "yes", "y", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(str(os.getenv(name, default)).strip()))
+    except Exception:
+        return int(default)
+
+
+def _day(v: Any) -> np.datetime64:
+    """스칼라 날짜(Timestamp/date/'YYYYMMDD'/'YYYY-MM-DD')를 datetime64[D]로. 해석 불가면 NaT."""
+    if isinstance(v, np.datetime64):
+        return v.astype("datetime64[D]")
+    if isinstance(v, (datetime, date)):
+        return np.datetime64(v.strftime("%Y-%m-%d"), "D")
+    s = str(v or "").strip()
+    if len(s) == 8 and s.isdigit():
+        s = f"{s[:4]}-{s[4:6]}-{s[6:]}"
+    try:
+        ts = pd.Timestamp(s)
+    except Exception:
+        return np.datetime64("NaT", "D")
+    if pd.isna(ts):
+        return np.datetime64("NaT", "D")
+    return np.datetime64(ts.strftime("%Y-%m-%d"), "D")
+
+
+def _is_scalar(v: Any) -> bool:
+    return v is None or isinstance(v, (str, datetime, date, np.datetime64)) or np.isscalar(v)
+
+
+def _days(values: Any) -> np.ndarray:
+    """Series/Index/배열(또는 스칼라)을 datetime64[D] 배열로(해석 불가 값은 NaT)."""
+    if _is_scalar(values):
+        return np.array([_day(values)], dtype="datetime64[D]")
+    if not isinstance(values, (pd.Series, pd.Index)):
+        values = pd.Series(list(values), dtype="object")
+    arr = pd.to_datetime(values, errors="coerce", format="mixed")
+    return np.asarray(arr, dtype="datetime64[ns]").astype("datetime64[D]")
+
+
+def _file() -> Path:
+    return _ROOT / "calendar.json"
+
+
+def configure(root: str | Path | None = None) -> None:
+    """달력 캐시 디렉터리를 바꾼다(메모리 상태도 비운다)."""
+    global _ROOT, _STATE, _SESSIONS
+    with _LOCK:
+        if root is not None:
+            _ROOT = Path(root)
+        _STATE = None
+        _SESSIONS = None
+
+
+def _empty_state() -> dict[str, Any]:
+    return {"spans": [], "holidays": set(), "extra": set()}
+
+
+def _load() -> dict[str, Any]:
+    global _STATE
+    if _STATE is not None:
+        return _STATE
+    st = _empty_state()
+    p = _file()
+    if p.exists():
+        try:
+            doc = json.loads(p.read_text(encoding="utf-8"))
+            if doc.get("schema") == SCHEMA:
+                st["spans"] = [(str(a), str(b)) for a, b in doc.get("spans") or []]
+                st["holidays"] = set(doc.get("holidays") or [])
+                st["extra"] = set(doc.get("extra") or [])
+        except Exception:
+            st = _empty_state()
+    _STATE = st
+    return st
+
+
+def _save(st: dict[str, Any]) -> None:
+    if not _env_bool("KRX_CALENDAR_DISK_ENABLE", True):
+        return
+    p = _file()
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        doc = {
+            "schema": SCHEMA,
+            "saved_at": time.time(),
+            "spans": [list(s) for s in st["spans"]],
+            "holidays": sorted(st["holidays"]),
+            "extra": sorted(st["extra"]),
+        }
+        tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(doc, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, p)
+    except Exception:
+        pass
+
+
+def _merge_spans(spans: Iterable[tuple[str, str]]) -> list[tuple[str, str]]:
+    out: list[list[np.datetime64]] = []
+    for a, b in sorted((np.datetime64(a, "D"), np.datetime64(b, "D")) for a, b in spans):
+        if out and a <= out[-1][1] + np.timedelta64(1, "D"):
+            out[-1][1] = max(out[-1][1], b)
+        else:
+            out.append([a, b])
+    return [(str(a), str(b)) for a, b in out]
+
+
+def _rule_holidays(lo: np.datetime64, hi: np.datetime64) -> list[np.datetime64]:
+    if not _env_bool("KRX_CALENDAR_FIXED_HOLIDAYS", True):
+        return []
+    y0, y1 = int(str(lo)[:4]), int(str(hi)[:4])
+    out = []
+    for y in range(y0, y1 + 1):
+        for m, d in _FIXED_HOLIDAYS:
+            if (m, d) == (10, 9) and y < 2013:
+                continue
+            out.append(np.datetime64(f"{y:04d}-{m:02d}-{d:02d}", "D"))
+        # 연말휴장: 12/31(주말이면 그 직전 평일)
+        eoy = np.datetime64(f"{y:04d}-12-31", "D")
+        out.append(np.busday_offset(eoy, 0, roll="backward"))
+    return out
+
+
+def _build(st: dict[str, Any]) -> np.ndarray:
+    today = np.datetime64(datetime.now().strftime("%Y-%m-%d"), "D")
+    hi = today + np.timedelta64(max(30, _env_int("KRX_CALENDAR_FORWARD_DAYS", 800)), "D")
+    lo = _SPAN_START
+    for a, _b in st["spans"]:
+        lo = min(lo, np.datetime64(a, "D"))
+    for a, b in st["spans"]:
+        hi = max(hi, np.datetime64(b, "D") + np.timedelta64(1, "D"))
+    rule_hol = np.array(_rule_holidays(lo, hi), dtype="datetime64[D]")
+    days = np.arange(lo, hi, dtype="datetime64[D]")
+    mask = np.is_busday(days, holidays=rule_hol)
+    # 관측 구간은 실제 세션이 정답: 규칙 휴장일을 되살리고 관측된 평일 휴장일만 뺀다.
+    observed_hol = np.array(sorted(st["holidays"]), dtype="datetime64[D]")
+    for a, b in st["spans"]:
+        i, j = np.searchsorted(days, [np.datetime64(a, "D"), np.datetime64(b, "D") + np.timedelta64(1, "D")])
+        mask[i:j] = np.is_busday(days[i:j], holidays=observed_hol)
+    out = days[mask]
+    if st["extra"]:
+        out = np.union1d(out, np.array(sorted(st["extra"]), dtype="datetime64[D]"))
+    _STATS["rebuilds"] += 1
+    return out
+
+
+def session_array() -> np.ndarray:
+    """정렬된 전체 세션 배열(datetime64[D]). 읽기 전용으로 쓴다."""
+    global _SESSIONS
+    arr = _SESSIONS
+    if arr is not None:
+        return arr
+    with _LOCK:
+        if _SESSIONS is None:
+            _SESSIONS = _build(_load())
+        return _SESSIONS
+
+
+def observed_spans() -> list[tuple[str, str]]:
+    with _LOCK:
+        return list(_load()["spans"])
+
+
+def is_observed(d: Any) -> bool:
+    x = str(_day(d))
+    return any(a <= x <= b for a, b in observed_spans())
+
+
+def learn(sessions: Iterable[Any], start: Any = None, end: Any = None) -> int:
+    """관측한 실제 세션 목록으로 [start, end] 구간을 확정한다(기본: 목록의 처음~끝). 새 휴장일 수를 돌려준다.
+
+    ``learn([], d, d)`` 는 d 하루를 휴장으로 확정한다.
+    """
+    global _SESSIONS
+    obs = np.unique(_days(list(sessions)))
+    obs = obs[~np.isnat(obs)]
+    if obs.size == 0 and (start is None or end is None):
+        return 0
+    a = _day(start) if start is not None else obs[0]
+    b = _day(end) if end is not None else obs[-1]
+    if np.isnat(a) or np.isnat(b) or b < a:
+        return 0
+    obs = obs[(obs >= a) & (obs <= b)]
+    weekdays = np.arange(a, b + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    weekdays = weekdays[np.is_busday(weekdays)]
+    hol = {str(x) for x in np.setdiff1d(weekdays, obs)}
+    extra = {str(x) for x in obs[~np.is_busday(obs)]}
+    with _LOCK:
+        st = _load()
+        # 같은 구간을 다시 관측하면 최신 관측이 이긴다.
+        st["holidays"] = {h for h in st["holidays"] if not (str(a) <= h <= str(b))} | hol
+        st["extra"] = {h for h in st["extra"] if not (str(a) <= h <= str(b))} | extra
+        new_hol = len(hol)
+        st["spans"] = _merge_spans(st["spans"] + [(str(a), str(b))])
+        _STATS["learned_sessions"] += int(obs.size)
+        _STATS["learned_holidays"] += new_hol
+        _SESSIONS = None
+        _save(st)
+    return new_hol
+
+
+def _missing_span(a: np.datetime64, b: np.datetime64) -> tuple[np.datetime64, np.datetime64] | None:
+    """[a, b] 중 관측되지 않은 가장 바깥 범위(없으면 None)."""
+    spans = [(np.datetime64(x, "D"), np.datetime64(y, "D")) for x, y in observed_spans()]
+    for x, y in spans:
+        if x <= a and b <= y:
+            return None
+    cover = [s for s in spans if s[0] <= b and s[1] >= a]
+    if not cover:
+        return a, b
+    lo = a if a < min(s[0] for s in cover) else min(s[1] for s in cover if s[0] <= a) + np.timedelta64(1, "D")
+    hi = b if b > max(s[1] for s in cover) else max(s[0] for s in cover if s[1] >= b) - np.timedelta64(1, "D")
+    return (lo, hi) if lo <= hi else (a, b)
+
+
+def ensure_observed(start: Any, end: Any, reader: Callable[..., pd.DataFrame] | None = None, symbols: Iterable[str] = ("KS11", "KOSPI")) -> bool:
+    """[start, end]가 관측 구간이 아니면 ``reader(symbol, start, end)`` (FDR DataReader 형식) 1회로 채운다.
+
+    빠진 쪽으로 KRX_CALENDAR_FETCH_DAYS(기본 400일)만큼 넓혀 받아, 날짜를 바꿔 도는 리플레이 루프가
+    날짜마다 지수를 다시 받지 않게 한다. 관측 구간이 되면 True.
+    """
+    if not callable(reader) or not _env_bool("KRX_CALENDAR_FETCH_ENABLE", True):
+        return False
+    a, b = _day(start), _day(end)
+    if np.isnat(a) or np.isnat(b):
+        return False
+    today = np.datetime64(datetime.now().strftime("%Y-%m-%d"), "D")
+    b = min(b, today)
+    if b < a:
+        return False
+    gap = _missing_span(a, b)
+    if gap is None:
+        return True
+    pad = np.timedelta64(max(0, _env_int("KRX_CALENDAR_FETCH_DAYS", 400)), "D")
+    lo, hi = gap[0] - pad, min(today, gap[1] + pad)
+    spans = observed_spans()
+    if spans:
+        # 이미 관측된 구간과 붙여 받으면 구멍이 생기지 않는다.
+        first, last = np.datetime64(spans[0][0], "D"), np.datetime64(spans[-1][1], "D")
+        if gap[0] > last:
+            lo = min(gap[0], last + np.timedelta64(1, "D"))
+        if gap[1] < first:
+            hi = max(gap[1], first - np.timedelta64(1, "D"))
+    for symbol in symbols:
+        t0 = time.perf_counter()
+        try:
+            z = reader(symbol, str(lo), str(hi))
+        except Exception:
+            with _LOCK:
+                _STATS["fetch_errors"] += 1
+                _STATS["fetch_sec"] += time.perf_counter() - t0
+            continue
+        with _LOCK:
+            _STATS["fetches"] += 1
+            _STATS["fetch_sec"] += time.perf_counter() - t0
+        if z is None or getattr(z, "empty", True):
+            continue
+        obs = np.unique(_days(pd.to_datetime(z.index)))
+        obs = obs[~np.isnat(obs)]
+        if obs.size == 0:
+            continue
+        # 지난 날짜는 응답에 없으면 휴장으로 확정. 오늘은 장중/집계 전일 수 있어 응답에 있을 때만 확정한다.
+        end = hi if hi < today else max(obs[-1], hi - np.timedelta64(1, "D"))
+        learn(obs, max(lo, obs[0]), end)
+        return _missing_span(a, min(b, end)) is None
+    return False
+
+
+# -------------------------------------------------------------
+# scalar queries
+# -------------------------------------------------------------
+def _pos(d: np.datetime64, side: str = "left") -> int:
+    _STATS["queries"] += 1
+    return int(np.searchsorted(session_array(), d, side=side))
+
+
+def is_session(d: Any) -> bool:
+    x = _day(d)
+    if np.isnat(x):
+        return False
+    arr = session_array()
+    i = _pos(x)
+    return i < len(arr) and arr[i] == x
+
+
+def rollback(d: Any) -> pd.Timestamp | None:
+    """d가 세션이면 d, 아니면 직전 세션."""
+    x = _day(d)
+    if np.isnat(x):
+        return None
+    i = _pos(x, "right") - 1
+    return pd.Timestamp(session_array()[i]) if i >= 0 else None
+
+
+def rollforward(d: Any) -> pd.Timestamp | None:
+    """d가 세션이면 d, 아니면 다음 세션."""
+    x = _day(d)
+    if np.isnat(x):
+        return None
+    arr = session_array()
+    i = _pos(x)
+    return pd.Timestamp(arr[i]) if i < len(arr) else None
+
+
+def prev_session(d: Any, n: int = 1) -> pd.Timestamp | None:
+    """d보다 앞선 n번째 세션(d 자체는 세지 않는다)."""
+    x = _day(d)
+    if np.isnat(x):
+        return None
+    i = _pos(x) - max(1, int(n))
+    return pd.Timestamp(session_array()[i]) if i >= 0 else None
+
+
+def next_session(d: Any, n: int = 1) -> pd.Timestamp | None:
+    """d보다 뒤의 n번째 세션(d 자체는 세지 않는다)."""
+    x = _day(d)
+    if np.isnat(x):
+        return None
+    arr = session_array()
+    i = _pos(x, "right") + max(1, int(n)) - 1
+    return pd.Timestamp(arr[i]) if i < len(arr) else None
+
+
+def offset(d: Any, n: int) -> pd.Timestamp | None:
+    """n 세션 이동. d가 휴장이면 n>0은 직전 세션, n<0은 다음 세션 기준(0이면 rollback)."""
+    x = _day(d)
+    if np.isnat(x):
+        return None
+    arr = session_array()
+    base = _pos(x, "right") - 1 if n >= 0 else _pos(x)
+    i = base + int(n)
+    return pd.Timestamp(arr[i]) if 0 <= i < len(arr) else None
+
+
+def count_between(a: Any, b: Any, inclusive: str = "right") -> int:
+    """a~b 사이 세션 수. inclusive: 'right'=(a,b] 경과 거래일, 'left'=[a,b) (np.busday_count 규약), 'both', 'neither'.
+
+    b < a 이면 0. 해석 불가 날짜면 -1.
+    """
+    x, y = _day(a), _day(b)
+    if np.isnat(x) or np.isnat(y):
+        return -1
+    if y < x:
+        return 0
+    lo = _pos(x, "right" if inclusive in ("right", "neither") else "left")
+    hi = _pos(y, "right" if inclusive in ("right", "both") else "left")
+    return max(0, hi - lo)
+
+
+def sessions(start: Any = None, end: Any = None) -> pd.DatetimeIndex:
+    """[start, end] 세션 목록."""
+    arr = session_array()
+    i = _pos(_day(start)) if start is not None else 0
+    j = _pos(_day(end), "right") if end is not None else len(arr)
+    return pd.DatetimeIndex(arr[i:j].astype("datetime64[ns]"))
+
+
+def sessions_before(d: Any, n: int) -> list[pd.Timestamp]:
+    """d 이전(d 제외) 최근 n개 세션, 오래된 순."""
+    x = _day(d)
+    if np.isnat(x) or n <= 0:
+        return []
+    j = _pos(x)
+    return [pd.Timestamp(v) for v in session_array()[max(0, j - int(n)):j]]
+
+
+# -------------------------------------------------------------
+# vectorized queries (Series/배열 전체를 한 번의 searchsorted로)
+# -------------------------------------------------------------
+def count_between_vec(a: Any, b: Any, inclusive: str = "right", invalid: int = -1) -> np.ndarray:
+    """``count_between`` 의 벡터판. a, b 는 같은 길이의 배열/Series 또는 스칼라."""
+    _STATS["vector_queries"] += 1
+    arr = session_array()
+    da, db = _days(a), _days(b)
+    n = max(da.size, db.size)
+    xa, xb = np.broadcast_to(da, (n,)), np.broadcast_to(db, (n,))
+    lo = np.searchsorted(arr, xa, side="right" if inclusive in ("right", "neither") else "left")
+    hi = np.searchsorted(arr, xb, side="right" if inclusive in ("right", "both") else "left")
+    out = np.maximum(0, hi - lo).astype(int)
+    out[xb < xa] = 0
+    out[np.isnat(xa) | np.isnat(xb)] = int(invalid)
+    return out
+
+
+def offset_vec(d: Any, n: int | Any) -> pd.DatetimeIndex:
+    """``offset`` 의 벡터판. 범위를 벗어나거나 해석 불가면 NaT."""
+    _STATS["vector_queries"] += 1
+    arr = session_array()
+    x = _days(d)
+    k = np.broadcast_to(np.asarray(n, dtype=int), x.shape)
+    base = np.where(k >= 0, np.searchsorted(arr, x, side="right") - 1, np.searchsorted(arr, x, side="left"))
+    i = base + k
+    ok = (i >= 0) & (i < len(arr)) & ~np.isnat(x)
+    out = np.full(x.shape, np.datetime64("NaT"), dtype="datetime64[ns]")
+    out[ok] = arr[i[ok]]
+    return pd.DatetimeIndex(out)
+
+
+def rollback_vec(d: Any) -> pd.DatetimeIndex:
+    return offset_vec(d, 0)
+
+
+def is_session_vec(d: Any) -> np.ndarray:
+    _STATS["vector_queries"] += 1
+    arr = session_array()
+    x = _days(d)
+    i = np.clip(np.searchsorted(arr, x), 0, max(0, len(arr) - 1))
+    return (arr[i] == x) & ~np.isnat(x) if len(arr) else np.zeros(x.shape, dtype=bool)
+
+
+def reset_stats() -> None:
+    global _RUN_START
+    _RUN_START = time.monotonic()
+    with _LOCK:
+        for k in list(_STATS):
+            _STATS[k] = 0
+
+
+def stats_snapshot() -> dict[str, Any]:
+    with _LOCK:
+        z = dict(_STATS)
+        st = _load()
+        z["observed_spans"] = len(st["spans"])
+        z["observed_holidays"] = len(st["holidays"])
+    z["sessions"] = int(len(session_array()))
+    z["fetch_sec"] = round(z["fetch_sec"], 2)
+    z["elapsed_sec"] = round(max(0.0, time.monotonic() - _RUN_START), 3)
+    return z
+
+
+def format_stats() -> str:
+    st = stats_snapshot()
+    return (
+        f"📅 거래일 달력: 세션 {st['sessions']} · 관측구간 {st['observed_spans']} · 관측 휴장 {st['observed_holidays']}일 | "
+        f"조회 {int(st['queries'])} · 벡터 {int(st['vector_queries'])} | 지수 조회 {int(st['fetches'])}({st['fetch_sec']}초) 오류 {int(st['fetch_errors'])}"
+    )
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+VERSION = "LAZY_IMPORTS_V1"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# 차트/LLM/시트/뉴스처럼 스캔 코어에 필요 없는 무거운 모듈을 첫 사용 시점까지 미룬다.
+# LAZY_IMPORTS_DISABLE=1 이면 기존처럼 즉시 import(비교 벤치마크용).
+HEAVY_MODULES = (
+    "matplotlib", "mplfinance", "openai", "bs4", "gspread", "oauth2client",
+    "yfinance", "feedparser", "google.generativeai",
+)
+
+_LOCK = threading.RLock()
+_REGISTERED: dict[str, str] = {}
+_LOADED: dict[str, float] = {}
+_FAILED: dict[str, str] = {}
+
+
+def _reinit_after_fork() -> None:
+    """fork 자식: 부모의 다른 스레드가 import 중에 잡고 있던 락은 자식에서 풀리지 않으므로 새로 만든다."""
+    global _LOCK
+    _LOCK = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = str(os.getenv(name, "1" if default else "0")).strip().lower()
+    return v in {"1", "true", "yes", "y", "on"}
+
+
+def enabled() -> bool:
+    return not _env_bool("LAZY_IMPORTS_DISABLE", False)
+
+
+def _import(name: str) -> types.ModuleType:
+    with _LOCK:
+        mod = sys.modules.get(name)
+        if mod is not None and not isinstance(mod, LazyModule):
+            _LOADED.setdefault(name, 0.0)
+            return mod
+        if name in _FAILED:
+            raise ImportError(f"{name}: {_FAILED[name]}")
+        t0 = time.perf_counter()
+        try:
+            mod = importlib.import_module(name)
+        except Exception as e:
+            _FAILED[name] = f"{type(e).__name__}: {e}"
+            raise ImportError(f"{name}: {_FAILED[name]}") from e
+        _LOADED.setdefault(name, time.perf_counter() - t0)
+        return mod
+
+
+class LazyModule(types.ModuleType):
+    """첫 속성 접근 때 실제 모듈을 import하는 대리 모듈. 속성 대입은 실제 모듈에 반영된다."""
+
+    def __init__(self, name: str, on_load: Callable[[types.ModuleType], None] | None = None):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+        self.__dict__["_lazy_on_load"] = on_load
+
+    def _lazy_load(self) -> types.ModuleType:
+        mod = self.__dict__["_lazy_target"]
+        if mod is None:
+            with _LOCK:
+                mod = self.__dict__["_lazy_target"]
+                if mod is None:
+                    mod = _import(self.__name__)
+                    self.__dict__["_lazy_target"] = mod
+                    hook = self.__dict__["_lazy_on_load"]
+                    if hook is not None:
+                        hook(mod)
+        return mod
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._lazy_load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._lazy_load(), attr, value)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "deferred"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+class LazyAttr:
+    """``from module import attr`` 대리 객체. 호출/속성 접근 때 import한다.
+
+    ``try: from m import X / except: X = None`` 패턴을 대신할 수 있도록, import가 실패하면 bool()이 False다.
+    """
+
+    __slots__ = ("_module", "_attr", "_value")
+
+    def __init__(self, module: str, attr: str):
+        self._module = module
+        self._attr = attr
+        self._value = None
+
+    def _lazy_resolve(self) -> Any:
+        if self._value is None:
+            self._value = getattr(_import(self._module), self._attr)
+        return self._value
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._lazy_resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._lazy_resolve(), attr)
+
+    def __bool__(self) -> bool:
+        try:
+            self._lazy_resolve()
+            return True
+        except Exception:
+            return False
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._value is not None else "deferred"
+        return f"<lazy {self._module}.{self._attr} ({state})>"
+
+
+def lazy_module(name: str, on_load: Callable[[types.ModuleType], None] | None = None) -> Any:
+    """``import name`` 대체. 비활성화 상태면 즉시 import한 실제 모듈을 돌려준다."""
+    with _LOCK:
+        _REGISTERED.setdefault(name, "module")
+    if not enabled():
+        mod = importlib.import_module(name)
+        if on_load is not None:
+            on_load(mod)
+        return mod
+    return LazyModule(name, on_load)
+
+
+def lazy_attr(module: str, attr: str, optional: bool = False) -> Any:
+    """``from module import attr`` 대체. optional=True 이고 즉시 모드에서 import가 실패하면 None."""
+    with _LOCK:
+        _REGISTERED.setdefault(module, "attr")
+    if not enabled():
+        try:
+            return getattr(importlib.import_module(module), attr)
+        except Exception:
+            if optional:
+                return None
+            raise
+    return LazyAttr(module, attr)
+
+
+def lazy_attrs(module: str, *attrs: str, optional: bool = False) -> tuple:
+    return tuple(lazy_attr(module, a, optional=optional) for a in attrs)
+
+
+def stats_snapshot() -> dict[str, Any]:
+    with _LOCK:
+        loaded = {k: round(v, 3) for k, v in _LOADED.items() if k in _REGISTERED}
+        return {
+            "enabled": enabled(),
+            "registered": len(_REGISTERED),
+            "loaded": loaded,
+            "deferred": sorted(k for k in _REGISTERED if k not in _LOADED and k not in _FAILED),
+            "failed": dict(_FAILED),
+        }
+
+
+def format_stats() -> str:
+    st = stats_snapshot()
+    if not st["enabled"]:
+        return "🐢 지연 로딩: 꺼짐(LAZY_IMPORTS_DISABLE=1)"
+    loaded_sec = round(sum(st["loaded"].values()), 2)
+    line = f"🐢 지연 로딩: 등록 {st['registered']} · 사용 중 로드 {len(st['loaded'])}({loaded_sec}초) · 미사용 {len(st['deferred'])}"
+    if st["deferred"]:
+        line += f" ({', '.join(st['deferred'][:6])}{' …' if len(st['deferred']) > 6 else ''})"
+    if st["failed"]:
+        line += f" | 실패 {', '.join(sorted(st['failed']))}"
+    return line
+
+
+# -------------------------------------------------------------
+# import-time benchmark
+# -------------------------------------------------------------
+_BENCH_SNIPPET = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import importlib
+importlib.import_module(sys.argv[1])
+wall = time.perf_counter() - t0
+heavy = [m for m in json.loads(sys.argv[2]) if m in sys.modules and type(sys.modules[m]).__name__ != 'LazyModule']
+print('__BENCH__' + json.dumps({'wall_sec': wall, 'heavy_loaded': heavy, 'modules': len(sys.modules)}))
+"""
+
+
+def _parse_importtime(stderr: str, top: int) -> list[tuple[str, float]]:
+    """``-X importtime`` 출력에서 최상위 import(들여쓰기 없음)의 누적 시간을 뽑는다."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        try:
+            cumulative = int(parts[1].strip())
+        except ValueError:
+            continue
+        name = parts[2]
+        if name.startswith(" ") and not name.startswith("  "):
+            rows.append((name.strip(), cumulative / 1e6))
+    rows.sort(key=lambda r: -r[1])
+    return rows[:top]
+
+
+def bench(module: str, runs: int = 3, lazy: bool = True, top: int = 12) -> dict[str, Any]:
+    """새 인터프리터에서 ``import module`` 을 runs번 재서 중앙값/최상위 import 비용을 돌려준다."""
+    env = dict(os.environ)
+    env["LAZY_IMPORTS_DISABLE"] = "0" if lazy else "1"
+    walls, heavy, tops, errors = [], [], [], []
+    for _ in range(max(1, runs)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _BENCH_SNIPPET, module, json.dumps(HEAVY_MODULES)],
+            capture_output=True, text=True, env=env, cwd=str(Path(__file__).resolve().parent),
+        )
+        line = next((ln for ln in proc.stdout.splitlines() if ln.startswith("__BENCH__")), None)
+        if proc.returncode != 0 or line is None:
+            errors.append((proc.stderr.strip().splitlines() or ["unknown error"])[-1][:300])
+            continue
+        doc = json.loads(line[len("__BENCH__"):])
+        walls.append(doc["wall_sec"])
+        heavy = doc["heavy_loaded"]
+        tops = _parse_importtime(proc.stderr, top)
+    walls.sort()
+    return {
+        "module": module,
+        "mode": "lazy" if lazy else "eager",
+        "runs": len(walls),
+        "median_sec": round(walls[len(walls) // 2], 3) if walls else None,
+        "min_sec": round(walls[0], 3) if walls else None,
+        "heavy_loaded": heavy,
+        "top_imports": [(n, round(s, 3)) for n, s in tops],
+        "errors": errors,
+    }
+
+
+def _format_bench(res: dict[str, Any]) -> str:
+    if not res["runs"]:
+        return f"⏱️ import {res['module']} [{res['mode']}]: 실패 — {res['errors'][:1]}"
+    lines = [
+        f"⏱️ import {res['module']} [{res['mode']}]: 중앙값 {res['median_sec']}초 (최소 {res['min_sec']}초, {res['runs']}회) | "
+        f"무거운 모듈 로드: {', '.join(res['heavy_loaded']) or '없음'}"
+    ]
+    lines += [f"   {s:7.3f}s  {n}" for n, s in res["top_imports"]]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="import 시간 벤치마크 (지연 로딩 on/off 비교)")
+    ap.add_argument("--bench", default="scanner.legacy_main_patched", help="측정할 모듈 경로")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--compare", action="store_true", help="LAZY_IMPORTS_DISABLE=1(즉시 import)과 비교")
+    ap.add_argument("--json", default="", help="결과를 이 JSON 파일에 누적 기록(추이 추적용)")
+    args = ap.parse_args(argv)
+
+    results = [bench(args.bench, args.runs, lazy=True)]
+    if args.compare:
+        results.append(bench(args.bench, args.runs, lazy=False))
+    for res in results:
+        print(_format_bench(res))
+    if args.compare and results[0]["median_sec"] and results[1]["median_sec"]:
+        print(f"→ 지연 로딩 절감: {round(results[1]['median_sec'] - results[0]['median_sec'], 3)}초")
+    if args.json:
+        p = Path(args.json)
+        hist = []
+        if p.exists():
+            try:
+                hist = json.loads(p.read_text(encoding="utf-8"))
+            except Exception:
+                hist = []
+        hist.append({"at": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], "results": results})
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(hist, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0 if all(r["runs"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
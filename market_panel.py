@@ -0,0 +1,505 @@
+from __future__ import annotations
+
+import io
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+VERSION = "MARKET_PANEL_V1"
+SCHEMA = "MARKET_PANEL_NPZ_2"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# 날짜×종목 일봉 패널. 새 거래일마다 시장별 pykrx get_market_ohlcv(date, market) 1회로 전 종목 봉을 붙인다.
+# pykrx 날짜별 스냅샷은 수정주가가 아니다. 액면분할·병합·유무상증자 등으로 기준가가 조정된 날은 원 종가 대비
+# 등락률과 KRX 등락률(조정된 기준가 대비)이 어긋나므로, 그 종목의 구간은 corporate_action()/action_codes()로 걸러
+# 종목별 수정주가 이력으로 대신한다.
+MARKETS = ("KOSPI", "KOSDAQ")
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+KST = timezone(timedelta(hours=9))
+
+_LOCK = threading.RLock()
+_ROOT = Path(os.getenv("MARKET_PANEL_DIR", "reports/.cache/market_panel"))
+_FETCHER: Callable[[str, str], pd.DataFrame] | None = None
+_STATE: dict[str, Any] | None = None
+_CHECKED_FOR: pd.Timestamp | None = None
+_LAST_TRY = 0.0
+_RUN_START = time.monotonic()
+_STATS: dict[str, float] = {
+    "bulk_calls": 0,
+    "bulk_errors": 0,
+    "sessions_added": 0,
+    "holidays_added": 0,
+    "tail_served": 0,
+    "frame_served": 0,
+    "not_covered": 0,
+    "corporate_actions": 0,
+    "unverified": 0,
+    "bytes_read": 0,
+    "bytes_written": 0,
+}
+
+_PYKRX_RENAME = {"시가": "Open", "고가": "High", "저가": "Low", "종가": "Close", "거래량": "Volume", "등락률": "Change"}
+
+
+def _reinit_after_fork() -> None:
+    """fork 자식: _LOCK을 새로 만든다. fork 순간 잡혀 있었으면 부모가 일자를 붙이거나 잘라내던 중이었을 수 있으므로
+    _STATE 행렬과 _CHECKED_FOR(오늘 갱신 확인 표시)를 버려 npz에서 다시 읽고 갱신 여부도 다시 확인하게 한다."""
+    global _LOCK, _STATE, _CHECKED_FOR
+    held = not _LOCK.acquire(blocking=False)
+    _LOCK = threading.RLock()
+    if held:
+        _STATE = None
+        _CHECKED_FOR = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = str(os.getenv(name, "1" if default else "0")).strip().lower()
+    return v in {"1", "true", "yes", "y", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(str(os.getenv(name, default)).strip()))
+    except Exception:
+        return int(default)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(str(os.getenv(name, default)).strip())
+    except Exception:
+        return float(default)
+
+
+def _norm_code(v: Any) -> str:
+    """Canonical KRX ticker identity; preserves 6-char alphanumeric tickers (e.g. 0126Z0)."""
+    raw = str(v or "").strip().upper()
+    if raw.endswith(".0") and raw[:-2].isdigit():
+        raw = raw[:-2]
+    for suffix in (".KS", ".KQ", ".KRX"):
+        if raw.endswith(suffix):
+            raw = raw[:-len(suffix)]
+            break
+    s = "".join(ch for ch in raw if ch in "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    if len(s) == 7 and s.startswith("A"):
+        s = s[1:]
+    if s.isdigit() and len(s) <= 6:
+        return s.zfill(6)
+    if len(s) >= 6:
+        return s[-6:]
+    return s
+
+
+def enabled() -> bool:
+    return _env_bool("MARKET_PANEL_ENABLE", True)
+
+
+def _default_fetcher(ymd: str, market: str) -> pd.DataFrame:
+    from pykrx import stock
+
+    return stock.get_market_ohlcv(ymd, market=market)
+
+
+def configure(fetcher: Callable[[str, str], pd.DataFrame] | None = None, root: str | Path | None = None) -> None:
+    """Install the bulk fetcher (``fetcher('YYYYMMDD', market)``, pykrx frame) and/or the panel directory."""
+    global _FETCHER, _ROOT, _STATE, _CHECKED_FOR
+    with _LOCK:
+        if fetcher is not None:
+            _FETCHER = fetcher
+        if root is not None:
+            _ROOT = Path(root)
+            _STATE = None
+            _CHECKED_FOR = None
+
+
+def _now_kst() -> datetime:
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def _session_close(d: pd.Timestamp) -> datetime:
+    h, m = divmod(max(0, _env_int("MARKET_PANEL_CLOSE_HHMM", _env_int("OHLCV_STORE_CLOSE_HHMM", 1540))), 100)
+    return datetime(d.year, d.month, d.day, h, m)
+
+
+def last_completed_weekday(now: datetime | None = None) -> pd.Timestamp:
+    """가장 최근에 마감된 평일. 장중/장전에는 직전 평일, 마감 후에는 오늘."""
+    now = now or _now_kst()
+    d = pd.Timestamp(now.date())
+    if d.weekday() < 5 and now >= _session_close(d):
+        return d
+    d -= pd.Timedelta(days=1)
+    while d.weekday() >= 5:
+        d -= pd.Timedelta(days=1)
+    return d
+
+
+def _file() -> Path:
+    return _ROOT / "panel.npz"
+
+
+def _empty_state() -> dict[str, Any]:
+    return {
+        "dates": np.array([], dtype="datetime64[D]"),
+        "codes": np.array([], dtype="<U6"),
+        "prices": np.zeros((0, 0, len(PRICE_COLUMNS)), dtype="float32"),
+        "volume": np.zeros((0, 0), dtype="float64"),
+        "change": np.zeros((0, 0), dtype="float32"),
+        "span_start": None,
+        "through": None,
+        "col": {},
+    }
+
+
+def _load_disk() -> dict[str, Any]:
+    p = _file()
+    if not p.exists():
+        return _empty_state()
+    try:
+        raw = p.read_bytes()
+        with np.load(io.BytesIO(raw), allow_pickle=False) as z:
+            if str(z["schema"]) != SCHEMA:
+                raise ValueError("schema mismatch")
+            st = {
+                "dates": z["dates"].astype("datetime64[D]"),
+                "codes": z["codes"].astype("<U6"),
+                "prices": z["prices"].astype("float32"),
+                "volume": z["volume"].astype("float64"),
+                "change": z["change"].astype("float32"),
+                "span_start": pd.Timestamp(z["span_start"].astype("datetime64[ns]")[()]),
+                "through": pd.Timestamp(z["through"].astype("datetime64[ns]")[()]),
+            }
+        st["col"] = {c: j for j, c in enumerate(st["codes"].tolist())}
+        with _LOCK:
+            _STATS["bytes_read"] += len(raw)
+        return st
+    except Exception:
+        return _empty_state()
+
+
+def _save_disk(st: dict[str, Any]) -> None:
+    p = _file()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf,
+        schema=np.array(SCHEMA),
+        dates=st["dates"],
+        codes=st["codes"],
+        prices=st["prices"],
+        volume=st["volume"],
+        change=st["change"],
+        span_start=np.array(st["span_start"].to_datetime64()).astype("datetime64[D]"),
+        through=np.array(st["through"].to_datetime64()).astype("datetime64[D]"),
+        saved_at=np.array(time.time()),
+    )
+    tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(buf.getvalue())
+    os.replace(tmp, p)
+    _STATS["bytes_written"] += buf.tell()
+
+
+def _normalize_day(df: Any) -> pd.DataFrame:
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return pd.DataFrame(columns=[*PRICE_COLUMNS, "Volume", "Change"])
+    out = df.rename(columns=_PYKRX_RENAME)
+    out.index = [_norm_code(i) for i in out.index]
+    out = out[~out.index.duplicated(keep="last")]
+    for c in (*PRICE_COLUMNS, "Volume", "Change"):
+        out[c] = pd.to_numeric(out[c], errors="coerce") if c in out.columns else np.nan
+    return out[[*PRICE_COLUMNS, "Volume", "Change"]]
+
+
+def _fetch_day(day: pd.Timestamp) -> pd.DataFrame | None:
+    """한 거래일 전 시장 스냅샷. 시장 하나라도 예외면 None(해당 날짜는 다음 실행에서 재시도)."""
+    fetcher = _FETCHER or _default_fetcher
+    ymd = day.strftime("%Y%m%d")
+    frames = []
+    for market in MARKETS:
+        try:
+            raw = fetcher(ymd, market)
+        except Exception:
+            _STATS["bulk_errors"] += 1
+            return None
+        _STATS["bulk_calls"] += 1
+        frames.append(_normalize_day(raw))
+    day_df = pd.concat(frames) if frames else pd.DataFrame()
+    day_df = day_df[~day_df.index.duplicated(keep="last")]
+    # 휴장일 응답은 빈 표 또는 종가 0으로 온다.
+    if day_df.empty or not (day_df["Close"].fillna(0) > 0).any():
+        return day_df.iloc[0:0]
+    return day_df
+
+
+def _append_day(st: dict[str, Any], day: pd.Timestamp, day_df: pd.DataFrame) -> None:
+    col = st["col"]
+    new_codes = [c for c in day_df.index if c not in col]
+    if new_codes:
+        for c in new_codes:
+            col[c] = len(col)
+        st["codes"] = np.concatenate([st["codes"], np.array(new_codes, dtype="<U6")])
+        pad = len(new_codes)
+        st["prices"] = np.concatenate(
+            [st["prices"], np.full((len(st["dates"]), pad, len(PRICE_COLUMNS)), np.nan, dtype="float32")], axis=1
+        )
+        st["volume"] = np.concatenate([st["volume"], np.full((len(st["dates"]), pad), np.nan)], axis=1)
+        st["change"] = np.concatenate([st["change"], np.full((len(st["dates"]), pad), np.nan, dtype="float32")], axis=1)
+    n = len(st["codes"])
+    row_p = np.full((1, n, len(PRICE_COLUMNS)), np.nan, dtype="float32")
+    row_v = np.full((1, n), np.nan)
+    row_c = np.full((1, n), np.nan, dtype="float32")
+    idx = np.array([col[c] for c in day_df.index], dtype=int)
+    row_p[0, idx, :] = day_df[list(PRICE_COLUMNS)].to_numpy(dtype="float32")
+    row_v[0, idx] = day_df["Volume"].to_numpy(dtype="float64")
+    row_c[0, idx] = day_df["Change"].to_numpy(dtype="float32")
+    st["dates"] = np.concatenate([st["dates"], np.array([day.to_datetime64()], dtype="datetime64[D]")])
+    st["prices"] = np.concatenate([st["prices"], row_p], axis=0)
+    st["volume"] = np.concatenate([st["volume"], row_v], axis=0)
+    st["change"] = np.concatenate([st["change"], row_c], axis=0)
+
+
+def _trim(st: dict[str, Any]) -> None:
+    keep = max(1, _env_int("MARKET_PANEL_KEEP_SESSIONS", 700))
+    if len(st["dates"]) <= keep:
+        return
+    cut = len(st["dates"]) - keep
+    st["span_start"] = pd.Timestamp(st["dates"][cut])
+    st["dates"] = st["dates"][cut:]
+    st["prices"] = st["prices"][cut:]
+    st["volume"] = st["volume"][cut:]
+    st["change"] = st["change"][cut:]
+
+
+def ensure_current(now: datetime | None = None) -> dict[str, Any]:
+    """패널을 가장 최근 마감 거래일까지 확장한다. 새 평일 1일당 시장별 bulk 호출 1회."""
+    global _STATE, _CHECKED_FOR, _LAST_TRY
+    target = last_completed_weekday(now)
+    with _LOCK:
+        if _STATE is not None and _CHECKED_FOR is not None and _CHECKED_FOR >= target:
+            return _STATE
+        if _STATE is not None and time.monotonic() - _LAST_TRY < max(0, _env_int("MARKET_PANEL_RETRY_SEC", 300)):
+            # 직전 확장이 실패/미완료였다면 종목마다 bulk 호출을 반복하지 않는다.
+            return _STATE
+        _LAST_TRY = time.monotonic()
+        st = _STATE if _STATE is not None else _load_disk()
+        if st["through"] is None:
+            # 첫 생성: 최근 MARKET_PANEL_SEED_DAYS 평일만 채운다. (과거 구간은 종목별 저장소가 담당,
+            # 20일 거래량 평균을 쓰는 유니버스 사전필터가 바로 돌 수 있도록 기본 25일)
+            seed = max(1, _env_int("MARKET_PANEL_SEED_DAYS", 25))
+            days = pd.bdate_range(end=target, periods=seed)
+            st["span_start"] = days[0]
+            st["through"] = days[0] - pd.Timedelta(days=1)
+        todo = [d for d in pd.bdate_range(st["through"] + pd.Timedelta(days=1), target)]
+        max_new = max(1, _env_int("MARKET_PANEL_MAX_NEW_DAYS", 30))
+        if len(todo) > max_new:
+            # 오래 비어 있던 패널은 연속성이 끊기므로 최근 구간으로 다시 시작한다.
+            st = _empty_state()
+            todo = todo[-max_new:]
+            st["span_start"] = todo[0]
+        changed = False
+        today = pd.Timestamp(_now_kst().date())
+        for day in todo:
+            day_df = _fetch_day(day)
+            if day_df is None:
+                break
+            if day_df.empty:
+                if day >= today:
+                    # 마감 직후 아직 집계 전일 수 있으므로 휴장으로 확정하지 않는다.
+                    break
+                _STATS["holidays_added"] += 1
+            else:
+                _append_day(st, day, day_df)
+                _STATS["sessions_added"] += 1
+            st["through"] = day
+            changed = True
+        if changed:
+            _trim(st)
+            if _env_bool("MARKET_PANEL_DISK_ENABLE", True):
+                try:
+                    _save_disk(st)
+                except Exception:
+                    pass
+        _STATE = st
+        _CHECKED_FOR = target if st["through"] is not None and st["through"] >= target else None
+        return st
+
+
+def _ticker_frame(st: dict[str, Any], code: str, lo: int) -> pd.DataFrame | None:
+    j = st["col"].get(code)
+    if j is None:
+        return None
+    prices = st["prices"][lo:, j, :].astype("float64")
+    vol = st["volume"][lo:, j]
+    dates = st["dates"][lo:]
+    ok = ~np.isnan(prices[:, 3])
+    df = pd.DataFrame(prices[ok], index=pd.DatetimeIndex(dates[ok].astype("datetime64[ns]"), name="Date"), columns=list(PRICE_COLUMNS))
+    df["Volume"] = vol[ok]
+    df["Change"] = np.nan
+    return df
+
+
+def _action_masks(close: np.ndarray, change: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """T×N 원 종가/KRX 등락률(%) → (기준가 조정 봉, 등락률이 없어 확인할 수 없는 봉).
+
+    각 봉을 직전 유효 종가와 비교하므로 첫 행과 직전 종가가 없는 봉(신규 상장)은 둘 다 False.
+    거래정지일 스냅샷은 종가가 직전 종가 그대로, 등락률 0이라 걸리지 않는다.
+    """
+    close = np.where(close > 0, close, np.nan)
+    prev = pd.DataFrame(close).ffill().shift(1).to_numpy()
+    valid = np.isfinite(close) & np.isfinite(prev)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw = (close / prev - 1.0) * 100.0
+    tol = max(0.0, _env_float("MARKET_PANEL_ACTION_TOL_PCT", 0.1))
+    unknown = valid & np.isnan(change)
+    broken = valid & ~np.isnan(change) & (np.abs(raw - change) > tol)
+    return broken, unknown
+
+
+def corporate_action(ticker: Any, start: Any, through: Any) -> bool | None:
+    """패널의 ``start`` 다음 봉부터 ``through``까지 기준가 조정(액면분할·병합·유무상증자 등)이 있는지.
+
+    True면 이 구간의 미수정 봉을 수정주가 이력에 이어 붙이거나 그대로 쓰면 안 된다.
+    등락률이 없는 봉이 있어 확인할 수 없으면 None, 종목이 패널에 없으면 False.
+    """
+    code = _norm_code(ticker)
+    start_ts = pd.Timestamp(start).normalize()
+    through_ts = pd.Timestamp(through).normalize()
+    st = ensure_current()
+    with _LOCK:
+        j = st["col"].get(code)
+        if j is None:
+            return False
+        lo = int(np.searchsorted(st["dates"], np.datetime64(start_ts.date(), "D"), side="left"))
+        hi = int(np.searchsorted(st["dates"], np.datetime64(through_ts.date(), "D"), side="right"))
+        broken, unknown = _action_masks(st["prices"][lo:hi, j:j + 1, 3].astype("float64"),
+                                        st["change"][lo:hi, j:j + 1].astype("float64"))
+        if broken.any():
+            _STATS["corporate_actions"] += 1
+            return True
+        if unknown.any():
+            _STATS["unverified"] += 1
+            return None
+    return False
+
+
+def action_codes(mat: dict[str, pd.DataFrame]) -> list[str]:
+    """recent_matrix 결과에서 구간 안에 기준가 조정이 있거나 등락률이 없어 확인할 수 없는 종목.
+    이 종목들의 행렬 값은 미수정·수정 봉이 섞였을 수 있으므로 종목별 수정주가 이력으로 다시 계산해야 한다."""
+    if not mat or "Change" not in mat:
+        return [str(c) for c in mat["Close"].columns] if mat else []
+    broken, unknown = _action_masks(mat["Close"].to_numpy(dtype="float64"), mat["Change"].to_numpy(dtype="float64"))
+    flag = (broken | unknown).any(axis=0)
+    return [str(c) for c in mat["Close"].columns[flag]]
+
+
+def intraday(now: datetime | None = None) -> bool:
+    """평일 09:00~마감 사이면 True. 이때 당일 봉은 패널에 없다."""
+    now = now or _now_kst()
+    d = pd.Timestamp(now.date())
+    return d.weekday() < 5 and now.hour >= 9 and now < _session_close(d)
+
+
+def recent_matrix(sessions: int, now: datetime | None = None) -> dict[str, pd.DataFrame] | None:
+    """최근 ``sessions`` 거래일 × 전 종목 Open/High/Low/Close/Volume/Change(KRX 등락률 %) 행렬(열=종목코드).
+
+    미수정 가격이다: 이력 기반 값을 만드는 호출자는 action_codes()로 나온 종목을 종목별 이력으로 대신한다.
+    패널이 가장 최근 마감 거래일까지 채워지지 않았으면 None.
+    """
+    st = ensure_current(now)
+    with _LOCK:
+        if st["through"] is None or st["through"] < last_completed_weekday(now) or not len(st["dates"]):
+            return None
+        lo = max(0, len(st["dates"]) - max(1, int(sessions)))
+        index = pd.DatetimeIndex(st["dates"][lo:].astype("datetime64[ns]"), name="Date")
+        codes = st["codes"].tolist()
+        out = {
+            c: pd.DataFrame(st["prices"][lo:, :, k].astype("float64"), index=index, columns=codes)
+            for k, c in enumerate(PRICE_COLUMNS)
+        }
+        out["Volume"] = pd.DataFrame(st["volume"][lo:].copy(), index=index, columns=codes)
+        out["Change"] = pd.DataFrame(st["change"][lo:].astype("float64"), index=index, columns=codes)
+    return out
+
+
+def tail(ticker: Any, since: Any, through: Any) -> pd.DataFrame | None:
+    """``since``(포함)부터 ``through``까지의 봉. 패널이 그 구간을 빠짐없이 덮지 못하면 None.
+
+    종목별 저장소의 마지막 봉(장중 저장분일 수 있음)을 since로 넘겨 확정 봉으로 덮어쓰게 한다.
+    """
+    code = _norm_code(ticker)
+    since_ts = pd.Timestamp(since).normalize()
+    through_ts = pd.Timestamp(through).normalize()
+    st = ensure_current()
+    with _LOCK:
+        covered = (
+            st["span_start"] is not None
+            and st["span_start"] <= since_ts
+            and st["through"] >= through_ts
+        )
+        if not covered or code not in st["col"]:
+            _STATS["not_covered"] += 1
+            return None
+        lo = int(np.searchsorted(st["dates"], np.datetime64(since_ts.date(), "D"), side="left"))
+        out = _ticker_frame(st, code, lo)
+        _STATS["tail_served"] += 1
+    return out[out.index <= through_ts] if out is not None else None
+
+
+def frame(ticker: Any, start: Any, through: Any) -> pd.DataFrame | None:
+    """``start``~``through`` 구간 전체를 패널에서 잘라 준다. 패널 깊이가 모자라면 None."""
+    code = _norm_code(ticker)
+    start_ts = pd.Timestamp(start).normalize()
+    through_ts = pd.Timestamp(through).normalize()
+    st = ensure_current()
+    with _LOCK:
+        if st["span_start"] is None or st["span_start"] > start_ts or st["through"] < through_ts or code not in st["col"]:
+            _STATS["not_covered"] += 1
+            return None
+        lo = int(np.searchsorted(st["dates"], np.datetime64(start_ts.date(), "D"), side="left"))
+        out = _ticker_frame(st, code, lo)
+        _STATS["frame_served"] += 1
+    if out is None:
+        return None
+    out = out[out.index <= through_ts]
+    out["Change"] = out["Close"].pct_change()
+    return out
+
+
+def reset_stats() -> None:
+    global _RUN_START
+    _RUN_START = time.monotonic()
+    with _LOCK:
+        for k in list(_STATS):
+            _STATS[k] = 0
+
+
+def stats_snapshot() -> dict[str, Any]:
+    with _LOCK:
+        z = dict(_STATS)
+        st = _STATE
+        z["sessions"] = int(len(st["dates"])) if st is not None else 0
+        z["tickers"] = int(len(st["codes"])) if st is not None else 0
+        z["through"] = str(st["through"].date()) if st is not None and st["through"] is not None else ""
+    z["elapsed_sec"] = round(max(0.0, time.monotonic() - _RUN_START), 3)
+    return z
+
+
+def format_stats() -> str:
+    st = stats_snapshot()
+    return (
+        f"🗂️ 시장 패널: {st['sessions']}거래일 × {st['tickers']}종목 (~{st['through']}) | "
+        f"bulk 호출 {int(st['bulk_calls'])} (오류 {int(st['bulk_errors'])}) | 신규 {int(st['sessions_added'])}일 휴장 {int(st['holidays_added'])}일 | "
+        f"tail 제공 {int(st['tail_served'])} / 전체 제공 {int(st['frame_served'])} / 미커버 {int(st['not_covered'])} | "
+        f"기준가 조정 {int(st['corporate_actions'])} / 확인 불가 {int(st['unverified'])}"
+    )
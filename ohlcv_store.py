@@ -0,0 +1,459 @@
+from __future__ import annotations
+
+import io
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+VERSION = "OHLCV_STORE_V1"
+SCHEMA = "OHLCV_NPZ_1"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# fdr.DataReader 일봉 컬럼 순서를 그대로 유지한다. (Change는 tail append 시 재계산)
+COLUMNS = ("Open", "High", "Low", "Close", "Volume", "Change")
+KST = timezone(timedelta(hours=9))
+
+_LOCK = threading.RLock()
+_CODE_LOCKS: dict[str, threading.Lock] = {}
+_ROOT = Path(os.getenv("OHLCV_STORE_DIR", "reports/.cache/ohlcv_store"))
+_FETCHER: Callable[..., pd.DataFrame] | None = None
+# 날짜×종목 bulk 패널(market_panel). tail(code, since, through) / frame(code, start, through)를 제공하면
+# 종목별 네트워크 호출 대신 패널에서 잘라 쓴다. 패널 봉은 미수정 가격이므로 corporate_action(code, start, through)로
+# 그 구간에 기준가 조정이 없다고 확인된 경우에만 쓰고, 조정이 있으면 수정주가 전체를 다시 받는다.
+_PANEL: Any = None
+_MEMORY: dict[str, tuple[pd.DataFrame, pd.Timestamp, float]] = {}
+_RUN_START = time.monotonic()
+_STATS: dict[str, float] = {
+    "hit": 0,
+    "miss": 0,
+    "tail_fetch": 0,
+    "full_fetch": 0,
+    "panel_tail": 0,
+    "panel_frame": 0,
+    "panel_action": 0,
+    "network_error": 0,
+    "disk_invalid": 0,
+    "adjusted_refetch": 0,
+    "rows_fetched": 0,
+    "bytes_read": 0,
+    "bytes_written": 0,
+}
+
+
+def _reinit_after_fork() -> None:
+    """fork 자식: _LOCK과 종목별 _CODE_LOCKS(부모의 조회 스레드가 잡은 채일 수 있음)를 새로 만든다.
+    fork 순간 _LOCK이 잡혀 있었으면 반쯤 갱신됐을 수 있는 _MEMORY 캐시를 비워 디스크 저장본부터 다시 읽게 한다."""
+    global _LOCK, _CODE_LOCKS, _MEMORY
+    held = not _LOCK.acquire(blocking=False)
+    _LOCK = threading.RLock()
+    _CODE_LOCKS = {}
+    if held:
+        _MEMORY = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = str(os.getenv(name, "1" if default else "0")).strip().lower()
+    return v in {"1", "true", "yes", "y", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(str(os.getenv(name, default)).strip()))
+    except Exception:
+        return int(default)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(str(os.getenv(name, default)).strip())
+    except Exception:
+        return float(default)
+
+
+def _norm_code(v: Any) -> str:
+    """Canonical KRX ticker identity; preserves 6-char alphanumeric tickers (e.g. 0126Z0)."""
+    raw = str(v or "").strip().upper()
+    if raw.endswith(".0") and raw[:-2].isdigit():
+        raw = raw[:-2]
+    for suffix in (".KS", ".KQ", ".KRX"):
+        if raw.endswith(suffix):
+            raw = raw[:-len(suffix)]
+            break
+    s = "".join(ch for ch in raw if ch in "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    if len(s) == 7 and s.startswith("A"):
+        s = s[1:]
+    if s.isdigit() and len(s) <= 6:
+        return s.zfill(6)
+    if len(s) >= 6:
+        return s[-6:]
+    return s
+
+
+def enabled() -> bool:
+    return _env_bool("OHLCV_STORE_ENABLE", True)
+
+
+def _default_fetcher(code: str, start: str, end: str | None = None) -> pd.DataFrame:
+    import FinanceDataReader as fdr
+
+    return fdr.DataReader(code, start, end) if end else fdr.DataReader(code, start=start)
+
+
+def configure(fetcher: Callable[..., pd.DataFrame] | None = None, root: str | Path | None = None, panel: Any = None) -> None:
+    """Install the network fetcher (``fetcher(code, start, end)``), the store root directory and/or a bulk panel."""
+    global _FETCHER, _ROOT, _PANEL
+    with _LOCK:
+        if fetcher is not None:
+            _FETCHER = fetcher
+        if panel is not None:
+            _PANEL = panel
+        if root is not None:
+            _ROOT = Path(root)
+            _MEMORY.clear()
+
+
+def adjusted_history() -> bool:
+    """True when every bar served is on the provider's adjusted-price scale.
+
+    A configured bulk panel (unadjusted pykrx snapshots) is used only through its ``corporate_action`` check;
+    a panel without it is ignored by ``get_history``. Callers that must not see mixed-scale history gate on this.
+    """
+    with _LOCK:
+        return _PANEL is None or hasattr(_PANEL, "corporate_action")
+
+
+def _code_lock(code: str) -> threading.Lock:
+    with _LOCK:
+        lk = _CODE_LOCKS.get(code)
+        if lk is None:
+            lk = _CODE_LOCKS[code] = threading.Lock()
+        return lk
+
+
+def _now_kst() -> datetime:
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def _prev_weekday(d: pd.Timestamp) -> pd.Timestamp:
+    d = d - pd.Timedelta(days=1)
+    while d.weekday() >= 5:
+        d -= pd.Timedelta(days=1)
+    return d
+
+
+def _session_close(d: pd.Timestamp) -> datetime:
+    h, m = divmod(max(0, _env_int("OHLCV_STORE_CLOSE_HHMM", 1540)), 100)
+    return datetime(d.year, d.month, d.day, h, m)
+
+
+def required_saved_after(now: datetime | None = None) -> datetime:
+    """Latest KST wall-clock time a local copy must have been written after to be considered current.
+
+    - 장 마감 후: 오늘 마감 이후 저장본이면 최신
+    - 장중(09:00~마감): 오늘 봉이 미완성이므로 OHLCV_STORE_INTRADAY_TTL_SEC 이내 저장본만 인정
+    - 장 시작 전/주말: 직전 평일 마감 이후 저장본이면 최신 (아침 스캔은 네트워크 0회)
+    """
+    now = now or _now_kst()
+    today = pd.Timestamp(now.date())
+    if today.weekday() < 5:
+        close_dt = _session_close(today)
+        if now >= close_dt:
+            return close_dt
+        if now.hour >= 9:
+            return now - timedelta(seconds=max(0, _env_int("OHLCV_STORE_INTRADAY_TTL_SEC", 300)))
+    return _session_close(_prev_weekday(today))
+
+
+def _panel_through(now: datetime) -> pd.Timestamp | None:
+    """패널로 채울 수 있는 마지막 확정 거래일. 장중에는 당일 봉이 미완성이므로 None."""
+    if _PANEL is None:
+        return None
+    today = pd.Timestamp(now.date())
+    if today.weekday() < 5 and now.hour >= 9 and now < _session_close(today):
+        return None
+    return pd.Timestamp(required_saved_after(now).date())
+
+
+def _panel_fetch(code: str, start: pd.Timestamp, local: pd.DataFrame, covers_start: bool, now: datetime) -> tuple[pd.DataFrame | None, str]:
+    """패널에서 tail/전체 구간을 잘라 온다. (봉, 종류). 구간에 기준가 조정이 있으면 (None, "panel_action"),
+    조정 여부를 확인할 수 없거나 패널이 덮지 못하면 (None, "")."""
+    through = _panel_through(now)
+    if through is None or not hasattr(_PANEL, "corporate_action"):
+        return None, ""
+    tail = covers_start and not local.empty
+    lo = _tail_since(local) if tail else start
+    try:
+        action = _PANEL.corporate_action(code, lo, through)
+        if action:
+            return None, "panel_action"
+        if action is None:
+            return None, ""
+        if tail:
+            got = _PANEL.tail(code, lo, through)
+            kind = "panel_tail"
+        else:
+            got = _PANEL.frame(code, start, through)
+            kind = "panel_frame"
+    except Exception:
+        return None, ""
+    if got is None:
+        return None, ""
+    return _normalize_fetched(got), kind
+
+
+def _file(code: str) -> Path:
+    return _ROOT / f"{code}.npz"
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=list(COLUMNS), index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+
+def _load_disk(code: str) -> tuple[pd.DataFrame, pd.Timestamp, float] | None:
+    p = _file(code)
+    if not p.exists():
+        return None
+    try:
+        raw = p.read_bytes()
+        with np.load(io.BytesIO(raw), allow_pickle=False) as z:
+            if str(z["schema"]) != SCHEMA or str(z["code"]) != code:
+                raise ValueError("schema/code mismatch")
+            idx = pd.DatetimeIndex(z["date"].astype("datetime64[ns]"), name="Date")
+            df = pd.DataFrame(z["values"], index=idx, columns=list(COLUMNS))
+            span_start = pd.Timestamp(z["span_start"].astype("datetime64[ns]")[()])
+            saved_at = float(z["saved_at"])
+        with _LOCK:
+            _STATS["bytes_read"] += len(raw)
+        return df, span_start, saved_at
+    except Exception:
+        with _LOCK:
+            _STATS["disk_invalid"] += 1
+        return None
+
+
+def _save_disk(code: str, df: pd.DataFrame, span_start: pd.Timestamp, saved_at: float) -> None:
+    p = _file(code)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    buf = io.BytesIO()
+    np.savez(
+        buf,
+        schema=np.array(SCHEMA),
+        code=np.array(code),
+        date=df.index.values.astype("datetime64[D]"),
+        values=df[list(COLUMNS)].to_numpy(dtype="float64"),
+        span_start=np.array(span_start.to_datetime64()).astype("datetime64[D]"),
+        saved_at=np.array(saved_at),
+    )
+    tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(buf.getvalue())
+    os.replace(tmp, p)
+    with _LOCK:
+        _STATS["bytes_written"] += buf.tell()
+
+
+def _normalize_fetched(df: Any) -> pd.DataFrame:
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return _empty_frame()
+    out = df.copy()
+    out.index = pd.to_datetime(out.index, errors="coerce").normalize()
+    out = out[out.index.notna()]
+    out = out[~out.index.duplicated(keep="last")].sort_index()
+    for c in COLUMNS:
+        out[c] = pd.to_numeric(out[c], errors="coerce") if c in out.columns else np.nan
+    out = out[list(COLUMNS)].astype("float64")
+    out.index.name = "Date"
+    return out
+
+
+def _tail_since(local: pd.DataFrame) -> pd.Timestamp:
+    """tail 조회 시작일. 마지막 봉은 장중 저장분일 수 있으므로 그 앞 확정 봉부터 겹쳐 받는다."""
+    return local.index[-2] if len(local) >= 2 else local.index.max()
+
+
+def _overlap_mismatch(local: pd.DataFrame, fresh: pd.DataFrame, saved_at: float) -> bool:
+    """겹치는 확정 봉의 종가/거래량이 저장본과 다르면 True (액면분할·유무상증자 등으로 과거 봉이 수정된 경우).
+
+    저장 시각이 그 봉의 장 마감 전이면(장중 저장분) 값이 달라지는 게 정상이므로 비교에서 뺀다.
+    """
+    if local.empty or fresh.empty:
+        return False
+    common = local.index.intersection(fresh.index)
+    if saved_at and len(common):
+        saved = datetime.fromtimestamp(saved_at, KST).replace(tzinfo=None)
+        common = common[[saved >= _session_close(d) for d in common]]
+    if not len(common):
+        return False
+    for col, env, default in (("Close", "OHLCV_STORE_OVERLAP_CLOSE_TOL", 0.002), ("Volume", "OHLCV_STORE_OVERLAP_VOLUME_TOL", 0.02)):
+        a = local.loc[common, col].to_numpy(dtype="float64")
+        b = fresh.loc[common, col].to_numpy(dtype="float64")
+        ok = np.isnan(a) | np.isnan(b) | np.isclose(b, a, rtol=_env_float(env, default), atol=0.0)
+        if not ok.all():
+            return True
+    return False
+
+
+def _merge_tail(local: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    if fresh.empty:
+        return local
+    if local.empty:
+        merged = fresh
+    else:
+        merged = pd.concat([local[local.index < fresh.index.min()], fresh])
+    # tail fetch의 첫 봉은 Change가 비어 있으므로 전체 종가열 기준으로 보정한다.
+    miss = merged["Change"].isna()
+    if miss.any():
+        merged.loc[miss, "Change"] = merged["Close"].pct_change()[miss]
+    return merged
+
+
+def _fetch(code: str, start: pd.Timestamp, end: pd.Timestamp | None) -> pd.DataFrame | None:
+    fetcher = _FETCHER or _default_fetcher
+    try:
+        df = fetcher(code, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d") if end is not None else None)
+    except Exception:
+        with _LOCK:
+            _STATS["network_error"] += 1
+        return None
+    out = _normalize_fetched(df)
+    with _LOCK:
+        _STATS["rows_fetched"] += len(out)
+    return out
+
+
+def get_history(ticker: Any, days: int = 900, end: Any = None) -> pd.DataFrame:
+    """Return ``days`` calendar days of daily bars ending at ``end`` (default: now), served from local disk.
+
+    Only bars newer than the stored last date are requested from the network; a full download happens only
+    when the ticker is unknown or a longer look-back than ever stored is requested.
+    """
+    code = _norm_code(ticker)
+    if not code:
+        return _empty_frame()
+    now = _now_kst()
+    end_ts = pd.Timestamp(end).normalize() if end not in (None, "") else None
+    anchor = end_ts if end_ts is not None else pd.Timestamp(now)
+    start = (anchor - pd.Timedelta(days=max(1, int(days or 900)))).normalize()
+    historical = end_ts is not None and end_ts < pd.Timestamp(now.date())
+
+    with _code_lock(code):
+        with _LOCK:
+            entry = _MEMORY.get(code)
+        if entry is None:
+            entry = _load_disk(code)
+        local, span_start, saved_at = entry if entry is not None else (_empty_frame(), pd.Timestamp.max, 0.0)
+
+        covers_start = span_start <= start
+        if historical:
+            current = (not local.empty and local.index.max() >= end_ts) or (
+                saved_at > 0 and datetime.fromtimestamp(saved_at, KST).replace(tzinfo=None) >= _session_close(end_ts)
+            )
+        else:
+            current = datetime.fromtimestamp(saved_at, KST).replace(tzinfo=None) >= required_saved_after(now) if saved_at else False
+
+        if covers_start and current:
+            with _LOCK:
+                _STATS["hit"] += 1
+                _MEMORY[code] = (local, span_start, saved_at)
+        else:
+            with _LOCK:
+                _STATS["miss"] += 1
+            fresh, kind = _panel_fetch(code, start, local, covers_start, now)
+            if fresh is not None:
+                if kind == "panel_frame" and not local.empty:
+                    local = local.iloc[0:0]
+            elif kind == "panel_action":
+                # 패널 구간에 액면분할·유무상증자 등이 있다: 미수정 패널 봉 대신 수정주가 전체를 받는다.
+                with _LOCK:
+                    _STATS["panel_action"] += 1
+                    _STATS["adjusted_refetch"] += 1
+                fresh, kind = _fetch(code, start, None), "full_fetch"
+                if fresh is not None and not fresh.empty:
+                    local = local.iloc[0:0]
+                    span_start = start
+                else:
+                    # 재다운로드 실패: 기존 저장본만 돌려주고 다음 호출에서 다시 확인한다.
+                    fresh = None
+            elif covers_start and not local.empty:
+                fresh = _fetch(code, _tail_since(local), None)
+                kind = "tail_fetch"
+            else:
+                fresh = _fetch(code, start, None)
+                kind = "full_fetch"
+                if fresh is not None and not local.empty:
+                    # 더 긴 look-back 재다운로드: 기존 저장분과 겹치지 않는 뒤쪽 봉은 새로 받은 값이 우선한다.
+                    local = local.iloc[0:0]
+            if fresh is not None and kind in ("tail_fetch", "panel_tail") and _overlap_mismatch(local, fresh, saved_at):
+                # 과거 봉이 수정주가로 바뀌었다. 저장본 위에 이어 붙이면 수정/미수정 봉이 섞이므로 전체를 다시 받는다.
+                with _LOCK:
+                    _STATS["adjusted_refetch"] += 1
+                refetched = _fetch(code, start, None)
+                if refetched is None or refetched.empty:
+                    # 재다운로드 실패: 섞인 봉을 저장하지 않고 기존 저장본만 돌려준 뒤 다음 호출에서 다시 시도한다.
+                    fresh = None
+                else:
+                    fresh, kind = refetched, "full_fetch"
+                    local = local.iloc[0:0]
+                    span_start = start
+            if fresh is None:
+                if local.empty:
+                    return _empty_frame()
+            else:
+                with _LOCK:
+                    _STATS[kind] += 1
+                local = _merge_tail(local, fresh)
+                span_start = min(span_start, start)
+                saved_at = time.time()
+                if _env_bool("OHLCV_STORE_DISK_ENABLE", True):
+                    try:
+                        _save_disk(code, local, span_start, saved_at)
+                    except Exception:
+                        pass
+                with _LOCK:
+                    _MEMORY[code] = (local, span_start, saved_at)
+
+    q = local[local.index >= start]
+    if end_ts is not None:
+        q = q[q.index <= end_ts]
+    return q.copy()
+
+
+def reset_stats() -> None:
+    global _RUN_START
+    _RUN_START = time.monotonic()
+    with _LOCK:
+        for k in list(_STATS):
+            _STATS[k] = 0
+
+
+def stats_snapshot() -> dict[str, Any]:
+    with _LOCK:
+        z = dict(_STATS)
+        z["memory_entries"] = len(_MEMORY)
+    total = z["hit"] + z["miss"]
+    z["hit_rate"] = round(z["hit"] / total, 4) if total else 0.0
+    z["network_calls"] = z["tail_fetch"] + z["full_fetch"] + z["network_error"]
+    z["elapsed_sec"] = round(max(0.0, time.monotonic() - _RUN_START), 3)
+    return z
+
+
+def format_stats() -> str:
+    st = stats_snapshot()
+    return (
+        f"📦 OHLCV store: hit {int(st['hit'])} / miss {int(st['miss'])} (hit율 {st['hit_rate']*100:.1f}%) | "
+        f"network tail {int(st['tail_fetch'])} full {int(st['full_fetch'])} error {int(st['network_error'])} "
+        f"adjusted {int(st['adjusted_refetch'])} | "
+        f"panel tail {int(st['panel_tail'])} full {int(st['panel_frame'])} action {int(st['panel_action'])} | "
+        f"read {st['bytes_read']/1e6:.1f}MB write {st['bytes_written']/1e6:.1f}MB | rows fetched {int(st['rows_fetched'])}"
+    )
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+VERSION = "PORTFOLIO_KERNEL_V1"
+RESEARCH_ONLY = True
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# 거래표 한 장을 (신호일, 우선순위키) 순으로 한 번만 정렬·색인하고, 그 위에서
+# (부분집합, fold, 손익열, 하루최대 종목수, 비용bp) 조합을 배열 연산으로 평가하는 공용 커널.
+# - 하루 n종목 선택 = 같은 날 안의 순위 < n (groupby(date).head(n)와 같은 행).
+# - fold = 정렬된 날짜의 searchsorted 구간(between과 같은 양끝 포함).
+# - 비용 변형 = 손익열 - bp/100 (선택은 비용과 무관하므로 한 번만 고른다).
+# - 일별 평균은 pandas groupby().mean()과 같은 보정합(Kahan)으로 계산해 비트 단위로 같다.
+#   월/분기 통계처럼 보고서마다 다른 요약은 호출부가 일별 Series로 기존 식을 그대로 쓴다.
+
+
+def _as_values(frame: pd.DataFrame, v: Any) -> np.ndarray:
+    if isinstance(v, str):
+        s = frame[v] if v in frame.columns else pd.Series(np.nan, index=frame.index)
+        return pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64")
+    if isinstance(v, pd.Series):
+        return pd.to_numeric(v, errors="coerce").to_numpy(dtype="float64")
+    return np.asarray(v, dtype="float64").reshape(-1)
+
+
+def group_mean(group: np.ndarray, rank: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """그룹별 NaN 제외 평균. pandas group_mean과 같은 순서·같은 보정합이라 결과가 같다(값이 없으면 NaN)."""
+    sumx = np.zeros(n_groups)
+    comp = np.zeros(n_groups)
+    nobs = np.zeros(n_groups, dtype=np.int64)
+    ok = ~np.isnan(values)
+    if len(rank):
+        for r in range(int(rank.max()) + 1):
+            m = ok & (rank == r)
+            if not m.any():
+                continue
+            g = group[m]
+            y = values[m] - comp[g]
+            t = sumx[g] + y
+            c = t - sumx[g] - y
+            comp[g] = np.where(np.isnan(c), 0.0, c)
+            sumx[g] = t
+            nobs[g] += 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(nobs > 0, sumx / np.maximum(nobs, 1), np.nan)
+
+
+def max_loss_streak(values: Iterable[Any]) -> int:
+    """연속 음수 최대 길이(NaN은 연속을 끊는다)."""
+    v = np.asarray(list(values) if not isinstance(values, np.ndarray) else values, dtype="float64")
+    if not len(v):
+        return 0
+    neg = v < 0
+    if not neg.any():
+        return 0
+    idx = np.arange(len(v))
+    last_break = np.maximum.accumulate(np.where(~neg, idx, -1))
+    return int((idx - last_break)[neg].max())
+
+
+def period_means(dates: Any, values: Any, freq: str = "M", min_n: int = 1) -> list[tuple[str, int, float]]:
+    """기간(M/Q)별 (라벨, 건수, 평균). 표본이 min_n 미만인 기간은 뺀다. 입력 순서를 기간 안에서 유지한다."""
+    d = pd.DatetimeIndex(pd.to_datetime(dates))
+    v = np.asarray(values, dtype="float64")
+    if not len(d):
+        return []
+    labels = d.to_period(freq).astype(str).to_numpy()
+    uniq, inv = np.unique(labels, return_inverse=True)
+    order = np.argsort(inv, kind="stable")
+    bounds = np.r_[0, np.cumsum(np.bincount(inv, minlength=len(uniq)))]
+    out = []
+    for k, lab in enumerate(uniq):
+        seg = v[order[bounds[k]:bounds[k + 1]]]
+        if len(seg) >= int(min_n):
+            out.append((str(lab), int(len(seg)), float(seg.mean())))
+    return out
+
+
+def leave_one_out_min(dates: Any, values: Any, labels: Iterable[str], freq: str = "M") -> float:
+    """labels의 기간을 하나씩 빼고 나머지 평균을 낸 뒤 그 최솟값(남는 표본이 없으면 건너뛴다)."""
+    d = pd.DatetimeIndex(pd.to_datetime(dates))
+    v = np.asarray(values, dtype="float64")
+    lab = d.to_period(freq).astype(str).to_numpy()
+    out = []
+    for m in labels:
+        rest = v[lab != m]
+        if len(rest):
+            out.append(float(rest.mean()))
+    return min(out) if out else np.nan
+
+
+def max_overlap(starts: Any, ends: Any) -> int:
+    """닫힌 구간 [start, end]들이 끝점 기준으로 최대 몇 개 겹치는지."""
+    a = np.sort(np.asarray(starts, dtype="datetime64[ns]"))
+    b = np.sort(np.asarray(ends, dtype="datetime64[ns]"))
+    if not len(a):
+        return 0
+    pts = np.unique(np.concatenate([a, b]))
+    cnt = np.searchsorted(a, pts, side="right") - np.searchsorted(b, pts, side="left")
+    return int(cnt.max()) if len(cnt) else 0
+
+
+class TradeBook:
+    """거래표를 (신호일, order 키) 순으로 한 번 정렬해 두고 선택/fold/비용 조합을 평가한다.
+
+    order: [(컬럼명|배열, ascending), ...] — 같은 날 안의 우선순위. 정렬은 안정정렬이라
+    pandas ``sort_values(kind='mergesort')`` 와 같은 순서가 된다.
+    """
+
+    def __init__(self, frame: pd.DataFrame, date_col: Any = "signal_date",
+                 order: Sequence[tuple[Any, bool]] = (), valid: Any = None):
+        frame = frame if isinstance(frame, pd.DataFrame) else pd.DataFrame()
+        self.frame = frame
+        raw = frame[date_col] if isinstance(date_col, str) and date_col in frame.columns else (
+            pd.Series(pd.NaT, index=frame.index) if isinstance(date_col, str) else date_col)
+        d = pd.to_datetime(pd.Series(raw, index=frame.index) if not isinstance(raw, pd.Series) else raw, errors="coerce")
+        ok = d.notna().to_numpy().copy()
+        if valid is not None:
+            ok &= np.asarray(valid, dtype=bool)
+        pos = np.flatnonzero(ok)
+        dv = d.to_numpy(dtype="datetime64[ns]")[pos]
+        keys = []
+        for col, asc in reversed(list(order)):
+            k = _as_values(frame, col)[pos]
+            keys.append(k if asc else -k)
+        keys.append(dv.astype(np.int64))
+        srt = np.lexsort(keys) if len(pos) else np.empty(0, dtype=np.int64)
+        self.rows = pos[srt]
+        self.dates = dv[srt]
+        self.index = frame.index[self.rows]
+        new_day = np.r_[True, self.dates[1:] != self.dates[:-1]] if len(self.rows) else np.empty(0, dtype=bool)
+        self.day = np.cumsum(new_day) - 1
+        self.day_dates = self.dates[new_day]
+        self.n_days = int(len(self.day_dates))
+
+    def __len__(self) -> int:
+        return int(len(self.rows))
+
+    def values(self, v: Any) -> np.ndarray:
+        """컬럼명/원본 순서 배열을 정렬 순서 배열로."""
+        return _as_values(self.frame, v)[self.rows]
+
+    def span(self, start: Any = None, end: Any = None) -> np.ndarray:
+        """start <= 날짜 <= end 인 행(정렬 순서 bool)."""
+        lo = 0 if start is None or pd.isna(start) else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), "ns"), side="left"))
+        hi = len(self.rows) if end is None or pd.isna(end) else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), "ns"), side="right"))
+        m = np.zeros(len(self.rows), dtype=bool)
+        m[lo:max(lo, hi)] = True
+        return m
+
+    def _rank(self, mask: np.ndarray) -> np.ndarray:
+        """mask 행 안에서 같은 날 순위(0부터). mask 밖은 큰 값."""
+        c = np.cumsum(mask)
+        day_first = np.searchsorted(self.day, np.arange(self.n_days), side="left")
+        before = np.where(day_first > 0, c[np.maximum(day_first - 1, 0)], 0)
+        r = c - 1 - before[self.day]
+        return np.where(mask, r, np.iinfo(np.int64).max)
+
+    def pick(self, day_limit: int, mask: Any = None) -> np.ndarray:
+        """mask(정렬 순서 bool) 행 중 날짜별 앞에서 day_limit개."""
+        m = np.ones(len(self.rows), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        return m & (self._rank(m) < max(0, int(day_limit)))
+
+    def daily(self, values: Any, picked: Any) -> pd.Series:
+        """선택 행(정렬 순서 bool)의 날짜별 평균 Series(index=날짜). 값이 모두 NaN인 날은 NaN으로 남는다."""
+        v = np.asarray(values, dtype="float64")
+        p = np.asarray(picked, dtype=bool)
+        days = np.unique(self.day[p])
+        if not len(days):
+            return pd.Series([], index=pd.DatetimeIndex([]), dtype="float64")
+        gid = np.searchsorted(days, self.day[p])
+        mean = group_mean(gid, self._rank(p)[p], v[p], len(days))
+        return pd.Series(mean, index=pd.DatetimeIndex(self.day_dates[days]), dtype="float64")
+
+    def cube(self, pnl: Mapping[str, Any], day_limits: Iterable[int] = (1,), cost_bps: Iterable[float] = (0,),
+             folds: Mapping[Any, tuple[Any, Any]] | None = None, subsets: Mapping[Any, Any] | None = None,
+             stats: Callable[[pd.Series, np.ndarray, np.ndarray], dict] | None = None, valid_first: bool = False) -> pd.DataFrame:
+        """(subset, fold, pnl, day_limit, cost_bps) 조합별 한 행의 tidy 결과표.
+
+        stats(daily, picked_values, picked_rows) -> dict 가 없으면 n/days/mean/total/mdd/positive_month/streak 기본 요약.
+        picked_rows는 frame의 위치(iloc) 번호라 보고서별 부가 통계(동시보유 등)를 원본 행에서 계산할 수 있다.
+        valid_first=True 면 손익이 NaN인 행을 선택 전에 뺀다(아니면 선택 후 평균에서만 빠진다).
+        """
+        stats = stats or equity_stats
+        folds = dict(folds or {"ALL": (None, None)})
+        subsets = dict(subsets or {"ALL": None})
+        vals = {k: self.values(v) for k, v in pnl.items()}
+        recs = []
+        for sk, sm in subsets.items():
+            base = np.ones(len(self.rows), dtype=bool) if sm is None else np.asarray(sm, dtype=bool)[self.rows]
+            for fk, (a, b) in folds.items():
+                fm = base & self.span(a, b)
+                for pk, v in vals.items():
+                    m = fm & ~np.isnan(v) if valid_first else fm
+                    for lim in day_limits:
+                        picked = self.pick(int(lim), m)
+                        for cost in cost_bps:
+                            net = v - float(cost) / 100.0 if float(cost) else v
+                            recs.append({"subset": sk, "fold": fk, "pnl": pk, "day_limit": int(lim), "cost_bps": cost,
+                                         **stats(self.daily(net, picked), net[picked], self.rows[picked])})
+        return pd.DataFrame(recs)
+
+
+def equity_stats(daily: pd.Series, picked_values: np.ndarray, picked_rows: Any = None) -> dict[str, Any]:
+    """일별 평균손익 → 복리 누적/MDD/양수월/연속손실일(기본 cube 요약)."""
+    pv = np.asarray(picked_values, dtype="float64")
+    n = int((~np.isnan(pv)).sum())
+    d = daily.dropna()
+    if d.empty:
+        return {"n": n, "days": 0, "mean": np.nan, "total": np.nan, "mdd": np.nan, "positive_month": np.nan, "streak": 0}
+    eq = (1.0 + d / 100.0).cumprod()
+    month = (1.0 + d / 100.0).groupby(d.index.to_period("M")).prod() - 1.0
+    return {"n": n, "days": int(len(d)), "mean": float(np.nanmean(pv)) if n else np.nan,
+            "total": (float(eq.iloc[-1]) - 1.0) * 100.0, "mdd": float(((eq / eq.cummax()) - 1.0).min() * 100.0),
+            "positive_month": float((month > 0).mean() * 100.0) if len(month) else np.nan,
+            "streak": max_loss_streak(d.to_numpy())}
+
+
+def slot_schedule(day_idx: Any, codes: Sequence[Any], n_days: int, day_limit: int, max_positions: int,
+                  cooldown: int, hold_days: int) -> tuple[list[tuple[int, int, int]], int]:
+    """동시보유/종목 cooldown이 있는 하루 n종목 편입 순서.
+
+    후보는 우선순위 순으로 들어오고 day_idx는 달력 위치(-1이면 달력 밖). 비용과 무관하므로
+    한 번 정한 일정(후보번호, 편입일, 청산일)에 비용별 손익만 바꿔 끼운다. 반환: (일정, 최대 동시보유).
+    """
+    di = np.asarray(day_idx, dtype=np.int64)
+    order = np.argsort(di, kind="stable")
+    order = order[di[order] >= 0]
+    active: list[tuple[Any, int]] = []
+    last: dict[Any, int] = {}
+    sched: list[tuple[int, int, int]] = []
+    peak = 0
+    k = 0
+    while k < len(order):
+        i = int(di[order[k]])
+        j = k
+        while j < len(order) and di[order[j]] == i:
+            j += 1
+        active = [a for a in active if a[1] > i]
+        picked = 0
+        for c in order[k:j]:
+            cd = codes[c]
+            if picked >= int(day_limit) or len(active) >= int(max_positions):
+                break
+            if any(a[0] == cd for a in active):
+                continue
+            if cd in last and i - last[cd] < int(cooldown):
+                continue
+            exi = i + int(hold_days)
+            if exi >= int(n_days):
+                continue
+            active.append((cd, exi))
+            sched.append((int(c), i, exi))
+            last[cd] = i
+            picked += 1
+        peak = max(peak, len(active))
+        k = j
+    return sched, peak
+
+
+def slot_returns(sched: Sequence[tuple[int, int, int]], pnl: Any, weight: float, n_days: int) -> np.ndarray:
+    """일정의 청산일마다 weight*(pnl/100)을 편입 순서대로 더한 일별 포트폴리오 수익률."""
+    ret = np.zeros(int(n_days))
+    if sched:
+        v = np.asarray(pnl, dtype="float64")
+        rows = np.fromiter((s[0] for s in sched), dtype=np.int64, count=len(sched))
+        exits = np.fromiter((s[2] for s in sched), dtype=np.int64, count=len(sched))
+        np.add.at(ret, exits, float(weight) * (v[rows] / 100.0))
+    return ret
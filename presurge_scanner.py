@@ -25,6 +25,13 @@ import numpy as np
 import FinanceDataReader as fdr
 from pykrx import stock
 
+# 장중 스트리밍 엔진(intraday_engine.py): 일봉 이력 기준값(BB40폭 순위/OBV/VMA20/전일 매집)은 하루 한 번,
+# 틱마다 전 종목 시세 bulk 1회만 받아 신호 상태를 갱신한다. 없으면 종목별 FDR/pykrx 조회(기존 경로).
+try:
+    import intraday_engine as _intraday
+except Exception:
+    _intraday = None
+
 try:
     from scan_logger import set_log_level, log_info, log_error, log_debug
     set_log_level('NORMAL')
@@ -122,6 +129,16 @@ def _load_krx_listing() -> pd.DataFrame:
     return pd.DataFrame(columns=['Code', 'Name', 'Market'])
 
 
+def _engine_warn(msg: str):
+    """장중 엔진 경고(기준값 파일 없음 등): 로그 + 텔레그램. 엔진이 세션마다 한 번만 부른다."""
+    log_error(msg)
+    send_telegram(msg)
+
+
+if _intraday is not None:
+    _intraday.configure(listing_loader=_load_krx_listing, warn=_engine_warn)
+
+
 
 # 필터 기준
 MIN_PRICE       = 5_000           # 5,000원 미만 제외
@@ -305,8 +322,18 @@ def _mark_alerted(code: str, alerted: dict):
 def _get_snapshot() -> pd.DataFrame:
     """
     전 종목 시세 수집.
-    _load_krx_listing() 사용: 구글시트 → FDR → pykrx 순서로 폴백.
+    장중 엔진이 있으면 엔진 틱(당일 bulk 시세 + 전일 봉, 종목표는 하루 한 번) 사용.
+    없거나 실패하면 _load_krx_listing() 사용: 구글시트 → FDR → pykrx 순서로 폴백.
     """
+    if _intraday is not None and _intraday.enabled():
+        try:
+            df = _intraday.tick()
+            if not df.empty:
+                log_info(f"✅ 시세 로드(엔진): {len(df)}개 종목")
+                return df
+        except Exception as e:
+            log_error(f"⚠️ 장중 엔진 틱 실패: {e}")
+
     df = _load_krx_listing()
     if df is None or df.empty:
         return pd.DataFrame()
@@ -331,6 +358,21 @@ def _get_snapshot() -> pd.DataFrame:
     return df
 
 
+def _engine_state(snapshot: pd.DataFrame, codes: list):
+    """엔진 신호 상태(code 인덱스). 엔진이 없거나 실패하거나 오늘 기준값에 일봉 이력이 없으면(기준값 파일 없이
+    장중 strict로 연 세션) None → 신호 ②/⑤는 종목별 FDR 조회로 계산."""
+    if _intraday is None or not _intraday.enabled():
+        return None
+    try:
+        if not _intraday.history_ready():
+            log_info("  ⚠️ 장중 엔진 기준값에 일봉 이력 없음 → ②/⑤ 종목별 조회")
+            return None
+        return _intraday.signal_state(snapshot, codes)
+    except Exception as e:
+        log_error(f"⚠️ 장중 엔진 신호 상태 실패: {e}")
+        return None
+
+
 # =============================================================
 # 🎯 선제 신호 ① — 오전 거래량 누적 이상
 # =============================================================
@@ -373,8 +415,14 @@ def signal_vol_accumulation(snapshot: pd.DataFrame) -> list:
             return code, 0
 
     prev_vols = {}
+    missing = top_codes
+    if 'prev_volume' in snapshot.columns:
+        # 엔진 스냅샷: 전일 거래량은 장 시작 시 읽은 기준값(전일 봉) 값. 기준값에 없는 종목만 종목별 조회.
+        known = pd.to_numeric(snapshot.set_index('code')['prev_volume'], errors='coerce').dropna()
+        prev_vols = {c: float(known[c]) for c in top_codes if c in known.index}
+        missing = [c for c in top_codes if c not in prev_vols]
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
-        for code, vol in ex.map(_get_prev_vol, top_codes):
+        for code, vol in ex.map(_get_prev_vol, missing):
             prev_vols[code] = vol
 
     for _, row in snapshot.iterrows():
@@ -420,10 +468,30 @@ def signal_vol_accumulation(snapshot: pd.DataFrame) -> list:
 # 🎯 선제 신호 ② — 분봉 BB 에너지 압축
 # =============================================================
 
-def signal_bb_compression(top_codes: list, snapshot_map: dict) -> list:
+def _bb_result(code: str, row: dict, close: float, change: float, amount: float,
+               curr_bb: float, pct_rank: float, obv_rising: bool):
+    if pct_rank > BB_COMPRESS_PCT:
+        return None
+    return {
+        'code':    code,
+        'name':    str(row.get('name', code)),
+        'close':   int(close),
+        'change':  round(change, 1),
+        'amount':  round(amount, 1),
+        'signal_type': '② BB압축응축',
+        'signal_detail': (
+            f"BB40폭 {curr_bb:.1f} (20일 하위 {pct_rank*100:.0f}%) | "
+            f"OBV{'상승↑' if obv_rising else '하락↓'}"
+        ),
+        'score': (1 - pct_rank) * 40 + (10 if obv_rising else 0),
+    }
+
+
+def signal_bb_compression(top_codes: list, snapshot_map: dict, state: pd.DataFrame | None = None) -> list:
     """
     일봉 기준 BB40폭이 최근 20일 중 최저 수준 → 에너지 응축 완료.
     (분봉 API 없으므로 일봉 BB폭 근사)
+    state: 장중 엔진 신호 상태(_engine_state). 있으면 종목별 일봉 조회 없이 판정.
     """
     results = []
     today = _today()
@@ -441,6 +509,13 @@ def signal_bb_compression(top_codes: list, snapshot_map: dict) -> list:
             if change >= 5 or change <= -3:  # 이미 터졌거나 급락 중이면 제외
                 return None
 
+            if state is not None:
+                if code not in state.index or pd.isna(state.at[code, 'bb_rank']):
+                    return None
+                return _bb_result(code, row, close, change, amount,
+                                  float(state.at[code, 'bb_width']), float(state.at[code, 'bb_rank']),
+                                  bool(state.at[code, 'obv_rising']))
+
             df = fdr.DataReader(code, start=start)
             if df is None or len(df) < 25:
                 return None
@@ -464,19 +539,7 @@ def signal_bb_compression(top_codes: list, snapshot_map: dict) -> list:
             obv   = (np.sign(df['Close'].diff()) * df['Volume']).fillna(0).cumsum()
             obv_rising = float(obv.iloc[-1]) > float(obv.iloc[-5])
 
-            return {
-                'code':    code,
-                'name':    str(row.get('name', code)),
-                'close':   int(close),
-                'change':  round(change, 1),
-                'amount':  round(amount, 1),
-                'signal_type': '② BB압축응축',
-                'signal_detail': (
-                    f"BB40폭 {curr_bb:.1f} (20일 하위 {pct_rank*100:.0f}%) | "
-                    f"OBV{'상승↑' if obv_rising else '하락↓'}"
-                ),
-                'score': (1 - pct_rank) * 40 + (10 if obv_rising else 0),
-            }
+            return _bb_result(code, row, close, change, amount, curr_bb, pct_rank, obv_rising)
         except Exception:
             return None
 
@@ -686,7 +749,88 @@ def signal_premarket(snapshot: pd.DataFrame) -> list:
 # 🎯 선제 신호 ⑤ — 전일 종가 세력 매집 징후
 # =============================================================
 
-def signal_prev_accumulation(top_codes: list, snapshot_map: dict) -> list:
+def _prev_acc_result(code: str, row: dict, close: float, change: float, amount: float,
+                     p_open: float, p_high: float, p_low: float, p_close: float, p_vol: float,
+                     prev2_low: float, vol_ma20: float, obv_5d_rising: bool, ma20: float, atr: float):
+    """전일 봉/20일 평균/OBV/ATR 값으로 ⑤ 매집 판정 (일봉 조회 경로와 장중 엔진 경로 공용)."""
+    # ─── 5가지 매집 조건
+    cond_a = p_close > p_open                                      # A. 양봉 마감
+    cond_b = p_vol   > vol_ma20 * 1.5                              # B. 거래량 1.5배+
+    cond_d = p_low   > prev2_low                                   # D. 고저점 상승
+
+    # E. 종가가 고가 90% 이상 (윗꼬리 작음)
+    cond_e = p_high  > 0 and p_close >= p_high * 0.90
+
+    # C. OBV 5일 연속 상승 방향 (종가 기준 누적 방향)
+    cond_c = obv_5d_rising
+
+    score_items = [cond_a, cond_b, cond_c, cond_d, cond_e]
+    score_count = sum(score_items)
+    labels = ['양봉마감', '거래량1.5배', 'OBV5일상승', '고저점상승', '윗꼬리없음']
+    passed = [l for l, c in zip(labels, score_items) if c]
+
+    if score_count < 3:
+        return None
+
+    # 이격도 체크 — 너무 올라있으면 제외
+    disparity = p_close / ma20 * 100 if ma20 > 0 else 100
+    if disparity > 115:
+        return None
+
+    grade = '🏆A급' if score_count == 5 else ('✅B급' if score_count == 4 else '📋C급')
+
+    # 피봇/피보나치/ATR 계산
+    _pivot_r = {}
+    _fib_r   = {}
+    _atr_r   = {}
+    try:
+        _p = (p_high + p_low + p_close) / 3
+        _pivot_r = {
+            'pp': round(_p),
+            'r1': round(2*_p - p_low),
+            'r2': round(_p + (p_high - p_low)),
+            's1': round(2*_p - p_high),
+            's2': round(_p - (p_high - p_low)),
+        }
+        _diff = p_high - p_low
+        if _diff > 0:
+            _fib_r = {
+                'fib_382': round(p_high - _diff * 0.382),
+                'fib_618': round(p_high - _diff * 0.618),
+            }
+        if atr > 0:
+            _atr_r = {
+                'atr_val':   round(float(atr)),
+                'target1':   round(close + atr * 2),
+                'target2':   round(close + atr * 3.5),
+            }
+    except Exception:
+        pass
+
+    return {
+        'code':    code,
+        'name':    str(row.get('name', code)),
+        'close':   int(close),
+        'change':  round(change, 1),
+        'amount':  round(amount, 1),
+        'signal_type': '⑤ 전일매집징후',
+        'signal_detail': (
+            f"{grade} {score_count}/5개 충족 | {' + '.join(passed)} | "
+            f"이격도:{disparity:.0f} | 전일거래:{p_vol/vol_ma20:.1f}배"
+        ),
+        'score':      score_count * 12 + (5 if disparity < 105 else 0),
+        'pivot_pp':   _pivot_r.get('pp', 0),
+        'pivot_r1':   _pivot_r.get('r1', 0),
+        'pivot_s1':   _pivot_r.get('s1', 0),
+        'fib_382':    _fib_r.get('fib_382', 0),
+        'fib_618':    _fib_r.get('fib_618', 0),
+        'atr_val':    _atr_r.get('atr_val', 0),
+        'atr_target1':_atr_r.get('target1', 0),
+        'atr_target2':_atr_r.get('target2', 0),
+    }
+
+
+def signal_prev_accumulation(top_codes: list, snapshot_map: dict, state: pd.DataFrame | None = None) -> list:
     """
     전날 종가 기준으로 세력 매집 흔적 5가지를 복합 판단.
 
@@ -699,6 +843,8 @@ def signal_prev_accumulation(top_codes: list, snapshot_map: dict) -> list:
 
     → 5개 중 4개 이상 충족 = 강한 매집 징후
     → 3개 충족 = 중간 수준 매집 징후
+
+    state: 장중 엔진 신호 상태(_engine_state). 있으면 종목별 일봉 조회 없이 판정.
     """
     results = []
     today = _today()
@@ -718,6 +864,17 @@ def signal_prev_accumulation(top_codes: list, snapshot_map: dict) -> list:
             if change >= 3:
                 return None
 
+            if state is not None:
+                if code not in state.index or not bool(state.at[code, 'acc_ok']):
+                    return None
+                st = state.loc[code]
+                return _prev_acc_result(
+                    code, row, close, change, amount,
+                    float(st['prev_open']), float(st['prev_high']), float(st['prev_low']),
+                    float(st['prev_close']), float(st['prev_volume']), float(st['prev2_low']),
+                    float(st['vol_ma20']), bool(st['obv_5d_rising']), float(st['ma20']), float(st['atr14']),
+                )
+
             # 일봉 데이터 조회
             df = fdr.DataReader(code, start=start)
             if df is None or len(df) < 22:
@@ -728,92 +885,19 @@ def signal_prev_accumulation(top_codes: list, snapshot_map: dict) -> list:
             prev2    = df.iloc[-3]    # 그저께
             vol_ma20 = df['Volume'].tail(20).mean()
 
-            p_open   = float(prev['Open'])
-            p_high   = float(prev['High'])
-            p_low    = float(prev['Low'])
-            p_close  = float(prev['Close'])
-            p_vol    = float(prev['Volume'])
-
-            # ─── 5가지 매집 조건
-            cond_a = p_close > p_open                                      # A. 양봉 마감
-            cond_b = p_vol   > vol_ma20 * 1.5                              # B. 거래량 1.5배+
-            cond_d = p_low   > float(prev2['Low'])                         # D. 고저점 상승
-
-            # E. 종가가 고가 90% 이상 (윗꼬리 작음)
-            cond_e = p_high  > 0 and p_close >= p_high * 0.90
-
-            # C. OBV 5일 연속 상승 방향 (종가 기준 누적 방향)
             obv = (df['Close'].diff().apply(lambda x: 1 if x > 0 else (-1 if x < 0 else 0))
                    * df['Volume']).cumsum()
             obv_5d_rising = all(obv.iloc[-i-1] > obv.iloc[-i-2] for i in range(5))
-            cond_c = obv_5d_rising
 
-            score_items = [cond_a, cond_b, cond_c, cond_d, cond_e]
-            score_count = sum(score_items)
-            labels = ['양봉마감', '거래량1.5배', 'OBV5일상승', '고저점상승', '윗꼬리없음']
-            passed = [l for l, c in zip(labels, score_items) if c]
-
-            if score_count < 3:
-                return None
-
-            # 이격도 체크 — 너무 올라있으면 제외
             ma20 = float(df['Close'].rolling(20).mean().iloc[-1])
-            disparity = p_close / ma20 * 100 if ma20 > 0 else 100
-            if disparity > 115:
-                return None
-
-            grade = '🏆A급' if score_count == 5 else ('✅B급' if score_count == 4 else '📋C급')
+            atr  = df['Close'].diff().abs().rolling(14).mean().iloc[-1]
 
-            # 피봇/피보나치/ATR 계산
-            _pivot_r = {}
-            _fib_r   = {}
-            _atr_r   = {}
-            try:
-                _p = (p_high + p_low + p_close) / 3
-                _pivot_r = {
-                    'pp': round(_p),
-                    'r1': round(2*_p - p_low),
-                    'r2': round(_p + (p_high - p_low)),
-                    's1': round(2*_p - p_high),
-                    's2': round(_p - (p_high - p_low)),
-                }
-                _diff = p_high - p_low
-                if _diff > 0:
-                    _fib_r = {
-                        'fib_382': round(p_high - _diff * 0.382),
-                        'fib_618': round(p_high - _diff * 0.618),
-                    }
-                _atr_s = df['Close'].diff().abs().rolling(14).mean().iloc[-1]
-                if _atr_s > 0:
-                    _atr_r = {
-                        'atr_val':   round(float(_atr_s)),
-                        'target1':   round(close + _atr_s * 2),
-                        'target2':   round(close + _atr_s * 3.5),
-                    }
-            except Exception:
-                pass
-
-            return {
-                'code':    code,
-                'name':    str(row.get('name', code)),
-                'close':   int(close),
-                'change':  round(change, 1),
-                'amount':  round(amount, 1),
-                'signal_type': '⑤ 전일매집징후',
-                'signal_detail': (
-                    f"{grade} {score_count}/5개 충족 | {' + '.join(passed)} | "
-                    f"이격도:{disparity:.0f} | 전일거래:{p_vol/vol_ma20:.1f}배"
-                ),
-                'score':      score_count * 12 + (5 if disparity < 105 else 0),
-                'pivot_pp':   _pivot_r.get('pp', 0),
-                'pivot_r1':   _pivot_r.get('r1', 0),
-                'pivot_s1':   _pivot_r.get('s1', 0),
-                'fib_382':    _fib_r.get('fib_382', 0),
-                'fib_618':    _fib_r.get('fib_618', 0),
-                'atr_val':    _atr_r.get('atr_val', 0),
-                'atr_target1':_atr_r.get('target1', 0),
-                'atr_target2':_atr_r.get('target2', 0),
-            }
+            return _prev_acc_result(
+                code, row, close, change, amount,
+                float(prev['Open']), float(prev['High']), float(prev['Low']),
+                float(prev['Close']), float(prev['Volume']), float(prev2['Low']),
+                vol_ma20, obv_5d_rising, ma20, atr,
+            )
         except Exception as e:
             log_debug(f"⑤ {code} 실패: {e}")
             return None
@@ -879,21 +963,27 @@ def signal_closing_volume(snapshot: pd.DataFrame) -> list:
             if chg > 5 or chg < -3:
                 continue
 
-            # 전일 거래량 조회
-            try:
-                prev_date = (datetime.strptime(today, '%Y%m%d') - timedelta(days=5)).strftime('%Y%m%d')
-                df_prev = stock.get_market_ohlcv(prev_date, today, code)
-                if df_prev is None or len(df_prev) < 2:
-                    continue
-                vol_col  = next((c for c in df_prev.columns
-                                 if c in ('거래량', 'Volume', 'volume')), None)
-                if not vol_col:
-                    continue
-                prev_vol = float(df_prev[vol_col].iloc[-2])
+            # 전일 거래량 조회 (엔진 스냅샷이면 장 시작 시 읽은 기준값의 전일 봉 값, 기준값에 없는 종목만 종목별 조회)
+            prev_vol = pd.to_numeric(row.get('prev_volume'), errors='coerce') if 'prev_volume' in row.index else np.nan
+            if pd.notna(prev_vol):
+                prev_vol = float(prev_vol)
                 if prev_vol <= 0:
                     continue
-            except Exception:
-                continue
+            else:
+                try:
+                    prev_date = (datetime.strptime(today, '%Y%m%d') - timedelta(days=5)).strftime('%Y%m%d')
+                    df_prev = stock.get_market_ohlcv(prev_date, today, code)
+                    if df_prev is None or len(df_prev) < 2:
+                        continue
+                    vol_col  = next((c for c in df_prev.columns
+                                     if c in ('거래량', 'Volume', 'volume')), None)
+                    if not vol_col:
+                        continue
+                    prev_vol = float(df_prev[vol_col].iloc[-2])
+                    if prev_vol <= 0:
+                        continue
+                except Exception:
+                    continue
 
             # 핵심 조건: 현재 거래량 / 전일 거래량 비율
             vol_ratio = volume / prev_vol
@@ -1006,7 +1096,7 @@ def format_presurge_message(hit: dict, scan_time: str) -> str:
 # 🚀 메인 스캔
 # =============================================================
 
-def run_presurge_scan() -> list:
+def run_presurge_scan(snapshot: pd.DataFrame | None = None) -> list:
     now_kst   = datetime.now(KST)
     scan_time = now_kst.strftime('%H:%M')
 
@@ -1020,8 +1110,9 @@ def run_presurge_scan() -> list:
     log_info(f"🎯 선제 급등 스캔: {scan_time}")
     log_info(f"{'='*55}")
 
-    # 시세 스냅샷
-    snapshot = _get_snapshot()
+    # 시세 스냅샷 (엔진 구독 시 틱 스냅샷을 그대로 받음)
+    if snapshot is None or snapshot.empty:
+        snapshot = _get_snapshot()
     if snapshot.empty:
         log_error("⚠️ 시세 수집 실패")
         return []
@@ -1041,6 +1132,9 @@ def run_presurge_scan() -> list:
 
     log_info(f"📊 대상 종목: {len(top_codes)}개")
 
+    # 장중 엔진 신호 상태: ②(상위 200)/⑤(상위 250) 대상의 일봉 기준값은 하루 한 번만 준비된다.
+    state = _engine_state(snapshot, top_codes[:250])
+
     # 4가지 신호 병렬 수집
     all_hits = []
 
@@ -1050,7 +1144,7 @@ def run_presurge_scan() -> list:
     log_info(f"     → {len(hits1)}개")
 
     log_info("  🔋 ② BB 에너지 압축 탐지...")
-    hits2 = signal_bb_compression(top_codes, snapshot_map)
+    hits2 = signal_bb_compression(top_codes, snapshot_map, state)
     all_hits.extend(hits2)
     log_info(f"     → {len(hits2)}개")
 
@@ -1070,7 +1164,7 @@ def run_presurge_scan() -> list:
     log_info(f"     → {len(hits4)}개")
 
     log_info("  🐋 ⑤ 전일 세력매집 징후 탐지...")
-    hits5 = signal_prev_accumulation(top_codes, snapshot_map)
+    hits5 = signal_prev_accumulation(top_codes, snapshot_map, state)
     all_hits.extend(hits5)
     log_info(f"     → {len(hits5)}개")
 
@@ -1129,7 +1223,7 @@ def run_presurge_scan() -> list:
 # 🔄 자동 반복
 # =============================================================
 
-def run_loop(interval: int = 10):
+def run_loop(interval: float = 2):
     log_info(f"🔄 선제 스캐너 시작: {interval}분 간격")
 
     send_telegram(
@@ -1138,6 +1232,17 @@ def run_loop(interval: int = 10):
         f"신호: 거래량누적 | BB압축 | 섹터후행 | 소부장선행 | 갭업출발 | 전일매집 | 종가수급"
     )
 
+    if _intraday is not None and _intraday.enabled():
+        # 엔진 구독: 틱마다 당일 시세만 새로 받고, 일봉 기준값은 장 시작 때 만든 것을 갱신해 쓴다.
+        _intraday.subscribe('presurge', lambda snap: run_presurge_scan(snapshot=snap))
+        try:
+            _intraday.run_loop(interval * 60, log=log_error)
+        except KeyboardInterrupt:
+            log_info("\n🛑 종료")
+            log_info(_intraday.format_stats())
+            send_telegram("🛑 선제 스캐너 종료")
+        return
+
     while True:
         try:
             if datetime.now(KST).weekday() < 5:
@@ -1164,7 +1269,7 @@ def run_loop(interval: int = 10):
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--loop',     action='store_true')
-    parser.add_argument('--interval', default=10, type=int)
+    parser.add_argument('--interval', default=2, type=float)
     parser.add_argument('--test',     action='store_true', help='장외 강제 실행')
     args = parser.parse_args()
 
@@ -0,0 +1,458 @@
+from __future__ import annotations
+
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+import pandas as pd
+
+VERSION = "PRICE_CHUNK_STORE_V1"
+SCHEMA = "PRICE_CHUNK_REFS_1"
+RESEARCH_ONLY = True
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# V20 가격캐시를 내용 주소(content-addressed) 청크로 보관한다.
+# - 종목 일봉을 달력연도 단위로 잘라 불변 청크(objects/<hh>/<hash>.pkl.gz)로 쓴다. 해시는 인덱스/값/컬럼/dtype
+#   기준이라 같은 구간이면 어느 샤드·어느 실행에서 받아도 같은 파일 하나로 합쳐진다.
+# - refs.json 한 개가 "코드_days" → 청크 목록/마지막 날짜를 들고 있어, as-of 커버리지 판정에 청크를 풀 필요가 없다.
+# - 샤드 handoff는 refs.json + 이번 실행(run key)에서 새로 만든 청크만 싣고, 부모 병합은 청크 합집합 + refs 병합이다.
+REFS_FILE = "refs.json"
+OBJECTS_DIR = "objects"
+OBJECT_SUFFIX = ".pkl.gz"
+
+_LOCK = threading.RLock()
+_ROOT = Path(os.getenv("V20_PRICE_CACHE_DIR", "reports/.cache/v20_price_history"))
+_DOC: dict[str, Any] | None = None
+_PENDING = 0
+_RUN_START = time.monotonic()
+_STATS: dict[str, float] = {
+    "ref_hit": 0,
+    "ref_stale": 0,
+    "chunk_read": 0,
+    "chunk_missing": 0,
+    "chunk_written": 0,
+    "chunk_dedup": 0,
+    "bytes_written": 0,
+    "legacy_imported": 0,
+    "refs_flushed": 0,
+}
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = str(os.getenv(name, "1" if default else "0")).strip().lower()
+    return v in {"1", "true", "yes", "y", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(str(os.getenv(name, default)).strip()))
+    except Exception:
+        return int(default)
+
+
+def enabled() -> bool:
+    return _env_bool("V20_PRICE_CHUNK_STORE_ENABLE", True)
+
+
+def run_key() -> str:
+    """이번 실행에서 새로 만든 청크를 묶는 키. Actions에서는 run id/attempt, 로컬은 'local'."""
+    v = os.getenv("V20_PRICE_CHUNK_RUN_KEY", "").strip()
+    if v:
+        return v
+    rid = os.getenv("GITHUB_RUN_ID", "").strip()
+    if rid:
+        return f"{rid}-{os.getenv('GITHUB_RUN_ATTEMPT', '1').strip() or '1'}"
+    return "local"
+
+
+def configure(root: str | Path | None = None) -> None:
+    """저장소 루트를 바꾼다. 메모리에 들고 있던 refs는 먼저 기록하고 비운다."""
+    global _ROOT, _DOC, _PENDING
+    flush()
+    with _LOCK:
+        if root is not None:
+            _ROOT = Path(root)
+        _DOC = None
+        _PENDING = 0
+
+
+def ref_key(code: str, days: int) -> str:
+    return f"{code}_{int(days)}"
+
+
+def object_path(root: str | Path, digest: str) -> Path:
+    return Path(root) / OBJECTS_DIR / digest[:2] / f"{digest}{OBJECT_SUFFIX}"
+
+
+def has_store(root: str | Path) -> bool:
+    return (Path(root) / REFS_FILE).exists()
+
+
+def is_store_path(rel: str | Path) -> bool:
+    """저장소 루트 기준 상대경로가 refs.json/청크인지(legacy 단일 pickle과 구분)."""
+    parts = Path(rel).parts
+    return bool(parts) and (parts[0] == OBJECTS_DIR or (len(parts) == 1 and parts[0].startswith(REFS_FILE)))
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """pickle 바이트가 아니라 내용(인덱스·값·컬럼·dtype) 기준 해시. pandas/gzip 버전이 달라도 같은 구간은 같은 키."""
+    h = hashlib.sha256()
+    h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()], ensure_ascii=False).encode("utf-8"))
+    h.update(str(df.index.dtype).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _day(v: Any) -> str:
+    return pd.Timestamp(v).strftime("%Y-%m-%d")
+
+
+def _split(df: pd.DataFrame) -> list[pd.DataFrame]:
+    idx = pd.to_datetime(df.index, errors="coerce")
+    if idx.isna().any() or not idx.is_monotonic_increasing:
+        return [df]
+    years = idx.year.to_numpy()
+    return [df.iloc[i:j] for i, j in _runs(years)]
+
+
+def _runs(values: Any) -> Iterable[tuple[int, int]]:
+    start = 0
+    for i in range(1, len(values) + 1):
+        if i == len(values) or values[i] != values[start]:
+            yield start, i
+            start = i
+
+
+def _empty_doc() -> dict[str, Any]:
+    return {"schema": SCHEMA, "version": VERSION, "refs": {}, "runs": {}}
+
+
+def read_refs(root: str | Path) -> dict[str, Any]:
+    p = Path(root) / REFS_FILE
+    try:
+        doc = json.loads(p.read_text(encoding="utf-8"))
+        if isinstance(doc, dict) and doc.get("schema") == SCHEMA:
+            doc.setdefault("refs", {})
+            doc.setdefault("runs", {})
+            return doc
+    except Exception:
+        pass
+    return _empty_doc()
+
+
+def write_refs(root: str | Path, doc: dict[str, Any]) -> None:
+    p = Path(root) / REFS_FILE
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(doc, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def _doc() -> dict[str, Any]:
+    global _DOC
+    if _DOC is None:
+        _DOC = read_refs(_ROOT)
+    return _DOC
+
+
+def ref_count(root: str | Path) -> int:
+    return len(read_refs(root).get("refs") or {})
+
+
+def get_ref(code: str, days: int) -> dict[str, Any] | None:
+    with _LOCK:
+        ref = _doc()["refs"].get(ref_key(code, days))
+        return dict(ref) if isinstance(ref, dict) else None
+
+
+def ref_covers(ref: dict[str, Any] | None, required_asof: pd.Timestamp | None) -> bool:
+    if not ref or not ref.get("chunks") or not ref.get("last"):
+        return False
+    if required_asof is None:
+        return True
+    try:
+        ok = pd.Timestamp(ref["last"]).normalize() >= required_asof
+    except Exception:
+        ok = False
+    if not ok:
+        with _LOCK:
+            _STATS["ref_stale"] += 1
+    return ok
+
+
+def _load_object(path: Path) -> pd.DataFrame:
+    with gzip.open(path, "rb") as fh:
+        return pickle.load(fh)
+
+
+def read(code: str, days: int, ref: dict[str, Any] | None = None) -> pd.DataFrame | None:
+    """ref의 청크를 이어 붙여 원래 프레임을 돌려준다. 청크가 하나라도 없거나 깨졌으면 None."""
+    ref = ref if ref is not None else get_ref(code, days)
+    if not ref:
+        return None
+    parts = []
+    for digest in ref.get("chunks") or []:
+        try:
+            parts.append(_load_object(object_path(_ROOT, digest)))
+        except Exception:
+            with _LOCK:
+                _STATS["chunk_missing"] += 1
+            return None
+    with _LOCK:
+        _STATS["chunk_read"] += len(parts)
+        _STATS["ref_hit"] += 1
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else pd.concat(parts)
+
+
+def _write_object(digest: str, part: pd.DataFrame) -> bool:
+    p = object_path(_ROOT, digest)
+    if p.exists():
+        return False
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with gzip.open(tmp, "wb", compresslevel=3) as fh:
+        pickle.dump(part, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    size = tmp.stat().st_size
+    os.replace(tmp, p)
+    with _LOCK:
+        _STATS["bytes_written"] += size
+    return True
+
+
+def put(code: str, days: int, df: pd.DataFrame, fetched_at: str | None = None, legacy: bool = False) -> dict[str, Any] | None:
+    """프레임을 청크로 나눠 없는 청크만 쓰고 ref를 갱신한다. 실패하면 None(캐시는 선택 사항)."""
+    global _PENDING
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return None
+    try:
+        idx = pd.to_datetime(df.index, errors="coerce")
+        idx = idx[idx.notna()]
+        digests, created = [], []
+        for part in _split(df):
+            digest = frame_digest(part)
+            if _write_object(digest, part):
+                created.append(digest)
+            digests.append(digest)
+    except Exception:
+        return None
+    ref = {
+        "code": code,
+        "days": int(days),
+        "chunks": digests,
+        "rows": int(len(df)),
+        "first": _day(idx.min()) if len(idx) else "",
+        "last": _day(idx.max()) if len(idx) else "",
+        "fetched_at": fetched_at or datetime.now(timezone.utc).isoformat(),
+        "run": run_key(),
+    }
+    with _LOCK:
+        doc = _doc()
+        doc["refs"][ref_key(code, days)] = ref
+        if created:
+            doc["runs"].setdefault(run_key(), []).extend(created)
+        _STATS["chunk_written"] += len(created)
+        _STATS["chunk_dedup"] += len(digests) - len(created)
+        if legacy:
+            _STATS["legacy_imported"] += 1
+        _PENDING += 1
+        due = _PENDING >= max(1, _env_int("V20_PRICE_CHUNK_FLUSH_EVERY", 50))
+    if due:
+        flush()
+    return ref
+
+
+def flush() -> bool:
+    """메모리 refs를 refs.json에 원자적으로 기록한다. 디스크 쪽이 더 최신인 ref(다른 프로세스 병합)는 보존한다."""
+    global _PENDING
+    with _LOCK:
+        if _DOC is None or _PENDING <= 0:
+            return False
+        try:
+            disk = read_refs(_ROOT)
+            _merge_doc(_DOC, disk, have=None)
+            write_refs(_ROOT, _DOC)
+            _PENDING = 0
+            _STATS["refs_flushed"] += 1
+            return True
+        except Exception:
+            return False
+
+
+atexit.register(flush)
+
+
+def _newer(a: dict[str, Any], b: dict[str, Any] | None) -> bool:
+    """a가 b를 대체해야 하는지: 마지막 날짜가 더 늦으면 교체, 같으면 기존 유지."""
+    if not isinstance(b, dict):
+        return True
+    return str(a.get("last") or "") > str(b.get("last") or "")
+
+
+def _merge_doc(dst: dict[str, Any], src: dict[str, Any], have: Any) -> dict[str, int]:
+    """src refs/runs를 dst에 합친다. have(digest)->bool 이 주어지면 청크가 모두 있는 ref만 받는다."""
+    out = {"refs_added": 0, "refs_updated": 0, "refs_kept": 0, "refs_incomplete": 0}
+    for key, ref in (src.get("refs") or {}).items():
+        if not isinstance(ref, dict):
+            continue
+        cur = dst["refs"].get(key)
+        if not _newer(ref, cur):
+            out["refs_kept"] += 1
+            continue
+        if have is not None and not all(have(d) for d in ref.get("chunks") or []):
+            out["refs_incomplete"] += 1
+            continue
+        dst["refs"][key] = ref
+        out["refs_added" if cur is None else "refs_updated"] += 1
+    for rk, digests in (src.get("runs") or {}).items():
+        merged = dst["runs"].setdefault(rk, [])
+        seen = set(merged)
+        merged.extend(d for d in digests or [] if d not in seen)
+    return out
+
+
+def handoff_members(root: str | Path, run: str | None = None) -> list[tuple[str, Path | bytes]]:
+    """샤드 handoff에 실을 (루트 기준 상대경로, 파일 또는 바이트) 목록.
+
+    이번 run에서 갱신한 ref만 담은 refs.json + 이번 run에서 새로 만든 청크. 이전 실행에서 이미 있던 청크는
+    부모 캐시에도 있을 가능성이 높아 싣지 않는다(부모에 없으면 그 ref는 병합되지 않고 다음 조회 때 다시 받는다).
+    로컬 실행(run key 'local')은 실행 경계가 없으므로 참조 중인 ref/청크를 모두 싣는다.
+    """
+    root = Path(root)
+    if root == _ROOT:
+        flush()
+    doc = read_refs(root)
+    if not doc["refs"]:
+        return []
+    run = run or run_key()
+    if run == "local":
+        refs = doc["refs"]
+        digests = sorted({d for ref in refs.values() for d in ref.get("chunks") or []})
+    else:
+        refs = {k: r for k, r in doc["refs"].items() if r.get("run") == run}
+        digests = list(dict.fromkeys(doc["runs"].get(run) or []))
+    manifest = {**_empty_doc(), "refs": refs, "runs": {run: digests}}
+    members: list[tuple[str, Path | bytes]] = [(REFS_FILE, json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))]
+    for d in digests:
+        p = object_path(root, d)
+        if p.exists():
+            members.append((p.relative_to(root).as_posix(), p))
+    return members
+
+
+def merge_store(src_root: str | Path, dst_root: str | Path) -> dict[str, int]:
+    """src 저장소(샤드 handoff 압축해제본)를 dst에 합친다. 청크는 없는 것만 복사, refs는 마지막 날짜가 늦은 쪽."""
+    global _DOC
+    src_root, dst_root = Path(src_root), Path(dst_root)
+    out = {"objects_copied": 0, "objects_present": 0}
+    src_doc = read_refs(src_root)
+    obj_root = src_root / OBJECTS_DIR
+    if obj_root.exists():
+        for p in obj_root.glob(f"*/*{OBJECT_SUFFIX}"):
+            dst = object_path(dst_root, p.name[: -len(OBJECT_SUFFIX)])
+            if dst.exists():
+                out["objects_present"] += 1
+                continue
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dst.with_name(dst.name + f".{os.getpid()}.tmp")
+            shutil.copy2(p, tmp)
+            os.replace(tmp, dst)
+            out["objects_copied"] += 1
+    with _LOCK:
+        live = _DOC is not None and dst_root == _ROOT
+        if live:
+            flush()
+        dst_doc = read_refs(dst_root)
+        out.update(_merge_doc(dst_doc, src_doc, have=lambda d: object_path(dst_root, d).exists()))
+        write_refs(dst_root, dst_doc)
+        if live:
+            _DOC = None
+    return out
+
+
+def prune(root: str | Path | None = None, max_refs: int = 1800, min_object_age_sec: int = 6 * 3600) -> dict[str, int]:
+    """오래된 ref(fetched_at 순)를 max_refs까지 줄이고, 어떤 ref도 가리키지 않는 오래된 청크를 지운다."""
+    global _DOC
+    root = Path(root) if root is not None else _ROOT
+    out = {"refs_dropped": 0, "objects_removed": 0}
+    with _LOCK:
+        if root == _ROOT:
+            flush()
+        doc = read_refs(root)
+        refs = doc["refs"]
+        if len(refs) > max(1, max_refs):
+            order = sorted(refs, key=lambda k: str(refs[k].get("fetched_at") or ""), reverse=True)
+            for k in order[max(1, max_refs):]:
+                refs.pop(k, None)
+                out["refs_dropped"] += 1
+        live = {d for ref in refs.values() for d in ref.get("chunks") or []}
+        for rk in list(doc["runs"]):
+            kept = [d for d in doc["runs"][rk] if d in live]
+            if kept:
+                doc["runs"][rk] = kept
+            else:
+                doc["runs"].pop(rk)
+        if out["refs_dropped"] or refs:
+            write_refs(root, doc)
+        if root == _ROOT:
+            _DOC = None
+    cutoff = time.time() - max(0, min_object_age_sec)
+    obj_root = root / OBJECTS_DIR
+    if obj_root.exists():
+        for p in obj_root.glob(f"*/*{OBJECT_SUFFIX}"):
+            if p.name[: -len(OBJECT_SUFFIX)] in live:
+                continue
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+                    out["objects_removed"] += 1
+            except Exception:
+                pass
+    return out
+
+
+def disk_summary(root: str | Path | None = None) -> dict[str, int]:
+    root = Path(root) if root is not None else _ROOT
+    objs = list((root / OBJECTS_DIR).glob(f"*/*{OBJECT_SUFFIX}")) if (root / OBJECTS_DIR).exists() else []
+    return {
+        "refs": ref_count(root),
+        "objects": len(objs),
+        "object_bytes": sum(p.stat().st_size for p in objs),
+    }
+
+
+def reset_stats() -> None:
+    global _RUN_START
+    _RUN_START = time.monotonic()
+    with _LOCK:
+        for k in list(_STATS):
+            _STATS[k] = 0
+
+
+def stats_snapshot() -> dict[str, Any]:
+    with _LOCK:
+        z = dict(_STATS)
+        z["refs"] = len(_doc()["refs"])
+        z["run_key"] = run_key()
+    z["elapsed_sec"] = round(max(0.0, time.monotonic() - _RUN_START), 3)
+    return z
+
+
+def format_stats() -> str:
+    st = stats_snapshot()
+    return (
+        f"🧩 가격 청크: ref {int(st['refs'])} · 적중 {int(st['ref_hit'])} · 기간부족 {int(st['ref_stale'])} | "
+        f"청크 신규 {int(st['chunk_written'])} · 중복제거 {int(st['chunk_dedup'])} · 누락 {int(st['chunk_missing'])} | "
+        f"legacy 이관 {int(st['legacy_imported'])} | {round(st['bytes_written'] / 1e6, 1)}MB 기록"
+    )
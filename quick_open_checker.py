@@ -32,6 +32,7 @@ Stock-Hunter 정규장 초반 빠른 확인용 미니 검색기
 python quick_open_checker.py
 python quick_open_checker.py --candidate-file today_candidates.json
 python quick_open_checker.py --codes "277810,049950,448280" --send-telegram
+python quick_open_checker.py --build-daily-cache   # 장 마감 후 다음 거래일용 일봉 사전 캐시
 
 필수 패키지
 - requests, beautifulsoup4, pandas
@@ -47,9 +48,11 @@ import math
 import os
 import re
 import sys
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
@@ -57,6 +60,11 @@ import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 
+try:
+    import http_pool
+except Exception:
+    http_pool = None
+
 try:
     import pytz
 except Exception:  # pragma: no cover
@@ -67,6 +75,16 @@ try:
 except Exception:  # pragma: no cover
     fdr = None
 
+try:
+    import market_panel as _market_panel
+except Exception:  # pragma: no cover
+    _market_panel = None
+
+try:
+    import krx_calendar as _krx_cal
+except Exception:  # pragma: no cover
+    _krx_cal = None
+
 KST_NAME = "Asia/Seoul"
 REAL_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -418,7 +436,11 @@ def load_nxt_snapshot(path: Path) -> Dict[str, NxtInfo]:
 # ─────────────────────────────────────────────────────────────────────────────
 
 def request_get(url: str, params: Optional[Dict[str, Any]] = None, timeout: int = 7) -> requests.Response:
-    res = requests.get(url, params=params, headers=REAL_HEADERS, timeout=timeout)
+    # 공용 세션 풀(호스트별 keep-alive + 토큰버킷 + 지터 재시도). 없으면 requests.get.
+    if http_pool is not None:
+        res = http_pool.get(url, params=params, headers=REAL_HEADERS, timeout=timeout)
+    else:
+        res = requests.get(url, params=params, headers=REAL_HEADERS, timeout=timeout)
     res.raise_for_status()
     return res
 
@@ -511,19 +533,24 @@ def fetch_quote_naver(code: str) -> QuoteInfo:
         return q
 
 
-def fetch_daily_fdr(code: str, lookback_days: int = 80) -> DailyInfo:
+def fetch_daily_fdr(code: str, lookback_days: int = 80, through: Optional[date] = None) -> DailyInfo:
+    """through를 주면 그 날짜까지의 확정봉을 기준으로 쓴다(장 마감 후 사전 캐시 생성용)."""
     d = DailyInfo(code=code, source="")
     if fdr is None:
         return d
     try:
-        end = now_kst().date()
+        end = through or now_kst().date()
         start = end - timedelta(days=lookback_days * 2)
         df = fdr.DataReader(code, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
         if df is None or df.empty:
             return d
         df = df.rename(columns={c: c.capitalize() for c in df.columns})
+        if through is not None:
+            base = df[pd.DatetimeIndex(df.index).normalize() <= pd.Timestamp(through)].copy()
+            if base.empty:
+                return d
         # 당일 데이터가 포함되어도 정규장 초반에는 전일 확정봉 기준이 필요하므로 마지막 1개 제외 시도
-        if len(df) >= 2:
+        elif len(df) >= 2:
             base = df.iloc[:-1].copy()
             if base.empty:
                 base = df.copy()
@@ -543,7 +570,7 @@ def fetch_daily_fdr(code: str, lookback_days: int = 80) -> DailyInfo:
         return d
 
 
-def fetch_daily_naver(code: str) -> DailyInfo:
+def fetch_daily_naver(code: str, through: Optional[date] = None) -> DailyInfo:
     """FDR 실패 시 Naver 일별시세 2~3페이지에서 전일/평균 거래량 대체."""
     d = DailyInfo(code=code, source="")
     try:
@@ -566,7 +593,9 @@ def fetch_daily_naver(code: str) -> DailyInfo:
         today_str = now_kst().strftime("%Y.%m.%d")
         if "날짜" in df.columns:
             df["날짜"] = df["날짜"].astype(str)
-            if str(df.iloc[0]["날짜"]) == today_str and len(df) >= 2:
+            if through is not None:
+                base = df[df["날짜"] <= through.strftime("%Y.%m.%d")].copy()
+            elif str(df.iloc[0]["날짜"]) == today_str and len(df) >= 2:
                 base = df.iloc[1:].copy()
             else:
                 base = df.copy()
@@ -591,11 +620,11 @@ def fetch_daily_naver(code: str) -> DailyInfo:
         return d
 
 
-def fetch_daily_info(code: str) -> DailyInfo:
-    d = fetch_daily_fdr(code)
+def fetch_daily_info(code: str, through: Optional[date] = None) -> DailyInfo:
+    d = fetch_daily_fdr(code, through=through)
     if d.prev_close:
         return d
-    return fetch_daily_naver(code)
+    return fetch_daily_naver(code, through=through)
 
 
 def fetch_minute_naver(code: str, window_min: int = 5) -> MinuteInfo:
@@ -689,6 +718,283 @@ def fetch_minute_naver(code: str, window_min: int = 5) -> MinuteInfo:
         return m
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# 일봉 사전 캐시 (전일 저녁 생성 → 장 초반엔 조회 없이 사용)
+# ─────────────────────────────────────────────────────────────────────────────
+
+DAILY_CACHE_SCHEMA = "quick_daily_v1"
+DAILY_CACHE_FILE = os.getenv("QUICK_DAILY_CACHE", "reports/.cache/quick_open/daily_cache.json")
+DAILY_FIELDS = ("prev_close", "prev_high", "prev_low", "ma5", "ma20", "vma20", "high20")
+
+
+def last_completed_session(now: Optional[datetime] = None) -> date:
+    """가장 최근 마감된 거래일. 장 마감(15:30) 전이면 전 거래일."""
+    now = now or now_kst()
+    today = pd.Timestamp(now.date())
+    closed = (now.hour, now.minute) >= (15, 30)
+    if _krx_cal is not None:
+        try:
+            if closed and _krx_cal.is_session(today):
+                return today.date()
+            prev = _krx_cal.prev_session(today)
+            if prev is not None:
+                return pd.Timestamp(prev).date()
+        except Exception:
+            pass
+    if closed and today.weekday() < 5:
+        return today.date()
+    d = today - pd.Timedelta(days=1)
+    while d.weekday() >= 5:
+        d -= pd.Timedelta(days=1)
+    return d.date()
+
+
+def _panel_daily(through: date) -> Dict[str, DailyInfo]:
+    """market_panel 최근 20거래일 행렬로 전 종목 DailyInfo를 한 번에 계산한다.
+
+    패널은 미수정 가격이므로 그 20거래일 안에 기준가 조정(액면분할·유무상증자 등)이 있거나 확인할 수 없는 종목은
+    빼고 돌려준다. build_daily_cache가 그 종목을 종목별(FDR 수정주가/Naver)로 다시 조회한다.
+    """
+    if _market_panel is None or not _market_panel.enabled():
+        return {}
+    try:
+        mat = _market_panel.recent_matrix(21)
+    except Exception:
+        return {}
+    if not mat:
+        return {}
+    keep = mat["Close"].index <= pd.Timestamp(through)
+    fr = {k: mat[k].loc[keep].tail(20) for k in ("High", "Low", "Close", "Volume", "Change") if k in mat}
+    if fr["Close"].empty or fr["Close"].index[-1] != pd.Timestamp(through):
+        return {}
+    adjusted = set(_market_panel.action_codes(fr))
+    last = {k: fr[k].iloc[-1] for k in ("High", "Low", "Close")}
+    ma5 = fr["Close"].tail(5).mean()
+    ma20 = fr["Close"].mean()
+    vma20 = fr["Volume"].mean()
+    high20 = fr["High"].max()
+    out: Dict[str, DailyInfo] = {}
+
+    def whole(x: Any) -> int:
+        # 패널 값은 float이다. to_int는 Naver 문자열용이라 "20000.0"을 200000으로 읽으므로 쓰지 않는다.
+        return int(x) if pd.notna(x) else 0
+
+    for col in fr["Close"].columns:
+        close = last["Close"][col]
+        if not close or pd.isna(close) or col in adjusted:
+            continue
+        code = normalize_code(col)
+        out[code] = DailyInfo(
+            code=code,
+            prev_close=int(close),
+            prev_high=whole(last["High"][col]),
+            prev_low=whole(last["Low"][col]),
+            ma5=to_float(ma5[col]),
+            ma20=to_float(ma20[col]),
+            vma20=to_float(vma20[col]),
+            high20=whole(high20[col]),
+            source="panel",
+        )
+    return out
+
+
+def build_daily_cache(codes: Iterable[str], path: Path, now: Optional[datetime] = None, workers: int = 4) -> Dict[str, Any]:
+    """장 마감 후 다음 거래일 장 초반용 일봉 기준값 파일을 만든다.
+
+    전 종목은 market_panel에서 한 번에 채우고, 패널에 없거나 최근 20거래일에 기준가 조정이 있는 후보만 FDR/Naver로 병렬 조회한다.
+    """
+    through = last_completed_session(now)
+    items = _panel_daily(through)
+    missing = [c for c in dict.fromkeys(normalize_code(x) for x in codes) if c and c not in items]
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="quick-daily") as pool:
+            for d in pool.map(lambda c: fetch_daily_info(c, through=through), missing):
+                if d.prev_close:
+                    items[d.code] = d
+    payload = {
+        "schema": DAILY_CACHE_SCHEMA,
+        "through": through.isoformat(),
+        "built_at": (now or now_kst()).isoformat(timespec="seconds"),
+        "items": {c: [getattr(d, k) for k in DAILY_FIELDS] + [d.source] for c, d in items.items()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    return {"through": payload["through"], "count": len(items), "fetched": len(missing)}
+
+
+def load_daily_cache(path: Path, now: Optional[datetime] = None) -> Dict[str, DailyInfo]:
+    """전 거래일 기준으로 만들어진 캐시만 쓴다. 없거나 날짜가 다르면 빈 dict."""
+    data = read_json_file(path, default=None)
+    if not isinstance(data, dict) or data.get("schema") != DAILY_CACHE_SCHEMA:
+        return {}
+    if data.get("through") != last_completed_session(now).isoformat():
+        return {}
+    out: Dict[str, DailyInfo] = {}
+    for code, row in (data.get("items") or {}).items():
+        try:
+            vals = dict(zip(DAILY_FIELDS, row))
+            out[code] = DailyInfo(
+                code=code,
+                prev_close=int(vals["prev_close"]),
+                prev_high=int(vals["prev_high"]),
+                prev_low=int(vals["prev_low"]),
+                ma5=float(vals["ma5"]),
+                ma20=float(vals["ma20"]),
+                vma20=float(vals["vma20"]),
+                high20=int(vals["high20"]),
+                source=f"cache:{row[len(DAILY_FIELDS)]}",
+            )
+        except Exception:
+            continue
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 동시 조회 파이프라인
+# ─────────────────────────────────────────────────────────────────────────────
+
+# 호스트별 동시 요청 수. QUICK_HOST_LIMIT_<HOST(점→밑줄, 대문자)> 로 덮어쓸 수 있다.
+# 초당 요청 수는 http_pool 토큰버킷이 따로 제한한다.
+DEFAULT_HOST_LIMITS: Dict[str, int] = {
+    "finance.naver.com": 6,
+    "api.finance.naver.com": 4,
+    "fdr": 4,
+}
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 4000)
+
+_LOCK = threading.Lock()
+_LATENCY: Dict[str, List[float]] = {}
+
+
+def host_limit(host: str) -> int:
+    env = "QUICK_HOST_LIMIT_" + re.sub(r"[^0-9A-Za-z]", "_", host).upper()
+    default = DEFAULT_HOST_LIMITS.get(host, 4)
+    return max(1, to_int(os.getenv(env, default), default))
+
+
+def record_latency(source: str, sec: float) -> None:
+    with _LOCK:
+        _LATENCY.setdefault(source, []).append(sec * 1000.0)
+
+
+def _timed(source: str, fn: Any, *args: Any, **kwargs: Any) -> Any:
+    t0 = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        record_latency(source, time.perf_counter() - t0)
+
+
+def latency_histograms() -> Dict[str, Dict[str, Any]]:
+    """소스별 지연(ms) 분포: 건수, p50/p90/max, 구간별 건수."""
+    with _LOCK:
+        data = {k: sorted(v) for k, v in _LATENCY.items()}
+    out: Dict[str, Dict[str, Any]] = {}
+    for source, xs in data.items():
+        if not xs:
+            continue
+        labels = [f"<{b}ms" for b in LATENCY_BUCKETS_MS] + [f">={LATENCY_BUCKETS_MS[-1]}ms"]
+        buckets = dict.fromkeys(labels, 0)
+        for x in xs:
+            idx = next((i for i, b in enumerate(LATENCY_BUCKETS_MS) if x < b), len(LATENCY_BUCKETS_MS))
+            buckets[labels[idx]] += 1
+        out[source] = {
+            "n": len(xs),
+            "p50_ms": round(xs[int(0.5 * (len(xs) - 1))], 1),
+            "p90_ms": round(xs[int(0.9 * (len(xs) - 1))], 1),
+            "max_ms": round(xs[-1], 1),
+            "buckets": buckets,
+        }
+    return out
+
+
+def format_latency() -> str:
+    parts = [
+        f"{k} {v['n']}건 p50 {v['p50_ms']:.0f}ms p90 {v['p90_ms']:.0f}ms max {v['max_ms']:.0f}ms"
+        for k, v in latency_histograms().items()
+    ]
+    return "⏱️ 조회 지연 | " + (" · ".join(parts) if parts else "기록 없음")
+
+
+def fetch_all(
+    codes: List[str],
+    daily_cache: Dict[str, DailyInfo],
+    use_minute: bool = True,
+    window_min: int = 5,
+    minute_grace: float = 1.5,
+    on_quote: Any = None,
+) -> Tuple[Dict[str, QuoteInfo], Dict[str, DailyInfo], Dict[str, MinuteInfo]]:
+    """후보 전체의 시세/일봉/분봉을 호스트별 풀에서 동시에 조회한다.
+
+    일봉은 사전 캐시에 없는 종목만 조회하고(FDR → 실패 시 Naver), 시세와 일봉이 모두 모이면
+    분봉은 minute_grace초만 더 기다린 뒤 남은 것은 미수신으로 두고 바로 돌려준다.
+    """
+    pools = {h: ThreadPoolExecutor(max_workers=host_limit(h), thread_name_prefix=f"quick-{h}") for h in DEFAULT_HOST_LIMITS}
+    naver, api = pools["finance.naver.com"], pools["api.finance.naver.com"]
+    quotes: Dict[str, QuoteInfo] = {}
+    daily: Dict[str, DailyInfo] = {c: daily_cache[c] for c in codes if c in daily_cache}
+    minutes: Dict[str, MinuteInfo] = {}
+    meta: Dict[Future, Tuple[str, str]] = {}
+
+    def submit(pool: ThreadPoolExecutor, kind: str, code: str, source: str, fn: Any, *args: Any, **kwargs: Any) -> None:
+        meta[pool.submit(_timed, source, fn, code, *args, **kwargs)] = (kind, code)
+
+    try:
+        for code in codes:
+            submit(naver, "quote", code, "quote", fetch_quote_naver)
+        for code in codes:
+            if code in daily:
+                continue
+            if fdr is not None:
+                submit(pools["fdr"], "daily_fdr", code, "daily_fdr", fetch_daily_fdr)
+            else:
+                submit(naver, "daily", code, "daily_naver", fetch_daily_naver)
+        if use_minute:
+            for code in codes:
+                submit(api, "minute", code, "minute", fetch_minute_naver, window_min=window_min)
+
+        pending = set(meta)
+        deadline: Optional[float] = None
+        while pending:
+            if deadline is None and not any(meta[f][0] != "minute" for f in pending):
+                deadline = time.monotonic() + max(0.0, minute_grace)
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for f in done:
+                kind, code = meta[f]
+                err = ""
+                try:
+                    res = f.result()
+                except Exception as e:
+                    res = None
+                    err = str(e)
+                if kind == "quote":
+                    quotes[code] = res if res is not None else QuoteInfo(code=code, source="naver", error=err)
+                    if on_quote is not None:
+                        on_quote(code, len(quotes), len(codes))
+                elif kind == "daily_fdr" and (res is None or not res.prev_close):
+                    nf = naver.submit(_timed, "daily_naver", fetch_daily_naver, code)
+                    meta[nf] = ("daily", code)
+                    pending.add(nf)
+                elif kind in ("daily", "daily_fdr"):
+                    daily[code] = res if res is not None else DailyInfo(code=code)
+                else:
+                    minutes[code] = res if res is not None else MinuteInfo(code=code, source="naver_minute", error=err)
+        for code in codes:
+            if use_minute and code not in minutes:
+                minutes[code] = MinuteInfo(code=code, source="naver_minute", error="분봉 대기시간 초과")
+            minutes.setdefault(code, MinuteInfo(code=code))
+            daily.setdefault(code, DailyInfo(code=code))
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+    return quotes, daily, minutes
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 판정 로직
 # ─────────────────────────────────────────────────────────────────────────────
@@ -1081,6 +1387,47 @@ def send_telegram(text: str) -> bool:
 # 실행부
 # ─────────────────────────────────────────────────────────────────────────────
 
+def check_candidate(
+    c: Candidate,
+    q: QuoteInfo,
+    d: DailyInfo,
+    minute: MinuteInfo,
+    nxt: Optional[NxtInfo],
+    th: Thresholds,
+) -> CheckResult:
+    # 시세 실패해도 결과에 남김
+    if not q.ok:
+        return CheckResult(
+            code=c.code,
+            name=c.name or c.code,
+            status=c.status,
+            grade=c.grade,
+            source=c.source,
+            price=0,
+            change_rate=0.0,
+            amount_b=0.0,
+            prev_close=d.prev_close,
+            prev_high=d.prev_high,
+            ma5=round(d.ma5, 2),
+            vma20=round(d.vma20, 2),
+            volume_ratio_daily=0.0,
+            early_amount_b=0.0,
+            early_volume_ratio=0.0,
+            nxt_price=nxt.nxt_price if nxt else 0,
+            nxt_high=nxt.nxt_high if nxt else 0,
+            structure="시세조회실패",
+            trade_decision="제외",
+            action="시세 확인 실패",
+            score=0,
+            reasons=[],
+            warnings=[q.error or "시세 확인 실패"],
+            conditions=["재조회 필요"],
+            meaning="현재가를 확인하지 못해 매매 판단에서 제외합니다.",
+            raw={"candidate": c.raw or {}, "quote": asdict(q), "daily": asdict(d), "minute": asdict(minute), "nxt": asdict(nxt) if nxt else None},
+        )
+    return judge_candidate(c, q, d, minute, nxt, th)
+
+
 def run(args: argparse.Namespace) -> Tuple[List[CheckResult], str]:
     th = Thresholds(
         min_amount_b=args.min_amount_b,
@@ -1110,49 +1457,37 @@ def run(args: argparse.Namespace) -> Tuple[List[CheckResult], str]:
     if args.limit and args.limit > 0:
         candidates = candidates[: args.limit]
 
+    daily_cache = load_daily_cache(Path(args.daily_cache))
+    if not args.quiet:
+        print(f"[QUICK] 일봉 사전 캐시 {len(daily_cache)}종목 ({args.daily_cache})")
+
     results: List[CheckResult] = []
-    for idx, c in enumerate(candidates, 1):
-        if not args.quiet:
-            print(f"[{idx}/{len(candidates)}] {c.name}({c.code}) 확인 중...")
-        q = fetch_quote_naver(c.code)
-        d = fetch_daily_info(c.code)
-        minute = fetch_minute_naver(c.code, window_min=args.window_min) if args.use_minute else MinuteInfo(code=c.code)
-        nxt = nxt_map.get(c.code)
-
-        # 시세 실패해도 결과에 남김
-        if not q.ok:
-            r = CheckResult(
-                code=c.code,
-                name=c.name or c.code,
-                status=c.status,
-                grade=c.grade,
-                source=c.source,
-                price=0,
-                change_rate=0.0,
-                amount_b=0.0,
-                prev_close=d.prev_close,
-                prev_high=d.prev_high,
-                ma5=round(d.ma5, 2),
-                vma20=round(d.vma20, 2),
-                volume_ratio_daily=0.0,
-                early_amount_b=0.0,
-                early_volume_ratio=0.0,
-                nxt_price=nxt.nxt_price if nxt else 0,
-                nxt_high=nxt.nxt_high if nxt else 0,
-                structure="시세조회실패",
-                trade_decision="제외",
-                action="시세 확인 실패",
-                score=0,
-                reasons=[],
-                warnings=[q.error or "시세 확인 실패"],
-                conditions=["재조회 필요"],
-                meaning="현재가를 확인하지 못해 매매 판단에서 제외합니다.",
-                raw={"candidate": c.raw or {}, "quote": asdict(q), "daily": asdict(d), "minute": asdict(minute), "nxt": asdict(nxt) if nxt else None},
-            )
-        else:
-            r = judge_candidate(c, q, d, minute, nxt, th)
-        results.append(r)
-        time.sleep(args.sleep)
+    if args.sequential:
+        for idx, c in enumerate(candidates, 1):
+            if not args.quiet:
+                print(f"[{idx}/{len(candidates)}] {c.name}({c.code}) 확인 중...")
+            q = _timed("quote", fetch_quote_naver, c.code)
+            d = daily_cache.get(c.code) or _timed("daily", fetch_daily_info, c.code)
+            minute = _timed("minute", fetch_minute_naver, c.code, window_min=args.window_min) if args.use_minute else MinuteInfo(code=c.code)
+            results.append(check_candidate(c, q, d, minute, nxt_map.get(c.code), th))
+            time.sleep(args.sleep)
+    else:
+        names = {c.code: c.name for c in candidates}
+
+        def on_quote(code: str, n: int, total: int) -> None:
+            if not args.quiet:
+                print(f"[{n}/{total}] {names.get(code, code)}({code}) 시세 수신")
+
+        quotes, daily, minutes = fetch_all(
+            [c.code for c in candidates],
+            daily_cache,
+            use_minute=args.use_minute,
+            window_min=args.window_min,
+            minute_grace=args.minute_grace,
+            on_quote=on_quote,
+        )
+        for c in candidates:
+            results.append(check_candidate(c, quotes[c.code], daily[c.code], minutes[c.code], nxt_map.get(c.code), th))
 
     report = format_report(results)
     return results, report
@@ -1173,7 +1508,12 @@ def build_arg_parser() -> argparse.ArgumentParser:
     p.add_argument("--min-daily-vratio", type=float, default=float(os.getenv("QUICK_MIN_DAILY_VRATIO", "0.06")), help="누적 거래량/VMA20 최소 비율")
     p.add_argument("--overheat-disparity", type=float, default=float(os.getenv("QUICK_OVERHEAT_DISP", "116")), help="전일종가 대비 과열 기준")
     p.add_argument("--upper-wick-warn", type=float, default=float(os.getenv("QUICK_UPPER_WICK_WARN", "45")), help="초반 윗꼬리 경고 기준")
-    p.add_argument("--sleep", type=float, default=float(os.getenv("QUICK_SLEEP", "0.12")), help="종목별 조회 간격")
+    p.add_argument("--sleep", type=float, default=float(os.getenv("QUICK_SLEEP", "0.12")), help="순차 조회 시 종목별 조회 간격")
+    p.add_argument("--sequential", action="store_true", default=os.getenv("QUICK_SEQUENTIAL", "0") == "1", help="동시 조회 대신 종목별 순차 조회")
+    p.add_argument("--minute-grace", type=float, default=float(os.getenv("QUICK_MINUTE_GRACE", "1.5")), help="시세/일봉 수신 후 분봉 추가 대기 초")
+    p.add_argument("--daily-cache", default=DAILY_CACHE_FILE, help="일봉 사전 캐시 파일")
+    p.add_argument("--build-daily-cache", action="store_true", help="장 마감 후 다음 거래일용 일봉 사전 캐시만 만들고 종료")
+    p.add_argument("--out-latency", default="quick_open_latency.json", help="소스별 조회 지연 분포 저장 파일")
     p.add_argument("--out-text", default="quick_open_result.txt", help="텍스트 결과 저장 파일")
     p.add_argument("--out-json", default="quick_open_result.json", help="JSON 결과 저장 파일")
     p.add_argument("--send-telegram", action="store_true", help="텔레그램 전송")
@@ -1184,11 +1524,19 @@ def build_arg_parser() -> argparse.ArgumentParser:
 def main() -> int:
     parser = build_arg_parser()
     args = parser.parse_args()
+    if args.build_daily_cache:
+        codes = [c.code for c in load_candidates(Path(args.candidate_file), args.codes)]
+        info = build_daily_cache(codes, Path(args.daily_cache), workers=host_limit("fdr"))
+        print(f"[QUICK] 일봉 사전 캐시 저장: 기준일 {info['through']} · {info['count']}종목 (개별 조회 {info['fetched']}) → {args.daily_cache}")
+        return 0
+
     results, report = run(args)
 
     print(report)
+    print(format_latency())
     write_text(Path(args.out_text), report)
     write_json(Path(args.out_json), [asdict(r) for r in results])
+    write_json(Path(args.out_latency), latency_histograms())
 
     if args.send_telegram:
         send_telegram(report)
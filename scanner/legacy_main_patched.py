@@ -34,8 +34,6 @@ import FinanceDataReader as fdr
 import pandas as pd
 import numpy as np
 import requests
-import mplfinance as mpf
-import matplotlib.pyplot as plt
 import os, re, time, pytz
 import sys
 
@@ -56,22 +54,110 @@ def _v1080_import_path_fix():
         pass
 
 _v1080_import_path_fix()
-from bs4 import BeautifulSoup
-from openai import OpenAI
+
+# PERF-12: 공용 HTTP 세션 풀(http_pool.py)
+# - 네이버/야후 스크래핑 GET을 호스트별 keep-alive 세션 + 토큰버킷 + 지터 재시도로 보낸다.
+# - 모듈이 없거나 HTTP_POOL_ENABLE=0 이면 requests.get 그대로.
+try:
+    import http_pool as _http_pool
+except Exception:
+    _http_pool = None
+
+
+def _http_get(url, **kwargs):
+    if _http_pool is not None:
+        return _http_pool.get(url, **kwargs)
+    kwargs.pop('cache_ttl', None)
+    return requests.get(url, **kwargs)
+
+
+# PERF-13: pykrx 종목별 수급/일봉 조회 캐시(supply_cache.py)
+# - 같은 (종목, 기간, 구분) 요청은 한 번만 보내고, 확정 거래일 결과는 reports/.cache/supply_cache 에 남긴다.
+# - 모듈이 없으면 pykrx 직접 호출.
+try:
+    import supply_cache as _supply_store
+except Exception:
+    _supply_store = None
+
+
+def _supply_trading_value(code, start, end, on='순매수'):
+    if _supply_store is not None and _supply_store.enabled():
+        return _supply_store.trading_value(code, start, end, on=on)
+    return stock.get_market_trading_value_by_date(start, end, code, on=on)
+
+
+def _supply_ohlcv_by_date(code, start, end):
+    if _supply_store is not None and _supply_store.enabled():
+        return _supply_store.ohlcv_by_date(code, start, end)
+    return stock.get_market_ohlcv_by_date(start, end, code)
+
+
+# PERF-14: 무거운 선택 모듈 지연 로딩(lazy_imports.py)
+# - 차트(matplotlib/mplfinance)·LLM(openai)·시트(gspread)·뉴스/해외(bs4/feedparser/yfinance) 모듈은
+#   스캔 코어에 필요 없으므로 첫 호출 때 import한다. 스캔 코어(fdr/pykrx/pandas/numpy)는 그대로 즉시 import.
+# - 선택 모듈(optional=True)은 import 실패 시 bool()이 False라 기존 `X is None` 분기를 `not X`로 본다.
+# - LAZY_IMPORTS_DISABLE=1 이면 기존처럼 즉시 import.
+#   측정: python lazy_imports.py --bench scanner.legacy_main_patched --compare
+import importlib
+
+try:
+    import lazy_imports as _lazy
+except Exception:
+    _lazy = None
+
+
+def _lazy_mod(name):
+    if _lazy is not None:
+        return _lazy.lazy_module(name)
+    return importlib.import_module(name)
+
+
+def _lazy_from(module, *names, optional=False):
+    if _lazy is not None:
+        vals = _lazy.lazy_attrs(module, *names, optional=optional)
+    else:
+        try:
+            mod = importlib.import_module(module)
+            vals = tuple(getattr(mod, n) for n in names)
+        except Exception:
+            if not optional:
+                raise
+            vals = (None,) * len(names)
+    return vals[0] if len(names) == 1 else vals
+
+
+# PERF-15: 공용 KRX 거래일 달력(krx_calendar.py)
+# - 정렬된 세션 배열 이진탐색으로 거래일 수를 센다(행마다 pd.bdate_range 생성 없음). 관측된 휴장일 반영.
+# - 모듈이 없으면 기존 평일 계산.
+try:
+    import krx_calendar as _krx_cal
+except Exception:
+    _krx_cal = None
+
+
+mpf = _lazy_mod('mplfinance')
+plt = _lazy_mod('matplotlib.pyplot')
+
+
+BeautifulSoup = _lazy_from('bs4', 'BeautifulSoup')
+OpenAI = _lazy_from('openai', 'OpenAI', optional=True)
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup 
 import pytz
-from tactics_engine import get_global_and_leader_status, analyze_all_narratives, get_dynamic_sector_leaders, calculate_dante_symmetry, watermelon_indicator_complete, judge_yeok_break_sequence_v2
+(get_global_and_leader_status, analyze_all_narratives, get_dynamic_sector_leaders, calculate_dante_symmetry,
+ watermelon_indicator_complete, judge_yeok_break_sequence_v2) = _lazy_from(
+    'tactics_engine', 'get_global_and_leader_status', 'analyze_all_narratives', 'get_dynamic_sector_leaders',
+    'calculate_dante_symmetry', 'watermelon_indicator_complete', 'judge_yeok_break_sequence_v2')
 from triangle_combo_analyzer import jongbe_triangle_combo_v3
 import traceback
-from news_sentiment import get_news_sentiment
+get_news_sentiment = _lazy_from('news_sentiment', 'get_news_sentiment')
 from pykrx import stock
 import pandas as pd
 from datetime import datetime
-from auto_theme_news import analyze_market_issues
+analyze_market_issues = _lazy_from('auto_theme_news', 'analyze_market_issues')
 from functools import lru_cache  # ✅ FIX 1: 캐시용
-from Watermelonchart import create_watermelon_charts_for_hits
+create_watermelon_charts_for_hits = _lazy_from('Watermelonchart', 'create_watermelon_charts_for_hits')
+import vector_indicators as _vind
 from dante_3phase_v4_module import (
     apply_dante_v4,
     build_v4_signal_map,
@@ -80,14 +166,8 @@ from dante_3phase_v4_module import (
     build_pre_dolbanji_hts_exact_bundle,
     build_pre_dolbanji_lite_bundle,
 )
-try: from openai import OpenAI
-except: OpenAI = None
-
-from google_sheet_manager import update_google_sheet, update_ai_briefing_sheet
-try:
-    from closing_bet_ai_debate_integration_multi3 import run_closing_bet_debate_pipeline
-except Exception:
-    run_closing_bet_debate_pipeline = None
+update_google_sheet, update_ai_briefing_sheet = _lazy_from('google_sheet_manager', 'update_google_sheet', 'update_ai_briefing_sheet')
+run_closing_bet_debate_pipeline = _lazy_from('closing_bet_ai_debate_integration_multi3', 'run_closing_bet_debate_pipeline', optional=True)
 import io
 import html
 from pathlib import Path
@@ -1098,6 +1178,8 @@ def _business_days_since_anchor(anchor_date, ref_date=None) -> int:
     r = _safe_parse_dt_local(ref_date)
     if r is None or r < a:
         return -1
+    if _krx_cal is not None:
+        return max(_krx_cal.count_between(a, r, "both") - 1, 0)
     try:
         bdays = pd.bdate_range(a, r)
         return max(len(bdays) - 1, 0)
@@ -3139,22 +3221,15 @@ except ImportError:
         pass
 
 from news_keyword_engine import analyze_news_rule_based
-from news_event_engine import (
-    collect_market_news,
-    flatten_news_titles,
-    analyze_news_to_korea_theme,
-    apply_news_theme_bonus,
-    format_news_theme_for_telegram,
-)
+(collect_market_news, flatten_news_titles, analyze_news_to_korea_theme, apply_news_theme_bonus,
+ format_news_theme_for_telegram) = _lazy_from(
+    'news_event_engine', 'collect_market_news', 'flatten_news_titles', 'analyze_news_to_korea_theme',
+    'apply_news_theme_bonus', 'format_news_theme_for_telegram')
 
-from us_kor_market_mapper import (
-    fetch_us_market_snapshot,
-    infer_kor_themes_rule_based,
-    analyze_us_to_kor_with_gpt,
-    merge_rule_and_gpt_us_mapping,
-    apply_us_theme_bonus,
-    format_us_mapping_for_telegram,
-)
+(fetch_us_market_snapshot, infer_kor_themes_rule_based, analyze_us_to_kor_with_gpt, merge_rule_and_gpt_us_mapping,
+ apply_us_theme_bonus, format_us_mapping_for_telegram) = _lazy_from(
+    'us_kor_market_mapper', 'fetch_us_market_snapshot', 'infer_kor_themes_rule_based', 'analyze_us_to_kor_with_gpt',
+    'merge_rule_and_gpt_us_mapping', 'apply_us_theme_bonus', 'format_us_mapping_for_telegram')
 
 # =================================================
 # ⚙️ [1. 필수 설정]
@@ -3363,7 +3438,7 @@ def _fetch_stock_news(code: str, name: str) -> str:
     # ── 2순위: 네이버 금융 종목 뉴스 직접 파싱 (코드 기반 — 인코딩 안전)
     try:
         url  = f"https://finance.naver.com/item/news_news.naver?code={code}&page=1"
-        res  = requests.get(url, headers=REAL_HEADERS, timeout=5)
+        res  = _http_get(url, headers=REAL_HEADERS, timeout=5)
         res.encoding = 'euc-kr'
         soup = BeautifulSoup(res.text, 'html.parser')
 
@@ -3391,7 +3466,7 @@ def _fetch_stock_news(code: str, name: str) -> str:
             'ds':    '',
             'de':    '',
         }
-        res2 = requests.get(search_url, params=params, headers=REAL_HEADERS, timeout=5)
+        res2 = _http_get(search_url, params=params, headers=REAL_HEADERS, timeout=5)
         soup2 = BeautifulSoup(res2.text, 'html.parser')
 
         titles2 = []
@@ -3644,7 +3719,7 @@ def _fetch_price_from_yahoo_chart(symbol):
         "interval": "1d",
         "includePrePost": "false",
     }
-    res = requests.get(url, params=params, headers=YAHOO_HEADERS, timeout=8)
+    res = _http_get(url, params=params, headers=YAHOO_HEADERS, timeout=8)
     res.raise_for_status()
     data = res.json()
 
@@ -4216,7 +4291,7 @@ def get_supply_and_money(code, price):
         return _supply_cache[code]
     try:
         url = f"https://finance.naver.com/item/frgn.naver?code={code}"
-        res = requests.get(url, headers=REAL_HEADERS, timeout=5)
+        res = _http_get(url, headers=REAL_HEADERS, timeout=5)
         res.encoding = 'euc-kr'
         df = pd.read_html(res.text, match='날짜')[0].dropna().head(10)
         
@@ -5037,7 +5112,7 @@ def get_supply_profile(code, price):
 
     try:
         url = f"https://finance.naver.com/item/frgn.naver?code={code}"
-        res = requests.get(url, headers=REAL_HEADERS, timeout=5)
+        res = _http_get(url, headers=REAL_HEADERS, timeout=5)
         res.encoding = 'euc-kr'
         df = pd.read_html(res.text, match='날짜')[0].dropna().head(10)
         df.columns = ['_'.join(col) if isinstance(col, tuple) else col for col in df.columns]
@@ -5299,7 +5374,7 @@ def _build_gross_line(prefix: str, buy_df: pd.DataFrame, sell_df: pd.DataFrame,
 
 def _fetch_ohlcv_for_supply_v2(code: str, start_dt: datetime, end_dt: datetime) -> pd.DataFrame:
     try:
-        raw = stock.get_market_ohlcv_by_date(start_dt.strftime('%Y%m%d'), end_dt.strftime('%Y%m%d'), code)
+        raw = _supply_ohlcv_by_date(code, start_dt.strftime('%Y%m%d'), end_dt.strftime('%Y%m%d'))
         if raw is None or raw.empty:
             return pd.DataFrame()
         df = raw.copy()
@@ -5342,22 +5417,22 @@ def _fetch_supply_snapshot_v2(code: str, end_ymd: str = None, calendar_back: int
     }
 
     try:
-        net_raw = stock.get_market_trading_value_by_date(
+        net_raw = _supply_trading_value(
+            code,
             start_dt.strftime('%Y%m%d'),
             end_dt.strftime('%Y%m%d'),
-            code,
             on='순매수',
         )
-        buy_raw = stock.get_market_trading_value_by_date(
+        buy_raw = _supply_trading_value(
+            code,
             start_dt.strftime('%Y%m%d'),
             end_dt.strftime('%Y%m%d'),
-            code,
             on='매수',
         )
-        sell_raw = stock.get_market_trading_value_by_date(
+        sell_raw = _supply_trading_value(
+            code,
             start_dt.strftime('%Y%m%d'),
             end_dt.strftime('%Y%m%d'),
-            code,
             on='매도',
         )
     except Exception as e:
@@ -5682,7 +5757,7 @@ def get_financial_health(code):
         return _financial_cache[code]
     try:
         url = f"https://finance.naver.com/item/main.naver?code={code}"
-        res = requests.get(url, headers=REAL_HEADERS, timeout=5)
+        res = _http_get(url, headers=REAL_HEADERS, timeout=5)
         dfs = pd.read_html(res.text)
         df_fin = dfs[3]; df_fin.columns = df_fin.columns.get_level_values(1)
         profit = str(df_fin.iloc[1, -2]).replace(',', '')
@@ -6921,33 +6996,20 @@ def get_indicators(df):
     low   = df['Low']
     close = df['Close']
 
-    for n in [5, 10, 20, 40, 60, 112, 224, 448]:
-        df[f'MA{n}']    = close.rolling(window=n, min_periods=n).mean()
-        df[f'VMA{n}']   = df['Volume'].rolling(window=n, min_periods=n).mean()
-        df[f'Slope{n}'] = (df[f'MA{n}'] - df[f'MA{n}'].shift(3)) / df[f'MA{n}'].shift(3) * 100
+    # PERF-8: MA/VMA/Slope(5~448), BB20/30/40, High20/52, 일목, OBV, RSI는
+    # vector_indicators.compute_core가 누적합 1회로 한꺼번에 계산한다. (pandas 경로와 정합성 검증: --parity)
+    df = _vind.apply_core(df)
 
     # PERF-4: Slope20/40은 이미 Slope 루프에서 계산됨 → 재활용
     df['MA20_slope'] = df['Slope20']
     df['MA40_slope'] = df['Slope40']
 
-    std20 = close.rolling(20).std()
-    std40 = close.rolling(40).std()
-
-    df['BB_Upper']      = df['MA20'] + std20 * 2
-    df['BB_Lower']      = df['MA20'] - std20 * 2
-    df['BB20_Width']    = std20 * 4 / df['MA20'] * 100
-    df['BB40_Upper']    = df['MA40'] + std40 * 2
-    df['BB40_Lower']    = df['MA40'] - std40 * 2
-    df['BB40_Width']    = std40 * 4 / df['MA40'] * 100
-    df['BB40_PercentB'] = (close - df['BB40_Lower']) / (df['BB40_Upper'] - df['BB40_Lower'])
     df['BB_UP']  = df['BB40_Upper']
     df['BB_LOW'] = df['BB_Lower']
 
     # ✅ SHIFT(BBandsUp(30,1.8), 20) — 단테 수박 골든크로스 타점
     # 30일 MA + 1.8σ 상단을 20봉 뒤로 시프트
     # 의미: "20일 전 과열 저항선" → 현재가가 이 선을 하→상 돌파 시 저항→지지 전환 확정
-    std30              = close.rolling(30).std()
-    df['BB30_Upper_18']       = close.rolling(30).mean() + std30 * 1.8
     df['BB30_Upper_18_Shift'] = df['BB30_Upper_18'].shift(20)   # SHIFT(..., 20)
     # 골든크로스: 전일 종가≤Shift선, 당일 종가>Shift선
     prev_close = close.shift(1)
@@ -6979,8 +7041,6 @@ def get_indicators(df):
     df['Is_Super_MA_Conv']           = df['Is_Short_MA_Conv'] & df['Is_Structure_MA_Conv']
 
     # ── 전고점 대비 이격 (종가배팅 타점용)
-    df['High20']         = df['High'].rolling(20).max()
-    df['High52']         = df['High'].rolling(252).max()
     df['NearHigh20_Pct'] = (close / df['High20'] * 100).round(1)
     df['NearHigh52_Pct'] = (close / df['High52'] * 100).round(1)
 
@@ -7009,12 +7069,6 @@ def get_indicators(df):
     df['ATR_Below_MA']   = (df['ATR'] < df['ATR_MA20']).astype(int)
     df['ATR_Below_Days'] = df['ATR_Below_MA'].rolling(10).sum()
 
-    df['Tenkan_sen'] = (high.rolling(9).max()  + low.rolling(9).min())  / 2
-    df['Kijun_sen']  = (high.rolling(26).max() + low.rolling(26).min()) / 2
-    df['Span_A']     = ((df['Tenkan_sen'] + df['Kijun_sen']) / 2).shift(26)
-    df['Span_B']     = ((high.rolling(52).max() + low.rolling(52).min()) / 2).shift(26)
-    df['Cloud_Top']  = df[['Span_A', 'Span_B']].max(axis=1)
-
     l_min, h_max = low.rolling(12).min(), high.rolling(12).max()
     df['Sto_K']  = (close - l_min) / (h_max - l_min) * 100
     df['Sto_D']  = df['Sto_K'].rolling(5).mean()
@@ -7026,8 +7080,6 @@ def get_indicators(df):
     df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
     df['MACD_Hist']   = df['MACD'] - df['MACD_Signal']
 
-    df['OBV']         = (np.sign(close.diff()) * df['Volume']).fillna(0).cumsum()
-    df['OBV_MA10']    = df['OBV'].rolling(10).mean()
     df['OBV_Rising']  = df['OBV'] > df['OBV_MA10']
     # ✅ V1058: OBV 5일 전 값이 0이면 inf가 발생하므로 0/NaN으로 안전 정리
     _obv_den = df['OBV'].shift(5).abs().replace(0, np.nan)
@@ -7035,11 +7087,6 @@ def get_indicators(df):
     df['OBV_Bullish'] = df['OBV_MA10'] > df['OBV_MA10'].shift(1)
     df['Base_Line']   = close.rolling(20).min().shift(5)
 
-    delta      = close.diff()
-    gain       = delta.where(delta > 0, 0).ewm(com=13, adjust=False).mean()
-    loss       = (-delta.where(delta < 0, 0)).ewm(com=13, adjust=False).mean()
-    df['RSI']  = 100 - (100 / (1 + gain / loss))
-
     typical_price     = (high + low + close) / 3
     money_flow        = typical_price * df['Volume']
     pos_flow          = money_flow.where(typical_price > typical_price.shift(1), 0).rolling(14).sum()
@@ -7985,7 +8032,7 @@ def build_judgment_packet(row) -> dict:
 
 def get_hot_themes():
     try:
-        res = requests.get("https://finance.naver.com/sise/theme.naver", headers=REAL_HEADERS)
+        res = _http_get("https://finance.naver.com/sise/theme.naver", headers=REAL_HEADERS, timeout=10, cache_ttl=600)
         soup = BeautifulSoup(res.text, 'html.parser')
         themes = [t.text.strip() for t in soup.select('table.type_1 td.col_type1')[:3]]
         return ", ".join(themes)
@@ -8473,7 +8520,7 @@ def _call_ai(system_prompt: str, user_prompt: str,
 
 
 def _call_openai_api_generic(system_prompt: str, user_prompt: str, max_tokens: int = 3000) -> str:
-    if not OPENAI_API_KEY or OpenAI is None:
+    if not OPENAI_API_KEY or not OpenAI:
         return ''
     try:
         client = OpenAI(api_key=OPENAI_API_KEY)
@@ -8860,7 +8907,7 @@ def _format_main7_ai_debate_text(rows):
     return "\n".join(lines).strip()
 
 def _run_main7_ai_debate(ai_candidates_df: pd.DataFrame, issues=None, market_news=None):
-    if run_closing_bet_debate_pipeline is None:
+    if not run_closing_bet_debate_pipeline:
         return ai_candidates_df, '', []
 
     if ai_candidates_df is None or ai_candidates_df.empty:
@@ -11011,16 +11058,54 @@ def build_sub_classification(row) -> dict:
 # ════════════════════════════════════════════════
 # PERF-6: fdr.DataReader 결과 당일 메모리 캐시
 # 같은 종목을 여러 번 호출하는 경우 방지
+# PERF-7: 로컬 OHLCV 저장소(ohlcv_store.py) 경유
+# - 종목별 일봉을 디스크에 보관하고 마지막 저장일 이후 tail 봉만 새로 받는다.
+# - 아침 스캔(장 시작 전)은 전일 마감 후 저장본을 그대로 써서 네트워크 호출이 거의 없다.
+# - OHLCV_STORE_ENABLE=0 이면 기존 fdr.DataReader 직접 호출로 돌아간다.
+# PERF-10: 시장 전체 일봉 패널(market_panel.py)
+# - 새 거래일마다 pykrx get_market_ohlcv(date, market) 시장별 1회로 전 종목 봉을 받아 날짜×종목 패널에 붙인다.
+# - 저장소 tail 갱신을 패널에서 잘라 쓰므로 종목 수천 건의 HTTP 호출이 bulk 호출 몇 건으로 줄어든다.
+# - 장중에는 당일 봉이 미완성이라 패널을 쓰지 않는다. MARKET_PANEL_ENABLE=0 이면 종목별 tail 조회로 돌아간다.
 # ════════════════════════════════════════════════
+try:
+    import ohlcv_store as _ohlcv_store
+except Exception:
+    _ohlcv_store = None
+
+try:
+    import market_panel as _market_panel
+    if _ohlcv_store is not None and _market_panel.enabled():
+        _ohlcv_store.configure(panel=_market_panel)
+except Exception:
+    _market_panel = None
+
 _fdr_cache = {}
 
+
+def _ohlcv_store_on() -> bool:
+    try:
+        return _ohlcv_store is not None and _ohlcv_store.enabled()
+    except Exception:
+        return False
+
+
+def _ohlcv_history(ticker: str, days: int = 900, end=None) -> pd.DataFrame:
+    """로컬 OHLCV 저장소 우선 조회. 저장소를 쓸 수 없으면 fdr.DataReader로 직접 받는다."""
+    if _ohlcv_store_on():
+        return _ohlcv_store.get_history(ticker, days=days, end=end)
+    anchor = pd.Timestamp(end) if end else pd.Timestamp(datetime.now())
+    start = (anchor - pd.Timedelta(days=days)).strftime('%Y-%m-%d')
+    if end:
+        return fdr.DataReader(ticker, start=start, end=pd.Timestamp(end).strftime('%Y-%m-%d'))
+    return fdr.DataReader(ticker, start=start)
+
+
 def fdr_cached(ticker: str, days: int = 900) -> pd.DataFrame:
     """fdr.DataReader 결과를 당일 메모리 캐시."""
     today_key = f"{ticker}_{days}_{datetime.now().strftime('%Y%m%d')}"
     if today_key in _fdr_cache:
         return _fdr_cache[today_key]
-    start = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-    df = fdr.DataReader(ticker, start=start)
+    df = _ohlcv_history(ticker, days=days)
     _fdr_cache[today_key] = df
     return df
 
@@ -12762,7 +12847,7 @@ def get_target_levels(current_price):
 
 def analyze_weekly_trend(ticker, name):
     try:
-        df_daily = fdr.DataReader(ticker, start=(datetime.now()-timedelta(days=730)))
+        df_daily = _ohlcv_history(ticker, days=730)
         if len(df_daily) < 200: return []
 
         df = df_daily.resample('W-MON').agg({
@@ -12939,8 +13024,7 @@ def analyze_single_stock_with_main7_engine(ticker, name, end_date='', context=No
     if end_date:
         end_ts = pd.Timestamp(end_date).strftime('%Y-%m-%d')
         def _fdr_cached_for_date(_ticker: str, days: int = 250):
-            start_ts = (pd.Timestamp(end_ts) - pd.Timedelta(days=days)).strftime('%Y-%m-%d')
-            return fdr.DataReader(_ticker, start=start_ts, end=end_ts)
+            return _ohlcv_history(_ticker, days=days, end=end_ts)
         globals()['fdr_cached'] = _fdr_cached_for_date
         patched = True
 
@@ -15668,7 +15752,7 @@ def _v6_collect_naver_finance_news(code: str, name: str, limit=3):
     try:
         url = f"https://finance.naver.com/item/news_news.naver?code={str(code).zfill(6)}&page=1"
         headers = globals().get('REAL_HEADERS', {'User-Agent': 'Mozilla/5.0', 'Referer': 'https://finance.naver.com/'})
-        res = requests.get(url, headers=headers, timeout=4)
+        res = _http_get(url, headers=headers, timeout=4)
         res.encoding = 'euc-kr'
         soup = BeautifulSoup(res.text, 'html.parser')
         for sel in ['td.title a', '.articleSubject a', '.news_tit', 'a.tit']:
@@ -15692,7 +15776,7 @@ def _v6_collect_naver_search_news(code: str, name: str, limit=3):
     try:
         headers = globals().get('REAL_HEADERS', {'User-Agent': 'Mozilla/5.0', 'Referer': 'https://search.naver.com/'})
         query = f"{name} 주식 뉴스"
-        res = requests.get('https://search.naver.com/search.naver', params={'where': 'news', 'query': query}, headers=headers, timeout=4)
+        res = _http_get('https://search.naver.com/search.naver', params={'where': 'news', 'query': query}, headers=headers, timeout=4)
         soup = BeautifulSoup(res.text, 'html.parser')
         for sel in ['.news_tit', 'a.news_tit', '.api_txt_lines', '.title_link']:
             for a in soup.select(sel):
@@ -43665,7 +43749,7 @@ def _v1077_ai_pick_enabled() -> bool:
     except Exception:
         pass
     try:
-        if not OPENAI_API_KEY or OpenAI is None:
+        if not OPENAI_API_KEY or not OpenAI:
             return False
     except Exception:
         return False
@@ -64630,6 +64714,533 @@ except Exception:
 # ✅ END V1107.4.5.17 TD WATCH PRIME + PRIME DEMOTE
 # =============================================================
 
+# =============================================================
+# ✅ PERF-9 SCAN PROCESS POOL
+# - SCAN_EXEC_MODE=process: 1단계 스레드 prefetch(일봉 I/O) → 2단계 프로세스 풀(지표/판정 CPU)
+# - 워커에는 종목별 (날짜 int64, 값 float64, 컬럼) 배열만 넘기고, 워커는 fdr_cached 캐시에 꽂은 뒤
+#   기존 analyze_final을 그대로 돌려 hit dict만 돌려준다. (GIL에 묶이던 pandas 계산을 코어 수만큼 분산)
+# - 종목 기준 타임아웃(SCAN_TIMEOUT_PER_STOCK)은 워커 안에서 SIGALRM으로 적용, 전체 상한은 SCAN_GLOBAL_TIMEOUT 그대로.
+# - 기본값(SCAN_EXEC_MODE=thread) 또는 fork 불가 환경이면 V1045 스레드 경로를 그대로 쓴다.
+#   (프로세스 모드에서는 analyze_final이 워커 안에서 채운 전역 캐시가 본 프로세스로 돌아오지 않는다.)
+# =============================================================
+import multiprocessing as _perf9_mp
+import signal as _perf9_signal
+import pickle as _perf9_pickle
+from concurrent.futures import ProcessPoolExecutor as _Perf9ProcessPoolExecutor
+
+try:
+    _PERF9_BASE_RUN_SCAN_WITH_TIMEOUT = run_scan_with_timeout
+except Exception:
+    _PERF9_BASE_RUN_SCAN_WITH_TIMEOUT = None
+
+_PERF9_CTX = {}
+_PERF9_STAGE_TIMINGS = {}
+
+
+class _Perf9StockTimeout(BaseException):
+    """analyze_final 내부의 except Exception에 삼켜지지 않도록 BaseException으로 둔다."""
+
+
+def _perf9_exec_mode() -> str:
+    mode = str(os.getenv('SCAN_EXEC_MODE', 'thread') or 'thread').strip().lower()
+    if mode == 'process' and 'fork' not in _perf9_mp.get_all_start_methods():
+        return 'thread'
+    return mode
+
+
+def _perf9_pack_bars(df):
+    """DataFrame → (날짜 int64[ns], float64 2D, 컬럼, 인덱스명). 숫자 변환이 안 되면 None(워커가 직접 조회)."""
+    try:
+        if df is None or len(df) == 0:
+            return None
+        idx = pd.DatetimeIndex(df.index)
+        return (
+            idx.values.astype('datetime64[ns]').view('i8'),
+            df.to_numpy(dtype='float64'),
+            tuple(str(c) for c in df.columns),
+            idx.name,
+        )
+    except Exception:
+        return None
+
+
+def _perf9_unpack_bars(packed):
+    i8, values, cols, idx_name = packed
+    index = pd.DatetimeIndex(i8.view('datetime64[ns]'), name=idx_name)
+    return pd.DataFrame(values, index=index, columns=list(cols))
+
+
+def _perf9_prefetch_one(code):
+    return _perf9_pack_bars(fdr_cached(code, days=900))
+
+
+def _perf9_picklable(hit):
+    try:
+        _perf9_pickle.dumps(hit)
+        return hit
+    except Exception:
+        pass
+    if not isinstance(hit, dict):
+        return None
+    out = {}
+    for k, v in hit.items():
+        try:
+            _perf9_pickle.dumps(v)
+            out[k] = v
+        except Exception:
+            out[k] = str(v)
+    return out
+
+
+def _perf9_alarm(signum, frame):
+    raise _Perf9StockTimeout()
+
+
+def _perf9_scan_chunk(chunk):
+    """워커 프로세스: (code, name, packed) 묶음을 순서대로 analyze_final에 태운다."""
+    weather_data = _PERF9_CTX.get('weather_data')
+    g_env = _PERF9_CTX.get('global_env')
+    l_env = _PERF9_CTX.get('leader_env')
+    s_map = _PERF9_CTX.get('sector_master_map') or {}
+    per_stock = int(_PERF9_CTX.get('per_stock', 0) or 0)
+    today = datetime.now().strftime('%Y%m%d')
+    use_alarm = per_stock > 0 and hasattr(_perf9_signal, 'setitimer')
+    old_handler = _perf9_signal.signal(_perf9_signal.SIGALRM, _perf9_alarm) if use_alarm else None
+
+    hits, timeouts, errors = [], [], []
+    t0 = time.perf_counter()
+    try:
+        for code, name, packed in chunk:
+            key = f"{code}_900_{today}"
+            if packed is not None:
+                _fdr_cache[key] = _perf9_unpack_bars(packed)
+            result = None
+            try:
+                if use_alarm:
+                    _perf9_signal.setitimer(_perf9_signal.ITIMER_REAL, per_stock)
+                result = analyze_final(code, name, weather_data, g_env, l_env, s_map)
+            except _Perf9StockTimeout:
+                timeouts.append(name)
+            except Exception as e:
+                errors.append((name, str(e)))
+            finally:
+                if use_alarm:
+                    _perf9_signal.setitimer(_perf9_signal.ITIMER_REAL, 0)
+                _fdr_cache.pop(key, None)
+            for h in result or []:
+                h = _perf9_picklable(h)
+                if h is not None:
+                    hits.append(h)
+    finally:
+        if use_alarm:
+            _perf9_signal.signal(_perf9_signal.SIGALRM, old_handler)
+    return {'hits': hits, 'timeouts': timeouts, 'errors': errors, 'n': len(chunk), 'sec': time.perf_counter() - t0}
+
+
+def _perf9_shutdown(executor, terminate=False):
+    if terminate:
+        # 전체 상한 도달 시 남은 워커를 끊어야 인터프리터 종료 시 join에서 멈추지 않는다.
+        for p in list((getattr(executor, '_processes', None) or {}).values()):
+            try: p.terminate()
+            except Exception: pass
+    try:
+        executor.shutdown(wait=False, cancel_futures=True)
+    except TypeError:
+        try: executor.shutdown(wait=False)
+        except Exception: pass
+    except Exception:
+        pass
+
+
+def _perf9_run_scan_process(pairs, weather_data, global_env, leader_env, sector_master_map):
+    total = len(pairs)
+    per_stock = _v1045_env_int('SCAN_TIMEOUT_PER_STOCK', 4)
+    io_workers = max(1, min(_v1045_env_int('SCAN_PREFETCH_WORKERS', 16), 64))
+    proc_workers = max(1, min(_v1045_env_int('SCAN_PROCESS_WORKERS', os.cpu_count() or 2), 64))
+    chunk_size = max(1, _v1045_env_int('SCAN_PROCESS_CHUNK', 8))
+    global_timeout = _v1045_env_int('SCAN_GLOBAL_TIMEOUT', max(480, min(900, per_stock * total // proc_workers + 420)))
+    deadline = time.monotonic() + global_timeout
+    try:
+        log_info(
+            f"⚡ PERF-9 프로세스 스캔: {total}개 | prefetch 스레드 {io_workers} | 프로세스 {proc_workers} | "
+            f"청크 {chunk_size} | 종목기준 {per_stock}초 | 전체상한 {global_timeout}초"
+        )
+    except Exception:
+        pass
+
+    # 1단계: 일봉 prefetch (I/O, 스레드)
+    t_fetch = time.perf_counter()
+    packed = {}
+    fetch_fail = 0
+    io_ex = ThreadPoolExecutor(max_workers=io_workers)
+    try:
+        fmap = {io_ex.submit(_perf9_prefetch_one, code): code for code, _ in pairs}
+        try:
+            for fut in as_completed(fmap, timeout=max(1.0, deadline - time.monotonic())):
+                try:
+                    packed[fmap[fut]] = fut.result(timeout=0)
+                except Exception:
+                    fetch_fail += 1
+        except FuturesTimeoutError:
+            try: log_error(f"⏰ PERF-9 prefetch 상한 도달: {len(packed)}/{total}개만 선조회, 나머지는 워커가 직접 조회")
+            except Exception: pass
+    finally:
+        try:
+            io_ex.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            pass
+    fetch_sec = time.perf_counter() - t_fetch
+
+    # 2단계: 지표/판정 (CPU, 프로세스)
+    t_comp = time.perf_counter()
+    _PERF9_CTX.update(
+        weather_data=weather_data, global_env=global_env, leader_env=leader_env,
+        sector_master_map=sector_master_map, per_stock=per_stock,
+    )
+    items = [(code, name, packed.get(code)) for code, name in pairs]
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    all_hits = []
+    done_count = 0
+    n_timeout = n_error = 0
+    worker_sec = 0.0
+    timed_out = False
+    # fork: 워커가 _PERF9_CTX/스캐너 전역을 복사 없이 물려받는다. prefetch 스레드가 잡고 있던 모듈 락은
+    # ohlcv_store/market_panel/http_pool/krx_calendar/supply_cache/lazy_imports가 각자
+    # os.register_at_fork(after_in_child=...)로 자식에서 새로 만든다.
+    executor = _Perf9ProcessPoolExecutor(
+        max_workers=proc_workers, mp_context=_perf9_mp.get_context('fork'),
+    )
+    try:
+        future_map = {executor.submit(_perf9_scan_chunk, ch): ch for ch in chunks}
+        try:
+            for future in as_completed(future_map, timeout=max(1.0, deadline - time.monotonic())):
+                chunk = future_map[future]
+                try:
+                    res = future.result(timeout=0)
+                except Exception as e:
+                    done_count += len(chunk)
+                    n_error += len(chunk)
+                    try: log_error(f"🚨 PERF-9 청크 실패({chunk[0][1]} 외 {len(chunk) - 1}개): {e}")
+                    except Exception: pass
+                    continue
+                all_hits.extend(res['hits'])
+                worker_sec += res['sec']
+                done_count += res['n']
+                n_timeout += len(res['timeouts'])
+                n_error += len(res['errors'])
+                for name in res['timeouts']:
+                    try: log_error(f"⏰ [{name}] 타임아웃 스킵")
+                    except Exception: pass
+                for name, msg in res['errors']:
+                    try: log_error(f"🚨 [{name}] 오류: {msg}")
+                    except Exception: pass
+                try: log_progress(done_count, total)
+                except Exception: pass
+        except FuturesTimeoutError:
+            timed_out = True
+            try:
+                log_error(f"⏰ PERF-9 전체 스캔 상한 도달: 완료 {done_count}/{total}, 나머지는 취소하고 현재 결과로 진행")
+            except Exception:
+                pass
+    finally:
+        _perf9_shutdown(executor, terminate=timed_out)
+    comp_sec = time.perf_counter() - t_comp
+
+    _PERF9_STAGE_TIMINGS.clear()
+    _PERF9_STAGE_TIMINGS.update({
+        'mode': 'process', 'total': total, 'prefetch_sec': round(fetch_sec, 2),
+        'prefetched': sum(1 for v in packed.values() if v is not None), 'prefetch_fail': fetch_fail,
+        'compute_sec': round(comp_sec, 2), 'worker_cpu_sec': round(worker_sec, 2),
+        'process_workers': proc_workers, 'chunks': len(chunks), 'done': done_count,
+        'timeouts': n_timeout, 'errors': n_error, 'hits': len(all_hits),
+    })
+    return all_hits
+
+
+def format_scan_stage_timings() -> str:
+    st = dict(_PERF9_STAGE_TIMINGS)
+    if not st:
+        return '⏱️ 스캔 스테이지: 기록 없음'
+    if st.get('mode') != 'process':
+        return f"⏱️ 스캔 스테이지(thread): 다운로드+계산 {st.get('compute_sec', 0)}초 | {st.get('total', 0)}개 | hit {st.get('hits', 0)}"
+    return (
+        f"⏱️ 스캔 스테이지(process): prefetch {st['prefetch_sec']}초 ({st['prefetched']}/{st['total']}, 실패 {st['prefetch_fail']}) | "
+        f"계산 {st['compute_sec']}초 (워커 누적 {st['worker_cpu_sec']}초, 프로세스 {st['process_workers']}, 청크 {st['chunks']}) | "
+        f"완료 {st['done']} 타임아웃 {st['timeouts']} 오류 {st['errors']} | hit {st['hits']}"
+    )
+
+
+def run_scan_with_timeout(target_dict, weather_data, global_env, leader_env, sector_master_map, timeout_per_stock=10):
+    pairs = list(zip(target_dict.keys(), target_dict.values()))
+    if pairs and _perf9_exec_mode() == 'process':
+        return _perf9_run_scan_process(pairs, weather_data, global_env, leader_env, sector_master_map)
+    t0 = time.perf_counter()
+    hits = _PERF9_BASE_RUN_SCAN_WITH_TIMEOUT(
+        target_dict, weather_data, global_env, leader_env, sector_master_map, timeout_per_stock=timeout_per_stock,
+    )
+    _PERF9_STAGE_TIMINGS.clear()
+    _PERF9_STAGE_TIMINGS.update({
+        'mode': 'thread', 'total': len(pairs), 'compute_sec': round(time.perf_counter() - t0, 2), 'hits': len(hits or []),
+    })
+    return hits
+
+# =============================================================
+# ✅ END PERF-9 SCAN PROCESS POOL
+# =============================================================
+
+# =============================================================
+# ✅ PERF-11 UNIVERSE PREFILTER
+# - analyze_final의 PERF-3 사전필터(가격/5일 거래대금/track A·B/역매공파 light)를
+#   종목마다 900일 일봉을 받은 뒤가 아니라, 시장 패널의 최근 구간 행렬로 전 종목을 한 번에 판정한다.
+# - 통과 종목만 기존 run_scan_with_timeout(전체 일봉 + 지표 파이프라인)으로 넘긴다.
+# - 데이터 출처(pykrx vs fdr) 차이를 감안해 임계값에 UNIVERSE_PREFILTER_MARGIN(기본 0.95)을 곱해 넉넉히 통과시키고,
+#   패널에 없는 종목/역매공파처럼 긴 이력이 필요한데 패널이 얕은 경우는 판정하지 않고 통과시킨다.
+#   (최종 판정은 여전히 analyze_final 내부 PERF-3가 한다)
+# - 장중에는 당일 봉이 패널에 없으므로 이 단계를 건너뛴다. UNIVERSE_PREFILTER_ENABLE=0 이면 끈다.
+# =============================================================
+_PERF11_BASE_RUN_SCAN_WITH_TIMEOUT = run_scan_with_timeout
+_PERF11_LAST_STATS = {}
+
+
+def _perf11_ymgp_light_mask(close, high, vol, min_amount_b):
+    """_v1045_light_ymgp_prefilter_raw의 조건을 종목 열 전체에 대해 한 번에 계산한다."""
+    ma5 = close.rolling(5).mean()
+    ma20 = close.rolling(20).mean()
+    ma40 = close.rolling(40).mean()
+    ma112 = close.rolling(112).mean()
+    ma224 = close.rolling(224).mean()
+    bb40_up = ma40 + close.rolling(40).std() * 2
+
+    c = close.iloc[-1]
+    amount_ok = ((close * vol).tail(5).mean() / 1e8) >= min_amount_b
+    had_bear = ((ma5 < ma112) & (ma112 < ma224)).tail(180).any()
+    m5, m112, m224 = ma5.iloc[-1], ma112.iloc[-1], ma224.iloc[-1]
+    lo = pd.concat([m112, m224], axis=1).min(axis=1) * (1 - 0.04)
+    hi = pd.concat([m112, m224], axis=1).max(axis=1) * (1 + 0.04)
+    ma_between = (m5 > 0) & (m112 > 0) & (m224 > 0) & (m5 >= lo) & (m5 <= hi)
+    brk = (close > bb40_up) & (close.shift(1) <= bb40_up.shift(1))
+    brk_recent = brk.tail(25).any()
+    up = bb40_up.iloc[-1]
+    near_bb40 = (up > 0) & (c >= up * 0.96)
+    ma5_hold = (m5 > 0) & (c >= m5 * 0.95)
+    m20 = ma20.iloc[-1]
+    disp = (c / m20.where(m20 > 0) * 100.0).fillna(100.0)
+    enough = close.notna().sum() >= 260
+    return enough & (c > 0) & amount_ok & had_bear & ma_between & brk_recent & near_bb40 & ma5_hold & (disp <= 114.0)
+
+
+def _perf11_universe_prefilter(target_dict):
+    """전 종목 사전필터. (통과 dict, 단계별 통계) 반환. 판정할 수 없으면 원본 그대로 반환."""
+    t0 = time.perf_counter()
+    stats = {'total': len(target_dict), 'kept': len(target_dict), 'removed': 0, 'stage_sec': 0.0, 'skipped': ''}
+    if not _v1046_env_on('UNIVERSE_PREFILTER_ENABLE', '1'):
+        stats['skipped'] = 'disabled'
+        return target_dict, stats
+    if _market_panel is None or not _market_panel.enabled():
+        stats['skipped'] = 'no_panel'
+        return target_dict, stats
+    try:
+        if _market_panel.intraday():
+            stats['skipped'] = 'intraday'
+            return target_dict, stats
+        mat = _market_panel.recent_matrix(_v1045_env_int('UNIVERSE_PREFILTER_SESSIONS', 430))
+    except Exception as e:
+        stats['skipped'] = f'panel_error:{e}'
+        return target_dict, stats
+    if mat is None or len(mat['Close']) < 20:
+        stats['skipped'] = 'panel_shallow'
+        return target_dict, stats
+
+    margin = min(1.0, max(0.5, float(_v1046_num(os.getenv('UNIVERSE_PREFILTER_MARGIN', '0.95'), 0.95))))
+    codes = [_v1046_norm_code(c) for c in target_dict.keys()]
+    known = [c for c in codes if c in mat['Close'].columns]
+    close = mat['Close'][known]
+    vol = mat['Volume'][known]
+
+    c_last = close.iloc[-1]
+    amount5 = (close * vol).tail(5).mean() / 1e8
+    vol_last = vol.iloc[-1]
+    vma20 = vol.tail(20).mean()
+    ymgp_min = _v1045_env_int('YMGP_MIN_AMOUNT_B', 8)
+
+    price_ok = c_last >= MIN_PRICE * margin
+    track_a = amount5 >= 50 * margin
+    track_b = (amount5 >= 10 * margin) & (vma20 > 0) & (vol_last >= vma20 * 3.0 * margin)
+    ymgp_amount = amount5 >= ymgp_min * margin
+    if len(close) >= 260:
+        ymgp = _perf11_ymgp_light_mask(close, mat['High'][known], vol, ymgp_min * margin)
+        ymgp_undecided = pd.Series(False, index=close.columns)
+    else:
+        # 패널이 얕아 장기선 조건을 볼 수 없으면 거래대금만 확인하고 통과시킨다.
+        ymgp = pd.Series(False, index=close.columns)
+        ymgp_undecided = ymgp_amount
+
+    keep = price_ok & (track_a | track_b | ymgp | ymgp_undecided)
+    keep_set = set(keep[keep].index)
+    known_set = set(known)
+    survivors = {
+        k: v for k, v in target_dict.items()
+        if _v1046_norm_code(k) not in known_set or _v1046_norm_code(k) in keep_set
+    }
+
+    stats.update({
+        'kept': len(survivors),
+        'removed': len(target_dict) - len(survivors),
+        'not_in_panel': len(codes) - len(known),
+        'gate_price': int((~price_ok).sum()),
+        'gate_amount': int((price_ok & ~(amount5 >= min(10, ymgp_min) * margin)).sum()),
+        'gate_track': int((price_ok & (amount5 >= min(10, ymgp_min) * margin) & ~keep).sum()),
+        'track_a': int((price_ok & track_a).sum()),
+        'track_b': int((price_ok & track_b & ~track_a).sum()),
+        'ymgp': int((price_ok & ymgp & ~track_a & ~track_b).sum()),
+        'ymgp_undecided': int((price_ok & ymgp_undecided & ~track_a & ~track_b).sum()),
+        'sessions': len(close),
+        'stage_sec': round(time.perf_counter() - t0, 3),
+    })
+    return survivors, stats
+
+
+def format_universe_prefilter_stats(stats=None) -> str:
+    st = dict(stats if stats is not None else _PERF11_LAST_STATS)
+    if not st:
+        return '🧹 유니버스 사전필터: 기록 없음'
+    if st.get('skipped'):
+        return f"🧹 유니버스 사전필터 생략({st['skipped']}): {st.get('total', 0)}개 전부 분석"
+    line = (
+        f"🧹 유니버스 사전필터({st['sessions']}거래일 행렬, {st['stage_sec']}초): {st['total']} → {st['kept']}개 | "
+        f"제거: 가격 {st['gate_price']} · 거래대금 {st['gate_amount']} · trackA/B/역매공파 불충족 {st['gate_track']} | "
+        f"통과: A {st['track_a']} · B {st['track_b']} · 역매공파 {st['ymgp']} · 이력부족보류 {st['ymgp_undecided']} · 패널미수록 {st['not_in_panel']}"
+    )
+    if 'saved_sec' in st:
+        line += f" | 절감 추정 {st['saved_sec']}초 (종목당 {st['per_stock_sec']}초 기준)"
+    return line
+
+
+def run_scan_with_timeout(target_dict, weather_data, global_env, leader_env, sector_master_map, timeout_per_stock=10):
+    survivors, stats = _perf11_universe_prefilter(target_dict)
+    t0 = time.perf_counter()
+    hits = _PERF11_BASE_RUN_SCAN_WITH_TIMEOUT(
+        survivors, weather_data, global_env, leader_env, sector_master_map, timeout_per_stock=timeout_per_stock,
+    )
+    scan_sec = time.perf_counter() - t0
+    if not stats.get('skipped') and survivors:
+        # 제거된 종목도 통과 종목과 같은 평균 비용(일봉 로드 + PERF-3)이 들었다고 보고 상한 추정한다.
+        per_stock = scan_sec / max(1, len(survivors))
+        stats['per_stock_sec'] = round(per_stock, 3)
+        stats['saved_sec'] = round(max(0.0, per_stock * stats['removed'] - stats['stage_sec']), 1)
+    _PERF11_LAST_STATS.clear()
+    _PERF11_LAST_STATS.update(stats)
+    return hits
+
+# =============================================================
+# ✅ END PERF-11 UNIVERSE PREFILTER
+# =============================================================
+
+# =============================================================
+# ✅ PERF-13 SUPPLY/FINANCIAL BATCH PREFETCH
+# - enrich_hits_with_supply_and_financial은 상위 후보를 한 종목씩 get_supply_profile(pykrx 순매수/매수/매도 +
+#   일봉 4회, 실패 시 네이버 폴백)/get_financial_health로 조회해 80종목이면 수 분이 걸린다.
+# - V1044/V1049 래퍼가 조회 범위(top_k)를 최종 확정한 뒤 호출하는 기본 루프 바로 앞에서,
+#   같은 범위의 종목을 중복 제거해 SUPPLY_FETCH_WORKERS(기본 8)개 스레드로 미리 조회해 둔다.
+#   결과는 기존 _supply_cache/_financial_cache에 들어가므로 기본 루프(점수/태그 부여)는 그대로 캐시만 읽는다.
+# - pykrx 원시 조회는 PERF-13 supply_cache가 (종목, 기간) 단위로 중복 제거하고 확정 거래일분은 디스크에 남긴다.
+# - SUPPLY_PREFETCH_TIMEOUT(기본 120초)을 넘긴 종목은 기본 루프가 평소처럼 직접 조회한다.
+#   SUPPLY_PREFETCH_ENABLE=0 이면 끈다.
+# =============================================================
+_PERF13_BASE_ENRICH_SUPPLY_FINANCIAL = _V1044_BASE_ENRICH_SUPPLY_FINANCIAL
+_PERF13_LAST_STATS = {}
+
+
+def _perf13_prefetch(all_hits_sorted, top_k_supply, top_k_financial):
+    hits = list(all_hits_sorted or [])
+    supply_jobs, fin_jobs = {}, {}
+    for idx, item in enumerate(hits[:max(int(top_k_supply or 0), int(top_k_financial or 0))]):
+        code = item.get('code') if isinstance(item, dict) else None
+        if not code:
+            continue
+        if idx < top_k_supply and f'profile::realmoney::{code}' not in _supply_cache:
+            supply_jobs.setdefault(code, item.get('현재가', 0))
+        if idx < top_k_financial and code not in _financial_cache:
+            fin_jobs.setdefault(code, None)
+
+    stats = {
+        'supply': len(supply_jobs), 'financial': len(fin_jobs),
+        'supply_ok': 0, 'financial_ok': 0, 'errors': 0, 'timed_out': 0, 'workers': 0, 'stage_sec': 0.0,
+    }
+    if not supply_jobs and not fin_jobs:
+        return stats
+
+    workers = max(1, min(_v1045_env_int('SUPPLY_FETCH_WORKERS', 8), len(supply_jobs) + len(fin_jobs)))
+    budget = max(1, _v1045_env_int('SUPPLY_PREFETCH_TIMEOUT', 120))
+    stats['workers'] = workers
+    t0 = time.perf_counter()
+    ex = ThreadPoolExecutor(max_workers=workers)
+    futs = {}
+    for code, price in supply_jobs.items():
+        futs[ex.submit(get_supply_profile, code, price)] = 'supply'
+    for code in fin_jobs:
+        futs[ex.submit(get_financial_health, code)] = 'financial'
+    try:
+        for fut in as_completed(futs, timeout=budget):
+            try:
+                fut.result()
+                stats[futs[fut] + '_ok'] += 1
+            except Exception:
+                stats['errors'] += 1
+    except FuturesTimeoutError:
+        stats['timed_out'] = sum(1 for f in futs if not f.done())
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
+    stats['stage_sec'] = round(time.perf_counter() - t0, 2)
+    if _supply_store is not None:
+        try:
+            _supply_store.flush()
+        except Exception:
+            pass
+    return stats
+
+
+def _perf13_enrich_batched(all_hits_sorted, top_k_supply=80, top_k_financial=30):
+    if _v1046_env_on('SUPPLY_PREFETCH_ENABLE', '1'):
+        try:
+            stats = _perf13_prefetch(all_hits_sorted, top_k_supply, top_k_financial)
+        except Exception as e:
+            stats = {'error': str(e)[:120]}
+        _PERF13_LAST_STATS.clear()
+        _PERF13_LAST_STATS.update(stats)
+    t0 = time.perf_counter()
+    out = _PERF13_BASE_ENRICH_SUPPLY_FINANCIAL(
+        all_hits_sorted, top_k_supply=top_k_supply, top_k_financial=top_k_financial,
+    )
+    if _PERF13_LAST_STATS:
+        _PERF13_LAST_STATS['apply_sec'] = round(time.perf_counter() - t0, 2)
+    return out
+
+
+def format_supply_prefetch_stats():
+    st = dict(_PERF13_LAST_STATS)
+    if not st:
+        return '🧾 수급/재무 선조회: 미실행'
+    if 'error' in st:
+        return f"🧾 수급/재무 선조회 실패(기본 루프로 진행): {st['error']}"
+    line = (
+        f"🧾 수급/재무 선조회({st['workers']}스레드, {st['stage_sec']}초): 수급 {st['supply_ok']}/{st['supply']} · "
+        f"재무 {st['financial_ok']}/{st['financial']} · 오류 {st['errors']} · 시간초과 {st['timed_out']}"
+    )
+    if 'apply_sec' in st:
+        line += f" | 후처리 루프 {st['apply_sec']}초"
+    if _supply_store is not None:
+        line += ' | ' + _supply_store.format_stats()
+    return line
+
+
+# V1044 래퍼가 확정한 top_k로 호출하는 기본 루프 앞에 끼운다(전역 이름을 호출 시점에 찾는다).
+_V1044_BASE_ENRICH_SUPPLY_FINANCIAL = _perf13_enrich_batched
+
+# =============================================================
+# ✅ END PERF-13 SUPPLY/FINANCIAL BATCH PREFETCH
+# =============================================================
+
 if __name__ == "__main__":
     if _v1080_env_on('STOCKHUNTER_WEEKLY_BACKTEST_ONLY', '0') or '--weekly-backtest' in sys.argv:
         try:
@@ -64850,6 +65461,22 @@ if __name__ == "__main__":
     all_hits = run_scan_with_timeout(
         target_dict, weather_data, global_env, leader_env, sector_master_map
     )
+    try: log_info(format_universe_prefilter_stats())
+    except Exception: pass
+    try: log_info(format_scan_stage_timings())
+    except Exception: pass
+    if _ohlcv_store_on():
+        try: log_info(_ohlcv_store.format_stats())
+        except Exception: pass
+    if _market_panel is not None and _market_panel.enabled():
+        try: log_info(_market_panel.format_stats())
+        except Exception: pass
+    if _http_pool is not None:
+        try: log_info(_http_pool.format_stats())
+        except Exception: pass
+    if _lazy is not None:
+        try: log_info(_lazy.format_stats())
+        except Exception: pass
         
     # ✅ BUGFIX: all_hits 비어있을 때 all_hits_sorted 미정의 방지
     all_hits_sorted = sorted(all_hits, key=lambda x: x['N점수'], reverse=True) if all_hits else []
@@ -64860,6 +65487,8 @@ if __name__ == "__main__":
         top_k_supply=200,
         top_k_financial=100
     )
+    try: log_info(format_supply_prefetch_stats())
+    except Exception: pass
 
     # ✅ DART 공시 정보 추가
     if DART_ENABLED:
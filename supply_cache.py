@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+VERSION = "SUPPLY_CACHE_V1"
+SCHEMA = "SUPPLY_CACHE_PKL_1"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# pykrx 종목별 투자자 거래대금/일봉 조회 결과를 (종류, 종목, 시작, 종료, 옵션) 단위로 재사용한다.
+# - 같은 키를 여러 스레드가 동시에 요청하면 한 번만 호출하고 나머지는 결과를 기다린다.
+# - 종료일이 확정된 거래일(과거일, 또는 당일 SUPPLY_CACHE_FINAL_HHMM 이후)이면 종료일별 파일에 보관해
+#   재실행/백테스트가 네트워크 없이 읽는다. 장중 당일 조회나 빈 결과는 메모리에만 둔다.
+KST = timezone(timedelta(hours=9))
+
+_LOCK = threading.RLock()
+_ROOT = Path(os.getenv("SUPPLY_CACHE_DIR", "reports/.cache/supply_cache"))
+_MEM: dict[str, pd.DataFrame] = {}
+_DAYS: dict[str, dict[str, pd.DataFrame]] = {}
+_DIRTY: set[str] = set()
+_INFLIGHT: dict[str, threading.Event] = {}
+_RUN_START = time.monotonic()
+_STATS: dict[str, float] = {
+    "calls": 0,
+    "mem_hit": 0,
+    "disk_hit": 0,
+    "dedup_wait": 0,
+    "fetched": 0,
+    "fetch_sec": 0.0,
+    "empty": 0,
+    "errors": 0,
+    "days_loaded": 0,
+    "days_written": 0,
+    "bytes_written": 0,
+}
+
+
+def _reinit_after_fork() -> None:
+    """fork 자식: _LOCK을 새로 만들고, 부모 스레드가 끝내고 set 할 _INFLIGHT 이벤트는 자식에서 영영 오지 않으므로 비운다.
+    fork 순간 _LOCK이 잡혀 있었으면 _MEM/_DAYS 캐시와 _DIRTY 표시도 버린다(저장은 부모 몫, 자식은 디스크에서 다시 읽음)."""
+    global _LOCK, _MEM, _DAYS, _DIRTY, _INFLIGHT
+    held = not _LOCK.acquire(blocking=False)
+    _LOCK = threading.RLock()
+    _INFLIGHT = {}
+    if held:
+        _MEM = {}
+        _DAYS = {}
+        _DIRTY = set()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    v = str(os.getenv(name, "1" if default else "0")).strip().lower()
+    return v in {"1", "true", "yes", "y", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(str(os.getenv(name, default)).strip()))
+    except Exception:
+        return int(default)
+
+
+def _norm_code(v: Any) -> str:
+    """Canonical KRX ticker identity; preserves 6-char alphanumeric tickers (e.g. 0126Z0)."""
+    raw = str(v or "").strip().upper()
+    if raw.endswith(".0") and raw[:-2].isdigit():
+        raw = raw[:-2]
+    for suffix in (".KS", ".KQ", ".KRX"):
+        if raw.endswith(suffix):
+            raw = raw[:-len(suffix)]
+            break
+    s = "".join(ch for ch in raw if ch in "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    if len(s) == 7 and s.startswith("A"):
+        s = s[1:]
+    if s.isdigit() and len(s) <= 6:
+        return s.zfill(6)
+    if len(s) >= 6:
+        return s[-6:]
+    return s
+
+
+def enabled() -> bool:
+    return _env_bool("SUPPLY_CACHE_ENABLE", True)
+
+
+def configure(root: str | Path | None = None) -> None:
+    """캐시 디렉터리를 바꾼다(메모리 캐시도 비운다)."""
+    global _ROOT
+    with _LOCK:
+        if root is not None:
+            _ROOT = Path(root)
+        _MEM.clear()
+        _DAYS.clear()
+        _DIRTY.clear()
+
+
+def _now_kst() -> datetime:
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def _ymd(v: Any) -> str:
+    return str(v).replace("-", "")[:8]
+
+
+def is_final(end_ymd: str, now: datetime | None = None) -> bool:
+    """``end_ymd`` 까지의 투자자 데이터가 더 바뀌지 않는 시점인지."""
+    now = now or _now_kst()
+    today = now.strftime("%Y%m%d")
+    if end_ymd != today:
+        return end_ymd < today
+    hh, mm = divmod(max(0, _env_int("SUPPLY_CACHE_FINAL_HHMM", 1800)), 100)
+    return now.hour * 60 + now.minute >= hh * 60 + mm
+
+
+def _day_file(end_ymd: str) -> Path:
+    return _ROOT / f"{end_ymd}.pkl.gz"
+
+
+def _day_entries(end_ymd: str) -> dict[str, pd.DataFrame]:
+    ent = _DAYS.get(end_ymd)
+    if ent is not None:
+        return ent
+    ent = {}
+    p = _day_file(end_ymd)
+    if p.exists():
+        try:
+            obj = pd.read_pickle(p, compression="gzip")
+            if isinstance(obj, dict) and obj.get("schema") == SCHEMA:
+                ent = dict(obj.get("frames") or {})
+                _STATS["days_loaded"] += 1
+        except Exception:
+            ent = {}
+    _DAYS[end_ymd] = ent
+    return ent
+
+
+def cached_frame(kind: str, code: Any, start: Any, end: Any, fetch: Callable[[], Any], extra: str = "") -> pd.DataFrame:
+    """``fetch()`` 결과 DataFrame을 키 단위로 캐시해 복사본을 돌려준다. fetch 예외는 그대로 올린다."""
+    code_s, start_s, end_s = _norm_code(code), _ymd(start), _ymd(end)
+    key = f"{kind}|{code_s}|{start_s}|{end_s}|{extra}"
+    persist = enabled() and is_final(end_s)
+    with _LOCK:
+        _STATS["calls"] += 1
+    while True:
+        with _LOCK:
+            hit = _MEM.get(key)
+            if hit is not None:
+                _STATS["mem_hit"] += 1
+                return hit.copy()
+            if persist:
+                hit = _day_entries(end_s).get(key)
+                if hit is not None:
+                    _MEM[key] = hit
+                    _STATS["disk_hit"] += 1
+                    return hit.copy()
+            ev = _INFLIGHT.get(key)
+            if ev is None:
+                ev = _INFLIGHT[key] = threading.Event()
+                break
+            _STATS["dedup_wait"] += 1
+        # 먼저 요청한 스레드가 끝나면 메모리 캐시에서 가져간다(실패했으면 다음 바퀴에 직접 호출).
+        ev.wait(max(1, _env_int("SUPPLY_CACHE_WAIT_SEC", 60)))
+
+    t0 = time.perf_counter()
+    try:
+        raw = fetch()
+        df = raw.copy() if isinstance(raw, pd.DataFrame) else pd.DataFrame()
+        with _LOCK:
+            _STATS["fetched"] += 1
+            _STATS["fetch_sec"] += time.perf_counter() - t0
+            _MEM[key] = df
+            if df.empty:
+                _STATS["empty"] += 1
+            elif persist:
+                _day_entries(end_s)[key] = df
+                _DIRTY.add(end_s)
+        return df.copy()
+    except Exception:
+        with _LOCK:
+            _STATS["errors"] += 1
+            _STATS["fetch_sec"] += time.perf_counter() - t0
+        raise
+    finally:
+        with _LOCK:
+            _INFLIGHT.pop(key, None)
+        ev.set()
+
+
+def trading_value(code: Any, start: Any, end: Any, on: str = "순매수") -> pd.DataFrame:
+    """pykrx ``get_market_trading_value_by_date(start, end, code, on=on)`` 캐시판."""
+    code_s = _norm_code(code)
+
+    def _fetch() -> pd.DataFrame:
+        from pykrx import stock
+
+        return stock.get_market_trading_value_by_date(_ymd(start), _ymd(end), code_s, on=on)
+
+    return cached_frame("tv", code_s, start, end, _fetch, extra=on)
+
+
+def ohlcv_by_date(code: Any, start: Any, end: Any) -> pd.DataFrame:
+    """pykrx ``get_market_ohlcv_by_date(start, end, code)`` 캐시판(거래대금 포함)."""
+    code_s = _norm_code(code)
+
+    def _fetch() -> pd.DataFrame:
+        from pykrx import stock
+
+        return stock.get_market_ohlcv_by_date(_ymd(start), _ymd(end), code_s)
+
+    return cached_frame("ohlcv", code_s, start, end, _fetch)
+
+
+def flush() -> int:
+    """새로 확정된 항목이 생긴 종료일 파일만 원자적으로 다시 쓴다. 쓴 파일 수를 돌려준다."""
+    with _LOCK:
+        dirty = sorted(_DIRTY)
+        _DIRTY.clear()
+        payloads = {d: dict(_DAYS.get(d) or {}) for d in dirty}
+    written = 0
+    for d, frames in payloads.items():
+        if not frames:
+            continue
+        p = _day_file(d)
+        try:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+            pd.to_pickle({"schema": SCHEMA, "saved_at": time.time(), "frames": frames}, tmp, compression="gzip")
+            size = tmp.stat().st_size
+            os.replace(tmp, p)
+            written += 1
+            with _LOCK:
+                _STATS["days_written"] += 1
+                _STATS["bytes_written"] += size
+        except Exception:
+            with _LOCK:
+                _DIRTY.add(d)
+    return written
+
+
+atexit.register(flush)
+
+
+def reset_stats() -> None:
+    global _RUN_START
+    _RUN_START = time.monotonic()
+    with _LOCK:
+        for k in list(_STATS):
+            _STATS[k] = 0
+
+
+def stats_snapshot() -> dict[str, Any]:
+    with _LOCK:
+        z = dict(_STATS)
+        z["mem_entries"] = len(_MEM)
+    z["fetch_sec"] = round(z["fetch_sec"], 2)
+    z["elapsed_sec"] = round(max(0.0, time.monotonic() - _RUN_START), 3)
+    return z
+
+
+def format_stats() -> str:
+    st = stats_snapshot()
+    return (
+        f"🧾 수급 캐시: 조회 {int(st['calls'])} | 메모리 {int(st['mem_hit'])} · 디스크 {int(st['disk_hit'])} · 중복대기 {int(st['dedup_wait'])} | "
+        f"신규 {int(st['fetched'])}({st['fetch_sec']}초) · 빈결과 {int(st['empty'])} · 오류 {int(st['errors'])} | 저장 {int(st['days_written'])}일"
+    )
@@ -34,6 +34,18 @@ try:
 except Exception:
     fdr = None
 
+# 공용 KRX 거래일 달력(krx_calendar.py): 지수 일봉 1회 조회 결과를 디스크에 남겨 재실행은 네트워크 없이 쓴다.
+try:
+    import krx_calendar as _krx_cal
+except Exception:
+    _krx_cal = None
+
+# 장중 스트리밍 엔진(intraday_engine.py): 전일 봉/종목표는 하루 한 번, 틱마다 전 종목 시세 bulk 1회.
+try:
+    import intraday_engine as _intraday
+except Exception:
+    _intraday = None
+
 try:
     from scan_logger import set_log_level, log_info, log_error, log_debug
     set_log_level('NORMAL')
@@ -98,6 +110,12 @@ def _get_today_str() -> str:
 def _find_prev_trading_day(today_str: str, lookback_days: int = 10) -> str:
     """가장 가까운 이전 거래일 찾기"""
     today_dt = datetime.strptime(today_str, '%Y%m%d')
+    if _krx_cal is not None and fdr is not None:
+        start = today_dt - timedelta(days=lookback_days)
+        if _krx_cal.ensure_observed(start, today_dt - timedelta(days=1), fdr.DataReader):
+            prev = _krx_cal.prev_session(today_dt)
+            if prev is not None:
+                return prev.strftime('%Y%m%d')
     for i in range(1, lookback_days + 1):
         cand = (today_dt - timedelta(days=i)).strftime('%Y%m%d')
         try:
@@ -247,6 +265,16 @@ def _load_krx_listing() -> pd.DataFrame:
     return pd.DataFrame(columns=['Code', 'Name', 'Market'])
 
 
+def _engine_warn(msg: str):
+    """장중 엔진 경고(기준값 파일 없음 등): 로그 + 텔레그램. 엔진이 세션마다 한 번만 부른다."""
+    log_error(msg)
+    send_telegram(msg)
+
+
+if _intraday is not None:
+    _intraday.configure(listing_loader=_load_krx_listing, warn=_engine_warn)
+
+
 def _normalize_listing(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         return pd.DataFrame(columns=['code', 'name_meta', 'marcap', 'market_meta'])
@@ -458,6 +486,20 @@ def _get_market_snapshot() -> pd.DataFrame:
     return snapshot
 
 
+def _engine_snapshot() -> pd.DataFrame:
+    """장중 엔진 틱 스냅샷 (prev_close/prev_volume 포함). 엔진이 없거나 실패하면 빈 DataFrame."""
+    if _intraday is None or not _intraday.enabled():
+        return pd.DataFrame()
+    try:
+        snapshot = _intraday.tick()
+    except Exception as e:
+        log_error(f"⚠️ 장중 엔진 틱 실패: {e}")
+        return pd.DataFrame()
+    if not snapshot.empty:
+        log_info(f"✅ 시세 로드(엔진): {len(snapshot)}개 종목")
+    return snapshot
+
+
 def _get_prev_volume(code: str, today: str) -> float:
     """
     전일 거래량 조회.
@@ -605,7 +647,7 @@ def format_surge_message(hit: dict, scan_time: str) -> str:
 # =============================================================
 # 🚀 메인 스캔
 # =============================================================
-def run_surge_scan(force_run: bool = False) -> list:
+def run_surge_scan(force_run: bool = False, snapshot: pd.DataFrame | None = None) -> list:
     ts = now_kst()
     scan_time = ts.strftime('%H:%M')
     today = ts.strftime('%Y%m%d')
@@ -623,7 +665,10 @@ def run_surge_scan(force_run: bool = False) -> list:
     log_info(f"🔍 급등 스캔 시작: {scan_time}")
     log_info(f"   조건: +{min_change_pct:.1f}% | 거래량 {min_vol_ratio:.1f}배 | 거래대금 {min_amount:.1f}억+")
 
-    snapshot = _get_market_snapshot()
+    if snapshot is None or snapshot.empty:
+        snapshot = _engine_snapshot()
+    if snapshot.empty:
+        snapshot = _get_market_snapshot()
     if snapshot.empty:
         log_error("⚠️ 시세 수집 실패")
         return []
@@ -650,8 +695,16 @@ def run_surge_scan(force_run: bool = False) -> list:
     codes = list(snapshot['code'].astype(str).values)
 
     prev_vols = {}
+    missing = codes
+    if 'prev_volume' in snapshot.columns:
+        # 엔진 스냅샷: 전일 거래량은 장 시작 시 읽은 기준값 파일(전 종목 전일 봉)에서 꺼낸다.
+        # 기준값에 없는 종목(NaN)은 0으로 두면 조용히 탈락하므로 그 종목만 종목별 조회.
+        known = pd.to_numeric(snapshot['prev_volume'], errors='coerce')
+        prev_vols = {c: float(v) for c, v in zip(codes, known) if pd.notna(v)}
+        missing = [c for c in codes if c not in prev_vols]
+
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(_get_prev_volume, code, today): code for code in codes}
+        futures = {executor.submit(_get_prev_volume, code, today): code for code in missing}
         for future in as_completed(futures, timeout=60):
             code = futures[future]
             try:
@@ -705,7 +758,7 @@ def run_surge_scan(force_run: bool = False) -> list:
 # =============================================================
 # 🔄 장중 루프
 # =============================================================
-def run_loop(interval_minutes: int = 10):
+def run_loop(interval_minutes: float = 2):
     log_info(f"🔄 자동 반복 모드: {interval_minutes}분 간격")
     log_info("  종료: Ctrl+C\n")
 
@@ -715,6 +768,17 @@ def run_loop(interval_minutes: int = 10):
         f"조건: 동적 기준 적용 (장 초반 완화)"
     )
 
+    if _intraday is not None and _intraday.enabled():
+        # 엔진 구독: 틱마다 당일 시세만 새로 받고 전일 거래량은 장 시작 때 받은 값을 쓴다.
+        _intraday.subscribe('surge', lambda snap: run_surge_scan(force_run=False, snapshot=snap))
+        try:
+            _intraday.run_loop(interval_minutes * 60, log=log_error)
+        except KeyboardInterrupt:
+            log_info("\n🛑 스캐너 종료")
+            log_info(_intraday.format_stats())
+            send_telegram("🛑 급등 스캐너 종료")
+        return
+
     while True:
         try:
             ts = now_kst()
@@ -742,7 +806,7 @@ def run_loop(interval_minutes: int = 10):
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='실시간 급등 스캐너 (수정완성형)')
     parser.add_argument('--loop', action='store_true', help='장중 자동 반복')
-    parser.add_argument('--interval', default=10, type=int, help='반복 간격(분)')
+    parser.add_argument('--interval', default=2, type=float, help='반복 간격(분)')
     parser.add_argument('--test', action='store_true', help='장외에도 강제 실행')
     args = parser.parse_args()
 
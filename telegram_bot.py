@@ -1,11 +1,33 @@
 import os
+import threading
+import time
 import traceback
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
 import requests
 import pandas as pd
 import FinanceDataReader as fdr
 
 from flask import Flask, request, jsonify
 
+# 야간 스캔이 채워 둔 종목별 일봉 저장소(ohlcv_store) + 전 종목 패널(market_panel). 없으면 fdr 직접 조회.
+# 패널 연결과 예열 스레드는 import 시점이 아니라 create_app()에서 한다(공용 저장소 설정을 import만으로 바꾸지 않도록).
+try:
+    import ohlcv_store as _ohlcv_store
+except Exception:
+    _ohlcv_store = None
+
+try:
+    import market_panel as _market_panel
+except Exception:
+    _market_panel = None
+
+try:
+    import krx_calendar as _krx_cal
+except Exception:
+    _krx_cal = None
+
 # =========================================================
 # 기존 메인 코드에서 가져올 함수들
 # main7.py 파일명에 맞게 수정하세요.
@@ -37,6 +59,22 @@ REAL_HEADERS = {
     "User-Agent": "Mozilla/5.0"
 }
 
+KST = timezone(timedelta(hours=9))
+
+# 분석 캐시: 종목코드 → 지표 계산된 일봉 + 단계/청산 판정. 장중엔 짧게, 장외엔 다음 장 시작까지 유지.
+ANALYSIS_LRU_SIZE = int(os.environ.get("BOT_ANALYSIS_LRU_SIZE", "256"))
+INTRADAY_TTL_SEC = int(os.environ.get("BOT_INTRADAY_TTL_SEC", "300"))
+LISTING_TTL_SEC = int(os.environ.get("BOT_LISTING_TTL_SEC", "43200"))
+WARM_INTERVAL_SEC = int(os.environ.get("BOT_WARM_INTERVAL_SEC", "1800"))
+MARKET_OPEN_HHMM = (9, 0)
+MARKET_CLOSE_HHMM = (15, 40)  # ohlcv_store 확정봉 기준(OHLCV_STORE_CLOSE_HHMM)과 맞춘다
+
+_LOCK = threading.Lock()
+_ANALYSIS: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+_NAME_INDEX: dict = {"exact": {}, "rows": [], "expires_at": 0.0}
+_STATS = {"hit": 0, "miss": 0, "evicted": 0, "listing_loads": 0}
+_STARTED = False
+
 # =========================================================
 # 유틸
 # =========================================================
@@ -52,37 +90,95 @@ def send_telegram_message(chat_id: int, text: str):
 def normalize_stock_name(text: str) -> str:
     return str(text).strip().replace(" ", "")
 
+def _now_kst() -> datetime:
+    return datetime.now(KST).replace(tzinfo=None)
+
+def _is_session(day: pd.Timestamp) -> bool:
+    if _krx_cal is not None:
+        try:
+            return bool(_krx_cal.is_session(day))
+        except Exception:
+            pass
+    return day.weekday() < 5
+
+def _next_open(day: pd.Timestamp) -> datetime:
+    """day 다음 거래일 장 시작 시각"""
+    nxt = None
+    if _krx_cal is not None:
+        try:
+            nxt = _krx_cal.next_session(day)
+        except Exception:
+            nxt = None
+    if nxt is None:
+        nxt = day + pd.Timedelta(days=1)
+        while nxt.weekday() >= 5:
+            nxt += pd.Timedelta(days=1)
+    nxt = pd.Timestamp(nxt)
+    return datetime(nxt.year, nxt.month, nxt.day, *MARKET_OPEN_HHMM)
+
+def _cache_expiry(now: datetime | None = None) -> float:
+    """
+    분석 캐시 만료 시각(epoch). 장중에는 당일 봉이 움직이므로 INTRADAY_TTL_SEC,
+    장 시작 전이면 오늘 장 시작까지, 장 마감 후/휴장일이면 다음 거래일 장 시작까지 유지한다.
+    """
+    now = now or _now_kst()
+    today = pd.Timestamp(now.date())
+    if _is_session(today):
+        open_dt = datetime(now.year, now.month, now.day, *MARKET_OPEN_HHMM)
+        close_dt = datetime(now.year, now.month, now.day, *MARKET_CLOSE_HHMM)
+        if now < open_dt:
+            until = open_dt
+        elif now < close_dt:
+            until = min(now + timedelta(seconds=INTRADAY_TTL_SEC), close_dt)
+        else:
+            until = _next_open(today)
+    else:
+        until = _next_open(today)
+    return time.time() + max(1.0, (until - now).total_seconds())
+
+def _build_name_index() -> None:
+    df_krx = load_krx_listing_safe()
+    if df_krx is None or df_krx.empty:
+        return
+
+    codes = (
+        df_krx["Code"]
+        .fillna("")
+        .astype(str)
+        .str.replace(".0", "", regex=False)
+        .str.zfill(6)
+        .tolist()
+    )
+    names = df_krx["Name"].astype(str).tolist()
+    rows = [(normalize_stock_name(n), c, n) for c, n in zip(codes, names)]
+    exact = {}
+    for key, c, n in rows:
+        exact.setdefault(key, (c, n))  # 상장목록 순서상 첫 종목 우선(기존 iloc[0]과 동일)
+
+    with _LOCK:
+        _NAME_INDEX.update(exact=exact, rows=rows, expires_at=time.time() + LISTING_TTL_SEC)
+        _STATS["listing_loads"] += 1
+
 def find_stock_code_by_name(stock_name: str) -> tuple[str, str] | tuple[None, None]:
     """
-    종목명으로 Code, Name 찾기
+    종목명으로 Code, Name 찾기 (미리 만든 종목명 인덱스 사용)
     """
     try:
-        df_krx = load_krx_listing_safe()
-        if df_krx is None or df_krx.empty:
-            return None, None
-
-        df_krx["Code"] = (
-            df_krx["Code"]
-            .fillna("")
-            .astype(str)
-            .str.replace(".0", "", regex=False)
-            .str.zfill(6)
-        )
-        df_krx["Name"] = df_krx["Name"].astype(str)
+        if time.time() >= _NAME_INDEX["expires_at"]:
+            _build_name_index()
 
         target = normalize_stock_name(stock_name)
 
         # 1차: 완전일치
-        exact = df_krx[df_krx["Name"].apply(normalize_stock_name) == target]
-        if not exact.empty:
-            row = exact.iloc[0]
-            return row["Code"], row["Name"]
+        hit = _NAME_INDEX["exact"].get(target)
+        if hit:
+            return hit
 
         # 2차: 포함 검색
-        partial = df_krx[df_krx["Name"].apply(normalize_stock_name).str.contains(target, na=False)]
-        if not partial.empty:
-            row = partial.iloc[0]
-            return row["Code"], row["Name"]
+        if target:
+            for key, code, name in _NAME_INDEX["rows"]:
+                if target in key:
+                    return code, name
 
         return None, None
     except Exception:
@@ -90,7 +186,12 @@ def find_stock_code_by_name(stock_name: str) -> tuple[str, str] | tuple[None, No
 
 def fetch_stock_df(code: str, days: int = 250) -> pd.DataFrame | None:
     try:
-        df = fdr.DataReader(code)
+        if _ohlcv_store is not None and _ohlcv_store.enabled():
+            # 저장소의 마지막 저장일 이후 봉만 새로 받는다(장외에는 보통 네트워크 0회)
+            df = _ohlcv_store.get_history(code, days=int(days * 1.6) + 30)
+        else:
+            start = (pd.Timestamp.now() - pd.Timedelta(days=int(days * 1.6) + 30)).strftime("%Y-%m-%d")
+            df = fdr.DataReader(code, start)
         if df is None or df.empty:
             return None
 
@@ -101,21 +202,129 @@ def fetch_stock_df(code: str, days: int = 250) -> pd.DataFrame | None:
     except Exception:
         return None
 
+def get_analysis(code: str) -> dict | None:
+    """
+    종목별 지표 일봉 + 단계 판정을 LRU 캐시에서 꺼낸다. 없거나 만료됐으면 새로 계산해 넣는다.
+    반환: {"df", "stage_eval", "exit_eval"(매수가 미입력 기준)} / 실패 시 {"error": "..."}
+    """
+    now = time.time()
+    with _LOCK:
+        entry = _ANALYSIS.get(code)
+        if entry is not None and entry[0] > now:
+            _ANALYSIS.move_to_end(code)
+            _STATS["hit"] += 1
+            return entry[1]
+        _STATS["miss"] += 1
+
+    df = fetch_stock_df(code)
+    if df is None:
+        return {"error": "data"}
+
+    df = get_indicators(df)
+    if df is None or df.empty:
+        return {"error": "indicators"}
+
+    analysis = {
+        "df": df,
+        "stage_eval": evaluate_stage_sequence(df),
+        "exit_eval": evaluate_exit_signal(df, entry_price=None),
+    }
+    with _LOCK:
+        _ANALYSIS[code] = (_cache_expiry(), analysis)
+        _ANALYSIS.move_to_end(code)
+        while len(_ANALYSIS) > ANALYSIS_LRU_SIZE:
+            _ANALYSIS.popitem(last=False)
+            _STATS["evicted"] += 1
+    return analysis
+
+def _top_candidate_codes() -> list[str]:
+    if not os.path.exists(TOP_CANDIDATES_FILE):
+        return []
+    try:
+        df = pd.read_csv(TOP_CANDIDATES_FILE, dtype=str)
+    except Exception:
+        return []
+    codes = []
+    for _, row in df.head(20).iterrows():
+        code = str(row.get("종목코드", "") or row.get("code", "") or "").replace(".0", "").strip()
+        if code and code != "nan":
+            codes.append(code.zfill(6))
+        elif row.get("종목명"):
+            found, _ = find_stock_code_by_name(row.get("종목명"))
+            if found:
+                codes.append(found)
+    return codes
+
+def _warm_worker() -> None:
+    """
+    백그라운드 예열: 종목명 인덱스를 미리 만들고 TOP 후보 분석을 캐시에 올려 둔다.
+    첫 메시지가 상장목록 로딩/일봉 다운로드를 기다리지 않게 한다.
+    """
+    while True:
+        try:
+            if time.time() >= _NAME_INDEX["expires_at"]:
+                _build_name_index()
+            for code in _top_candidate_codes():
+                get_analysis(code)
+        except Exception:
+            traceback.print_exc()
+        time.sleep(max(60, WARM_INTERVAL_SEC))
+
+def start_warm_worker() -> None:
+    if os.environ.get("BOT_WARM_ENABLE", "1") != "1":
+        return
+    threading.Thread(target=_warm_worker, name="bot-warm", daemon=True).start()
+
+def _attach_panel() -> bool:
+    """
+    전 종목 패널을 일봉 저장소에 붙인다. 저장소가 패널 봉의 기준가 조정(액면분할 등)을 확인하지 못하면
+    (adjusted_history 없음/False) 미수정 봉이 섞일 수 있으므로 붙이지 않는다.
+    """
+    if _ohlcv_store is None or _market_panel is None or not _market_panel.enabled():
+        return False
+    if os.environ.get("BOT_MARKET_PANEL", "1") != "1" or not hasattr(_ohlcv_store, "adjusted_history"):
+        return False
+    _ohlcv_store.configure(panel=_market_panel)
+    return bool(_ohlcv_store.adjusted_history())
+
+def create_app() -> Flask:
+    """
+    봇 앱 팩토리: 패널 연결 + 예열 스레드 시작 후 app을 돌려준다. 여러 번 불러도 한 번만 시작한다.
+    python telegram_bot.py 또는 gunicorn "telegram_bot:create_app()" 로 띄운다.
+    """
+    global _STARTED
+    with _LOCK:
+        if _STARTED:
+            return app
+        _STARTED = True
+    _attach_panel()
+    start_warm_worker()
+    return app
+
 def format_profit(entry_price: float | None, current_price: float) -> str:
     if entry_price is None or entry_price <= 0:
         return "미입력"
     pct = ((current_price - entry_price) / entry_price) * 100
     return f"{pct:+.2f}%"
 
-def build_analyze_reply(stock_name: str, code: str, df: pd.DataFrame, entry_price: float | None = None) -> str:
+def build_analyze_reply(
+    stock_name: str,
+    code: str,
+    df: pd.DataFrame,
+    entry_price: float | None = None,
+    stage_eval: dict | None = None,
+    exit_eval: dict | None = None,
+) -> str:
     """
-    보유종목/현재종목 분석 답변
+    보유종목/현재종목 분석 답변 (stage_eval/exit_eval를 넘기면 재계산하지 않음)
     """
     row = df.iloc[-1]
 
     current_price = float(row["Close"])
-    stage_eval = evaluate_stage_sequence(df)
-    exit_eval = evaluate_exit_signal(df, entry_price=entry_price)
+    if stage_eval is None:
+        stage_eval = evaluate_stage_sequence(df)
+    if exit_eval is None:
+        exit_eval = evaluate_exit_signal(df, entry_price=entry_price)
 
     rsi = safe_float(row.get("RSI", 0))
     bb40 = safe_float(row.get("BB40_Width", 0))
@@ -189,6 +398,12 @@ def load_top_candidates_text() -> str:
 def health():
     return "ok", 200
 
+@app.route("/stats")
+def cache_stats():
+    with _LOCK:
+        payload = dict(_STATS, entries=len(_ANALYSIS), names=len(_NAME_INDEX["rows"]))
+    return jsonify(payload)
+
 @app.route(f"/webhook/{WEBHOOK_SECRET}", methods=["POST"])
 def telegram_webhook():
     try:
@@ -221,17 +436,18 @@ def telegram_webhook():
                 send_telegram_message(chat_id, f"종목을 찾지 못했습니다: {stock_name_input}")
                 return jsonify({"ok": True})
 
-            df = fetch_stock_df(code)
-            if df is None:
+            analysis = get_analysis(code)
+            if analysis.get("error") == "data":
                 send_telegram_message(chat_id, f"차트 데이터를 불러오지 못했습니다: {stock_name}")
                 return jsonify({"ok": True})
-
-            df = get_indicators(df)
-            if df is None or df.empty:
+            if analysis.get("error"):
                 send_telegram_message(chat_id, f"지표 계산 실패: {stock_name}")
                 return jsonify({"ok": True})
 
-            reply = build_analyze_reply(stock_name, code, df, entry_price=None)
+            reply = build_analyze_reply(
+                stock_name, code, analysis["df"], entry_price=None,
+                stage_eval=analysis["stage_eval"], exit_eval=analysis["exit_eval"],
+            )
             send_telegram_message(chat_id, reply)
             return jsonify({"ok": True})
 
@@ -257,17 +473,20 @@ def telegram_webhook():
                 send_telegram_message(chat_id, f"종목을 찾지 못했습니다: {stock_name_input}")
                 return jsonify({"ok": True})
 
-            df = fetch_stock_df(code)
-            if df is None:
+            analysis = get_analysis(code)
+            if analysis.get("error") == "data":
                 send_telegram_message(chat_id, f"차트 데이터를 불러오지 못했습니다: {stock_name}")
                 return jsonify({"ok": True})
-
-            df = get_indicators(df)
-            if df is None or df.empty:
+            if analysis.get("error"):
                 send_telegram_message(chat_id, f"지표 계산 실패: {stock_name}")
                 return jsonify({"ok": True})
 
-            reply = build_analyze_reply(stock_name, code, df, entry_price=entry_price)
+            # 매수가가 있으면 청산 판정만 새로 계산(지표/단계 판정은 캐시 재사용)
+            reply = build_analyze_reply(
+                stock_name, code, analysis["df"], entry_price=entry_price,
+                stage_eval=analysis["stage_eval"],
+                exit_eval=None if entry_price else analysis["exit_eval"],
+            )
             send_telegram_message(chat_id, reply)
             return jsonify({"ok": True})
 
@@ -294,4 +513,4 @@ def telegram_webhook():
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 10000))
-    app.run(host="0.0.0.0", port=port)
\ No newline at end of file
+    create_app().run(host="0.0.0.0", port=port)
\ No newline at end of file
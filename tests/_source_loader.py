@@ -0,0 +1,45 @@
+"""import할 수 없는 스크립트(점이 들어간 파일명, 저장소에 없는 main7_bugfix 등)에서 최상위 정의만 불러온다.
+
+설치돼 있지 않은 의존성의 import 문은 건너뛰고(그 이름을 쓰는 함수는 테스트 대상이 아니다),
+``if __name__ == '__main__'`` 블록은 실행하지 않는다.
+"""
+import ast
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _is_main_guard(node: ast.stmt) -> bool:
+    return isinstance(node, ast.If) and "__main__" in ast.unparse(node.test)
+
+
+def _bound_names(node: ast.stmt) -> set:
+    if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+        return {node.name}
+    targets = node.targets if isinstance(node, ast.Assign) else [node.target] if isinstance(node, ast.AnnAssign) else []
+    return {t.id for t in targets if isinstance(t, ast.Name)}
+
+
+def load_script(filename: str, names=None, preset=None) -> types.ModuleType:
+    """``filename``의 최상위 문장을 차례로 실행한 모듈 객체.
+
+    ``names``를 주면 그 이름을 정의하는 함수/클래스/대입문만 실행한다(import는 ``preset``으로 넘긴다).
+    """
+    path = ROOT / filename
+    src = path.read_text(encoding="utf-8")
+    mod = types.ModuleType(path.stem.replace(".", "_"))
+    mod.__file__ = str(path)
+    mod.__dict__.update(preset or {})
+    for node in ast.parse(src, filename=str(path)).body:
+        if _is_main_guard(node):
+            continue
+        if names is not None and not (_bound_names(node) & set(names)):
+            continue
+        code = compile(ast.Module(body=[node], type_ignores=[]), str(path), "exec")
+        try:
+            exec(code, mod.__dict__)
+        except ImportError:
+            if not isinstance(node, (ast.Import, ast.ImportFrom, ast.Try)):
+                raise
+    return mod
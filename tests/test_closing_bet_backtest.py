@@ -0,0 +1,139 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from _source_loader import load_script
+
+cb = load_script("Closing_bet_backtest.py")
+
+
+def _frame(seed: int, n: int = 360) -> pd.DataFrame:
+    """급락/급등이 섞인 일봉 + get_indicators가 붙이는 MA20/VMA20/RSI/ATR."""
+    rng = np.random.default_rng(seed)
+    ret = rng.normal(0, 0.025, n)
+    ret[rng.random(n) < 0.04] -= 0.07
+    ret[rng.random(n) < 0.04] += 0.08
+    c = np.round(20_000 * np.exp(np.cumsum(ret)), -1)
+    o = np.round(c * (1 + rng.normal(0, 0.012, n)), -1)
+    h = np.maximum(o, c) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    lo = np.minimum(o, c) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    v = rng.lognormal(np.log(400_000), 0.6, n).round()
+    df = pd.DataFrame({
+        "Date": pd.bdate_range("2021-01-04", periods=n),
+        "Open": o, "High": h.round(-1), "Low": lo.round(-1), "Close": c, "Volume": v,
+    })
+    close = df["Close"]
+    df["MA20"] = close.rolling(20).mean()
+    df["VMA20"] = df["Volume"].rolling(20).mean()
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).ewm(com=13, adjust=False).mean()
+    loss = (-delta.where(delta < 0, 0)).ewm(com=13, adjust=False).mean()
+    df["RSI"] = 100 - 100 / (1 + gain / loss)
+    tr = pd.concat(
+        [df["High"] - df["Low"], (df["High"] - close.shift()).abs(), (df["Low"] - close.shift()).abs()], axis=1
+    ).max(axis=1)
+    df["ATR"] = tr.rolling(14).mean()
+    return df
+
+
+def _with_gaps(seed: int) -> pd.DataFrame:
+    df = _frame(seed)
+    rng = np.random.default_rng(seed + 100)
+    for col in ("Open", "High", "Low"):
+        df.loc[rng.choice(np.arange(60, len(df)), 6, replace=False), col] = np.nan
+    df.loc[rng.choice(np.arange(60, len(df)), 3, replace=False), "RSI"] = np.nan
+    return df
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def _assert_rows_equal(df: pd.DataFrame, code: str) -> dict:
+    hits = cb._scan_condition_hits(df, code=code)
+    for i in range(60, len(df)):
+        ref = cb._check_conditions_on_date(df, i, code=code)
+        got = hits.get(i)
+        if ref is None or got is None:
+            assert ref is got, f"row {i}: per-row={'hit' if ref else 'miss'} vector={'hit' if got else 'miss'}"
+            continue
+        assert set(got) == set(ref), f"row {i}: keys {sorted(set(got) ^ set(ref))}"
+        bad = {k: (ref[k], got[k]) for k in ref if not _same(ref[k], got[k])}
+        assert not bad, f"row {i}: {bad}"
+    return hits
+
+
+@pytest.fixture
+def index_maps():
+    saved = dict(cb.INDEX_MAP), set(cb.TOP_MCAP_SET)
+    cb.INDEX_MAP.update({"005930": "코스피200", "247540": "코스닥150"})
+    cb.TOP_MCAP_SET.add("005930")
+    yield
+    cb.INDEX_MAP.clear(); cb.INDEX_MAP.update(saved[0])
+    cb.TOP_MCAP_SET.clear(); cb.TOP_MCAP_SET.update(saved[1])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("code", ["005930", "247540", "900110"])
+def test_vectorized_conditions_match_per_row(index_maps, seed, code):
+    hits = _assert_rows_equal(_frame(seed), code)
+    assert {h["mode"] for h in hits.values()} == {"A", "B1", "B2"}
+
+
+def test_vectorized_conditions_match_with_missing_values(index_maps):
+    _assert_rows_equal(_with_gaps(3), "005930")
+
+
+def test_vectorized_conditions_match_without_indicator_columns():
+    # get_indicators 컬럼이 없으면 두 경로 모두 rolling 대체값/기본값(RSI 50, ATR 0)을 쓴다.
+    df = _frame(4).drop(columns=["MA20", "VMA20", "RSI", "ATR"])
+    assert _assert_rows_equal(df, "000660")
+
+
+def test_scan_range_matches_full_scan():
+    df = _frame(5)
+    full = cb._scan_condition_hits(df, code="000660")
+    part = cb._scan_condition_hits(df, code="000660", lo=150, hi=250)
+    assert part == {i: v for i, v in full.items() if 150 <= i < 250}
+    assert cb._scan_condition_hits(df.iloc[:59], code="000660") == {}
+
+
+def test_verify_helper_reports_no_mismatch():
+    res = cb.verify_vectorized_conditions(_frame(6), code="000660")
+    assert res["mismatches"] == []
+    assert res["hits"] == res["vector_hits"] > 0
+
+
+def _path_frame(seed: int, n: int = 400) -> pd.DataFrame:
+    df = _frame(seed, n)
+    rng = np.random.default_rng(seed + 200)
+    for col in ("High", "Low", "Close"):
+        df.loc[rng.choice(n, 12, replace=False), col] = np.nan
+    df.loc[rng.choice(n, 4, replace=False), "Close"] = 0.0
+    # 진입 다음 날 +2% 목표와 -3% 손절을 같은 봉에서 모두 건드리는 행
+    df.loc[200, ["Close", "Open"]] = 20_000.0
+    df.loc[201, ["High", "Low"]] = [20_500.0, 19_300.0]
+    return df
+
+
+@pytest.mark.parametrize("policy", ["stop_first", "target_first"])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_trade_paths_batch_matches_per_row(monkeypatch, policy, seed):
+    monkeypatch.setattr(cb, "SAME_DAY_EXIT_POLICY", policy)
+    df = _path_frame(seed)
+    rows = list(range(60, len(df)))
+    batch = cb._trade_paths_batch(df, rows)
+    for i in rows:
+        entry = cb._safe_float(df["Close"].iloc[i])
+        if entry <= 0:
+            assert i not in batch
+            continue
+        fr, ev = batch[i]
+        assert list(fr.items()) == list(cb._forward_returns_one(df, i, entry).items()), i
+        assert list(ev.items()) == list(cb._evaluate_trade_window(df, i, entry).items()), i
+    assert batch[200][1]["실전청산사유"] == ("동일봉_익절우선" if policy == "target_first" else "동일봉_손절우선")
+    assert batch[len(df) - 1][1]["진행상태"] == "미평가"
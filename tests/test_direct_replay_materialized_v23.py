@@ -0,0 +1,121 @@
+import io
+import json
+import tarfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import direct_replay_materialized_v23 as v23
+
+DAY = "2026-10-16"
+
+
+@pytest.fixture
+def out(monkeypatch, tmp_path):
+    monkeypatch.delenv("V23_MATERIALIZED_DIR", raising=False)
+    monkeypatch.delenv("V23_MATERIALIZED_FORMAT", raising=False)
+    monkeypatch.setenv("GITHUB_SHA", "f" * 40)
+    return tmp_path / "reports"
+
+
+def _checkpoint():
+    rows = [
+        {"code": "005930", "score": 1.5, "tags": ["a", "b"]},
+        {"code": "000660", "score": 2.0},
+        {"code": "035720", "score": None, "tags": []},
+    ]
+    membership = pd.DataFrame(
+        {"code": ["005930", "000660"], "amount": [1.5e12, 8.0e11]},
+        index=pd.Index(pd.to_datetime([DAY, DAY]), name="date"),
+    )
+    summary = pd.DataFrame({"n": [2], "label": ["top"]})
+    return {
+        "candidate_rows": rows,
+        "capture_rows": [{"code": "005930", "ret": 0.03}],
+        "universe_membership": membership,
+        "universe_summary": summary,
+        "runtime_sidecars": {"note": "x"},
+    }
+
+
+def test_columnar_partition_round_trip(out):
+    ck = _checkpoint()
+    info = v23.write_materialized_date(out, DAY, ck, shard_index=0, shard_count=2)
+    assert info["file"].endswith(".json") and info["candidate_rows"] == 3
+    z = v23.load_materialized_date(out, DAY)
+    assert z["candidate_rows"] == ck["candidate_rows"]
+    assert z["capture_rows"] == ck["capture_rows"] and z["attempt_rows"] == []
+    pd.testing.assert_frame_equal(z["universe_membership"], ck["universe_membership"])
+    pd.testing.assert_frame_equal(z["universe_summary"], ck["universe_summary"])
+    assert z["runtime_sidecars"] == {"note": "x"}
+    assert z["table_rows"]["candidate_rows"] == 3
+
+
+def test_column_subset_keeps_named_and_range_index(out):
+    ck = _checkpoint()
+    v23.write_materialized_date(out, DAY, ck, shard_index=0, shard_count=1)
+    got = v23.read_materialized_table(out, DAY, "universe_membership", columns=["amount"])
+    pd.testing.assert_frame_equal(got, ck["universe_membership"][["amount"]])
+    assert got.index.name == "date"
+    summary = v23.read_materialized_table(out, DAY, "universe_summary", columns=["label"])
+    pd.testing.assert_frame_equal(summary, ck["universe_summary"][["label"]])
+    rows = v23.read_materialized_table(out, DAY, "candidate_rows", columns=["code", "tags"])
+    assert rows == [{"code": "005930", "tags": ["a", "b"]}, {"code": "000660"}, {"code": "035720", "tags": []}]
+
+
+def _archive(path, src_root, names):
+    with tarfile.open(path, "w:gz") as tf:
+        for name in names:
+            tf.add(src_root / name, arcname=f"reports/{v23.MATERIALIZED_DIRNAME}/{name}")
+    return path
+
+
+def _shard(tmp_path, monkeypatch, fmt, tag):
+    """One shard's materialized date in ``fmt`` ("arrow" | "pickle"), packed as a handoff archive."""
+    shard_out = tmp_path / f"shard_{tag}"
+    monkeypatch.setenv("V23_MATERIALIZED_FORMAT", fmt)
+    info = v23.write_materialized_date(shard_out, DAY, _checkpoint(), shard_index=0, shard_count=1)
+    monkeypatch.delenv("V23_MATERIALIZED_FORMAT")
+    root = shard_out / v23.MATERIALIZED_DIRNAME
+    names = [info["file"]]
+    if info["file"].endswith(".json"):
+        names.append(json.loads((root / info["file"]).read_text(encoding="utf-8"))["pack_file"])
+    return root, names
+
+
+def _rows(out, status):
+    df = pd.read_csv(out / v23.MERGE_AUDIT_CSV, encoding="utf-8-sig", dtype=str)
+    return df[(df["kind"] == v23.MATERIALIZED_DIRNAME) & (df["status"] == status)]
+
+
+@pytest.mark.parametrize("first,second", [("pickle", "arrow"), ("arrow", "pickle")])
+def test_merge_flags_same_date_in_other_format_as_conflict(out, tmp_path, monkeypatch, first, second):
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    for k, fmt in enumerate((first, second)):
+        root, names = _shard(tmp_path, monkeypatch, fmt, k)
+        _archive(downloads / f"a{k}_handoff.tar.gz", root, names)
+    audit = v23.merge_handoff_archives(downloads, out)
+    assert audit["conflicts"] == 1 and audit["errors"] == 0
+    mroot = out / v23.MATERIALIZED_DIRNAME
+    kept = sorted(p.name for p in mroot.glob("date_*") if not p.name.endswith(".ipc"))
+    assert kept == [v23.materialized_path(out, DAY).name]  # 먼저 들어온 형식만 남는다
+    assert _rows(out, "CONFLICT")["detail"].str.startswith("format:").all()
+
+
+def test_merge_keeps_identical_partition_and_flags_different_content(out, tmp_path, monkeypatch):
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    root, names = _shard(tmp_path, monkeypatch, "arrow", 0)
+    _archive(downloads / "a0_handoff.tar.gz", root, names)
+    _archive(downloads / "a1_handoff.tar.gz", root, names)
+    ck = _checkpoint()
+    ck["candidate_rows"] = ck["candidate_rows"][:1]
+    other = tmp_path / "other"
+    v23.write_materialized_date(other, DAY, ck, shard_index=1, shard_count=2)
+    oroot = other / v23.MATERIALIZED_DIRNAME
+    _archive(downloads / "a2_handoff.tar.gz", oroot, sorted(p.name for p in oroot.iterdir()))
+    audit = v23.merge_handoff_archives(downloads, out)
+    assert audit["partitions_installed"] == 1 and audit["partitions_kept"] == 1 and audit["conflicts"] == 1
+    assert len(v23.load_materialized_date(out, DAY)["candidate_rows"]) == 3
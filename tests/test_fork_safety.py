@@ -0,0 +1,118 @@
+import os
+import threading
+
+import pytest
+
+import flow_store
+import http_pool
+import krx_calendar
+import lazy_imports
+import market_panel
+import ohlcv_store
+import supply_cache
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="fork 전용")
+
+MODULES = [ohlcv_store, market_panel, http_pool, krx_calendar, supply_cache, flow_store, lazy_imports]
+
+
+def _fork_while_held(mod, check):
+    """다른 스레드가 mod._LOCK을 잡은 상태에서 fork하고, 자식에서 check()의 결과를 종료 코드로 돌려받는다."""
+    held, release = threading.Event(), threading.Event()
+
+    def holder():
+        with mod._LOCK:
+            held.set()
+            release.wait(10)
+
+    t = threading.Thread(target=holder, daemon=True)
+    t.start()
+    assert held.wait(5)
+    try:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = 0 if check() else 1
+            finally:
+                os._exit(code)
+        _, status = os.waitpid(pid, 0)
+    finally:
+        release.set()
+        t.join(5)
+    return os.waitstatus_to_exitcode(status)
+
+
+@pytest.mark.parametrize("mod", MODULES, ids=lambda m: m.__name__)
+def test_child_gets_fresh_module_lock(mod):
+    def check():
+        if not mod._LOCK.acquire(timeout=2):
+            return False
+        mod._LOCK.release()
+        return True
+
+    assert _fork_while_held(mod, check) == 0
+
+
+def test_child_drops_state_touched_under_held_lock():
+    ohlcv_store._MEMORY["005930"] = ("stale", None, 0.0)
+    ohlcv_store._CODE_LOCKS["005930"] = threading.Lock()
+    ohlcv_store._CODE_LOCKS["005930"].acquire()
+    try:
+        assert _fork_while_held(
+            ohlcv_store, lambda: not ohlcv_store._MEMORY and not ohlcv_store._CODE_LOCKS
+        ) == 0
+    finally:
+        ohlcv_store._MEMORY.pop("005930", None)
+        ohlcv_store._CODE_LOCKS.pop("005930", None)
+
+
+def test_child_keeps_state_when_lock_was_free():
+    ohlcv_store._MEMORY["005930"] = ("kept", None, 0.0)
+    try:
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if "005930" in ohlcv_store._MEMORY else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+    finally:
+        ohlcv_store._MEMORY.pop("005930", None)
+
+
+def test_child_does_not_share_http_sessions():
+    http_pool._SESSIONS["example.com"] = object()
+    try:
+        assert _fork_while_held(http_pool, lambda: not http_pool._SESSIONS and not http_pool._BUCKETS) == 0
+    finally:
+        http_pool._SESSIONS.pop("example.com", None)
+
+
+def test_flow_store_child_drops_key_locks_and_half_loaded_partitions():
+    key = "005930|순매수"
+    flow_store._KEY_LOCKS[key] = threading.Lock()
+    flow_store._KEY_LOCKS[key].acquire()  # 부모의 조회 스레드가 pykrx 응답을 기다리는 중
+    flow_store._PARTS["202610"] = {}
+    flow_store._DIRTY.add("202610")
+    try:
+        assert _fork_while_held(
+            flow_store,
+            lambda: not flow_store._KEY_LOCKS and not flow_store._PARTS and not flow_store._DIRTY and flow_store._COVER is None,
+        ) == 0
+    finally:
+        flow_store._KEY_LOCKS.pop(key, None)
+        flow_store._PARTS.pop("202610", None)
+        flow_store._DIRTY.discard("202610")
+
+
+def test_flow_store_child_keeps_partitions_when_lock_was_free():
+    flow_store._PARTS["202610"] = {}
+    flow_store._KEY_LOCKS["005930|순매수"] = threading.Lock()
+    try:
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if "202610" in flow_store._PARTS and not flow_store._KEY_LOCKS else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+    finally:
+        flow_store._PARTS.pop("202610", None)
+        flow_store._KEY_LOCKS.pop("005930|순매수", None)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import forward_paths as fp
+
+
+def _prices(n: int, seed: int, nan_frac: float = 0.0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10_000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    df = pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.005, n)),
+        "High": close * (1 + np.abs(rng.normal(0, 0.02, n))),
+        "Low": close * (1 - np.abs(rng.normal(0, 0.02, n))),
+        "Close": close,
+    })
+    if nan_frac:
+        for col in ("High", "Low"):
+            df.loc[rng.random(n) < nan_frac, col] = np.nan
+    return df
+
+
+def _events(df: pd.DataFrame, seed: int, k: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # 마지막 봉/마지막 직전 봉(창 일부만 있음)을 반드시 포함한다.
+    idx = np.unique(np.concatenate([rng.choice(len(df) - 2, k, replace=False), [len(df) - 2, len(df) - 1]]))
+    entry = df["Close"].to_numpy()[idx]
+    return pd.DataFrame({"signal_idx": idx, "entry": entry, "stop": entry * 0.97, "target": entry * 1.05})
+
+
+def _assert_matches_reference(df, ev, got, horizon, same_day):
+    for j, (i, e, s, t) in enumerate(ev[["signal_idx", "entry", "stop", "target"]].itertuples(index=False)):
+        ref = fp._reference_one(df, int(i), float(e), float(s), float(t), horizon, same_day)
+        for key, v in ref.items():
+            g = got.iloc[j][key]
+            assert (pd.isna(v) and pd.isna(g)) or v == g, (int(i), key, v, g)
+
+
+@pytest.mark.parametrize("same_day", ["stop_first", "target_first"])
+@pytest.mark.parametrize("horizon", [1, 5, 15])
+def test_evaluate_events_matches_per_event_loop(same_day, horizon):
+    df = _prices(600, 0)
+    ev = _events(df, 1, 250)
+    got = fp.evaluate_events(df, ev, horizon, same_day=same_day)
+    _assert_matches_reference(df, ev, got, horizon, same_day)
+    assert (got["exit_reason"] == "NO_DATA").sum() == 1
+
+
+def test_evaluate_events_same_day_collision_follows_policy():
+    df = pd.DataFrame({
+        "Open": [100.0, 100.0, 100.0], "High": [100.0, 106.0, 100.0],
+        "Low": [100.0, 96.0, 100.0], "Close": [100.0, 100.0, 100.0],
+    })
+    ev = pd.DataFrame({"signal_idx": [0], "entry": [100.0], "stop": [97.0], "target": [105.0]})
+    stop = fp.evaluate_events(df, ev, 2, same_day="stop_first").iloc[0]
+    tgt = fp.evaluate_events(df, ev, 2, same_day="target_first").iloc[0]
+    assert (stop["exit_reason"], stop["exit_price"], stop["exit_day"]) == ("SAME_DAY_STOP", 97.0, 1)
+    assert (tgt["exit_reason"], tgt["exit_price"], tgt["exit_day"]) == ("SAME_DAY_TARGET", 105.0, 1)
+
+
+def test_price_panel_matches_single_frame():
+    frames = {"000001": _prices(300, 2, nan_frac=0.03), "000002": _prices(180, 3, nan_frac=0.03)}
+    panel = fp.PricePanel(frames)
+    parts, evs = [], []
+    for code, df in frames.items():
+        ev = _events(df, 4, 60)
+        parts.append(fp.evaluate_events(df, ev, 10, holds=(1, 3, 5)))
+        evs.append(ev.assign(code=code))
+    got = fp.evaluate_events(panel, pd.concat(evs, ignore_index=True), 10, holds=(1, 3, 5))
+    pd.testing.assert_frame_equal(got, pd.concat(parts, ignore_index=True), check_exact=True)
+
+
+def test_max_hold_caps_window():
+    df = _prices(100, 5)
+    ev = _events(df, 6, 30).assign(max_hold=3)
+    got = fp.evaluate_events(df, ev, 10)
+    _assert_matches_reference(df, ev, got, 3, "stop_first")
+    assert got["days_available"].max() == 3
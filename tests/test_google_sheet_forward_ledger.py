@@ -0,0 +1,192 @@
+import json
+import re
+
+import pandas as pd
+import pytest
+
+import google_sheet_forward_ledger as gsl
+
+TAB = "CATALYST_QUERY_UNIVERSE"
+SPEC = next(s for s in gsl.TAB_SPECS if s.title == TAB)
+COLUMNS = ["code", "query_text", "sector", "theme", "priority"]
+
+
+class _Sheet:
+    def __init__(self, title, sid):
+        self.title, self.id, self.col_count = title, sid, gsl.DEFAULT_TAB_COLS
+        self.rows = []
+        self.fail_after = None  # append_rows 호출이 이 횟수만큼 성공한 뒤 실패한다
+
+    def append_rows(self, rows, value_input_option=None, insert_data_option=None):
+        if self.fail_after is not None:
+            if self.fail_after == 0:
+                raise RuntimeError("HTTP 400 invalid append")
+            self.fail_after -= 1
+        self.rows.extend([list(r) for r in rows])
+
+    def update(self, range_name=None, values=None, value_input_option=None):
+        self._set_header(values[0])
+
+    def add_cols(self, n):
+        self.col_count += n
+
+    def _set_header(self, header):
+        if self.rows:
+            self.rows[0] = list(header)
+        else:
+            self.rows.append(list(header))
+
+
+class _Book:
+    """values_batch_get/batch_update/values_batch_update만 흉내 내는 메모리 스프레드시트."""
+
+    def __init__(self):
+        self.id, self.title = gsl._spreadsheet_id(), "fake"
+        self.sheets = {}
+        self.ranges = []
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def batch_update(self, body):
+        for req in body["requests"]:
+            if "addSheet" in req:
+                title = req["addSheet"]["properties"]["title"]
+                self.sheets[title] = _Sheet(title, len(self.sheets))
+
+    def values_batch_update(self, body):
+        for item in body["data"]:
+            self.sheets[self._title(item["range"])]._set_header(item["values"][0])
+
+    def values_batch_get(self, ranges, params=None):
+        self.ranges.extend(ranges)
+        out = []
+        for rng in ranges:
+            rows = self.sheets[self._title(rng)].rows
+            m = re.search(r"!A(\d*):ZZ(\d*)$", rng)
+            lo = int(m.group(1) or 1) - 1
+            hi = int(m.group(2)) if m.group(2) else len(rows)
+            out.append({"values": [list(r) for r in rows[lo:hi]]})
+        return {"valueRanges": out}
+
+    @staticmethod
+    def _title(rng):
+        return rng.rsplit("!", 1)[0][1:-1].replace("''", "'")
+
+
+@pytest.fixture
+def sheet(monkeypatch, tmp_path):
+    book = _Book()
+    for name in ("GOOGLE_SHEET_FULL_RECONCILE", "GITHUB_STEP_SUMMARY", "STOCKHUNTER_GOOGLE_SHEET_ID", "GOOGLE_SHEET_ID"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(gsl, "load_service_account_info", lambda: ({"client_email": gsl._expected_service_account()}, "TEST"))
+    monkeypatch.setattr(gsl, "create_google_client", lambda info: type("C", (), {"open_by_key": lambda self, key: book})())
+    book.out = tmp_path
+    return book
+
+
+def _local(out, rows, columns=COLUMNS):
+    pd.DataFrame(rows, columns=columns).to_csv(out / SPEC.source_file, index=False, encoding="utf-8-sig")
+
+
+def _row(i, **extra):
+    return {"code": f"{i:06d}", "query_text": f"q{i}", "sector": "반도체", "theme": "HBM", "priority": str(i % 3), **extra}
+
+
+def _sync(book, **kw):
+    book.ranges.clear()
+    res = gsl.run_storage("SYNC", book.out, **kw)
+    audit = pd.read_csv(book.out / gsl.SYNC_AUDIT_FILE, dtype=str, encoding="utf-8-sig").fillna("")
+    return res, audit[audit["tab"] == TAB].iloc[-1]
+
+
+def _index(book):
+    return json.loads((book.out / gsl.SYNC_INDEX_FILE).read_text(encoding="utf-8"))["tabs"][TAB]
+
+
+def _data_rows(book):
+    return book.sheets[TAB].rows[1:]
+
+
+def _seed(book, n=3):
+    _local(book.out, [_row(i) for i in range(n)])
+    res, audit = _sync(book)
+    assert res["status"] == "SHEET_PRIMARY_OK" and audit["read_mode"] == "FULL"
+    assert _index(book)["row_count"] == n
+
+
+def test_tail_anchor_match_reads_and_appends_only_the_delta(sheet):
+    _seed(sheet)
+    _local(sheet.out, [_row(i) for i in range(5)])
+    _, audit = _sync(sheet)
+    assert audit["read_mode"] == "TAIL" and audit["rows_appended"] == "2" and audit["sheet_rows_before"] == "3"
+    tab_ranges = [r for r in sheet.ranges if r.startswith(f"'{TAB}'")]
+    assert tab_ranges == [f"'{TAB}'!A1:ZZ1", f"'{TAB}'!A4:ZZ"]
+    assert [r[0] for r in _data_rows(sheet)] == [f"{i:06d}" for i in range(5)]
+    entry = _index(sheet)
+    assert entry["row_count"] == 5 and entry["anchor"] == gsl._cells_digest(_data_rows(sheet)[-1])
+
+
+def test_tail_anchor_mismatch_falls_back_to_reconciled_full_read(sheet):
+    _seed(sheet)
+    # 다른 작성자가 위쪽에 행을 끼워 넣어 마지막 동기화 행이 아래로 밀렸다.
+    foreign = [gsl._clean_cell(v) for v in _row(99).values()]
+    sheet.sheets[TAB].rows.insert(1, foreign)
+    _local(sheet.out, [_row(i) for i in range(4)])
+    _, audit = _sync(sheet)
+    assert audit["read_mode"] == "RECONCILED" and audit["rows_appended"] == "1"
+    assert f"'{TAB}'!A:ZZ" in sheet.ranges
+    assert len(_data_rows(sheet)) == 5 and _index(sheet)["row_count"] == 5
+    assert len({tuple(r) for r in _data_rows(sheet)}) == 5  # 중복 append 없음
+
+
+def test_header_growth_invalidates_the_tail_index(sheet):
+    _seed(sheet)
+    _local(sheet.out, [_row(i, note="n") for i in range(4)], COLUMNS + ["note"])
+    _, audit = _sync(sheet)
+    assert audit["read_mode"] == "RECONCILED"
+    assert sheet.sheets[TAB].rows[0] == COLUMNS + ["note"]
+    entry = _index(sheet)
+    assert entry["headers"] == COLUMNS + ["note"] and entry["row_count"] == 4
+    assert _data_rows(sheet)[-1] == [f"{3:06d}", "q3", "반도체", "HBM", "0", "n"]
+
+
+def test_partial_append_does_not_advance_the_index(sheet, monkeypatch):
+    _seed(sheet)
+    before = (sheet.out / gsl.SYNC_INDEX_FILE).read_bytes()
+    monkeypatch.setattr(gsl, "APPEND_CHUNK_ROWS", 2)
+    sheet.sheets[TAB].fail_after = 1
+    _local(sheet.out, [_row(i) for i in range(7)])
+    res, _ = _sync(sheet)
+    assert res["status"] == "SHEET_PRIMARY_FAILED"
+    assert len(_data_rows(sheet)) == 5  # 첫 청크(2행)만 들어갔다
+    assert (sheet.out / gsl.SYNC_INDEX_FILE).read_bytes() == before
+
+    # 다음 실행: 예전 앵커가 그대로 맞으므로 tail에서 부분 append분을 배우고 나머지만 붙인다.
+    sheet.sheets[TAB].fail_after = None
+    _, audit = _sync(sheet)
+    assert audit["read_mode"] == "TAIL" and audit["rows_appended"] == "2"
+    assert [r[0] for r in _data_rows(sheet)] == [f"{i:06d}" for i in range(7)]
+    assert _index(sheet)["row_count"] == 7
+
+
+def test_index_after_append_counts_only_rows_written():
+    headers = list(COLUMNS)
+    entry = {"headers": headers, "row_count": 3, "anchor": "a", "keys": set()}
+    delta = [_row(i) for i in range(3, 6)]
+    gsl._index_after_append(entry, SPEC, headers, delta, 0)
+    assert entry == {"headers": headers, "row_count": 3, "anchor": "a", "keys": set()}
+    gsl._index_after_append(entry, SPEC, headers, delta, 2)
+    assert entry["row_count"] == 5 and len(entry["keys"]) == 2
+    assert entry["anchor"] == gsl._cells_digest(delta[1][h] for h in headers)
+
+
+def test_load_sync_index_drops_tampered_entries(tmp_path):
+    good = {"headers": COLUMNS, "row_count": 2, "anchor": "x", "keys": {"k1", "k2"}}
+    gsl._save_sync_index(tmp_path, "sheet", {TAB: good, "OTHER": dict(good, keys={"k3"})})
+    payload = json.loads((tmp_path / gsl.SYNC_INDEX_FILE).read_text(encoding="utf-8"))
+    payload["tabs"]["OTHER"]["keys"].append("k4")
+    (tmp_path / gsl.SYNC_INDEX_FILE).write_text(json.dumps(payload), encoding="utf-8")
+    tabs = gsl._load_sync_index(tmp_path, "sheet")
+    assert list(tabs) == [TAB] and tabs[TAB]["keys"] == {"k1", "k2"}
+    assert gsl._load_sync_index(tmp_path, "another-sheet") == {}
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import historical_asof_universe as hau
+
+DAYS = pd.bdate_range("2026-08-03", periods=45)
+CODES = [f"{i:06d}" for i in range(40)]
+WINDOW = 20
+
+
+def _snapshot(day: pd.Timestamp, actual: bool = True) -> pd.DataFrame:
+    rng = np.random.default_rng(int(day.strftime("%Y%m%d")))
+    codes = [c for c in CODES if rng.random() > 0.1]  # 상장/거래정지로 빠지는 종목
+    n = len(codes)
+    amount = rng.integers(1, 500, n).astype(float) * 1e8
+    amount[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        "code": codes,
+        "close": rng.integers(1_000, 90_000, n).astype(float),
+        "amount": amount,
+        "volume": rng.integers(1_000, 5_000_000, n).astype(float),
+        "amount_is_actual": 1 if actual else 0,
+    })
+
+
+class _Loader:
+    def __init__(self, legacy=()):
+        self.calls: list[str] = []
+        self.legacy = {pd.Timestamp(d) for d in legacy}
+
+    def __call__(self, ymd: str):
+        self.calls.append(ymd)
+        day = pd.Timestamp(ymd)
+        return _snapshot(day, actual=day not in self.legacy), "TEST"
+
+
+def _full(dates) -> pd.DataFrame:
+    """build_asof_universe_from_snapshots의 전체 재집계와 같은 식."""
+    prior = pd.concat([_snapshot(d).assign(date=d) for d in dates], ignore_index=True)
+    return prior.groupby("code", as_index=False).agg(
+        avg_amount20=("amount", "mean"), avg_volume20=("volume", "mean"), obs_days=("date", "nunique"),
+    )
+
+
+def _assert_same(got: pd.DataFrame, want: pd.DataFrame) -> None:
+    got = got.sort_values("code").reset_index(drop=True)
+    want = want.sort_values("code").reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False, rtol=1e-12)
+
+
+@pytest.mark.parametrize("newest_first", [True, False])
+def test_rolling_window_matches_full_recompute_at_every_step(newest_first):
+    win = hau.RollingLiquidityWindow()
+    loader = _Loader()
+    ends = range(len(DAYS), WINDOW - 1, -1) if newest_first else range(WINDOW, len(DAYS) + 1)
+    for end in ends:
+        dates = list(DAYS[end - WINDOW:end])
+        rows = win.sync(dates, loader)
+        assert [r[0] for r in rows] == dates
+        _assert_same(win.liquidity(dates), _full(dates))
+    # 날짜마다 스냅샷은 한 번만 읽고, 창을 완전히 갈아엎을 때마다 합계를 부분합에서 다시 만든다.
+    assert len(loader.calls) == len(set(loader.calls)) == len(DAYS)
+    assert win.stats["evicted"] == len(DAYS) - WINDOW and win.stats["resync"] >= 1
+
+
+def test_rolling_window_jump_and_return_reuses_held_dates():
+    win = hau.RollingLiquidityWindow()
+    loader = _Loader()
+    a, b = list(DAYS[-WINDOW:]), list(DAYS[5:5 + WINDOW])
+    for dates in (a, b, a):
+        win.sync(dates, loader)
+        _assert_same(win.liquidity(dates), _full(dates))
+    assert win.stats["reused"] == 2 * len(set(a) & set(b))
+
+
+def test_legacy_snapshot_is_not_held_and_defers_to_full_aggregation():
+    legacy = DAYS[-3]
+    win = hau.RollingLiquidityWindow()
+    loader = _Loader(legacy=[legacy])
+    dates = list(DAYS[-WINDOW:])
+    win.sync(dates, loader)
+    assert win.liquidity(dates) is None
+    win.sync(dates, loader)
+    assert loader.calls.count(legacy.strftime("%Y%m%d")) == 2  # 매번 다시 요청한다
+    # 합계는 들고 있는 날짜 전체의 것이므로 그 일부만 물으면 직접 집계하게 둔다.
+    held = [d for d in dates if d != legacy]
+    _assert_same(win.liquidity(held), _full(held))
+    assert win.liquidity(held[1:]) is None
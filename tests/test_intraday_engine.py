@@ -0,0 +1,294 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import intraday_engine as ie
+from _source_loader import load_script
+
+NOW = datetime(2026, 10, 14, 10, 0, tzinfo=ie.KST)  # 수요일 장중
+CODES = ["005930", "000660", "035720"]
+
+
+def _bulk(ymd: str, market: str) -> pd.DataFrame:
+    if market != "KOSPI":
+        return pd.DataFrame()
+    rng = np.random.default_rng(int(ymd))
+    c = rng.uniform(10_000, 50_000, len(CODES)).round(-1)
+    return pd.DataFrame({
+        "시가": c, "고가": c * 1.02, "저가": c * 0.98, "종가": c,
+        "거래량": rng.uniform(1e5, 1e6, len(CODES)).round(), "거래대금": c * 1e5, "등락률": 0.5,
+    }, index=pd.Index(CODES, name="티커"))
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    warnings = []
+    monkeypatch.setattr(ie, "_now_kst", lambda: NOW)
+    monkeypatch.setattr(ie, "_SESSION", None)
+    monkeypatch.setattr(ie, "_WARN", None)
+    monkeypatch.setattr(ie, "_SNAPSHOT_FETCHER", None)
+    monkeypatch.setattr(ie, "_BASELINE_ROOT", ie._BASELINE_ROOT)
+    monkeypatch.delenv("INTRADAY_BASELINE_STRICT", raising=False)
+    ie.configure(snapshot_fetcher=_bulk, baseline_root=tmp_path, warn=warnings.append)
+    ie.reset_stats()
+    yield warnings
+    ie.reset_stats()
+
+
+def _deep_baseline(day: pd.Timestamp) -> pd.Timestamp:
+    rng = np.random.default_rng(0)
+    c = 20_000 * np.exp(np.cumsum(rng.normal(0, 0.02, (70, len(CODES))), axis=0))
+    v = rng.uniform(1e5, 1e6, c.shape)
+    through = ie._prev_session_day(day)
+    ie.save_baseline(ie._baselines(CODES, c, c * 1.01, c * 0.99, c, v), through)
+    return through
+
+
+def test_file_session_is_not_degraded(engine):
+    _deep_baseline(pd.Timestamp(NOW.date()))
+    ses = ie.open_session(NOW)
+    assert ses["source"] == "FILE" and ses["degraded"] == ""
+    assert ie.history_ready(NOW)
+    assert engine == []
+    assert ie.stats_snapshot()["degraded_sessions"] == 0
+    assert "저하" not in ie.format_stats()
+
+
+def test_strict_session_without_file_warns_once_and_reports(engine):
+    ses = ie.open_session(NOW)
+    assert ses["source"] == "PREV_DAY" and not ses["fetch_history"]
+    assert not ie.history_ready(NOW)
+    ie.open_session(NOW)
+    ie.signal_state(ie.tick(NOW), now=NOW)
+    assert len(engine) == 1 and "기준값 파일 없음" in engine[0]
+    st = ie.stats_snapshot()
+    assert st["degraded_sessions"] == 1 and st["degraded"]
+    assert f"⚠️ 저하: {st['degraded']}" in ie.format_stats()
+
+
+def test_strict_session_state_has_no_history_columns(engine):
+    # history_ready()가 False인 이유: 이 세션의 이력 기반 열은 전부 비어 있다.
+    state = ie.signal_state(ie.tick(NOW), now=NOW)
+    assert state.index.tolist() == CODES
+    assert state[["bb_rank", "vol_ma20", "ma20", "atr14"]].isna().all().all()
+    assert not state["acc_ok"].any()
+    assert (state["prev_volume"] > 0).all()
+
+
+def test_next_day_session_warns_again(engine):
+    ie.open_session(NOW)
+    ie.open_session(NOW.replace(day=15))
+    assert len(engine) == 2
+    assert ie.stats_snapshot()["degraded_sessions"] == 2
+
+
+def test_warn_sink_failure_does_not_break_session(engine):
+    def boom(msg):
+        raise RuntimeError("telegram down")
+
+    ie.configure(warn=boom)
+    assert ie.open_session(NOW)["source"] == "PREV_DAY"
+
+
+def _presurge(logs):
+    # presurge_scanner는 pytz/pykrx 없이 import할 수 없어 엔진 상태 어댑터만 불러온다.
+    return load_script("presurge_scanner.py", names={"_engine_state"},
+                       preset={"pd": pd, "_intraday": ie, "log_info": logs.append, "log_error": logs.append})
+
+
+def test_presurge_falls_back_per_code_without_history(engine):
+    logs = []
+    ps = _presurge(logs)
+    assert ps._engine_state(ie.tick(NOW), CODES) is None
+    assert any("종목별 조회" in m for m in logs)
+
+
+def test_presurge_uses_engine_state_with_file(engine):
+    _deep_baseline(pd.Timestamp(NOW.date()))
+    ps = _presurge([])
+    state = ps._engine_state(ie.tick(), CODES)
+    assert state is not None and state["bb_rank"].notna().all() and state["acc_ok"].all()
+
+
+# --- 패널 기준값과 기준가 조정 ------------------------------------------------------
+AFTER_CLOSE = datetime(2026, 10, 16, 16, 30)
+PANEL_DAYS = pd.bdate_range(end="2026-10-16", periods=70)
+SPLIT = PANEL_DAYS[-10]
+
+
+def _panel_history():
+    """종목별 수정주가 이력(FDR)과 같은 구간의 미수정 pykrx 봉. 005930은 SPLIT일에 2:1 액면분할."""
+    rng = np.random.default_rng(7)
+    adjusted, raw = {}, {}
+    for k, code in enumerate(CODES):
+        c = np.round(20_000 * np.exp(np.cumsum(rng.normal(0, 0.02, len(PANEL_DAYS)))), -1)
+        v = rng.uniform(1e5, 1e6, len(PANEL_DAYS)).round()
+        df = pd.DataFrame({"Open": c * 0.99, "High": c * 1.02, "Low": c * 0.97, "Close": c, "Volume": v}, index=PANEL_DAYS)
+        r = df.copy()
+        if code == "005930":
+            pre = df.index < SPLIT
+            r.loc[pre, ["Open", "High", "Low", "Close"]] *= 2.0
+            r.loc[pre, "Volume"] /= 2.0
+        adjusted[code], raw[code] = df, r
+    return adjusted, raw
+
+
+def _panel_bulk(adjusted, raw):
+    # KRX 등락률은 조정된 기준가 대비이므로 수정 종가의 등락률과 같다.
+    change = {c: (adjusted[c]["Close"].pct_change() * 100).round(2).fillna(0.0) for c in CODES}
+
+    def fetch(ymd, market):
+        day = pd.Timestamp(ymd)
+        if market != "KOSPI" or day not in PANEL_DAYS:
+            return pd.DataFrame()
+        return pd.DataFrame.from_dict({
+            c: {"시가": raw[c].at[day, "Open"], "고가": raw[c].at[day, "High"], "저가": raw[c].at[day, "Low"],
+                "종가": raw[c].at[day, "Close"], "거래량": raw[c].at[day, "Volume"], "등락률": change[c][day]}
+            for c in CODES
+        }, orient="index")
+    return fetch
+
+
+@pytest.fixture
+def panel(monkeypatch, tmp_path):
+    import market_panel
+
+    adjusted, raw = _panel_history()
+    monkeypatch.setenv("MARKET_PANEL_SEED_DAYS", str(len(PANEL_DAYS)))
+    monkeypatch.setenv("MARKET_PANEL_MAX_NEW_DAYS", str(len(PANEL_DAYS)))
+    monkeypatch.setattr(market_panel, "_now_kst", lambda: AFTER_CLOSE)
+    monkeypatch.setattr(ie, "_market_panel", market_panel)
+    monkeypatch.setattr(ie, "_HISTORY_FETCHER", ie._HISTORY_FETCHER)
+    market_panel.configure(fetcher=_panel_bulk(adjusted, raw), root=tmp_path / "panel")
+    ie.reset_stats()
+    yield adjusted, raw
+    market_panel.configure(root="reports/.cache/market_panel")
+    market_panel._FETCHER = None
+
+
+def _expected(frames):
+    m = {k: pd.concat({c: f[k] for c, f in frames.items()}, axis=1) for k in ("Open", "High", "Low", "Close", "Volume")}
+    return ie._baselines(list(frames), *(m[k].to_numpy(dtype="float64") for k in ("Open", "High", "Low", "Close", "Volume")))
+
+
+def test_panel_baselines_rebuild_split_code_from_adjusted_history(panel):
+    adjusted, raw = panel
+    fetched = []
+
+    def history(code, start, through):
+        fetched.append(code)
+        return adjusted[code]
+
+    ie.configure(history_fetcher=history)
+    base, through = ie.build_baseline(pd.Timestamp("2026-10-19"), sessions=60, now=AFTER_CLOSE)
+    assert through == PANEL_DAYS[-1]
+    assert fetched == ["005930"]
+    assert ie.stats_snapshot()["adjusted_codes"] == 1
+    want = _expected({c: (adjusted[c] if c == "005930" else raw[c]).iloc[-60:] for c in CODES})
+    pd.testing.assert_frame_equal(base.loc[CODES, want.columns].astype("float64"), want.astype("float64"),
+                                  check_exact=False, rtol=1e-6)
+
+
+def test_panel_baselines_keep_only_last_bar_when_refetch_fails(panel):
+    _, raw = panel
+
+    def down(code, start, through):
+        raise ConnectionError("down")
+
+    ie.configure(history_fetcher=down)
+    base, _ = ie.build_baseline(pd.Timestamp("2026-10-19"), sessions=60, now=AFTER_CLOSE)
+    row = base.loc["005930"]
+    assert row["history"] == 1 and row["prev_close"] == raw["005930"]["Close"].iloc[-1]
+    assert np.isnan(row["close_mean39"]) and np.isnan(row["bb_h0"])
+    assert base.loc["000660", "history"] == 60
+
+
+def test_panel_session_refetches_only_adjusted_codes(engine, panel):
+    adjusted, _ = panel
+    fetched = []
+
+    def history(code, start, through):
+        fetched.append(code)
+        return adjusted[code]
+
+    ie.configure(history_fetcher=history)
+    ses = ie.open_session(AFTER_CLOSE)
+    assert ses["source"] == "PANEL" and not ses["fetch_history"] and ses["refetch"] == {"005930"}
+    base = ie.ensure_history(CODES, AFTER_CLOSE)
+    assert fetched == ["005930"]
+    assert base.loc["005930", "history"] == 60
+    # 세션일(10-16) 전날까지의 기준값
+    assert base.loc["005930", "prev_close"] == adjusted["005930"]["Close"].iloc[-2]
+
+
+# --- 엔진 상태 vs 종목별 일봉 경로(presurge ②/⑤) ------------------------------------
+LEGACY_CODES = [f"{i:06d}" for i in range(1, 25)]
+
+
+def _legacy_frames():
+    """종목별 70봉 이력 + 장중 당일 봉. 종가는 원 단위 정수, 몇 종목은 매집형(완만한 상승 + 거래량 증가)."""
+    rng = np.random.default_rng(11)
+    frames = {}
+    for k, code in enumerate(LEGACY_CODES):
+        drift = 0.004 if k % 3 == 0 else 0.0
+        c = np.round(20_000 * np.exp(np.cumsum(rng.normal(drift, 0.015, 71))))
+        v = rng.uniform(1e5, 1e6, 71).round() * (1 + np.linspace(0, drift * 300, 71))
+        o = np.round(c * (1 - rng.uniform(-0.01, 0.02, 71)))
+        frames[code] = pd.DataFrame({"Open": o, "High": np.maximum(o, c) * 1.01, "Low": np.minimum(o, c) * 0.99,
+                                     "Close": c, "Volume": v}, index=pd.bdate_range(end="2026-10-14", periods=71))
+    return frames
+
+
+def _legacy_presurge(frames):
+    names = {"signal_bb_compression", "signal_prev_accumulation", "_bb_result", "_prev_acc_result", "_today",
+             "MIN_PRICE", "MIN_AMOUNT_PREV", "BB_COMPRESS_PCT", "MAX_WORKERS"}
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import timedelta
+    from types import SimpleNamespace
+
+    ps = load_script("presurge_scanner.py", names=names, preset={
+        "pd": pd, "np": np, "datetime": datetime, "timedelta": timedelta, "ThreadPoolExecutor": ThreadPoolExecutor,
+        "KST": ie.KST, "log_debug": lambda *a: None,
+        "fdr": SimpleNamespace(DataReader=lambda code, start=None: frames[code]),
+    })
+    ps.BB_COMPRESS_PCT = 1.0  # 순위 컷 없이 모든 종목의 값을 비교한다
+    return ps
+
+
+def test_engine_state_matches_per_code_daily_path(engine):
+    frames = _legacy_frames()
+    hist = {k: np.column_stack([frames[c][k].to_numpy()[:-1] for c in LEGACY_CODES]) for k in ("Open", "High", "Low", "Close", "Volume")}
+    through = ie._prev_session_day(pd.Timestamp(NOW.date()))
+    ie.save_baseline(ie._baselines(LEGACY_CODES, hist["Open"], hist["High"], hist["Low"], hist["Close"], hist["Volume"]), through)
+    today = {c: frames[c].iloc[-1] for c in LEGACY_CODES}
+    snapshot = pd.DataFrame({"code": LEGACY_CODES, "close": [today[c]["Close"] for c in LEGACY_CODES],
+                             "volume": [today[c]["Volume"] for c in LEGACY_CODES]})
+    state = ie.signal_state(snapshot, LEGACY_CODES, now=NOW)
+    assert ie.history_ready(NOW)
+
+    # 열 단위: 원래 종목별 일봉 계산식(당일 봉 포함)과 같은 값
+    for code in LEGACY_CODES:
+        df, st = frames[code], state.loc[code]
+        bb = (df["Close"].rolling(40).std() * 4 / df["Close"].rolling(40).mean() * 100).dropna()
+        obv = (np.sign(df["Close"].diff()) * df["Volume"]).fillna(0).cumsum()
+        assert st["bb_width"] == pytest.approx(bb.iloc[-1], rel=1e-9)
+        assert st["bb_rank"] == pytest.approx((bb.tail(20) <= bb.iloc[-1]).mean())
+        assert st["obv_rising"] == (obv.iloc[-1] > obv.iloc[-5])
+        assert st["vol_ma20"] == pytest.approx(df["Volume"].tail(20).mean(), rel=1e-12)
+        assert st["ma20"] == pytest.approx(df["Close"].rolling(20).mean().iloc[-1], rel=1e-12)
+        assert st["atr14"] == pytest.approx(df["Close"].diff().abs().rolling(14).mean().iloc[-1], rel=1e-12)
+        assert st["obv_5d_rising"] == all(obv.iloc[-i - 1] > obv.iloc[-i - 2] for i in range(5))
+        assert (st["prev_close"], st["prev2_low"]) == (df["Close"].iloc[-2], df["Low"].iloc[-3])
+
+    # 신호 단위: ②/⑤ 결과가 엔진 상태 경로와 일봉 조회 경로에서 같다
+    ps = _legacy_presurge(frames)
+    smap = {c: {"close": today[c]["Close"], "change_pct": 1.0, "amount": 5e10, "name": c} for c in LEGACY_CODES}
+    for fn in (ps.signal_bb_compression, ps.signal_prev_accumulation):
+        legacy = sorted(fn(LEGACY_CODES, smap), key=lambda r: r["code"])
+        fast = sorted(fn(LEGACY_CODES, smap, state=state), key=lambda r: r["code"])
+        assert legacy and [r["code"] for r in fast] == [r["code"] for r in legacy]
+        for a, b in zip(fast, legacy):
+            assert a.pop("score") == pytest.approx(b.pop("score"))
+            assert a == b
@@ -0,0 +1,291 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ohlcv_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    ohlcv_store.configure(root=tmp_path)
+    ohlcv_store.reset_stats()
+    yield ohlcv_store
+    ohlcv_store.configure(root="reports/.cache/ohlcv_store")
+
+
+def _bars(n=30, end="2026-10-16"):
+    idx = pd.bdate_range(end=end, periods=n, name="Date")
+    close = np.arange(n, dtype="float64") + 1000.0
+    return pd.DataFrame(
+        {"Open": close - 5, "High": close + 10, "Low": close - 10, "Close": close,
+         "Volume": np.arange(n, dtype="float64") * 100 + 5000, "Change": pd.Series(close).pct_change().to_numpy()},
+        index=idx,
+    )
+
+
+def test_save_load_round_trip(store):
+    df = _bars()
+    span_start = pd.Timestamp("2026-08-01")
+    store._save_disk("005930", df, span_start, 1_760_000_000.5)
+
+    loaded = store._load_disk("005930")
+
+    assert loaded is not None
+    got, got_span, got_saved = loaded
+    assert got.index.equals(df.index)
+    np.testing.assert_array_equal(got.to_numpy(), df[list(store.COLUMNS)].to_numpy())
+    assert got_span == span_start
+    assert got_saved == 1_760_000_000.5
+    assert store.stats_snapshot()["disk_invalid"] == 0
+
+
+def test_load_rejects_other_code(store):
+    store._save_disk("005930", _bars(), pd.Timestamp("2026-08-01"), 1.0)
+    store._file("000660").write_bytes(store._file("005930").read_bytes())
+
+    assert store._load_disk("000660") is None
+    assert store.stats_snapshot()["disk_invalid"] == 1
+
+
+class _Provider:
+    """fetcher(code, start, end) stub serving a fixed bar set and recording the requested starts."""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.starts = []
+
+    def __call__(self, code, start, end=None):
+        self.starts.append(pd.Timestamp(start))
+        return self.bars[self.bars.index >= pd.Timestamp(start)]
+
+
+def _kst_epoch(day, hhmm):
+    h, m = divmod(hhmm, 100)
+    return pd.Timestamp(day).replace(hour=h, minute=m).tz_localize("Asia/Seoul").timestamp()
+
+
+def _seed(store, bars, saved_at, days=60):
+    """Put an older stored copy on disk as if written at ``saved_at``."""
+    span_start = bars.index[0] - pd.Timedelta(days=days)
+    store._save_disk("005930", bars, span_start, saved_at)
+    store._MEMORY.clear()
+
+
+def _history_until_today(n=40):
+    today = pd.Timestamp(ohlcv_store._now_kst().date())
+    return _bars(n=n, end=today - pd.offsets.BDay(1))
+
+
+def test_tail_fetch_appends_when_overlap_matches(store):
+    full = _history_until_today()
+    stored = full.iloc[:-5]
+    _seed(store, stored, _kst_epoch(stored.index[-1], 1600))
+    provider = _Provider(full)
+    store.configure(fetcher=provider)
+    try:
+        got = store.get_history("005930", days=30)
+    finally:
+        store._FETCHER = None
+
+    assert provider.starts == [stored.index[-2]]
+    assert store.stats_snapshot()["adjusted_refetch"] == 0
+    np.testing.assert_array_equal(got["Close"].to_numpy(), full["Close"].iloc[-len(got):].to_numpy())
+
+
+def test_adjusted_overlap_triggers_full_refetch(store):
+    full = _history_until_today()
+    stored = full.iloc[:-5]
+    _seed(store, stored, _kst_epoch(stored.index[-1], 1600))
+    # 2:1 액면분할: 제공처가 과거 봉까지 수정주가로 바꿔 보낸다.
+    adjusted = full.copy()
+    adjusted[["Open", "High", "Low", "Close"]] /= 2.0
+    adjusted["Volume"] *= 2.0
+    provider = _Provider(adjusted)
+    store.configure(fetcher=provider)
+    try:
+        got = store.get_history("005930", days=30)
+    finally:
+        store._FETCHER = None
+
+    assert store.stats_snapshot()["adjusted_refetch"] == 1
+    assert len(provider.starts) == 2 and provider.starts[1] < stored.index[-2]
+    np.testing.assert_array_equal(got["Close"].to_numpy(), adjusted["Close"].iloc[-len(got):].to_numpy())
+    on_disk, span_start, _ = store._load_disk("005930")
+    assert (on_disk["Close"] <= full["Close"].max() / 2.0).all()
+    assert span_start > stored.index[0] - pd.Timedelta(days=60)
+
+
+def test_intraday_saved_last_bar_is_not_compared(store):
+    full = _history_until_today()
+    stored = full.iloc[:-5].copy()
+    # 마지막 봉은 장중(10:00) 저장분이라 확정 봉과 달라도 정상이다.
+    stored.iloc[-1, stored.columns.get_loc("Close")] += 7.0
+    stored.iloc[-1, stored.columns.get_loc("Volume")] /= 3.0
+    _seed(store, stored, _kst_epoch(stored.index[-1], 1000))
+    provider = _Provider(full)
+    store.configure(fetcher=provider)
+    try:
+        got = store.get_history("005930", days=30)
+    finally:
+        store._FETCHER = None
+
+    assert store.stats_snapshot()["adjusted_refetch"] == 0
+    assert len(provider.starts) == 1
+    assert got.loc[stored.index[-1], "Close"] == full.loc[stored.index[-1], "Close"]
+
+
+def test_failed_refetch_keeps_store_unmixed(store):
+    full = _history_until_today()
+    stored = full.iloc[:-5]
+    saved_at = _kst_epoch(stored.index[-1], 1600)
+    _seed(store, stored, saved_at)
+    adjusted = full.copy()
+    adjusted["Close"] /= 2.0
+    calls = []
+
+    def flaky(code, start, end=None):
+        calls.append(start)
+        if len(calls) > 1:
+            raise ConnectionError("down")
+        return adjusted[adjusted.index >= pd.Timestamp(start)]
+
+    store.configure(fetcher=flaky)
+    try:
+        got = store.get_history("005930", days=30)
+    finally:
+        store._FETCHER = None
+
+    np.testing.assert_array_equal(got["Close"].to_numpy(), stored["Close"].iloc[-len(got):].to_numpy())
+    assert store._load_disk("005930")[2] == saved_at
+
+
+# --- 패널(미수정 pykrx 스냅샷) tail -------------------------------------------------
+AFTER_CLOSE = pd.Timestamp("2026-10-16 16:30").to_pydatetime()  # 금요일 장 마감 후
+
+
+class _Bulk:
+    """pykrx get_market_ohlcv(date, market) stub: 미수정 종가와 KRX 등락률(조정 기준가 대비)을 돌려준다."""
+
+    def __init__(self, raw, change=None):
+        self.raw = raw
+        self.change = change if change is not None else raw["Close"].pct_change() * 100
+
+    def __call__(self, ymd, market):
+        day = pd.Timestamp(ymd)
+        if market != "KOSPI" or day not in self.raw.index:
+            return pd.DataFrame()
+        r = self.raw.loc[day]
+        return pd.DataFrame({"시가": [r["Open"]], "고가": [r["High"]], "저가": [r["Low"]], "종가": [r["Close"]],
+                             "거래량": [r["Volume"]], "등락률": [self.change.loc[day]]}, index=["005930"])
+
+
+@pytest.fixture
+def panel_store(store, tmp_path, monkeypatch):
+    import market_panel
+
+    monkeypatch.setattr(ohlcv_store, "_now_kst", lambda: AFTER_CLOSE)
+    monkeypatch.setattr(market_panel, "_now_kst", lambda: AFTER_CLOSE)
+    monkeypatch.setattr(ohlcv_store, "_PANEL", market_panel)
+    market_panel.configure(root=tmp_path / "panel")
+    market_panel.reset_stats()
+    yield store, market_panel
+    market_panel.configure(root="reports/.cache/market_panel")
+    market_panel._FETCHER = None
+
+
+def _split_case():
+    """FDR 수정주가 이력과 같은 구간의 미수정 봉. 2026-10-15에 2:1 액면분할."""
+    split = pd.Timestamp("2026-10-15")
+    raw = _bars(n=40, end="2026-10-16")
+    pre = raw.index < split
+    raw[["Open", "High", "Low", "Close"]] = [9950.0, 10010.0, 9990.0, 10000.0]
+    raw.loc[~pre, ["Open", "High", "Low", "Close"]] = [4975.0, 5005.0, 4995.0, 5000.0]
+    raw.loc["2026-10-16", "Close"] = 5100.0
+    adjusted = raw.copy()
+    adjusted.loc[pre, ["Open", "High", "Low", "Close"]] /= 2.0
+    adjusted.loc[pre, "Volume"] *= 2.0
+    # KRX 등락률은 조정된 기준가(5,000원) 대비라 분할일에 0%다.
+    change = raw["Close"].pct_change() * 100
+    change.loc[split] = 0.0
+    return adjusted, raw, change
+
+
+def test_panel_tail_with_split_refetches_adjusted_history(panel_store):
+    store, market_panel = panel_store
+    adjusted, raw, change = _split_case()
+    # 분할 전 마감 후 저장본: 그때의 FDR 이력(분할 전이라 원 가격 그대로)
+    stored = raw[raw.index < pd.Timestamp("2026-10-14")]
+    _seed(store, stored, _kst_epoch(stored.index[-1], 1600))
+    market_panel.configure(fetcher=_Bulk(raw, change))
+    provider = _Provider(adjusted)
+    store.configure(fetcher=provider)
+    try:
+        got = store.get_history("005930", days=30)
+    finally:
+        store._FETCHER = None
+
+    st = store.stats_snapshot()
+    assert st["panel_action"] == 1 and st["adjusted_refetch"] == 1 and st["panel_tail"] == 0
+    assert len(provider.starts) == 1
+    np.testing.assert_array_equal(got["Close"].to_numpy(), adjusted["Close"].iloc[-len(got):].to_numpy())
+    on_disk = store._load_disk("005930")[0]
+    assert on_disk["Close"].max() <= 5100.0
+
+
+def test_panel_tail_without_action_is_served_from_panel(panel_store):
+    store, market_panel = panel_store
+    full = _bars(n=40, end="2026-10-16")
+    stored = full[full.index < pd.Timestamp("2026-10-14")]
+    _seed(store, stored, _kst_epoch(stored.index[-1], 1600))
+    market_panel.configure(fetcher=_Bulk(full))
+    provider = _Provider(full)
+    store.configure(fetcher=provider)
+    try:
+        got = store.get_history("005930", days=30)
+    finally:
+        store._FETCHER = None
+
+    st = store.stats_snapshot()
+    assert provider.starts == [] and st["panel_tail"] == 1 and st["adjusted_refetch"] == 0
+    np.testing.assert_allclose(got["Close"].to_numpy(), full["Close"].iloc[-len(got):].to_numpy())
+
+
+def test_panel_without_change_rate_is_not_trusted(panel_store):
+    store, market_panel = panel_store
+    full = _bars(n=40, end="2026-10-16")
+    stored = full[full.index < pd.Timestamp("2026-10-14")]
+    _seed(store, stored, _kst_epoch(stored.index[-1], 1600))
+    market_panel.configure(fetcher=_Bulk(full, change=pd.Series(np.nan, index=full.index)))
+    provider = _Provider(full)
+    store.configure(fetcher=provider)
+    try:
+        store.get_history("005930", days=30)
+    finally:
+        store._FETCHER = None
+
+    st = store.stats_snapshot()
+    assert st["panel_tail"] == 0 and st["tail_fetch"] == 1
+    assert provider.starts == [stored.index[-2]]
+
+
+def test_action_codes_flags_split_and_unverified():
+    import market_panel
+
+    idx = pd.bdate_range("2026-10-12", periods=4)
+    close = pd.DataFrame({"A": [100.0, 101.0, 50.5, 51.0], "B": [200.0, 202.0, 204.0, 204.0],
+                          "C": [np.nan, np.nan, 10.0, 11.0], "D": [10.0, 10.0, 10.0, 10.0]}, index=idx)
+    change = close.ffill().pct_change() * 100
+    change.loc[idx[2], "A"] = 0.0  # 2:1 분할: KRX 등락률은 조정 기준가 대비
+    change.loc[idx[3], "D"] = np.nan
+    assert market_panel.action_codes({"Close": close, "Change": change}) == ["A", "D"]
+
+
+def test_adjusted_history_requires_panel_action_check(monkeypatch):
+    import market_panel
+
+    monkeypatch.setattr(ohlcv_store, "_PANEL", None)
+    assert ohlcv_store.adjusted_history()
+    monkeypatch.setattr(ohlcv_store, "_PANEL", market_panel)
+    assert ohlcv_store.adjusted_history()
+    monkeypatch.setattr(ohlcv_store, "_PANEL", object())
+    assert not ohlcv_store.adjusted_history()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import price_chunk_store as pcs
+
+
+def _bars(end: str, periods: int, seed: int = 1) -> pd.DataFrame:
+    idx = pd.bdate_range(end=end, periods=periods)
+    rng = np.random.default_rng(seed)
+    c = np.round(10_000 * np.exp(np.cumsum(rng.normal(0, 0.02, len(idx)))), -1)
+    return pd.DataFrame({"Open": c, "High": c * 1.01, "Low": c * 0.99, "Close": c,
+                         "Volume": rng.integers(1_000, 100_000, len(idx))}, index=idx)
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setenv("V20_PRICE_CHUNK_RUN_KEY", "run-a")
+    monkeypatch.setenv("V20_PRICE_CHUNK_FLUSH_EVERY", "1000")
+    old = pcs._ROOT
+    pcs.configure(root=tmp_path / "shard")
+    pcs.reset_stats()
+    yield tmp_path
+    pcs.configure(root=old)
+
+
+def _unpack(members, dest):
+    """handoff tar를 푼 것과 같은 디렉터리를 만든다."""
+    for rel, item in members:
+        p = dest / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(item if isinstance(item, bytes) else item.read_bytes())
+    return dest
+
+
+def test_put_read_round_trip_splits_by_year_and_dedups(store):
+    df = _bars("2026-03-31", 120)  # 2025 ~ 2026에 걸친다
+    ref = pcs.put("005930", 400, df)
+    assert len(ref["chunks"]) == 2 and ref["first"] == "2025-10-15" and ref["last"] == "2026-03-31"
+    pd.testing.assert_frame_equal(pcs.read("005930", 400), df)
+    again = pcs.put("005930", 200, df)
+    assert again["chunks"] == ref["chunks"]
+    st = pcs.stats_snapshot()
+    assert st["chunk_written"] == 2 and st["chunk_dedup"] == 2
+    assert pcs.flush() and pcs.ref_count(pcs._ROOT) == 2
+
+
+def test_handoff_merge_round_trip_ships_only_this_runs_chunks(store, monkeypatch):
+    shard = pcs._ROOT
+    parent = store / "parent"
+    new = _bars("2026-04-01", 121)
+    pcs.put("005930", 400, new.iloc[:-1])
+    first = _unpack(pcs.handoff_members(shard), store / "x1")
+    assert pcs.merge_store(first, parent)["refs_added"] == 1
+
+    # 다음 실행: 같은 종목을 하루 늘려 받았다. 2025년 청크는 그대로라 새 청크는 2026년분 하나뿐이다.
+    monkeypatch.setenv("V20_PRICE_CHUNK_RUN_KEY", "run-b")
+    ref = pcs.put("005930", 400, new)
+    members = pcs.handoff_members(shard)
+    shipped = [rel for rel, _ in members if rel != pcs.REFS_FILE]
+    assert shipped == [pcs.object_path(".", ref["chunks"][-1]).relative_to(".").as_posix()]
+
+    res = pcs.merge_store(_unpack(members, store / "x2"), parent)
+    assert res == {"objects_copied": 1, "objects_present": 0, "refs_added": 0, "refs_updated": 1, "refs_kept": 0, "refs_incomplete": 0}
+    pcs.configure(root=parent)
+    got = pcs.read("005930", 400)
+    pd.testing.assert_frame_equal(got, new)
+    assert pcs.get_ref("005930", 400)["last"] == "2026-04-01"
+
+
+def test_merge_skips_ref_whose_chunks_the_parent_lacks(store, monkeypatch):
+    shard = pcs._ROOT
+    df = _bars("2026-04-01", 121, seed=2)
+    pcs.put("000660", 400, df.iloc[:-1])
+    monkeypatch.setenv("V20_PRICE_CHUNK_RUN_KEY", "run-b")
+    pcs.put("000660", 400, df)
+    # 부모가 run-a의 2025년 청크를 받은 적이 없으면 그 ref는 받지 않는다(다음 조회 때 다시 받음).
+    res = pcs.merge_store(_unpack(pcs.handoff_members(shard), store / "x"), store / "parent")
+    assert res["refs_incomplete"] == 1 and res["refs_added"] == 0
+    assert pcs.ref_count(store / "parent") == 0
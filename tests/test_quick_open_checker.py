@@ -0,0 +1,61 @@
+import json
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import market_panel
+from _source_loader import load_script
+
+# bs4가 없으면 import할 수 없으므로 정의만 불러온다(HTTP 조회 함수는 테스트에서 쓰지 않는다).
+q = load_script("quick_open_checker.py")
+
+THROUGH = date(2026, 10, 16)
+DAYS = pd.bdate_range(end=THROUGH, periods=21)
+
+
+def _matrix():
+    """미수정 패널 행렬. 000660은 10-14에 2:1 액면분할. KRX 등락률은 조정 기준가 대비 = 수정 종가의 등락률."""
+    rng = np.random.default_rng(3)
+    adjusted = pd.DataFrame({c: np.round(20_000 * np.exp(np.cumsum(rng.normal(0, 0.02, len(DAYS)))), -1)
+                             for c in ("005930", "000660", "035720")}, index=DAYS)
+    close = adjusted.copy()
+    close.loc[close.index < pd.Timestamp("2026-10-14"), "000660"] *= 2.0
+    return {"Open": close, "High": close * 1.02, "Low": close * 0.98, "Close": close,
+            "Volume": close * 0 + 1e5, "Change": adjusted.pct_change() * 100}
+
+
+def _with_panel(monkeypatch, mat):
+    stub = SimpleNamespace(enabled=lambda: True, recent_matrix=lambda n: mat, action_codes=market_panel.action_codes)
+    monkeypatch.setattr(q, "_market_panel", stub)
+
+
+def test_panel_daily_leaves_out_codes_with_a_corporate_action(monkeypatch):
+    mat = _matrix()
+    _with_panel(monkeypatch, mat)
+    got = q._panel_daily(THROUGH)
+    assert sorted(got) == ["005930", "035720"]
+    fr = mat["Close"].tail(20)["005930"]
+    d = got["005930"]
+    assert d.prev_close == int(fr.iloc[-1]) and d.source == "panel"
+    assert abs(d.ma5 - fr.tail(5).mean()) < 1e-6 and abs(d.ma20 - fr.mean()) < 1e-6
+    assert d.high20 == int((mat["High"].tail(20)["005930"]).max())
+
+
+def test_daily_cache_fetches_adjusted_codes_per_code(monkeypatch, tmp_path):
+    _with_panel(monkeypatch, _matrix())
+    fetched = []
+
+    def per_code(code, through=None):
+        fetched.append(code)
+        return q.DailyInfo(code=code, prev_close=10_300, ma5=10_100.0, ma20=10_000.0, source="fdr")
+
+    monkeypatch.setattr(q, "fetch_daily_info", per_code)
+    monkeypatch.setattr(q, "last_completed_session", lambda now=None: THROUGH)
+    path = tmp_path / "daily.json"
+    res = q.build_daily_cache(["005930", "000660"], path)
+    assert fetched == ["000660"] and res["fetched"] == 1
+    items = json.loads(path.read_text(encoding="utf-8"))["items"]
+    assert items["000660"][0] == 10_300 and items["000660"][-1] == "fdr"
+    assert items["005930"][-1] == "panel"
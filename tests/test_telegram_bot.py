@@ -0,0 +1,114 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from _source_loader import load_script
+
+# telegram_bot은 flask/FinanceDataReader/main7 없이 import할 수 없으므로 캐시 부분만 불러온다.
+NAMES = {
+    "KST", "ANALYSIS_LRU_SIZE", "INTRADAY_TTL_SEC", "MARKET_OPEN_HHMM", "MARKET_CLOSE_HHMM",
+    "_LOCK", "_ANALYSIS", "_STATS", "_STARTED",
+    "_now_kst", "_is_session", "_next_open", "_cache_expiry", "get_analysis", "_attach_panel", "create_app",
+}
+NOW = 1_000_000.0
+
+
+class _Clock:
+    def __init__(self):
+        self.t = NOW
+
+    def time(self):
+        return self.t
+
+
+class _Calendar:
+    """10-09(금) 한글날 휴장."""
+
+    HOLIDAYS = {pd.Timestamp("2026-10-09")}
+
+    def is_session(self, day):
+        return pd.Timestamp(day).weekday() < 5 and pd.Timestamp(day) not in self.HOLIDAYS
+
+    def next_session(self, day):
+        d = pd.Timestamp(day) + pd.Timedelta(days=1)
+        while not self.is_session(d):
+            d += pd.Timedelta(days=1)
+        return d
+
+
+@pytest.fixture
+def bot():
+    clock = _Clock()
+    calls = []
+
+    def fetch(code):
+        calls.append(code)
+        return pd.DataFrame({"Close": [1.0]})
+
+    mod = load_script("telegram_bot.py", names=NAMES, preset={
+        "os": os, "time": clock, "threading": threading, "OrderedDict": OrderedDict, "pd": pd,
+        "datetime": datetime, "timedelta": timedelta, "timezone": timezone, "_krx_cal": _Calendar(),
+        "fetch_stock_df": fetch, "get_indicators": lambda df: df,
+        "evaluate_stage_sequence": lambda df: {"stage": 1}, "evaluate_exit_signal": lambda df, entry_price=None: {},
+        "Flask": object, "app": SimpleNamespace(name="app"),
+        "start_warm_worker": lambda: calls.append("warm"),
+    })
+    mod.clock, mod.calls = clock, calls
+    return mod
+
+
+def _ttl(bot, now):
+    return bot._cache_expiry(now) - NOW
+
+
+@pytest.mark.parametrize("now,want", [
+    (datetime(2026, 10, 14, 8, 30), timedelta(minutes=30)),              # 장 시작 전 → 오늘 09:00
+    (datetime(2026, 10, 14, 10, 0), timedelta(seconds=300)),             # 장중 → INTRADAY_TTL_SEC
+    (datetime(2026, 10, 14, 15, 38), timedelta(minutes=2)),              # 마감 직전 → 마감 시각까지
+    (datetime(2026, 10, 14, 16, 0), timedelta(hours=17)),                # 마감 후 → 다음 날 09:00
+    (datetime(2026, 10, 16, 16, 0), timedelta(days=2, hours=17)),        # 금요일 마감 후 → 월요일 09:00
+    (datetime(2026, 10, 9, 10, 0), timedelta(days=2, hours=23)),         # 휴장일(한글날) 낮 → 다음 거래일 09:00
+    (datetime(2026, 10, 8, 16, 0), timedelta(days=3, hours=17)),         # 휴장 전날 마감 후 → 휴장일 건너뜀
+])
+def test_cache_expiry_follows_session_windows(bot, now, want):
+    assert _ttl(bot, now) == want.total_seconds()
+
+
+def test_cache_expiry_never_in_the_past(bot):
+    assert _ttl(bot, datetime(2026, 10, 14, 9, 0)) == 300
+    assert _ttl(bot, datetime(2026, 10, 14, 15, 40)) > 0
+
+
+def test_analysis_lru_hits_expires_and_evicts(bot, monkeypatch):
+    bot.ANALYSIS_LRU_SIZE = 2
+    monkeypatch.setattr(bot, "_cache_expiry", lambda now=None: NOW + 60)
+    for code in ("A", "B", "A", "C"):
+        bot.get_analysis(code)
+    assert bot.calls == ["A", "B", "C"]
+    assert list(bot._ANALYSIS) == ["A", "C"]  # A를 다시 써서 B가 가장 오래된 항목으로 밀려났다
+    assert bot._STATS["hit"] == 1 and bot._STATS["miss"] == 3 and bot._STATS["evicted"] == 1
+
+    bot.clock.t = NOW + 61
+    bot.get_analysis("A")
+    assert bot.calls[-1] == "A" and bot._STATS["miss"] == 4
+
+
+def test_create_app_attaches_panel_and_starts_worker_once(bot):
+    store = SimpleNamespace(configured=[], configure=lambda panel=None: store.configured.append(panel),
+                            adjusted_history=lambda: True)
+    panel = SimpleNamespace(enabled=lambda: True)
+    bot._ohlcv_store, bot._market_panel = store, panel
+    assert store.configured == []  # import(정의 로드)만으로는 저장소 설정을 바꾸지 않는다
+    assert bot.create_app() is bot.app and bot.create_app() is bot.app
+    assert store.configured == [panel] and bot.calls == ["warm"]
+
+
+def test_panel_not_attached_to_store_without_adjustment_check(bot):
+    store = SimpleNamespace(configured=[], configure=lambda panel=None: store.configured.append(panel))
+    bot._ohlcv_store, bot._market_panel = store, SimpleNamespace(enabled=lambda: True)
+    assert bot._attach_panel() is False and store.configured == []
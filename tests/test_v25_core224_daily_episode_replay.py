@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import v25_core224_daily_episode_replay as v25
+
+thesis = v25.thesis
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    return type(a) is type(b) and a == b
+
+
+def _px(n: int, seed: int, gaps: bool) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    px = pd.DataFrame({
+        "open": c * (1 + rng.normal(0, 0.01, n)),
+        "high": c * (1 + np.abs(rng.normal(0, 0.03, n))),
+        "low": c * (1 - np.abs(rng.normal(0, 0.03, n))),
+        "close": c,
+        "volume": 1.0,
+    }, index=pd.bdate_range("2024-01-01", periods=n))
+    if gaps:
+        for col in ("open", "high", "low"):
+            px.loc[px.index[rng.random(n) < 0.1], col] = np.nan
+    return px
+
+
+def _case(t: int):
+    rng = np.random.default_rng(1000 + t)
+    n = int(rng.integers(3, 120))
+    px = _px(n, t, gaps=t % 3 == 0)
+    si = int(rng.integers(0, n))
+    if t % 11 == 0:
+        px.iloc[si, 3] = np.nan  # 진입 종가 결측 → 행 단위 경로로 위임
+    e = float(px["close"].iloc[si]) if np.isfinite(px["close"].iloc[si]) else 100.0
+    rec = {
+        "restart_date": px.index[si].strftime("%Y-%m-%d") if t % 17 else "2030-01-01",
+        "code": "5930", "event_id": f"e{t}", "cycle_id": "c", "name": "x",
+        "h1_high": float(e * rng.uniform(0.95, 1.1)) if t % 4 else None,
+        "daily_universe_membership_proven": 1,
+    }
+    lenses = {"A": e * 0.97, "B": e * 0.9, "C": np.nan, "D": e * 1.01, "E": e * 0.8}
+    cfg = thesis.Core224LifecycleConfig(max_follow_days=int(rng.choice([5, 20, 60])))
+    return rec, px, lenses, cfg
+
+
+CASES = range(120)
+
+
+@pytest.mark.parametrize("t", CASES)
+def test_lenses_match_single_entry_one(t):
+    rec, px, lenses, cfg = _case(t)
+    got = v25._simulate_single_entry_lenses(rec, px, lenses, cfg)
+    ref = [v25._simulate_single_entry_one(rec, px, k, v, cfg) for k, v in lenses.items()]
+    assert len(got) == len(ref)
+    for g, r in zip(got, ref):
+        assert list(g) == list(r), r["stop_lens"]
+        bad = {k: (r[k], g[k]) for k in r if not _same(r[k], g[k])}
+        assert not bad, (r["stop_lens"], bad)
+
+
+def test_lenses_cover_stop_and_survive_paths():
+    statuses = set()
+    for t in CASES:
+        rec, px, lenses, cfg = _case(t)
+        statuses.update(r["single_status"] for r in v25._simulate_single_entry_lenses(rec, px, lenses, cfg))
+    assert {"STRUCTURE_STOP", "OPEN_RIGHT_CENSORED", "SURVIVED_60D_OBSERVATION_END", "SIGNAL_DATE_PRICE_MISSING"} <= statuses
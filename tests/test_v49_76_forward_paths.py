@@ -0,0 +1,114 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import forward_paths
+from _source_loader import load_script
+
+# v49.76.py는 파일명에 점이 있어 import할 수 없고 4만 줄 넘게 최상위 설정을 실행하므로,
+# 경로 어댑터와 그 행 단위 대조 함수만 불러온다.
+v49 = load_script(
+    "v49.76.py",
+    names={
+        "_env_raw", "_env_int", "_safe_float", "CLOSING_BET_V4940_LIFECYCLE_FORWARD_BARS", "_V538427_EXEC_POLICIES",
+        "_v538415_append_forward_metrics", "_v538415_forward_metrics_batch",
+        "_v4945_path_first_one", "_v4945_path_first_frame",
+        "_v538427_exec_policy_one", "_v538427_exec_policy_frame", "_v4940_policy_result", "_v4940_policy_pnl",
+    },
+    preset={"np": np, "pd": pd, "os": os, "_fwd_paths": forward_paths},
+)
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    return type(a) is type(b) and a == b
+
+
+def _ohlc(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    c = 10_000 * np.exp(np.cumsum(rng.normal(0, 0.04, n)))
+    df = pd.DataFrame({
+        "Open": c * (1 + rng.normal(0, 0.02, n)),
+        "High": c * (1 + np.abs(rng.normal(0, 0.05, n))),
+        "Low": c * (1 - np.abs(rng.normal(0, 0.05, n))),
+        "Close": c,
+    }, index=pd.bdate_range("2024-01-02", periods=n))
+    for col in ("Open", "High", "Low", "Close"):
+        df.loc[df.index[rng.random(n) < 0.05], col] = np.nan
+    df.iloc[rng.choice(n, 3, replace=False), 3] = 0.0
+    return df
+
+
+@pytest.mark.parametrize("hold_n", [1, 3, 5, 8])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_forward_metrics_batch_matches_per_signal(hold_n, seed):
+    h = _ohlc(160, seed)
+    items = [(p, {"code": "005930", "signal_pos": p}) for p in range(len(h))]
+    got = v49._v538415_forward_metrics_batch(h, items, hold_n=hold_n)
+    assert len(got) == len(items)
+    for (pos, feat), g in zip(items, got):
+        ref = v49._v538415_append_forward_metrics(h, pos, feat, hold_n=hold_n)
+        assert set(g) == set(ref), (pos, sorted(set(g) ^ set(ref)))
+        bad = {k: (ref[k], g[k]) for k in ref if not _same(ref[k], g[k])}
+        assert not bad, (pos, bad)
+
+
+def test_forward_metrics_batch_falls_back_without_ohlc():
+    h = _ohlc(40, 3).drop(columns=["High"])
+    items = [(5, {"code": "1"}), (39, {"code": "2"})]
+    assert v49._v538415_forward_metrics_batch(h, items) == [
+        v49._v538415_append_forward_metrics(h, p, f) for p, f in items
+    ]
+
+
+def _ret_frame(n: int, seed: int, days: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cols = {}
+    for d in range(1, days + 1):
+        for k in ("high", "low", "close"):
+            v = rng.normal(0, 4, n).round(int(rng.integers(0, 3)))
+            v[rng.random(n) < 0.15] = np.nan
+            cols[f"d{d}_{k}_ret"] = v
+    df = pd.DataFrame(cols, index=rng.permutation(n) + 100)
+    # 경계값: 정확히 +3 / -3, 같은 날 양방향
+    df.iloc[0, [0, 1]] = [3.0, -3.0]
+    df.iloc[1, [0, 1]] = [3.0, 0.0]
+    df.iloc[2, [0, 1]] = [0.0, -3.0]
+    return df
+
+
+@pytest.mark.parametrize("up,dn", [(3.0, -3.0), (5.0, -2.0)])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_path_first_frame_matches_per_row(up, dn, seed):
+    df = _ret_frame(300, seed)
+    df["d2_low_ret"] = df["d2_low_ret"].astype(object)
+    df.loc[df.index[:20], "d2_low_ret"] = "-4.5"  # 문자열로 들어온 시트 값
+    got = v49._v4945_path_first_frame(df, up, dn)
+    ref = [v49._v4945_path_first_one(r, up, dn) for _, r in df.iterrows()]
+    assert got.index.equals(df.index)
+    assert got.tolist() == ref
+    assert set(ref) == {"PLUS", "MINUS", "NONE"}
+
+
+def test_path_first_frame_missing_day_columns():
+    df = _ret_frame(80, 2).drop(columns=["d4_high_ret", "d5_low_ret"])
+    assert v49._v4945_path_first_frame(df).tolist() == [v49._v4945_path_first_one(r) for _, r in df.iterrows()]
+
+
+@pytest.mark.parametrize("cost_bps", [0, 20, 35])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_policy_pnl_matches_per_row(cost_bps, seed):
+    df = _ret_frame(300, seed)
+    # D3 미성숙(D3 전부 결측) 행
+    df.loc[df.index[5:15], ["d3_high_ret", "d3_low_ret", "d3_close_ret"]] = np.nan
+    got = v49._v4940_policy_pnl(df, cost_bps)
+    ref = pd.Series(
+        [v49._safe_float(v49._v4940_policy_result(r, cost_bps).get("exec_pnl", np.nan), np.nan) for _, r in df.iterrows()],
+        index=df.index, dtype="float64",
+    )
+    pd.testing.assert_series_equal(got, ref, check_names=False, check_exact=True)
+    assert ref.isna().sum() >= 10
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+import v73_discovery_engine as v73
+
+
+def _bars(n=200):
+    idx = pd.bdate_range(end="2026-10-16", periods=n)
+    c = np.linspace(10_000, 12_000, n)
+    return pd.DataFrame({"Open": c, "High": c * 1.01, "Low": c * 0.99, "Close": c, "Volume": 1e5, "Change": 0.0}, index=idx)
+
+
+def _patch(monkeypatch, adjusted):
+    calls = []
+    monkeypatch.setattr(v73.ohlcv_store, "get_history", lambda code, days, end=None: calls.append(code) or _bars())
+    monkeypatch.setattr(v73.ohlcv_store, "adjusted_history", lambda: adjusted)
+    monkeypatch.setattr(v73, "fetch_daily", lambda code, count=330, end_date=None: (_bars(), "NAVER_CHART"))
+    return calls
+
+
+def test_cached_fetch_uses_store_when_history_is_adjusted(monkeypatch):
+    calls = _patch(monkeypatch, True)
+    df, src = v73.fetch_daily_cached("005930", count=120)
+    assert src == "OHLCV_STORE" and calls == ["005930"]
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume"] and len(df) == 120
+
+
+def test_cached_fetch_skips_store_that_may_mix_unadjusted_bars(monkeypatch):
+    calls = _patch(monkeypatch, False)
+    _, src = v73.fetch_daily_cached("005930", count=120)
+    assert src == "NAVER_CHART" and calls == []
+
+
+def test_cached_fetch_skips_store_without_adjustment_guarantee(monkeypatch):
+    calls = _patch(monkeypatch, True)
+    monkeypatch.delattr(v73.ohlcv_store, "adjusted_history")
+    _, src = v73.fetch_daily_cached("005930", count=120)
+    assert src == "NAVER_CHART" and calls == []
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import vector_indicators as vi
+
+# 누적합 기반 이동창 vs pandas rolling: 상대오차 1e-9(가격 1e5원대 기준 0.0001원) 안쪽이어야 한다.
+RTOL = 1e-9
+ATOL = 1e-6
+
+
+def _legacy_core(df: pd.DataFrame, clamp_to_length: bool = False) -> pd.DataFrame:
+    """벡터화 이전 get_indicators의 pandas 계산 그대로.
+
+    clamp_to_length=False: scanner/legacy_main_patched.py (rolling(window=n, min_periods=n))
+    clamp_to_length=True : indicator_engine.py (rolling(window=min(count, n)))
+    """
+    df = df.copy()
+    count = len(df)
+    high, low, close = df["High"], df["Low"], df["Close"]
+    for n in [5, 10, 20, 40, 60, 112, 224, 448]:
+        if clamp_to_length:
+            df[f"MA{n}"] = close.rolling(window=min(count, n)).mean()
+            df[f"VMA{n}"] = df["Volume"].rolling(window=min(count, n)).mean()
+        else:
+            df[f"MA{n}"] = close.rolling(window=n, min_periods=n).mean()
+            df[f"VMA{n}"] = df["Volume"].rolling(window=n, min_periods=n).mean()
+        df[f"Slope{n}"] = (df[f"MA{n}"] - df[f"MA{n}"].shift(3)) / df[f"MA{n}"].shift(3) * 100
+
+    std20 = close.rolling(20).std()
+    std40 = close.rolling(40).std()
+    df["BB_Upper"] = df["MA20"] + std20 * 2
+    df["BB_Lower"] = df["MA20"] - std20 * 2
+    df["BB20_Width"] = std20 * 4 / df["MA20"] * 100
+    df["BB40_Upper"] = df["MA40"] + std40 * 2
+    df["BB40_Lower"] = df["MA40"] - std40 * 2
+    df["BB40_Width"] = std40 * 4 / df["MA40"] * 100
+    df["BB40_PercentB"] = (close - df["BB40_Lower"]) / (df["BB40_Upper"] - df["BB40_Lower"])
+    std30 = close.rolling(30).std()
+    df["BB30_Upper_18"] = close.rolling(30).mean() + std30 * 1.8
+    df["High20"] = df["High"].rolling(20).max()
+    df["High52"] = df["High"].rolling(252).max()
+
+    df["Tenkan_sen"] = (high.rolling(9).max() + low.rolling(9).min()) / 2
+    df["Kijun_sen"] = (high.rolling(26).max() + low.rolling(26).min()) / 2
+    df["Span_A"] = ((df["Tenkan_sen"] + df["Kijun_sen"]) / 2).shift(26)
+    df["Span_B"] = ((high.rolling(52).max() + low.rolling(52).min()) / 2).shift(26)
+    df["Cloud_Top"] = df[["Span_A", "Span_B"]].max(axis=1)
+
+    df["OBV"] = (np.sign(close.diff()) * df["Volume"]).fillna(0).cumsum()
+    df["OBV_MA10"] = df["OBV"].rolling(10).mean()
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).ewm(com=13, adjust=False).mean()
+    loss = (-delta.where(delta < 0, 0)).ewm(com=13, adjust=False).mean()
+    df["RSI"] = 100 - (100 / (1 + gain / loss))
+    return df
+
+
+def _frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.round(10_000 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), 0)
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    vol = rng.integers(0, 3_000_000, n).astype(float)
+    vol[rng.random(n) < 0.02] = 0
+    idx = pd.bdate_range("2022-01-03", periods=n, name="Date")
+    return pd.DataFrame(
+        {"Open": close, "High": close + spread, "Low": close - spread, "Close": close, "Volume": vol}, index=idx
+    )
+
+
+def _flat_then_move() -> pd.DataFrame:
+    # 거래정지 구간(가격 고정, 거래량 0) → 표준편차 0, RSI 0/0, 이후 고가주 급등.
+    df = _frame(320, 7)
+    df.iloc[100:160, :4] = 250_000.0
+    df.iloc[100:160, 4] = 0.0
+    df.iloc[200:, :4] *= 30
+    return df
+
+
+def _halted_tail() -> pd.DataFrame:
+    # 고가주가 최근 40봉째 거래정지 — 증분 갱신 구간이 전부 고정가.
+    df = _frame(400, 9)
+    df.iloc[:, :4] *= 30
+    df.iloc[360:, :4] = 7_512_345.0
+    df.iloc[360:, 4] = 0.0
+    return df
+
+
+FIXTURES = {
+    "short_30": _frame(30, 1),
+    "short_60": _frame(60, 2),
+    "mid_300": _frame(300, 3),
+    "long_900": _frame(900, 4),
+    "halt_flat": _flat_then_move(),
+    "halt_tail": _halted_tail(),
+}
+
+
+def _assert_columns_match(got: pd.DataFrame, ref: pd.DataFrame) -> None:
+    for col in vi.CORE_COLUMNS:
+        a = got[col].to_numpy(dtype="float64")
+        b = ref[col].to_numpy(dtype="float64")
+        np.testing.assert_allclose(a, b, rtol=RTOL, atol=ATOL, equal_nan=True, err_msg=col)
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+@pytest.mark.parametrize("clamp", [False, True], ids=["scanner", "indicator_engine"])
+def test_apply_core_matches_legacy_get_indicators(name, clamp):
+    df = FIXTURES[name]
+    got = vi.apply_core(df.copy(), clamp_to_length=clamp)
+    _assert_columns_match(got, _legacy_core(df, clamp_to_length=clamp))
+    assert list(got.columns[:5]) == ["Open", "High", "Low", "Close", "Volume"]
+    assert got.index.equals(df.index)
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_reference_core_is_legacy_path(name):
+    # --parity CLI의 기준(reference_core_pandas)이 레거시 계산에서 벗어나지 않았는지.
+    df = FIXTURES[name]
+    _assert_columns_match(vi.reference_core_pandas(df), _legacy_core(df))
+
+
+@pytest.mark.parametrize("name", ["mid_300", "long_900", "halt_flat", "halt_tail"])
+def test_incremental_append_matches_batch(name):
+    df = FIXTURES[name]
+    k = len(df) - 25
+    st = vi.IncrementalIndicators.from_frame(df.iloc[:k])
+    frame = vi.apply_core(df.iloc[:k].copy())
+    for when, bar in df.iloc[k:].iterrows():
+        frame = vi.append_bar(frame, st, when, bar.to_dict())
+    _assert_columns_match(frame.iloc[k:], _legacy_core(df).iloc[k:])
@@ -28,6 +28,11 @@ import pandas as pd
 
 import original_thesis_reconstruction as thesis
 
+try:
+    import forward_paths
+except Exception:  # pragma: no cover - engine optional; fall back to per-lens loop
+    forward_paths = None
+
 VERSION = "V73.3.6.6.25.4.1"
 RESEARCH_ONLY = True
 LIVE_LOGIC_CHANGED = False
@@ -493,6 +498,83 @@ def _simulate_single_entry_one(restart: Dict[str, Any], px: pd.DataFrame, stop_n
     }
 
 
+def _simulate_single_entry_lenses(restart: Dict[str, Any], px: pd.DataFrame, lenses: Dict[str, float], cfg: thesis.Core224LifecycleConfig) -> List[Dict[str, Any]]:
+    """All stop lenses of one restart on one forward path; row-for-row identical to _simulate_single_entry_one.
+
+    The day path (returns, first-touch days) is computed once and each lens only cuts it at its own
+    first stop bar, so the per-bar Python loop runs zero times instead of once per lens.
+    """
+    names = list(lenses.keys())
+    def per_lens() -> List[Dict[str, Any]]:
+        return [_simulate_single_entry_one(restart, px, k, lenses[k], cfg) for k in names]
+    if forward_paths is None or not names or px is None or px.empty:
+        return per_lens()
+    sig_date = pd.to_datetime(restart.get("restart_date") or restart.get("date"), errors="coerce")
+    if pd.isna(sig_date):
+        return per_lens()
+    sig_date = pd.Timestamp(sig_date).normalize(); start_idx = thesis._first_bar_index_on_or_after(px, sig_date)
+    if start_idx is None or px.index[start_idx].normalize() != sig_date:
+        return per_lens()
+    entry = float(px.iloc[start_idx]["close"])
+    if not (np.isfinite(entry) and entry > 0):
+        return per_lens()
+    code = _norm_code(restart.get("code", "")); event_id = str(restart.get("event_id", restart.get("cycle_id", "")))
+    h1 = float(pd.to_numeric(pd.Series([restart.get("h1_high")]), errors="coerce").iloc[0])
+    max_idx = min(len(px) - 1, start_idx + cfg.max_follow_days); available = max_idx - start_idx; n_days = available + 1
+    arr = forward_paths.ohlc_arrays(px, ("open", "high", "low", "close"), exact=True)
+    o, hi, lo, cl = (forward_paths.forward_windows(arr[f], [start_idx], n_days, start=0)[0] for f in ("open", "high", "low", "close"))
+    day = np.arange(n_days)
+    with np.errstate(invalid="ignore"):
+        high_ret = hi / entry - 1.0; low_ret = lo / entry - 1.0; close_ret = cl / entry - 1.0
+        stops = np.array([float(lenses[k]) for k in names])
+        stop_first = forward_paths.first_day((lo[None, :] <= stops[:, None]) & (day[None, :] > 0))
+        below_before = np.concatenate([[False], np.logical_or.accumulate(close_ret < 0)[:-1]])
+        path_days = {
+            "recovery": forward_paths.first_day(((day > 0) & below_before & (close_ret >= 0))[None, :])[0],
+            "h1_high": forward_paths.first_day((hi >= h1)[None, :])[0] if np.isfinite(h1) else 0,
+            "h1_close": forward_paths.first_day((cl >= h1)[None, :])[0] if np.isfinite(h1) else 0,
+            "p3": forward_paths.first_day((high_ret >= 0.03)[None, :])[0],
+            "p5": forward_paths.first_day((high_ret >= 0.05)[None, :])[0],
+            "p10": forward_paths.first_day((high_ret >= 0.10)[None, :])[0],
+        }
+    # 손절 봉은 지표에서 빠지므로 렌즈마다 관측일 수 = 손절일(없으면 전체 창).
+    n_obs = np.where(stop_first > 0, stop_first - 1, n_days)
+    mfe_all = forward_paths.nan_reduce(np.broadcast_to(high_ret, (len(names), n_days)), "max", n_obs)
+    mae_all = forward_paths.nan_reduce(np.broadcast_to(low_ret, (len(names), n_days)), "min", n_obs)
+
+    def cut(first: int, limit: int) -> Any:
+        return int(first - 1) if 0 < first and first - 1 < limit else np.nan
+
+    rows = []
+    for j, stop_name in enumerate(names):
+        stop_price = lenses[stop_name]
+        base = {"version": VERSION, "event_id": event_id, "cycle_id": restart.get("cycle_id", ""), "code": code, "name": restart.get("name", ""), "stop_lens": stop_name, "research_only": True}
+        risk_frac = (entry - float(stop_price)) / entry if np.isfinite(stop_price) else np.nan
+        risk_valid = int(np.isfinite(risk_frac) and risk_frac > 0)
+        stopped = bool(stop_first[j] > 0); limit = int(n_obs[j])
+        if stopped:
+            sd = int(stop_first[j] - 1); stop_day: Any = sd; stop_date = _fmt_date(px.index[start_idx + sd])
+            final_price = float(o[sd]) if float(o[sd]) < float(stop_price) else float(stop_price)
+        else:
+            stop_day = np.nan; stop_date = ""; final_price = float(cl[available])
+        mfe = float(mfe_all[j]); mae = float(mae_all[j])
+        pnl_frac = final_price / entry - 1.0
+        r_mult = pnl_frac / risk_frac if risk_valid else np.nan
+        rows.append({
+            **base, "signal_date": sig_date.strftime("%Y-%m-%d"), "entry_price": entry, "stop_price": float(stop_price),
+            "single_status": "STRUCTURE_STOP" if stopped else ("SURVIVED_60D_OBSERVATION_END" if available >= cfg.max_follow_days else "OPEN_RIGHT_CENSORED"),
+            "stop_day": stop_day, "stop_date": stop_date, "available_follow_days": available, "final_price": final_price,
+            "final_capital_pnl_pct": pnl_frac * 100.0 if np.isfinite(pnl_frac) else np.nan,
+            "planned_risk_pct": risk_frac * 100.0 if np.isfinite(risk_frac) else np.nan, "risk_valid": risk_valid,
+            "final_r_multiple": r_mult, "mfe_pct": mfe * 100.0 if np.isfinite(mfe) else np.nan, "mae_pct": mae * 100.0 if np.isfinite(mae) else np.nan,
+            "avg_recovery_day": cut(path_days["recovery"], limit), "h1_high_rebreak_day": cut(path_days["h1_high"], limit), "h1_close_rebreak_day": cut(path_days["h1_close"], limit),
+            "profit3_high_day": cut(path_days["p3"], limit), "profit5_high_day": cut(path_days["p5"], limit), "profit10_high_day": cut(path_days["p10"], limit),
+            "daily_universe_authority": restart.get("daily_universe_authority", ""),
+            "daily_universe_membership_proven": int(float(restart.get("daily_universe_membership_proven", 0) or 0)),
+        })
+    return rows
+
+
 def _risk_parity(scale_policy: pd.DataFrame, fills: pd.DataFrame, single: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     if scale_policy is None or scale_policy.empty or single is None or single.empty: return pd.DataFrame(), pd.DataFrame()
     fill_risk: Dict[Tuple[str, str], float] = {}
@@ -660,7 +742,7 @@ def run_daily_episode_replay(output_dir: str | Path, state: pd.DataFrame) -> Dic
         for x in hh: x.update(common)
         lifecycle_policy.extend(pol); lifecycle_fills.extend(ff); lifecycle_horizons.extend(hh)
         lenses = thesis._stop_lenses(float(rec.get("l0_low", np.nan)), float(rec.get("h1_high", np.nan)), float(sig.get("pullback_low", np.nan)), cfg_life)
-        for lens, stop in lenses.items(): single_rows.append(_simulate_single_entry_one(rec, px, lens, stop, cfg_life))
+        single_rows.extend(_simulate_single_entry_lenses(rec, px, lenses, cfg_life))
 
     life_signal_df = pd.DataFrame(lifecycle_signals); life_policy_df = pd.DataFrame(lifecycle_policy); life_fill_df = pd.DataFrame(lifecycle_fills); life_horizon_df = pd.DataFrame(lifecycle_horizons); single_df = pd.DataFrame(single_rows)
     life_stop = thesis._policy_stop_summary(life_policy_df, str(cohort.get("cohort_id", "COHORT_ALL"))) if not life_policy_df.empty else pd.DataFrame()
@@ -46,6 +46,45 @@ import v49_76_input as _v4972_input
 import requests
 import FinanceDataReader as fdr
 
+# 네이버 스크래핑 GET은 공용 세션 풀(http_pool.py: 호스트별 keep-alive + 토큰버킷 + 지터 재시도)로 보낸다.
+try:
+    import http_pool as _http_pool
+except Exception:
+    _http_pool = None
+
+# 거래일 차이는 공용 KRX 달력(krx_calendar.py: 정렬 세션 배열 이진탐색, 관측 휴장일 반영)으로 센다.
+try:
+    import krx_calendar as _krx_cal
+except Exception:
+    _krx_cal = None
+
+# 신호 이후 경로(보유일 수익률/선도달/정책 체결)는 공용 엔진(forward_paths.py)으로 이벤트 묶음 계산한다.
+try:
+    import forward_paths as _fwd_paths
+except Exception:
+    _fwd_paths = None
+
+# 하루 n종목 포트폴리오·Walk-forward 조합은 공용 커널(portfolio_kernel.py)에서 거래표를 한 번 정렬해 평가한다.
+try:
+    import portfolio_kernel as _pk
+except Exception:
+    _pk = None
+
+
+def _http_get(url, **kwargs):
+    if _http_pool is not None:
+        return _http_pool.get(url, **kwargs)
+    kwargs.pop('cache_ttl', None)
+    return requests.get(url, **kwargs)
+
+
+# I-CORE 종목별 투자자 거래대금은 flow_store.py(종목×일자 월 파티션 저장소)에서 읽고 빈 구간만 pykrx로 채운다.
+try:
+    import flow_store as _flow_store
+except Exception:
+    _flow_store = None
+
+
 # v4.4.9.28: GitHub Actions schedule 실행에서는 workflow_dispatch inputs가 빈 문자열로 들어올 수 있다.
 # os.environ.get(name, default)는 환경변수가 존재하지만 값이 ''이면 default를 쓰지 않으므로,
 # 숫자형 환경변수는 아래 안전 파서로 통일한다.
@@ -598,6 +637,9 @@ CLOSING_BET_V4959_STRATEGY_CACHE_READ = str(os.environ.get('CLOSING_BET_V4959_ST
 CLOSING_BET_V4959_STRATEGY_CACHE_WRITE = str(os.environ.get('CLOSING_BET_V4959_STRATEGY_CACHE_WRITE', '1')).lower() in ('1','true','yes','y','on')
 CLOSING_BET_V4959_STRATEGY_CACHE_DIR = str(os.environ.get('CLOSING_BET_V4959_STRATEGY_CACHE_DIR', 'closing_bet_logs/v49_72_strategy_eval_cache')).strip() or 'closing_bet_logs/v49_72_strategy_eval_cache'
 CLOSING_BET_V4959_STRATEGY_CACHE_MAX_CONTEXTS = max(2, min(40, _env_int('CLOSING_BET_V4959_STRATEGY_CACHE_MAX_CONTEXTS', '12')))
+# v49.76: 컨텍스트당 SQLite 파일 하나(code → schema/engine/fingerprint/payload)로 보관한다. 'files'면 종목별 pkl.gz(구방식).
+CLOSING_BET_V4959_STRATEGY_CACHE_BACKEND = str(os.environ.get('CLOSING_BET_V4959_STRATEGY_CACHE_BACKEND', 'sqlite')).strip().lower() or 'sqlite'
+CLOSING_BET_V4959_STRATEGY_DB_COMMIT_EVERY = max(1, _env_int('CLOSING_BET_V4959_STRATEGY_DB_COMMIT_EVERY', '25'))
 CLOSING_BET_V4959_STRATEGY_WORKERS = max(1, min(4, _env_int('CLOSING_BET_V4959_STRATEGY_WORKERS', str(max(1, min(2, int(os.cpu_count() or 2)))))))
 CLOSING_BET_V4960_VECTOR_GATE_ENABLE = str(os.environ.get('CLOSING_BET_V4960_VECTOR_GATE_ENABLE', '1')).lower() in ('1','true','yes','y','on')
 CLOSING_BET_V4960_PROGRESS_SECONDS = max(10, min(600, _env_int('CLOSING_BET_V4960_PROGRESS_SECONDS', '60')))
@@ -6611,7 +6653,7 @@ def _get_intraday_flow_estimate(code: str, price: float = 0.0) -> dict:
             'Referer': 'https://finance.naver.com/',
         }
         url = f"https://finance.naver.com/item/frgn.naver?code={code}"
-        res = requests.get(url, headers=headers, timeout=8)
+        res = _http_get(url, headers=headers, timeout=8)
         res.encoding = 'euc-kr'
         raw = _read_html_first_table(res.text)
         if raw is None or raw.empty:
@@ -14243,7 +14285,7 @@ def _read_naver_ohlcv(code: str, start_ymd: str, end_ymd: str, max_pages: int =
         }
         for page in range(1, int(max_pages) + 1):
             url = f'https://finance.naver.com/item/sise_day.naver?code={code}&page={page}'
-            res = requests.get(url, headers=headers, timeout=8)
+            res = _http_get(url, headers=headers, timeout=8)
             res.encoding = 'euc-kr'
             tables = pd.read_html(res.text)
             if not tables:
@@ -18433,6 +18475,114 @@ def _v538415_append_forward_metrics(h: pd.DataFrame, pos: int, feat: dict, hold_
     except Exception:
         return r
 
+def _v538415_forward_metrics_batch(h: pd.DataFrame, items: list, hold_n: int = 5) -> list:
+    """_v538415_append_forward_metrics의 묶음판. items=[(pos, feat), ...] 순서대로 같은 dict 목록을 돌려준다."""
+    items = list(items or [])
+    if not items:
+        return []
+    if _fwd_paths is None or h is None or not {'High', 'Low', 'Close'}.issubset(h.columns):
+        return [_v538415_append_forward_metrics(h, pos, feat, hold_n=hold_n) for pos, feat in items]
+    hold_n = int(hold_n)
+    n = len(h)
+    L = max(hold_n, 5)
+    px = _fwd_paths.ohlc_arrays(h, ('Open', 'High', 'Low', 'Close'), exact=True)
+    pos = np.array([int(p) for p, _ in items], dtype=np.int64)
+    entry = np.nan_to_num(px['Close'][pos], nan=0.0)
+    nf = np.clip(np.minimum(n, pos + hold_n + 1) - (pos + 1), 0, None)
+    vm = _fwd_paths.valid_mask(nf, L)
+    safe_e = np.where(entry > 0, entry, 1.0)
+    rets = {k: np.where(vm, _fwd_paths.pct_from_entry(_fwd_paths.forward_windows(px[k], pos, L), safe_e), np.nan) for k in ('Open', 'High', 'Low', 'Close')}
+    raw_hi = np.where(vm, _fwd_paths.forward_windows(px['High'], pos, L), np.nan)
+    raw_lo = np.where(vm, _fwd_paths.forward_windows(px['Low'], pos, L), np.nan)
+    hr, lr, cr = rets['High'], rets['Low'], rets['Close']
+    max_hi = _fwd_paths.nan_reduce(raw_hi, 'max')
+    min_lo = _fwd_paths.nan_reduce(raw_lo, 'min')
+    d3h = _fwd_paths.nan_reduce(hr[:, :3], 'max')
+    d5h = _fwd_paths.nan_reduce(hr[:, :5], 'max')
+    days = {}
+    for key, tp, sp in (('3', 3.0, 3.0), ('5', 5.0, 5.0), ('10_5', 10.0, 5.0)):
+        days[key] = (_fwd_paths.first_day(hr >= tp), _fwd_paths.first_day(lr <= -sp))
+
+    def _f(v):
+        return float(v) if pd.notna(v) else np.nan
+
+    def _day(v):
+        return int(v) if v > 0 else None
+
+    out = []
+    for j, (p, feat) in enumerate(items):
+        r = dict(feat or {})
+        e = float(entry[j])
+        if e <= 0:
+            out.append(r)
+            continue
+        r['vrec_entry_close'] = e
+        k = int(nf[j])
+        r['vrec_fwd_days'] = k
+        if k <= 0:
+            out.append(r)
+            continue
+        max_high_ret = (float(max_hi[j]) / e - 1.0) * 100.0 if pd.notna(max_hi[j]) else np.nan
+        min_low_ret = (float(min_lo[j]) / e - 1.0) * 100.0 if pd.notna(min_lo[j]) else np.nan
+        d1_close = _f(cr[j, 0])
+        d3_close = _f(cr[j, min(2, k - 1)])
+        d5_close = _f(cr[j, k - 1])
+        flags = {}
+        for key, (td, sd) in days.items():
+            t, sday = _day(td[j]), _day(sd[j])
+            flags[key] = (t, sday, int(t is not None and (sday is None or t < sday)), int(sday is not None and (t is None or sday < t)),
+                          int(t is not None and sday is not None and t == sday), int(t is None and sday is None))
+        p3_day, m3_day, p3_first, m3_first, same3, none3 = flags['3']
+        p5_day, m5_day, p5_first, m5_first, same5, none5 = flags['5']
+        p10_day, m5_day_vs10, p10_first, m5_first_vs10, same10_5, none10_5 = flags['10_5']
+        d1_high = _f(hr[j, 0])
+        d1_low = _f(lr[j, 0])
+        d3_high = _f(d3h[j])
+        d5_high = _f(d5h[j])
+        after3_hit5 = after3_hit5_by_d3 = after3_breakeven_fail = after3_close_below0 = np.nan
+        if p3_day is not None:
+            p3_idx = max(0, int(p3_day) - 1)
+            after3_hit5 = int((hr[j, p3_idx:k] >= 5.0).any())
+            after3_hit5_by_d3 = int(p5_day is not None and int(p5_day) >= int(p3_day) and int(p5_day) <= 3)
+            if p3_idx + 1 < k:
+                after3_breakeven_fail = int((lr[j, p3_idx + 1:k] <= 0.0).any())
+                after3_close_below0 = int((cr[j, p3_idx + 1:k] <= 0.0).any())
+        r.update({
+            'vrec_entry_close': e, 'vrec_fwd_days': k,
+            'vrec_d1_close_ret': d1_close, 'vrec_d3_close_ret': d3_close, 'vrec_d5_close_ret': d5_close,
+            'vrec_d1_high_ret': d1_high, 'vrec_d1_low_ret': d1_low,
+            'vrec_d3_max_high_ret': d3_high, 'vrec_d5_max_high_ret': d5_high,
+            'vrec_max_high_ret': max_high_ret, 'vrec_min_low_ret': min_low_ret,
+            'rule35_pnl': d5_close, 'rule35_win': int(pd.notna(d5_close) and d5_close > 0),
+            'hit3_before_stop': int(pd.notna(max_high_ret) and max_high_ret >= 3.0),
+            'hit5_before_stop': int(pd.notna(max_high_ret) and max_high_ret >= 5.0),
+            'hit10_before_stop': int(pd.notna(max_high_ret) and max_high_ret >= 10.0),
+            'stop_before_3': int(pd.notna(min_low_ret) and min_low_ret <= -5.0),
+            'vrec_dd3': int(pd.notna(min_low_ret) and min_low_ret <= -3.0),
+            'vrec_dd5': int(pd.notna(min_low_ret) and min_low_ret <= -5.0),
+            'vrec_plus3_day': p3_day if p3_day is not None else np.nan,
+            'vrec_minus3_day': m3_day if m3_day is not None else np.nan,
+            'vrec_plus3_first': p3_first, 'vrec_minus3_first': m3_first, 'vrec_3_same_day': same3, 'vrec_3_none': none3,
+            'vrec_plus5_day': p5_day if p5_day is not None else np.nan,
+            'vrec_minus5_day': m5_day if m5_day is not None else np.nan,
+            'vrec_plus5_first': p5_first, 'vrec_minus5_first': m5_first, 'vrec_5_same_day': same5, 'vrec_5_none': none5,
+            'vrec_plus10_day': p10_day if p10_day is not None else np.nan,
+            'vrec_minus5_day_vs10': m5_day_vs10 if m5_day_vs10 is not None else np.nan,
+            'vrec_plus10_first': p10_first, 'vrec_minus5_first_vs10': m5_first_vs10, 'vrec_10_5_same_day': same10_5, 'vrec_10_5_none': none10_5,
+            'vrec_d1_down3_hit5': int(pd.notna(d1_low) and pd.notna(d1_high) and d1_low <= -3.0 and d1_high >= 5.0),
+            'vrec_gap_up_fail': int(pd.notna(d1_high) and pd.notna(d1_close) and d1_high >= 3.0 and d1_close <= 0.0),
+            'vrec_after3_hit5': after3_hit5,
+            'vrec_after3_hit5_by_d3': after3_hit5_by_d3,
+            'vrec_after3_breakeven_fail': after3_breakeven_fail,
+            'vrec_after3_close_below0': after3_close_below0,
+        })
+        for _d in range(1, 6):
+            for kind in ('open', 'high', 'low', 'close'):
+                r[f'vrec_d{_d}_{kind}_ret'] = _f(rets[kind.capitalize()][j, _d - 1]) if _d - 1 < k else np.nan
+        out.append(r)
+    return out
+
+
 def _v538415_collect_vrec_codes(df=None, snapshots=None) -> list:
     codes = []
     try:
@@ -18482,19 +18632,24 @@ def _v538415_vrec_true_historical_df(df=None, snapshots=None, compact: bool=True
                 name = _clean_stock_name(cd, _VRECOVERY_MANUAL_NAMES.get(cd) or (STOCK_NAME_MAP.get(cd, cd) if isinstance(globals().get('STOCK_NAME_MAP', {}), dict) else cd))
                 start = max(120, len(h) - hold_n - lookback)
                 stop = max(start, len(h) - hold_n - 1)
-                for pos in range(start, stop):
-                    feat = _v538415_calc_vrec_features_at(h, pos, cd, name)
-                    if _safe_int(feat.get('vrec_calc_ok',0),0) != 1:
-                        continue
-                    # 너무 무관한 평범한 봉은 제외하고, V 관련 후보군만 true signal로 본다.
-                    route = str(feat.get('vrec_route','') or '')
-                    score = _safe_float(feat.get('vrec_score',0),0)
-                    rebound = _safe_float(feat.get('vrec_rebound_pct', np.nan), np.nan)
-                    if not (score >= 2 or pd.notna(rebound) and rebound >= 20 or any(x in route for x in ['ENTRY','CONFIRM','OVERHEAT','WATCH','BLOCK'])):
-                        continue
-                    feat['signal_pos'] = pos
-                    feat['signal_i'] = len(rows)
-                    rows.append(_v538415_append_forward_metrics(h, pos, feat, hold_n=hold_n))
+                pending = []
+                try:
+                    for pos in range(start, stop):
+                        feat = _v538415_calc_vrec_features_at(h, pos, cd, name)
+                        if _safe_int(feat.get('vrec_calc_ok',0),0) != 1:
+                            continue
+                        # 너무 무관한 평범한 봉은 제외하고, V 관련 후보군만 true signal로 본다.
+                        route = str(feat.get('vrec_route','') or '')
+                        score = _safe_float(feat.get('vrec_score',0),0)
+                        rebound = _safe_float(feat.get('vrec_rebound_pct', np.nan), np.nan)
+                        if not (score >= 2 or pd.notna(rebound) and rebound >= 20 or any(x in route for x in ['ENTRY','CONFIRM','OVERHEAT','WATCH','BLOCK'])):
+                            continue
+                        feat['signal_pos'] = pos
+                        feat['signal_i'] = len(rows) + len(pending)
+                        pending.append((pos, feat))
+                finally:
+                    # 종목의 신호 전체를 한 번에 평가한다(중간 예외 시에도 그때까지의 신호는 남긴다).
+                    rows.extend(_v538415_forward_metrics_batch(h, pending, hold_n=hold_n))
             except Exception:
                 continue
         res = pd.DataFrame(rows)
@@ -18791,23 +18946,27 @@ def _v538417_vrec_universe_replay_df(df=None, snapshots=None, compact: bool=True
                 name = _clean_stock_name(cd, _VRECOVERY_MANUAL_NAMES.get(cd) or (STOCK_NAME_MAP.get(cd, cd) if isinstance(globals().get('STOCK_NAME_MAP', {}), dict) else cd))
                 start = max(120, len(h) - hold_n - lookback)
                 stop = max(start, len(h) - hold_n - 1)
-                for pos in range(start, stop, stride):
-                    evaluated_positions += 1
-                    feat = _v538415_calc_vrec_features_at(h, pos, cd, name)
-                    if _safe_int(feat.get('vrec_calc_ok',0),0) != 1:
-                        if str(feat.get('vrec_calc_error','') or '').strip():
-                            feature_errors += 1
-                        continue
-                    calc_ok_rows += 1
-                    route = str(feat.get('vrec_route','') or '')
-                    score = _safe_float(feat.get('vrec_score',0),0)
-                    rebound = _safe_float(feat.get('vrec_rebound_pct', np.nan), np.nan)
-                    # route가 BLOCK이라도 V 변동성/저점후 반등/점수가 있는 후보는 비교대상에 남긴다.
-                    if not (score >= 2 or (pd.notna(rebound) and rebound >= 20) or any(x in route for x in ['ENTRY','CONFIRM','OVERHEAT','WATCH','BLOCK'])):
-                        continue
-                    feat['signal_pos'] = pos
-                    feat['signal_i'] = len(rows)
-                    rows.append(_v538415_append_forward_metrics(h, pos, feat, hold_n=hold_n))
+                pending = []
+                try:
+                    for pos in range(start, stop, stride):
+                        evaluated_positions += 1
+                        feat = _v538415_calc_vrec_features_at(h, pos, cd, name)
+                        if _safe_int(feat.get('vrec_calc_ok',0),0) != 1:
+                            if str(feat.get('vrec_calc_error','') or '').strip():
+                                feature_errors += 1
+                            continue
+                        calc_ok_rows += 1
+                        route = str(feat.get('vrec_route','') or '')
+                        score = _safe_float(feat.get('vrec_score',0),0)
+                        rebound = _safe_float(feat.get('vrec_rebound_pct', np.nan), np.nan)
+                        # route가 BLOCK이라도 V 변동성/저점후 반등/점수가 있는 후보는 비교대상에 남긴다.
+                        if not (score >= 2 or (pd.notna(rebound) and rebound >= 20) or any(x in route for x in ['ENTRY','CONFIRM','OVERHEAT','WATCH','BLOCK'])):
+                            continue
+                        feat['signal_pos'] = pos
+                        feat['signal_i'] = len(rows) + len(pending)
+                        pending.append((pos, feat))
+                finally:
+                    rows.extend(_v538415_forward_metrics_batch(h, pending, hold_n=hold_n))
                 done += 1
             except Exception:
                 err += 1
@@ -19045,7 +19204,7 @@ def _v538423_naver_index_history(naver_symbol: str, start_ymd: str, end_ymd: str
             'User-Agent': 'Mozilla/5.0 (compatible; StockHunter/49.25)',
             'Referer': 'https://finance.naver.com/',
         }
-        resp = requests.get('https://api.finance.naver.com/siseJson.naver', params=params, headers=headers, timeout=20)
+        resp = _http_get('https://api.finance.naver.com/siseJson.naver', params=params, headers=headers, timeout=20)
         resp.raise_for_status()
         payload = _ast.literal_eval(str(resp.text or '').strip())
         if not isinstance(payload, (list, tuple)) or len(payload) < 2:
@@ -20048,6 +20207,143 @@ def _v538427_exec_policy_one(row, policy: dict | None = None, cost_bps: int = 0,
     }
 
 
+def _v538427_exec_policy_frame(sub: pd.DataFrame, policy: dict | None = None, cost_bps: int = 0,
+                               initial_stop_pct: float = 3.0, breakeven_pct: float = 0.0,
+                               conservative_same_day: bool = True) -> pd.DataFrame:
+    """_v538427_exec_policy_one을 행 전체에 한 번에 적용한다(같은 컬럼·같은 값, index=sub.index).
+
+    행마다 돌던 상태기계를 (rem, gross, hit3, hit5, ...) 벡터로 바꿔 보유일 d 단위로만 루프를 돈다.
+    """
+    if sub is None or sub.empty:
+        return pd.DataFrame()
+    if _fwd_paths is None:
+        rows = [_v538427_exec_policy_one(r, policy=policy, cost_bps=cost_bps, initial_stop_pct=initial_stop_pct,
+                                         breakeven_pct=breakeven_pct, conservative_same_day=conservative_same_day)
+                for _, r in sub.iterrows()]
+        return pd.DataFrame(rows, index=sub.index)
+    p = dict(policy or {})
+    tp3_w = max(0.0, min(1.0, float(p.get('tp3_w', 0.50))))
+    tp5_w = max(0.0, min(1.0 - tp3_w, float(p.get('tp5_w', 0.30))))
+    time_stop_days = max(1, min(5, int(p.get('time_stop_days', 3))))
+    policy_name = str(p.get('name', 'P1'))
+    stop_pct = abs(float(initial_stop_pct))
+    be = float(breakeven_pct)
+    eps = 1e-10
+    days = range(1, time_stop_days + 1)
+    H = _fwd_paths.column_matrix(sub, [f'vrec_d{d}_high_ret' for d in days])
+    L = _fwd_paths.column_matrix(sub, [f'vrec_d{d}_low_ret' for d in days])
+    C = _fwd_paths.column_matrix(sub, [f'vrec_d{d}_close_ret' for d in days])
+    n = len(sub)
+    rem = np.ones(n)
+    gross = np.zeros(n)
+    hit3 = np.zeros(n, dtype=bool)
+    hit5 = np.zeros(n, dtype=bool)
+    hit3_day = np.zeros(n, dtype=np.int64)
+    exit_day = np.zeros(n, dtype=np.int64)
+    ambiguous = np.zeros(n, dtype=bool)
+    reason = np.full(n, '', dtype=object)
+    valid_days = np.zeros(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+
+    def _exit(mask, d, why):
+        reason[mask] = why
+        exit_day[mask] = d
+        active[mask] = False
+
+    with np.errstate(invalid='ignore'):
+        for j, d in enumerate(days):
+            hi, lo, cl = H[:, j], L[:, j], C[:, j]
+            step = active & ~(np.isnan(hi) & np.isnan(lo) & np.isnan(cl))
+            valid_days += step
+            a = step & ~hit3
+            b = step & hit3
+            # 분기 A: 아직 +3 미도달.
+            both = a & (hi >= 3.0) & (lo <= -stop_pct)
+            ambiguous |= both
+            if conservative_same_day:
+                gross[both] += rem[both] * (-stop_pct)
+                rem[both] = 0.0
+                _exit(both, d, 'AMBIGUOUS_SAME_DAY')
+                stop = a & active & (lo <= -stop_pct)
+            else:
+                stop = a & (lo <= -stop_pct) & ~both
+            gross[stop] += rem[stop] * (-stop_pct)
+            rem[stop] = 0.0
+            _exit(stop, d, 'INITIAL_STOP')
+            tp3 = a & active & (hi >= 3.0)
+            sell3 = np.minimum(rem, tp3_w)
+            m = tp3 & (sell3 > 0)
+            gross[m] += sell3[m] * 3.0
+            rem[m] -= sell3[m]
+            hit3 |= tp3
+            hit3_day[tp3] = d
+            if tp5_w > 0:
+                m = tp3 & (hi >= 5.0) & (rem > eps)
+                sell5 = np.minimum(rem, tp5_w)
+                gross[m] += sell5[m] * 5.0
+                rem[m] -= sell5[m]
+                hit5[m] = sell5[m] > 0
+            full = tp3 & (rem <= eps)
+            rem[full] = 0.0
+            _exit(full & hit5, d, 'FULL_TP5')
+            _exit(full & ~hit5, d, 'FULL_TP3')
+            # 분기 B: +3 도달 다음 거래일부터만 잔량 보호 스톱.
+            bes = b & (d > hit3_day) & (lo <= be) & (rem > eps)
+            gross[bes] += rem[bes] * be
+            rem[bes] = 0.0
+            _exit(bes & hit5, d, 'BE_STOP_AFTER_TP5')
+            _exit(bes & ~hit5, d, 'BE_STOP_AFTER_TP3')
+            if tp5_w > 0:
+                m = b & active & ~hit5 & (hi >= 5.0) & (rem > eps)
+                sell5 = np.minimum(rem, tp5_w)
+                gross[m] += sell5[m] * 5.0
+                rem[m] -= sell5[m]
+                hit5[m] = sell5[m] > 0
+                full = m & (rem <= eps)
+                rem[full] = 0.0
+                _exit(full, d, 'FULL_TP5')
+            if d == time_stop_days:
+                t = step & active & (rem > eps)
+                gross[t] += rem[t] * np.where(np.isnan(cl[t]), 0.0, cl[t])
+                rem[t] = 0.0
+                _exit(t, d, f'TIME_EXIT_D{time_stop_days}')
+
+    # 보유평가 데이터가 부족하면 남은 비중은 0% 청산으로 보수 처리한다.
+    left = rem > eps
+    gross[left] += rem[left] * 0.0
+    rem[left] = 0.0
+    reason[left & (reason == '') & (valid_days == 0)] = 'NO_DATA_EXIT'
+    reason[left & (reason == '')] = f'TIME_EXIT_D{time_stop_days}'
+
+    net = gross - max(0.0, float(cost_bps)) / 100.0
+    is_initial = np.isin(reason, ['INITIAL_STOP', 'AMBIGUOUS_SAME_DAY'])
+    is_be3 = reason == 'BE_STOP_AFTER_TP3'
+    is_be5 = reason == 'BE_STOP_AFTER_TP5'
+    is_time = np.array([str(x).startswith('TIME_EXIT_D') for x in reason], dtype=bool) | (reason == 'NO_DATA_EXIT')
+    reason[reason == ''] = 'UNKNOWN'
+    exit_col = exit_day if (exit_day > 0).all() else np.where(exit_day > 0, exit_day, np.nan)
+    return pd.DataFrame({
+        'exec_policy': policy_name,
+        'exec_gross_pnl': gross,
+        'exec_cost_bps': np.full(n, int(cost_bps), dtype=np.int64),
+        'exec_pnl': net,
+        'exec_win': (net > 0).astype(np.int64),
+        'exec_hit3': hit3.astype(np.int64),
+        'exec_hit5': hit5.astype(np.int64),
+        'exec_stop': (is_initial | is_be3 | is_be5).astype(np.int64),
+        'exec_initial_stop': is_initial.astype(np.int64),
+        'exec_be_after_tp3': is_be3.astype(np.int64),
+        'exec_be_after_tp5': is_be5.astype(np.int64),
+        'exec_time_exit': is_time.astype(np.int64),
+        'exec_full_tp3': (reason == 'FULL_TP3').astype(np.int64),
+        'exec_full_tp5': (reason == 'FULL_TP5').astype(np.int64),
+        'exec_no_data': (reason == 'NO_DATA_EXIT').astype(np.int64),
+        'exec_ambiguous': ambiguous.astype(np.int64),
+        'exec_reason': reason,
+        'exec_exit_day': exit_col,
+    }, index=sub.index)
+
+
 def _v538426_exec_one(row, time_stop_days: int = 3, initial_stop_pct: float = 3.0,
                        breakeven_pct: float = 0.0, conservative_same_day: bool = True) -> dict:
     """v49.26 P1 정책 호환 wrapper. v49.27의 범용 엔진을 사용한다."""
@@ -20064,11 +20360,10 @@ def _v538426_execution_frame(sub: pd.DataFrame, time_stop_days: int = 3, breakev
     try:
         if sub is None or sub.empty:
             return pd.DataFrame()
-        rows = [_v538426_exec_one(r, time_stop_days=time_stop_days,
-                                  initial_stop_pct=float(CLOSING_BET_VRECOVERY_EXEC_INITIAL_STOP_PCT),
-                                  breakeven_pct=breakeven_pct,
-                                  conservative_same_day=True) for _,r in sub.iterrows()]
-        return pd.DataFrame(rows, index=sub.index)
+        return _v538427_exec_policy_frame(
+            sub, policy={'name': 'P1', 'tp3_w': 0.50, 'tp5_w': 0.30, 'time_stop_days': time_stop_days},
+            cost_bps=0, initial_stop_pct=float(CLOSING_BET_VRECOVERY_EXEC_INITIAL_STOP_PCT),
+            breakeven_pct=breakeven_pct, conservative_same_day=True)
     except Exception:
         return pd.DataFrame()
 
@@ -20170,16 +20465,12 @@ def _v538427_policy_execution_frame(sub: pd.DataFrame, policy: dict, cost_bps: i
     try:
         if sub is None or sub.empty:
             return pd.DataFrame()
-        rows = [
-            _v538427_exec_policy_one(
-                r, policy=policy, cost_bps=cost_bps,
-                initial_stop_pct=float(CLOSING_BET_VRECOVERY_EXEC_INITIAL_STOP_PCT),
-                breakeven_pct=float(CLOSING_BET_VRECOVERY_EXEC_BREAKEVEN_PCT),
-                conservative_same_day=True,
-            )
-            for _, r in sub.iterrows()
-        ]
-        return pd.DataFrame(rows, index=sub.index)
+        return _v538427_exec_policy_frame(
+            sub, policy=policy, cost_bps=cost_bps,
+            initial_stop_pct=float(CLOSING_BET_VRECOVERY_EXEC_INITIAL_STOP_PCT),
+            breakeven_pct=float(CLOSING_BET_VRECOVERY_EXEC_BREAKEVEN_PCT),
+            conservative_same_day=True,
+        )
     except Exception:
         return pd.DataFrame()
 
@@ -20260,26 +20551,27 @@ def _v538427_walk_forward_line(sub: pd.DataFrame, label: str, min_month_n: int =
             cvc = x['code'].astype(str).value_counts()
             info['top_code_share'] = float(cvc.iloc[0]/len(x)*100.0) if len(cvc) else np.nan
 
-        monthly = []
-        for mon,g in x.groupby('_month'):
-            if len(g) >= int(min_month_n):
-                monthly.append((mon, len(g), float(g['_exec_pnl'].mean())))
+        q_min = max(5, int(min_month_n))
+        if _pk is not None:
+            monthly = _pk.period_means(x['_dt'], x['_exec_pnl'], 'M', int(min_month_n))
+            quarterly = _pk.period_means(x['_dt'], x['_exec_pnl'], 'Q', q_min)
+        else:
+            monthly = [(mon, len(g), float(g['_exec_pnl'].mean())) for mon,g in x.groupby('_month') if len(g) >= int(min_month_n)]
+            quarterly = [(q, len(g), float(g['_exec_pnl'].mean())) for q,g in x.groupby('_quarter') if len(g) >= q_min]
         info['months'] = len(monthly)
         if monthly:
             info['positive_month_rate'] = sum(1 for _,_,m in monthly if m > 0)/len(monthly)*100.0
             info['worst_month'] = min(m for _,_,m in monthly)
-            lomo = []
-            for mon,_,_ in monthly:
-                rest = x[x['_month'].ne(mon)]
-                if not rest.empty:
-                    lomo.append(float(rest['_exec_pnl'].mean()))
-            info['lomo_worst'] = min(lomo) if lomo else np.nan
-
-        quarterly = []
-        q_min = max(5, int(min_month_n))
-        for q,g in x.groupby('_quarter'):
-            if len(g) >= q_min:
-                quarterly.append((q, len(g), float(g['_exec_pnl'].mean())))
+            if _pk is not None:
+                info['lomo_worst'] = _pk.leave_one_out_min(x['_dt'], x['_exec_pnl'], [mon for mon,_,_ in monthly], 'M')
+            else:
+                lomo = []
+                for mon,_,_ in monthly:
+                    rest = x[x['_month'].ne(mon)]
+                    if not rest.empty:
+                        lomo.append(float(rest['_exec_pnl'].mean()))
+                info['lomo_worst'] = min(lomo) if lomo else np.nan
+
         info['quarters'] = len(quarterly)
         if quarterly:
             info['positive_quarter_rate'] = sum(1 for _,_,m in quarterly if m > 0)/len(quarterly)*100.0
@@ -20713,7 +21005,58 @@ def _v538428_benchmark_lines(oos_sets: dict, locked: dict) -> list[str]:
         return lines+[f'- 생성 실패: {type(e).__name__}: {e}']
 
 
+def _v538428_portfolio_grid(oos_sets: dict, locked: dict, all_dates: list[pd.Timestamp], day_limits, extra_costs) -> dict:
+    """(하루최대 종목수, 추가비용bp)별 _v538428_portfolio_one 결과.
+
+    후보표와 편입일정(동시보유·cooldown)은 비용과 무관하므로 한 번만 만들고 비용별로 자산곡선만 다시 계산한다.
+    """
+    keys=[(int(lim),int(c)) for lim in day_limits for c in extra_costs]
+    if _pk is None:return {k:_v538428_portfolio_one(oos_sets,locked,all_dates,*k) for k in keys}
+    res={k:{'trades':0,'total':0.0,'mdd':0.0,'months':0,'positive_month_rate':np.nan,'max_loss_days':0,'peak_active':0,'turnover':0.0,'routes':''} for k in keys}
+    try:
+        parts=[]
+        for route in _V538428_ROUTE_ORDER:
+            sub=_v538428_canonical_dedupe(oos_sets.get(route,pd.DataFrame()),route)
+            if sub.empty:continue
+            pol=locked.get(route,{}).get('policy',_V538427_EXEC_POLICIES['P1 50/30/D3'])
+            ex=_v538427_policy_execution_frame(sub,pol,int(CLOSING_BET_VRECOVERY_POLICY_LOCK_COST_BPS))
+            ev=ex['exec_pnl'].tolist() if 'exec_pnl' in ex.columns else [None]*len(ex)
+            n=len(sub); col=lambda c,default:sub[c].tolist() if c in sub.columns else [default]*n
+            part=pd.DataFrame({'date':[pd.to_datetime(v,errors='coerce') for v in col('vrec_signal_date',None)],
+                               'code':[str(v or '').zfill(6) for v in col('code','')],'route':route,
+                               'pnl':[_safe_float(ev[j],np.nan) if j<len(ev) else np.nan for j in range(n)],
+                               'score':[_safe_float(v,0) for v in col('vrec_score',None)],'amt':[_safe_float(v,0) for v in col('vrec_amount_b',None)]})
+            part=part[part['date'].notna()&part['pnl'].notna()]
+            if len(part):parts.append(part.assign(date=pd.DatetimeIndex(part['date']).normalize()))
+        if not parts or not all_dates:return res
+        x=pd.concat(parts,ignore_index=True); rank={r:i for i,r in enumerate(_V538428_ROUTE_ORDER)}; x['_rank']=x['route'].map(rank).fillna(99)
+        x=x.sort_values(['date','_rank','score','amt'],ascending=[True,True,False,False],kind='mergesort').drop_duplicates(['date','code'],keep='first')
+        dates=[pd.Timestamp(d).normalize() for d in all_dates]; pos={d:i for i,d in enumerate(dates)}
+        day_idx=[pos.get(d,-1) for d in x['date']]; codes=x['code'].tolist(); routes=x['route'].tolist(); pnl=x['pnl'].tolist()
+        w=float(CLOSING_BET_VRECOVERY_PORTFOLIO_WEIGHT_PCT)/100.0
+        for lim in sorted({k[0] for k in keys}):
+            sched,peak=_pk.slot_schedule(day_idx,codes,len(dates),lim,int(CLOSING_BET_VRECOVERY_PORTFOLIO_MAX_POSITIONS),
+                                         int(CLOSING_BET_VRECOVERY_PORTFOLIO_COOLDOWN_DAYS),int(CLOSING_BET_VRECOVERY_EXEC_TIME_STOP_DAYS))
+            route_counts={}
+            for row,_,_ in sched:route_counts[routes[row]]=route_counts.get(routes[row],0)+1
+            for c in sorted({k[1] for k in keys if k[0]==lim}):
+                out=res[(lim,c)]
+                ret=_pk.slot_returns(sched,[float(v)-max(0,int(c))/100.0 for v in pnl],w,len(dates))
+                arr=np.cumprod(np.r_[100.0,1.0+ret])[1:]; equity=float(arr[-1]) if len(arr) else 100.0
+                peak_eq=np.maximum.accumulate(arr); dd=(arr/peak_eq-1.0)*100.0
+                out['trades']=len(sched); out['peak_active']=peak; out['total']=equity-100.0; out['mdd']=float(dd.min()) if len(dd) else 0.0
+                out['turnover']=out['trades']*float(CLOSING_BET_VRECOVERY_PORTFOLIO_WEIGHT_PCT)*2.0
+                dr=pd.Series(ret.tolist(),index=pd.DatetimeIndex(dates))
+                mrets=dr.groupby(dr.index.to_period('M')).apply(lambda z:(1+z).prod()-1)
+                out['months']=len(mrets); out['positive_month_rate']=float((mrets>0).mean()*100.0) if len(mrets) else np.nan; out['max_loss_days']=_v538427_max_consecutive_losses(dr.tolist())
+                out['routes']=','.join([f'{k}:{v}' for k,v in sorted(route_counts.items(),key=lambda z:rank.get(z[0],99))])
+        return res
+    except Exception:
+        return res
+
+
 def _v538428_portfolio_one(oos_sets: dict, locked: dict, all_dates: list[pd.Timestamp], day_limit: int, extra_cost_bps: int = 0) -> dict:
+    if _pk is not None:return _v538428_portfolio_grid(oos_sets,locked,all_dates,[day_limit],[extra_cost_bps])[(int(day_limit),int(extra_cost_bps))]
     out={'trades':0,'total':0.0,'mdd':0.0,'months':0,'positive_month_rate':np.nan,'max_loss_days':0,'peak_active':0,'turnover':0.0,'routes':''}
     try:
         rows=[]
@@ -20772,8 +21115,9 @@ def _v538428_portfolio_lines(perf: pd.DataFrame, oos_sets: dict, locked: dict, s
         if not bool(CLOSING_BET_VRECOVERY_PORTFOLIO_AUDIT):return lines+['- 비활성화']
         dt=pd.to_datetime(perf.get('vrec_signal_date',pd.Series(pd.NaT,index=perf.index)),errors='coerce')
         dates=sorted(pd.Timestamp(x).normalize() for x in dt[dt.ge(split)].dropna().unique())
+        grid=_v538428_portfolio_grid(oos_sets,locked,dates,[1,2],[0,30])
         for lim in [1,2]:
-            b=_v538428_portfolio_one(oos_sets,locked,dates,lim,0); s=_v538428_portfolio_one(oos_sets,locked,dates,lim,30)
+            b=grid[(lim,0)]; s=grid[(lim,30)]
             lines.append(f"- 하루최대 {lim}종목: 거래 {b['trades']}건 | 20bp기준 누적 {b['total']:+.2f}%·MDD {b['mdd']:.2f}%·양수월 {b['positive_month_rate']:.1f}%·최대연속손실일 {b['max_loss_days']}일·동시보유최대 {b['peak_active']} | 총회전 {b['turnover']:.1f}%")
             lines.append(f"  ↳ 총비용50bp 스트레스 누적 {s['total']:+.2f}%·MDD {s['mdd']:.2f}% | 경로구성 {b['routes']}")
         lines.append(f"- 규칙: 경로우선순위 {' > '.join(_V538428_ROUTE_ORDER)} | 동일종목 {int(CLOSING_BET_VRECOVERY_PORTFOLIO_COOLDOWN_DAYS)}거래일 cooldown | 최대동시 {int(CLOSING_BET_VRECOVERY_PORTFOLIO_MAX_POSITIONS)}종목 | 종목당 {float(CLOSING_BET_VRECOVERY_PORTFOLIO_WEIGHT_PCT):.1f}%")
@@ -21253,6 +21597,9 @@ _LCZ430_LIVE_SHADOW_CACHE = {}
 
 
 def _v538430_business_days_between(a, b) -> int:
+    if _krx_cal is not None:
+        n=_krx_cal.count_between(a, b, 'left')
+        return n if n >= 0 else 0
     try:
         aa = pd.Timestamp(a).normalize(); bb = pd.Timestamp(b).normalize()
         if pd.isna(aa) or pd.isna(bb) or bb <= aa:
@@ -21487,7 +21834,7 @@ def _v538430_lcz_freshness_shadow_lines(df, replay: pd.DataFrame) -> list[str]:
         live_dt=ld.max() if len(ld) else pd.NaT
         lines.append(f"- 보고서 후보 latest {report_dt.strftime('%Y-%m-%d') if pd.notna(report_dt) else 'N/A'} | forward 평가가능 replay cutoff {eval_dt.strftime('%Y-%m-%d') if pd.notna(eval_dt) else 'N/A'} | no-forward shadow latest {live_dt.strftime('%Y-%m-%d') if pd.notna(live_dt) else 'N/A'}")
         if len(ld):
-            stale=[_v538430_business_days_between(d,live_dt) for d in ld]
+            stale=list(_krx_cal.count_between_vec(ld,live_dt,'left',invalid=0)) if _krx_cal is not None else [_v538430_business_days_between(d,live_dt) for d in ld]
             _mx=int(CLOSING_BET_LCZ_FRESHNESS_MAX_STALE_DAYS)
             lines.append(f"- 종목별 latest: min {ld.min().strftime('%Y-%m-%d')} / median {ld.median().strftime('%Y-%m-%d')} / max {live_dt.strftime('%Y-%m-%d')} | stale>{_mx}d {sum(v>_mx for v in stale)} / >3d {sum(v>3 for v in stale)} / 대상 {len(ld)}")
         lag=_v538430_business_days_between(eval_dt,live_dt) if pd.notna(eval_dt) and pd.notna(live_dt) else 0
@@ -21539,15 +21886,19 @@ def _v538430_lcz_walk_summary(sub: pd.DataFrame, policy: dict, cost_bps: int, mi
         x['_m']=x['_dt'].dt.to_period('M').astype(str); x['_q']=x['_dt'].dt.to_period('Q').astype(str)
         vc=x['_m'].value_counts(); out['top_month']=float(vc.iloc[0]/len(x)*100) if len(vc) else np.nan
         cvc=x['code'].astype(str).value_counts(); out['top_code']=float(cvc.iloc[0]/len(x)*100) if len(cvc) else np.nan
-        ms=[(m,len(g),float(g['_pnl'].mean())) for m,g in x.groupby('_m') if len(g)>=int(min_month_n)]
-        qs=[(q,len(g),float(g['_pnl'].mean())) for q,g in x.groupby('_q') if len(g)>=max(5,int(min_month_n))]
+        if _pk is not None:ms=_pk.period_means(x['_dt'],x['_pnl'],'M',int(min_month_n)); qs=_pk.period_means(x['_dt'],x['_pnl'],'Q',max(5,int(min_month_n)))
+        else:
+            ms=[(m,len(g),float(g['_pnl'].mean())) for m,g in x.groupby('_m') if len(g)>=int(min_month_n)]
+            qs=[(q,len(g),float(g['_pnl'].mean())) for q,g in x.groupby('_q') if len(g)>=max(5,int(min_month_n))]
         out['months']=len(ms); out['pos_month']=sum(v>0 for _,_,v in ms)/len(ms)*100 if ms else np.nan; out['worst_month']=min([v for _,_,v in ms],default=np.nan)
         out['quarters']=len(qs); out['pos_quarter']=sum(v>0 for _,_,v in qs)/len(qs)*100 if qs else np.nan; out['worst_quarter']=min([v for _,_,v in qs],default=np.nan)
-        lomo=[]
-        for m,_,_ in ms:
-            z=x[x['_m'].ne(m)]
-            if len(z): lomo.append(float(z['_pnl'].mean()))
-        out['lomo']=min(lomo) if lomo else np.nan
+        if _pk is not None:out['lomo']=_pk.leave_one_out_min(x['_dt'],x['_pnl'],[m for m,_,_ in ms],'M') if ms else np.nan
+        else:
+            lomo=[]
+            for m,_,_ in ms:
+                z=x[x['_m'].ne(m)]
+                if len(z): lomo.append(float(z['_pnl'].mean()))
+            out['lomo']=min(lomo) if lomo else np.nan
         out['preview']=', '.join([f'{m}:{v:+.2f}' for m,_,v in ms[-6:]]) if ms else '유효월없음'
         return out
     except Exception:return out
@@ -22229,6 +22580,7 @@ def _v4942_business_age(start, end) -> int:
     try:
         s=pd.Timestamp(start).normalize(); e=pd.Timestamp(end).normalize()
         if pd.isna(s) or pd.isna(e) or e < s: return 999
+        if _krx_cal is not None: return _krx_cal.count_between(s, e, 'left')
         return int(np.busday_count(s.date(), e.date()))
     except Exception:
         return 999
@@ -22971,11 +23323,15 @@ def _v4932_recent_vrec_stateless_df(df=None) -> pd.DataFrame:
                 h=_v538415_prepare_vrec_hist(hist)
                 nm=_clean_stock_name(cd,_VRECOVERY_MANUAL_NAMES.get(cd) or (STOCK_NAME_MAP.get(cd,cd) if isinstance(globals().get('STOCK_NAME_MAP',{}),dict) else cd))
                 start=max(120,len(h)-int(CLOSING_BET_V4932_TRACK_RECENT_BARS))
-                for pos in range(start,len(h)):
-                    feat=_v538415_calc_vrec_features_at(h,pos,cd,nm)
-                    if _safe_int(feat.get('vrec_calc_ok',0),0)!=1: continue
-                    feat['signal_pos']=int(pos); feat=_v538415_append_forward_metrics(h,pos,feat,hold_n=5)
-                    feat.setdefault('vrec_fwd_days',max(0,min(5,len(h)-pos-1))); rows.append(feat)
+                pending=[]
+                try:
+                    for pos in range(start,len(h)):
+                        feat=_v538415_calc_vrec_features_at(h,pos,cd,nm)
+                        if _safe_int(feat.get('vrec_calc_ok',0),0)!=1: continue
+                        feat['signal_pos']=int(pos); pending.append((pos,feat))
+                finally:
+                    for (pos,_),feat in zip(pending,_v538415_forward_metrics_batch(h,pending,hold_n=5)):
+                        feat.setdefault('vrec_fwd_days',max(0,min(5,len(h)-pos-1))); rows.append(feat)
             except Exception: continue
         out=pd.DataFrame(rows)
         if out.empty:
@@ -23863,11 +24219,11 @@ def _icore_load_krx_flow_cache_once() -> None:
         try:
             if I_CORE_KRX_FLOW_CACHE_CSV.exists():
                 cdf = pd.read_csv(I_CORE_KRX_FLOW_CACHE_CSV, dtype={'code': str, 'end': str})
-                for _, r in cdf.iterrows():
+                for r in cdf.to_dict('records'):
                     code = str(r.get('code', '')).zfill(6)
                     end = str(r.get('end', ''))
                     if code and end:
-                        _I_CORE_KRX_FLOW_CACHE_MEM[(code, end)] = r.to_dict()
+                        _I_CORE_KRX_FLOW_CACHE_MEM[(code, end)] = r
         except Exception as e:
             _icore_krx_flow_diag_inc('errors', f'cache_load:{type(e).__name__}:{e}')
         _I_CORE_KRX_FLOW_CACHE_LOADED = True
@@ -23928,6 +24284,10 @@ def _icore_store_negative_krx_flow(code: str, end: str, error: str, label: str =
         pass
 
 
+def _icore_pykrx_flow_fetcher(start: str, end: str, code: str, on: str):
+    return pykrx_stock.get_market_trading_value_by_date(start, end, code, on=on)
+
+
 def _icore_fetch_krx_flow_with_retry(start: str, end: str, code: str):
     """v53.7.2: KRX/pykrx RemoteDisconnected·일시 빈값을 재시도한다. 최종 빈값/오류만 상위에서 기록한다."""
     last_exc = None
@@ -23935,7 +24295,10 @@ def _icore_fetch_krx_flow_with_retry(start: str, end: str, code: str):
     tries = max(1, int(I_CORE_KRX_FLOW_RETRY_COUNT))
     for attempt in range(tries):
         try:
-            df = pykrx_stock.get_market_trading_value_by_date(start, end, str(code).zfill(6))
+            if _flow_store is not None and _flow_store.enabled():
+                df = _flow_store.frame(code, start, end, fetcher=_icore_pykrx_flow_fetcher)
+            else:
+                df = pykrx_stock.get_market_trading_value_by_date(start, end, str(code).zfill(6))
             last_df = df
             if df is not None and not getattr(df, 'empty', True):
                 if attempt > 0:
@@ -23983,6 +24346,9 @@ def _icore_save_krx_flow_diag_file() -> None:
         I_CORE_KRX_FLOW_DIAG_CSV.parent.mkdir(parents=True, exist_ok=True)
         row = dict(_I_CORE_KRX_FLOW_DIAG)
         row['ts'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if _flow_store is not None:
+            _flow_store.flush()
+            row['flow_store'] = _flow_store.format_stats()
         pd.DataFrame([row]).to_csv(I_CORE_KRX_FLOW_DIAG_CSV, index=False, encoding='utf-8-sig')
     except Exception:
         pass
@@ -29996,14 +30362,48 @@ def _v4940_policy_result(r, cost_bps: int=20) -> dict:
     except Exception:return {'exec_pnl':np.nan,'exec_reason':'CALC_FAIL'}
 
 
+def _v4940_trade_book(df: pd.DataFrame):
+    """신호일별 score·volume_ratio 내림차순 거래표(portfolio_kernel.TradeBook)."""
+    score=pd.to_numeric(df.get('score',pd.Series(0,index=df.index)),errors='coerce').fillna(0)
+    vol=pd.to_numeric(df.get('volume_ratio',pd.Series(0,index=df.index)),errors='coerce').fillna(0)
+    return _pk.TradeBook(df,'signal_date',[(score,False),(vol,False)])
+
+
+def _v4940_book_stats_fn(df: pd.DataFrame):
+    """TradeBook 선택 결과 → _v4940_portfolio_stats 요약(동시보유는 선택 행의 신호일~d3_date 구간)."""
+    dates=pd.to_datetime(df.get('signal_date'),errors='coerce')
+    dates=dates.tolist() if isinstance(dates,pd.Series) else [pd.NaT]*len(df)
+    d3s=df['d3_date'].tolist() if 'd3_date' in df.columns else ['']*len(df)
+    def stats(daily: pd.Series, vals: np.ndarray, rows: np.ndarray) -> dict:
+        ok=~np.isnan(vals); vals=vals[ok]; rows=rows[ok]; daily=daily.dropna()
+        if not len(vals):return {'n':0,'total':np.nan,'mdd':np.nan,'positive_month':np.nan,'streak':0,'concurrent':0,'mean':np.nan}
+        equity=(1.0+daily/100.0).cumprod(); total=(float(equity.iloc[-1])-1.0)*100.0
+        peak=equity.cummax(); mdd=float(((equity/peak)-1.0).min()*100.0)
+        month=(1.0+daily/100.0).groupby(daily.index.to_period('M')).prod()-1.0
+        pos_month=float((month>0).mean()*100.0) if len(month) else np.nan
+        starts=[]; ends=[]
+        for i in rows:
+            s=pd.Timestamp(dates[i]).normalize(); d3=str(d3s[i] or '')
+            try:e=pd.Timestamp(d3).normalize() if d3 else s+pd.offsets.BDay(3)
+            except Exception:e=s+pd.offsets.BDay(3)
+            if pd.notna(e) and e>=s:starts.append(s); ends.append(e)
+        return {'n':len(vals),'total':total,'mdd':mdd,'positive_month':pos_month,'streak':_pk.max_loss_streak(daily.tolist()),
+                'concurrent':_pk.max_overlap(starts,ends),'mean':float(pd.Series(vals).mean())}
+    return stats
+
+
 def _v4940_portfolio_stats(entry_events: pd.DataFrame, day_limit: int, cost_bps: int) -> dict:
     if entry_events is None or entry_events.empty:return {'n':0,'total':np.nan,'mdd':np.nan,'positive_month':np.nan,'streak':0,'concurrent':0,'mean':np.nan}
+    if _pk is not None:
+        book=_v4940_trade_book(entry_events); pnl=book.values(_v4940_policy_pnl(entry_events,int(cost_bps)).to_numpy())
+        sel=book.pick(max(1,int(day_limit)))
+        return _v4940_book_stats_fn(entry_events)(book.daily(pnl,sel),pnl[sel],book.rows[sel])
     x=entry_events.copy(); x['_date']=pd.to_datetime(x.get('signal_date'),errors='coerce')
     x['_score']=pd.to_numeric(x.get('score',pd.Series(0,index=x.index)),errors='coerce').fillna(0)
     x['_vol']=pd.to_numeric(x.get('volume_ratio',pd.Series(0,index=x.index)),errors='coerce').fillna(0)
     x=x[x['_date'].notna()].sort_values(['_date','_score','_vol'],ascending=[True,False,False],kind='mergesort')
     x=x.groupby('_date',group_keys=False).head(max(1,int(day_limit))).copy()
-    x['_pnl']=[_safe_float(_v4940_policy_result(r,int(cost_bps)).get('exec_pnl',np.nan),np.nan) for _,r in x.iterrows()]
+    x['_pnl']=_v4940_policy_pnl(x,int(cost_bps)).to_numpy()
     x=x[x['_pnl'].notna()].copy()
     if x.empty:return {'n':0,'total':np.nan,'mdd':np.nan,'positive_month':np.nan,'streak':0,'concurrent':0,'mean':np.nan}
     daily=x.groupby('_date')['_pnl'].mean().sort_index()
@@ -30073,8 +30473,8 @@ def _v4940_matched_null(entry_events: pd.DataFrame, pb_events: pd.DataFrame) ->
     if ent.empty or pool.empty:return {'valid':False,'reason':'표본 없음'}
     ent['_date']=pd.to_datetime(ent.get('signal_date'),errors='coerce'); pool['_date']=pd.to_datetime(pool.get('signal_date'),errors='coerce')
     ent=ent[ent['_date'].ge(split)].copy(); pool=pool[pool['_date'].ge(split)].copy()
-    ent['_pnl']=[_safe_float(_v4940_policy_result(r,20).get('exec_pnl',np.nan),np.nan) for _,r in ent.iterrows()]
-    pool['_pnl']=[_safe_float(_v4940_policy_result(r,20).get('exec_pnl',np.nan),np.nan) for _,r in pool.iterrows()]
+    ent['_pnl']=_v4940_policy_pnl(ent,20).to_numpy()
+    pool['_pnl']=_v4940_policy_pnl(pool,20).to_numpy()
     ent=ent[ent['_pnl'].notna()]; pool=pool[pool['_pnl'].notna()]
     if len(ent)<8 or len(pool)<12:return {'valid':False,'reason':f'표본부족 entry {len(ent)} / pool {len(pool)}'}
     ent['_month']=ent['_date'].dt.to_period('M').astype(str); pool['_month']=pool['_date'].dt.to_period('M').astype(str)
@@ -30102,6 +30502,33 @@ def _v4945_path_first_one(r, up: float=3.0, dn: float=-3.0) -> str:
     return 'NONE'
 
 
+def _v4945_path_first_frame(df: pd.DataFrame, up: float=3.0, dn: float=-3.0) -> pd.Series:
+    """_v4945_path_first_one의 프레임판. 첫 도달일에 -3이 함께 닿았으면 MINUS."""
+    if df is None or len(df)==0:return pd.Series([],dtype=object)
+    days=range(1,int(CLOSING_BET_V4940_LIFECYCLE_FORWARD_BARS)+1)
+    if _fwd_paths is None:return pd.Series([_v4945_path_first_one(r,up,dn) for _,r in df.iterrows()],index=df.index)
+    H=_fwd_paths.column_matrix(df,[f'd{d}_high_ret' for d in days]); L=_fwd_paths.column_matrix(df,[f'd{d}_low_ret' for d in days])
+    with np.errstate(invalid='ignore'):
+        hp=H>=float(up); lm=L<=float(dn)
+    first=_fwd_paths.first_day(hp|lm)
+    minus=_fwd_paths.take_day(np.where(lm,1.0,0.0),first)==1.0
+    return pd.Series(np.where(first==0,'NONE',np.where(minus,'MINUS','PLUS')).tolist(),index=df.index)
+
+
+def _v4940_policy_pnl(df: pd.DataFrame, cost_bps: int=20) -> pd.Series:
+    """행별 _v4940_policy_result(r,cost_bps)['exec_pnl']을 한 번에 계산한다(D3 미성숙은 NaN)."""
+    if df is None or len(df)==0:return pd.Series([],dtype='float64')
+    if _fwd_paths is None:
+        return pd.Series([_safe_float(_v4940_policy_result(r,int(cost_bps)).get('exec_pnl',np.nan),np.nan) for _,r in df.iterrows()],index=df.index,dtype='float64')
+    try:
+        v=pd.DataFrame({f'vrec_d{d}_{k}_ret':_fwd_paths.column_matrix(df,[f'd{d}_{k}_ret'])[:,0] for d in range(1,4) for k in ('high','low','close')},index=df.index)
+        ex=_v538427_exec_policy_frame(v,policy=_V538427_EXEC_POLICIES['P1 50/30/D3'],cost_bps=int(cost_bps),initial_stop_pct=3.0,breakeven_pct=0.0,conservative_same_day=True)
+        mature=v[['vrec_d3_high_ret','vrec_d3_low_ret','vrec_d3_close_ret']].notna().any(axis=1)
+        return ex['exec_pnl'].astype('float64').where(mature,np.nan)
+    except Exception:
+        return pd.Series(np.nan,index=df.index,dtype='float64')
+
+
 def _v4949_big_path_classify(r) -> tuple[str,float,float,float]:
     """D5 BIG을 실제 path/policy 관점에서 상호배타 분류한다.
 
@@ -30186,15 +30613,22 @@ def _v4949_capturable_big_lines(entry_events: pd.DataFrame) -> tuple[list[str],d
 def _v4945_enrich_outcomes(entry_events: pd.DataFrame) -> pd.DataFrame:
     if entry_events is None or entry_events.empty:return pd.DataFrame()
     x=entry_events.copy()
-    maxs=[]; mins=[]; lasts=[]; paths=[]; pnls=[]
-    for _,r in x.iterrows():
-        hs=[_safe_float(r.get(f'd{d}_high_ret',np.nan),np.nan) for d in range(1,int(CLOSING_BET_V4940_LIFECYCLE_FORWARD_BARS)+1)]
-        ls=[_safe_float(r.get(f'd{d}_low_ret',np.nan),np.nan) for d in range(1,int(CLOSING_BET_V4940_LIFECYCLE_FORWARD_BARS)+1)]
-        cs=[_safe_float(r.get(f'd{d}_close_ret',np.nan),np.nan) for d in range(1,int(CLOSING_BET_V4940_LIFECYCLE_FORWARD_BARS)+1)]
-        hs=[v for v in hs if pd.notna(v)]; ls=[v for v in ls if pd.notna(v)]; cs=[v for v in cs if pd.notna(v)]
-        maxs.append(max(hs) if hs else np.nan); mins.append(min(ls) if ls else np.nan); lasts.append(cs[-1] if cs else np.nan)
-        paths.append(_v4945_path_first_one(r)); pnls.append(_safe_float(_v4940_policy_result(r,20).get('exec_pnl',np.nan),np.nan))
-    x['_bw_max_high']=maxs; x['_bw_min_low']=mins; x['_bw_last_close']=lasts; x['_bw_path']=paths; x['_bw_policy_pnl']=pnls
+    if _fwd_paths is not None:
+        days=range(1,int(CLOSING_BET_V4940_LIFECYCLE_FORWARD_BARS)+1)
+        x['_bw_max_high']=_fwd_paths.nan_reduce(_fwd_paths.column_matrix(x,[f'd{d}_high_ret' for d in days]),'max')
+        x['_bw_min_low']=_fwd_paths.nan_reduce(_fwd_paths.column_matrix(x,[f'd{d}_low_ret' for d in days]),'min')
+        x['_bw_last_close']=_fwd_paths.last_notna(_fwd_paths.column_matrix(x,[f'd{d}_close_ret' for d in days]))
+        x['_bw_path']=_v4945_path_first_frame(x); x['_bw_policy_pnl']=_v4940_policy_pnl(x,20)
+    else:
+        maxs=[]; mins=[]; lasts=[]; paths=[]; pnls=[]
+        for _,r in x.iterrows():
+            hs=[_safe_float(r.get(f'd{d}_high_ret',np.nan),np.nan) for d in range(1,int(CLOSING_BET_V4940_LIFECYCLE_FORWARD_BARS)+1)]
+            ls=[_safe_float(r.get(f'd{d}_low_ret',np.nan),np.nan) for d in range(1,int(CLOSING_BET_V4940_LIFECYCLE_FORWARD_BARS)+1)]
+            cs=[_safe_float(r.get(f'd{d}_close_ret',np.nan),np.nan) for d in range(1,int(CLOSING_BET_V4940_LIFECYCLE_FORWARD_BARS)+1)]
+            hs=[v for v in hs if pd.notna(v)]; ls=[v for v in ls if pd.notna(v)]; cs=[v for v in cs if pd.notna(v)]
+            maxs.append(max(hs) if hs else np.nan); mins.append(min(ls) if ls else np.nan); lasts.append(cs[-1] if cs else np.nan)
+            paths.append(_v4945_path_first_one(r)); pnls.append(_safe_float(_v4940_policy_result(r,20).get('exec_pnl',np.nan),np.nan))
+        x['_bw_max_high']=maxs; x['_bw_min_low']=mins; x['_bw_last_close']=lasts; x['_bw_path']=paths; x['_bw_policy_pnl']=pnls
     x['_bw_big']=pd.to_numeric(x['_bw_max_high'],errors='coerce').ge(float(CLOSING_BET_V4945_BIG_THRESHOLD_PCT))
     x['_bw_super']=pd.to_numeric(x['_bw_max_high'],errors='coerce').ge(float(CLOSING_BET_V4945_SUPER_THRESHOLD_PCT))
     # v49.60 mutually-exclusive BIG path labels.
@@ -30714,7 +31148,8 @@ def _v4945_fail_threshold_lines(episodes: pd.DataFrame, entry_events: pd.DataFra
         for _,r in fail.iterrows():
             er=emap.get(str(r.get('episode_key','')))
             if er is not None: later.append(er)
-        ln=len(later); plus=sum(_v4945_path_first_one(r)=='PLUS' for r in later); minus=sum(_v4945_path_first_one(r)=='MINUS' for r in later)
+        path=_v4945_path_first_frame(pd.DataFrame(later)) if later else pd.Series([],dtype=object)
+        ln=len(later); plus=int(path.eq('PLUS').sum()); minus=int(path.eq('MINUS').sum())
         rec=ln/len(fail)*100.0 if len(fail) else 0.0
         ptxt=f'+3먼저 {plus/ln*100:.0f}%/-3먼저 {minus/ln*100:.0f}%' if ln else '후속ENTRY 없음'
         parts.append(f'{th:g}%: 실패 {len(fail)} · 후속ENTRY {ln}({rec:.0f}%) · {ptxt}')
@@ -30822,7 +31257,13 @@ def _v4950_post_policy_runner_lines(entry_events: pd.DataFrame) -> tuple[list[st
 
 def _v4950_policy_mean(df: pd.DataFrame,cost_bps:int=20)->float:
     if df is None or df.empty:return np.nan
-    vals=[_safe_float(_v4940_policy_result(r,int(cost_bps)).get('exec_pnl',np.nan),np.nan) for _,r in df.iterrows()]
+    return _v4950_col_mean(df,_v4940_policy_pnl(df,int(cost_bps)))
+
+
+def _v4950_col_mean(df: pd.DataFrame, col) -> float:
+    """손익열(컬럼명 또는 Series)의 NaN 제외 평균."""
+    if df is None or df.empty:return np.nan
+    vals=(df[col] if isinstance(col,str) else col).tolist()
     vals=[v for v in vals if pd.notna(v)]
     return float(np.mean(vals)) if vals else np.nan
 
@@ -30875,7 +31316,7 @@ def _v4950_fail_cutoff_locked_lines(episodes: pd.DataFrame, entry_events: pd.Dat
         keep=gap.notna() & gap.ge(-float(th)); oo=x[keep & dates.ge(split)].copy(); po20=selected['oo20']; po50=selected['oo50']
         parts=[]
         if not oo.empty:
-            oo=oo.copy(); oo['_p20']=[_safe_float(_v4940_policy_result(r,20).get('exec_pnl',np.nan),np.nan) for _,r in oo.iterrows()]
+            oo=oo.copy(); oo['_p20']=_v4940_policy_pnl(oo,20).to_numpy()
             for lab,g in oo.groupby(oo.get('history_market_m5',pd.Series('M5-확인필요',index=oo.index)).astype(str)):
                 vv=pd.to_numeric(g['_p20'],errors='coerce').dropna()
                 if len(vv):parts.append(f'{lab} n{len(vv)} {float(vv.mean()):+.2f}%')
@@ -30891,6 +31332,17 @@ def _v4950_fail_cutoff_locked_lines(episodes: pd.DataFrame, entry_events: pd.Dat
 
 def _v4951_custom_portfolio_stats(df: pd.DataFrame, pnl_col: str, day_limit: int=1) -> dict:
     if df is None or df.empty or pnl_col not in df.columns:return {'n':0,'total':np.nan,'mdd':np.nan,'positive_month':np.nan,'mean':np.nan}
+    if _pk is not None:
+        rp=pd.to_numeric(df[pnl_col],errors='coerce')
+        score=pd.to_numeric(df.get('score',pd.Series(0,index=df.index)),errors='coerce').fillna(0)
+        vol=pd.to_numeric(df.get('volume_ratio',pd.Series(0,index=df.index)),errors='coerce').fillna(0)
+        book=_pk.TradeBook(df,'signal_date',[(score,False),(vol,False)],valid=rp.notna().to_numpy())
+        v=book.values(rp); sel=book.pick(max(1,int(day_limit)))
+        if not sel.any():return {'n':0,'total':np.nan,'mdd':np.nan,'positive_month':np.nan,'mean':np.nan}
+        daily=book.daily(v,sel); equity=(1.0+daily/100.0).cumprod()
+        total=(float(equity.iloc[-1])-1.0)*100.0; mdd=float(((equity/equity.cummax())-1.0).min()*100.0)
+        month=(1.0+daily/100.0).groupby(daily.index.to_period('M')).prod()-1.0
+        return {'n':int(sel.sum()),'total':total,'mdd':mdd,'positive_month':float((month>0).mean()*100.0) if len(month) else np.nan,'mean':float(pd.Series(v[sel]).mean())}
     x=df.copy(); x['_date']=pd.to_datetime(x.get('signal_date'),errors='coerce')
     x['_score']=pd.to_numeric(x.get('score',pd.Series(0,index=x.index)),errors='coerce').fillna(0)
     x['_vol']=pd.to_numeric(x.get('volume_ratio',pd.Series(0,index=x.index)),errors='coerce').fillna(0)
@@ -31246,8 +31698,8 @@ def _v4953_write_research_cache(entry_policy: pd.DataFrame, start_date: str, end
     lines=['[💾 RESEARCH TABLE CACHE]']; detail={}
     if not bool(CLOSING_BET_V4953_RESEARCH_CACHE_ENABLE):return lines+['- 비활성화'],detail
     if entry_policy is None or entry_policy.empty:return lines+['- ENTRY 표 없음'],detail
-    x=entry_policy.copy(); x['_p1_20bp']=[_safe_float(_v4940_policy_result(r,20).get('exec_pnl',np.nan),np.nan) for _,r in x.iterrows()]
-    x['_p1_50bp']=[_safe_float(_v4940_policy_result(r,50).get('exec_pnl',np.nan),np.nan) for _,r in x.iterrows()]
+    x=entry_policy.copy(); x['_p1_20bp']=_v4940_policy_pnl(x,20).to_numpy()
+    x['_p1_50bp']=_v4940_policy_pnl(x,50).to_numpy()
     core=['episode_key','code','name','ignition_date','signal_date','entry_price','score','volume_ratio','history_market_m5','benchmark_d3_ret','cohort','matured','v4938_fwd_days','v4951_runner_fwd_days','bw_preentry_dynamic_support_gap_pct','_p1_20bp','_p1_50bp']
     feats=[c for c in x.columns if c.startswith('bw_') and c not in core]; paths=[]
     for d in range(1,int(CLOSING_BET_V4951_RUNNER_MAX_DAYS)+1):paths += [f'd{d}_date',f'd{d}_high_ret',f'd{d}_low_ret',f'd{d}_close_ret',f'd{d}_ma5_gap']
@@ -31339,13 +31791,24 @@ def _v4951_fail_walk_forward_lines(entry_events: pd.DataFrame, global_data_end=N
     if folds:
         f0=folds[-1]; lines.append(f"- FOLD DATE AUTHORITY: GLOBAL_DATA_END {f0['global_data_end']:%Y-%m-%d} · LAST_SIGNAL {f0['last_signal_date']:%Y-%m-%d} (진단전용) · D3_MATURITY_END {f0['maturity_end']:%Y-%m-%d} · calendar {f0['calendar_source']}")
     lines.append(f'- WF 설정: TRAIN {train_m}개월 → OOS {oos_m}개월 · step {step_m}개월 · fixed cutoff 0%/0.5% · final fold 우측절단 명시 · 표 재사용')
-    for f in folds:
+    port=None
+    if _pk is not None:
+        # P1 손익은 표 전체에서 한 번만 계산하고, OOS fold×cutoff×비용 포트폴리오는 한 장의 거래표에서 평가한다.
+        x['_p20']=_v4940_policy_pnl(x,20).to_numpy(); x['_p50']=_v4940_policy_pnl(x,50).to_numpy()
+        keys=('n','total','mdd','positive_month','streak','concurrent','mean')
+        cube=_v4940_trade_book(x).cube({20:'_p20',50:'_p50'},day_limits=(1,),folds={i:(f['oos_start'],f['oos_end']) for i,f in enumerate(folds) if f['status']!='SKIPPED'},
+                                        subsets={th:x['_gap'].ge(-th).to_numpy() for th in (0.0,0.5)},stats=_v4940_book_stats_fn(x))
+        port={(r['subset'],r['fold'],r['pnl']):{k:r[k] for k in keys} for r in cube.to_dict('records')}
+    for fi,f in enumerate(folds):
         if f['status']=='SKIPPED':
             lines.append(f"- F{f['id']} SKIPPED {f['oos_start']:%Y-%m-%d}~{f['oos_expected_end']:%Y-%m-%d} · {f['reason']}"); continue
         tr=x[x['_date'].between(f['train_start'],f['train_end'])].copy(); oo=x[x['_date'].between(f['oos_start'],f['oos_end'])].copy()
         rec=dict(f); rec['thresholds']={}
         for th in (0.0,0.5):
             trk=tr[tr['_gap'].ge(-th)].copy(); ook=oo[oo['_gap'].ge(-th)].copy()
+            if port is not None:
+                rec['thresholds'][th]={'train_n':len(trk),'oos_n':len(ook),'train20':_v4950_col_mean(trk,'_p20'),'train50':_v4950_col_mean(trk,'_p50'),'oos20':_v4950_col_mean(ook,'_p20'),'oos50':_v4950_col_mean(ook,'_p50'),'p20':port[(th,fi,20)],'p50':port[(th,fi,50)]}
+                continue
             rec['thresholds'][th]={'train_n':len(trk),'oos_n':len(ook),'train20':_v4950_policy_mean(trk,20),'train50':_v4950_policy_mean(trk,50),'oos20':_v4950_policy_mean(ook,20),'oos50':_v4950_policy_mean(ook,50),'p20':_v4940_portfolio_stats(ook,1,20),'p50':_v4940_portfolio_stats(ook,1,50)}
         a=rec['thresholds'][0.0]; b=rec['thresholds'][0.5]
         rec['selected']=max([(0.0,a),(0.5,b)],key=lambda z:(_safe_float(z[1]['train20'],-999),_safe_float(z[1]['train50'],-999),z[0]))[0]
@@ -31366,7 +31829,7 @@ def _v4951_fail_walk_forward_lines(entry_events: pd.DataFrame, global_data_end=N
         if not walk_oos.empty:
             dd=[c for c in ('episode_key','signal_date') if c in walk_oos.columns]
             if dd:walk_oos=walk_oos.drop_duplicates(dd,keep='first')
-            walk_oos['_wf_p20']=[_safe_float(_v4940_policy_result(r,20).get('exec_pnl',np.nan),np.nan) for _,r in walk_oos.iterrows()]
+            walk_oos['_wf_p20']=walk_oos['_p20'] if '_p20' in walk_oos.columns else _v4940_policy_pnl(walk_oos,20).to_numpy()
         regimes={}; reg_parts=[]; regime_ok=True
         for lab in ('M5-우호','M5-중립','M5-비우호','M5-확인필요'):
             g=walk_oos[walk_oos.get('history_market_m5',pd.Series('',index=walk_oos.index)).astype(str).eq(lab)] if not walk_oos.empty else pd.DataFrame(); vv=pd.to_numeric(g.get('_wf_p20',pd.Series(dtype=float)),errors='coerce').dropna() if not g.empty else pd.Series(dtype=float)
@@ -31652,7 +32115,7 @@ def _v4939_lifecycle_backtest_lines(start_date: str, end_date: str, df=None) ->
         lines.append(_v4939_stage_path_line(pb_ev,'FIRST-PULLBACK[NEW+D3]'))
         lines.append(_v4939_stage_path_line(near_ev,'RESTART-NEAR'))
         lines.append(_v4939_stage_path_line(ent_policy,'STRICT-ENTRY[NEW+D3]'))
-        vals=[_safe_float(_v4940_policy_result(r,20).get('exec_pnl',np.nan),np.nan) for _,r in ent_policy.iterrows()]
+        vals=_v4940_policy_pnl(ent_policy,20).tolist()
         vals=[v for v in vals if pd.notna(v)]
         lines.append(f'- LIFECYCLE ENTRY 정책모의 P1 50/30/D3·20bp: n {len(vals)} · 평균 {float(np.mean(vals)):+.2f}% · 승률 {sum(v>0 for v in vals)/len(vals)*100:.1f}% · 모집단 NEW+D3완전' if vals else '- LIFECYCLE ENTRY 정책모의: 평가표본 없음')
         ent_policy_mkt,hist_line=_v4940_market_enrich(ent_policy,start_date,end_date); lines.append(hist_line)
@@ -31676,7 +32139,7 @@ def _v4939_lifecycle_backtest_lines(start_date: str, end_date: str, df=None) ->
         l1,b1,s1=_v4940_portfolio_line(ent_policy_mkt,1); l2,b2,s2=_v4940_portfolio_line(ent_policy_mkt,2); lines.extend(['[💼 Lifecycle 전용 포트폴리오]',l1,l2])
         # OOS/gate
         split=pd.Timestamp(CLOSING_BET_V4940_OOS_SPLIT_DATE); oos=ent_policy_mkt[pd.to_datetime(ent_policy_mkt.get('signal_date'),errors='coerce').ge(split)].copy() if not ent_policy_mkt.empty else pd.DataFrame()
-        oos['_pnl']=[_safe_float(_v4940_policy_result(r,20).get('exec_pnl',np.nan),np.nan) for _,r in oos.iterrows()] if not oos.empty else []
+        oos['_pnl']=_v4940_policy_pnl(oos,20).to_numpy() if not oos.empty else []
         oos=oos[oos.get('_pnl',pd.Series(dtype=float)).notna()] if not oos.empty else oos
         oos_mean=float(oos['_pnl'].mean()) if not oos.empty else np.nan
         if not oos.empty:
@@ -32384,23 +32847,67 @@ def _v4959_strategy_context_doc(start_date: str, end_date: str, hold_days: int,
 
 def _v4959_prune_contexts(base: Path) -> None:
     try:
-        dirs=[d for d in Path(base).iterdir() if d.is_dir()]
-        dirs.sort(key=lambda d:d.stat().st_mtime,reverse=True)
-        for d in dirs[int(CLOSING_BET_V4959_STRATEGY_CACHE_MAX_CONTEXTS):]:
-            import shutil; shutil.rmtree(d,ignore_errors=True)
+        import shutil
+        ctxs=[d for d in Path(base).iterdir() if d.is_dir() or d.suffix=='.sqlite']
+        ctxs.sort(key=lambda d:d.stat().st_mtime,reverse=True)
+        for d in ctxs[int(CLOSING_BET_V4959_STRATEGY_CACHE_MAX_CONTEXTS):]:
+            if d.is_dir(): shutil.rmtree(d,ignore_errors=True)
+            else: d.unlink(missing_ok=True)
     except Exception: pass
 
 
+def _v4959_strategy_db_use() -> bool:
+    return CLOSING_BET_V4959_STRATEGY_CACHE_BACKEND=='sqlite'
+
+
+def _v4959_strategy_db_open(path: Path, manifest_doc: dict):
+    """컨텍스트 SQLite 캐시를 연다. entries는 code PK라 조회/갱신이 O(1)이고, 각 commit은 원자적이다."""
+    import sqlite3
+    path=Path(path); path.parent.mkdir(parents=True,exist_ok=True)
+    con=sqlite3.connect(str(path),timeout=30)
+    con.execute('PRAGMA journal_mode=DELETE'); con.execute('PRAGMA synchronous=NORMAL')
+    con.execute('CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value TEXT)')
+    con.execute('CREATE TABLE IF NOT EXISTS entries(code TEXT PRIMARY KEY, schema INTEGER, engine TEXT, fingerprint TEXT, payload BLOB, written_at TEXT)')
+    con.execute('INSERT OR IGNORE INTO meta(key,value) VALUES(?,?)',('manifest',json.dumps(manifest_doc,ensure_ascii=False,default=str)))
+    con.commit()
+    return con
+
+
+def _v4959_strategy_db_heads(con) -> dict:
+    """payload 없이 code → (schema, engine, fingerprint)만 읽는다."""
+    return {str(r[0]):(int(r[1] or 0),str(r[2] or ''),str(r[3] or '')) for r in con.execute('SELECT code,schema,engine,fingerprint FROM entries')}
+
+
+def _v4959_strategy_db_get(con, code: str):
+    row=con.execute('SELECT payload FROM entries WHERE code=?',(code,)).fetchone()
+    return pickle.loads(gzip.decompress(row[0])) if row else None
+
+
+def _v4959_strategy_db_put(con, code: str, payload: dict) -> None:
+    blob=gzip.compress(pickle.dumps(payload,protocol=pickle.HIGHEST_PROTOCOL),compresslevel=4)
+    con.execute('INSERT OR REPLACE INTO entries(code,schema,engine,fingerprint,payload,written_at) VALUES(?,?,?,?,?,?)',
+                (code,int(payload.get('schema',0) or 0),str(payload.get('engine','')),str(payload.get('frame_fingerprint','')),blob,str(payload.get('written_at',''))))
+
+
 def _v4959_cached_strategy_map(items, worker, start_date: str, end_date: str, hold_days: int, min_eval_days: int, universe_meta: dict) -> dict:
     """Per-code atomic resume with adaptive workers and elapsed/rate/ETA watchdog logging."""
     global _V4959_STRATEGY_ENGINE_AUDIT, _V4959_I_FLOW_DIAG
     seq=list(items or [])
     _V4959_I_FLOW_DIAG={'cache_hit':0,'cache_miss_proxy':0,'disabled':0}; base=Path(CLOSING_BET_V4959_STRATEGY_CACHE_DIR)
     context_doc=_v4959_strategy_context_doc(start_date,end_date,hold_days,min_eval_days,universe_meta,[item[0] for item in seq])
-    context_key=_v4959_json_sha(context_doc); context_dir=base/context_key; context_dir.mkdir(parents=True,exist_ok=True)
-    manifest=context_dir/'manifest.json'
-    if not manifest.exists():
-        manifest.write_text(json.dumps({**context_doc,'context_key':context_key,'created_at':datetime.now().isoformat()},ensure_ascii=False,indent=2),encoding='utf-8')
+    context_key=_v4959_json_sha(context_doc); context_dir=base/context_key
+    manifest_doc={**context_doc,'context_key':context_key,'created_at':datetime.now().isoformat()}
+    db=None; db_heads={}; db_pending=0; migrated=0
+    if CLOSING_BET_V4959_STRATEGY_CACHE_ENABLE and _v4959_strategy_db_use():
+        try:
+            db=_v4959_strategy_db_open(base/f'{context_key}.sqlite',manifest_doc); db_heads=_v4959_strategy_db_heads(db)
+        except Exception as e:
+            log_error(f'v49.76 STRATEGY CACHE sqlite open 실패 → 종목별 파일 캐시로 진행: {type(e).__name__}: {e}'); db=None
+    if db is None:
+        context_dir.mkdir(parents=True,exist_ok=True)
+        manifest=context_dir/'manifest.json'
+        if not manifest.exists():
+            manifest.write_text(json.dumps(manifest_doc,ensure_ascii=False,indent=2),encoding='utf-8')
     results=[]; errors=[]; cache_hits=0; writes=0; misses=[]; stale=0; flow_cache_hit=0; flow_proxy_miss=0
     perf_diag={'candidate_dates':0,'eligible_dates':0,'mode_calls':0,'full_mode_calls':0,'slow_codes':[],'code_seconds':[]}
     def add_flow_counts(value):
@@ -32424,14 +32931,26 @@ def _v4959_cached_strategy_map(items, worker, start_date: str, end_date: str, ho
     cache_map=globals().get('_V4940_BT_PRICE_CACHE',{}) or {}
     for item in seq:
         code,name=item; code=str(code).zfill(6); frame=cache_map.get((code,str(start_date),str(end_date))); frame_fp=_v4958_frame_fingerprint(frame) if isinstance(frame,pd.DataFrame) and not frame.empty else 'EMPTY'; cp=context_dir/f'{code}.pkl.gz'; loaded=False
-        if CLOSING_BET_V4959_STRATEGY_CACHE_ENABLE and CLOSING_BET_V4959_STRATEGY_CACHE_READ and cp.exists():
+        if CLOSING_BET_V4959_STRATEGY_CACHE_ENABLE and CLOSING_BET_V4959_STRATEGY_CACHE_READ:
+            payload=None
             try:
-                payload=_v4959_read_pickle_gz(cp)
+                head=db_heads.get(code) if db is not None else None
+                if head is not None:
+                    # 헤더로 먼저 판정해 무효 항목은 payload를 풀지 않는다.
+                    if head==(int(CLOSING_BET_V4959_STRATEGY_CACHE_SCHEMA),CLOSING_BET_V4959_STRATEGY_ENGINE_VERSION,frame_fp): payload=_v4959_strategy_db_get(db,code)
+                    else: payload={}
+                elif cp.exists():
+                    payload=_v4959_read_pickle_gz(cp)
+                    if db is not None and isinstance(payload,dict):
+                        _v4959_strategy_db_put(db,code,payload); db_pending+=1; migrated+=1
+            except Exception: payload={}
+            if payload is not None:
                 if int(payload.get('schema',0) or 0)==int(CLOSING_BET_V4959_STRATEGY_CACHE_SCHEMA) and payload.get('frame_fingerprint')==frame_fp and payload.get('engine')==CLOSING_BET_V4959_STRATEGY_ENGINE_VERSION:
                     val=payload.get('value'); results.append((item,val)); add_flow_counts(val); add_perf(val); cache_hits+=1; loaded=True
                 else: stale+=1
-            except Exception: stale+=1
         if not loaded: misses.append((item,frame_fp,cp))
+    if db is not None and db_pending:
+        db.commit(); db_pending=0
     total=len(seq); completed=cache_hits; workers=max(1,min(int(CLOSING_BET_V4959_STRATEGY_WORKERS),len(misses) or 1)); started=time.monotonic(); last_log=started
     def wrapped(item):
         _V4959_TLS.strategy_performance=True
@@ -32446,7 +32965,12 @@ def _v4959_cached_strategy_map(items, worker, start_date: str, end_date: str, ho
                 try:
                     val=fut.result(); results.append((item,val)); add_flow_counts(val); add_perf(val); completed+=1
                     if CLOSING_BET_V4959_STRATEGY_CACHE_ENABLE and CLOSING_BET_V4959_STRATEGY_CACHE_WRITE:
-                        _v4959_atomic_pickle_gz(cp,{'schema':int(CLOSING_BET_V4959_STRATEGY_CACHE_SCHEMA),'engine':CLOSING_BET_V4959_STRATEGY_ENGINE_VERSION,'frame_fingerprint':fp,'item':item,'value':val,'written_at':datetime.now().isoformat()}); writes+=1
+                        payload={'schema':int(CLOSING_BET_V4959_STRATEGY_CACHE_SCHEMA),'engine':CLOSING_BET_V4959_STRATEGY_ENGINE_VERSION,'frame_fingerprint':fp,'item':item,'value':val,'written_at':datetime.now().isoformat()}
+                        if db is not None:
+                            _v4959_strategy_db_put(db,str(item[0]).zfill(6),payload); db_pending+=1
+                            if db_pending>=int(CLOSING_BET_V4959_STRATEGY_DB_COMMIT_EVERY): db.commit(); db_pending=0
+                        else: _v4959_atomic_pickle_gz(cp,payload)
+                        writes+=1
                 except Exception as e:
                     errors.append((item,f'{type(e).__name__}: {e}')); completed+=1
                 nowm=time.monotonic()
@@ -32459,10 +32983,20 @@ def _v4959_cached_strategy_map(items, worker, start_date: str, end_date: str, ho
                     # Thread workers are not force-killed; atomic per-code results keep accumulating.
                     # The workflow-level timeout is the final hard stop.
                     pass
+    db_entries=None
+    if db is not None:
+        try:
+            db.commit(); db_entries=int(db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]); db.close()
+            if migrated and context_dir.is_dir():
+                # 구방식 종목별 파일은 SQLite로 옮겼으므로 지운다(캐시 복원/저장 tar 크기 축소).
+                import shutil; shutil.rmtree(context_dir,ignore_errors=True)
+        except Exception as e:
+            log_error(f'v49.76 STRATEGY CACHE sqlite commit 실패: {type(e).__name__}: {e}')
     try:
-        index={'updated_at':datetime.now().isoformat(),'latest_context':context_key,'contexts':[]}
+        index={'updated_at':datetime.now().isoformat(),'latest_context':context_key,'backend':'sqlite' if db is not None else 'files','contexts':[]}
         for d in base.iterdir():
-            if d.is_dir(): index['contexts'].append({'key':d.name,'mtime':d.stat().st_mtime,'files':len(list(d.glob('*.pkl.gz')))})
+            if d.suffix=='.sqlite': index['contexts'].append({'key':d.stem,'mtime':d.stat().st_mtime,'bytes':d.stat().st_size,**({'entries':db_entries} if d.stem==context_key and db_entries is not None else {})})
+            elif d.is_dir(): index['contexts'].append({'key':d.name,'mtime':d.stat().st_mtime,'legacy_dir':True})
         (base/'index.json').write_text(json.dumps(index,ensure_ascii=False,indent=2),encoding='utf-8'); _v4959_prune_contexts(base)
     except Exception: pass
     _V4959_I_FLOW_DIAG={'cache_hit':int(flow_cache_hit),'cache_miss_proxy':int(flow_proxy_miss),'disabled':0}
@@ -32472,7 +33006,7 @@ def _v4959_cached_strategy_map(items, worker, start_date: str, end_date: str, ho
         f'- COMMON STRATEGY ENGINE: {status} {"✅" if status=="VALID" else "🟡"} · {CLOSING_BET_V4959_STRATEGY_ENGINE_VERSION} · completed {completed}/{total} · cache HIT {cache_hits} · WRITE {writes} · stale {stale} · errors {len(errors)}',
         f'- VECTOR GATE: candidate dates {perf_diag["candidate_dates"]}/{perf_diag["eligible_dates"]} · mode calls {perf_diag["mode_calls"]}/{perf_diag["full_mode_calls"]} · reduction {reduction:.1f}% · zero-copy prefix view',
         f'- RUNTIME: adaptive workers {workers} · median/code {med:.1f}s · P95 {p95:.1f}s · slow≥{CLOSING_BET_V4960_SLOW_CODE_SECONDS}s {len(perf_diag["slow_codes"])} · watchdog {CLOSING_BET_V4960_ENGINE_WATCHDOG_SECONDS}s',
-        f'- STRATEGY CACHE CONTEXT: {context_key[:16]}… · per-code atomic resume · contexts dir {CLOSING_BET_V4959_STRATEGY_CACHE_DIR}',
+        f'- STRATEGY CACHE CONTEXT: {context_key[:16]}… · {"sqlite single-file" if db is not None else "per-code file"} atomic resume{f" · migrated {migrated}" if migrated else ""} · contexts dir {CLOSING_BET_V4959_STRATEGY_CACHE_DIR}',
         f'- I/IT HISTORY FLOW: {CLOSING_BET_V4959_I_FLOW_MODE} · pykrx cache HIT {_V4959_I_FLOW_DIAG.get("cache_hit",0)} · proxy miss {_V4959_I_FLOW_DIAG.get("cache_miss_proxy",0)} · proxy miss가 있으면 I/IT 승격 근거 사용 금지',
     ]
     audit={'status':status,'lines':lines,'detail':{'context_key':context_key,'completed':completed,'total':total,'cache_hits':cache_hits,'writes':writes,'stale':stale,'errors':len(errors),'workers':workers,'runtime_median_sec':med,'runtime_p95_sec':p95,'vector_gate':perf_diag,'i_flow':dict(_V4959_I_FLOW_DIAG)}}
@@ -32510,6 +33044,29 @@ def _v4959_daily_portfolio(df: pd.DataFrame, limit: int, cost_bps: int) -> dict:
     return {'n':int(len(z)),'days':int(len(daily)),'total':_v4959_compound_pct(daily),'mdd':_v4959_mdd_pct(daily),'positive_month':pm,'mean':float(daily.mean()) if len(daily) else np.nan}
 
 
+
+def _v4959_portfolio_book(df: pd.DataFrame):
+    """신호일별 mode 우선순위 → score → amount_b 순 거래표(portfolio_kernel.TradeBook)."""
+    rank={m:i for i,m in enumerate(CLOSING_BET_V4958_PRIMARY_PRIORITY)}
+    mr=df.get('mode',pd.Series('',index=df.index)).astype(str).map(rank).fillna(99)
+    score=pd.to_numeric(df.get('score',pd.Series(0,index=df.index)),errors='coerce').fillna(0)
+    amt=pd.to_numeric(df.get('amount_b',pd.Series(0,index=df.index)),errors='coerce').fillna(0)
+    return _pk.TradeBook(df,'signal_date',[(mr,True),(score,False),(amt,False)])
+
+
+def _v4959_book_stats(daily: pd.Series, vals: np.ndarray, rows: np.ndarray) -> dict:
+    tmp=pd.DataFrame({'signal_date':daily.index,'net':daily.values})
+    tmp['_month']=pd.to_datetime(tmp['signal_date']).dt.to_period('M'); pm=float((tmp.groupby('_month')['net'].sum()>0).mean()*100.0) if len(tmp) else np.nan
+    return {'n':int(len(vals)),'days':int(len(daily)),'total':_v4959_compound_pct(daily),'mdd':_v4959_mdd_pct(daily),'positive_month':pm,'mean':float(daily.mean()) if len(daily) else np.nan}
+
+
+def _v4959_daily_portfolio_grid(df: pd.DataFrame, limits, costs) -> list[dict]:
+    """(하루 최대 종목수 × 비용bp) 조합별 _v4959_daily_portfolio. 거래표는 한 번만 정렬한다."""
+    if _pk is None or df is None or df.empty:
+        return [{'day_limit':lim,'cost_bps':cost,**_v4959_daily_portfolio(df,lim,cost)} for lim in limits for cost in costs]
+    cube=_v4959_portfolio_book(df).cube({'rule35':'rule35_pnl'},day_limits=limits,cost_bps=costs,stats=_v4959_book_stats)
+    return [{'day_limit':r['day_limit'],'cost_bps':r['cost_bps'],**{k:r[k] for k in ('n','days','total','mdd','positive_month','mean')}} for r in cube.to_dict('records')]
+
 def _v4959_build_common_performance_audit(raw_df: pd.DataFrame, selected_df: pd.DataFrame, start_date: str, end_date: str, diag: dict) -> dict:
     global _V4959_COMMON_PERF_AUDIT, _V4959_I_FLOW_DIAG
     if not CLOSING_BET_V4959_PERFORMANCE_ENABLE:
@@ -32540,9 +33097,7 @@ def _v4959_build_common_performance_audit(raw_df: pd.DataFrame, selected_df: pd.
                      'oos_net20_mean_pct':float(oo['_net20'].mean()) if len(oo) else np.nan,'oos_net50_mean_pct':float(oo['_net50'].mean()) if len(oo) else np.nan,
                      'oos_net20_compound_pct':_v4959_compound_pct(oo['_net20']),'oos_net50_compound_pct':_v4959_compound_pct(oo['_net50']),
                      'oos_positive_month50_pct':_v4959_positive_month_pct(oo,'_net50'),'hit3_before_stop_pct':float(pd.to_numeric(z.get('hit3_before_stop'),errors='coerce').fillna(0).mean()*100.0) if len(z) else np.nan})
-        for lim in (1,2):
-            for cost in CLOSING_BET_V4959_PERFORMANCE_COST_BPS:
-                r=_v4959_daily_portfolio(z,lim,cost); port.append({'strategy':mode,'day_limit':lim,'cost_bps':cost,**r})
+        for r in _v4959_daily_portfolio_grid(z,(1,2),CLOSING_BET_V4959_PERFORMANCE_COST_BPS): port.append({'strategy':mode,**r})
         base=z.sort_values('_gross',ascending=False,kind='mergesort')
         for n in (0,1,3,5,10):
             zz=base.iloc[n:].copy() if len(base)>n else base.iloc[0:0].copy()
@@ -16,6 +16,21 @@ import numpy as np
 import pandas as pd
 import requests
 
+try:
+    import http_pool
+except Exception:
+    http_pool = None
+
+try:
+    import krx_calendar
+except Exception:
+    krx_calendar = None
+
+try:
+    import ohlcv_store
+except Exception:
+    ohlcv_store = None
+
 V73_VERSION = "V73.2.1"
 V73_POLICY = "LISTING_MULTISOURCE_CACHE_DTYPE_EMPTY_GUARD"
 
@@ -256,6 +271,11 @@ def _signal_phase(m: Mapping[str, float], profiles: Sequence[str]) -> str:
 
 
 def _business_gap(start, end) -> int:
+    """Trading sessions in (start, end]; 0 when end <= start."""
+    if krx_calendar is not None:
+        gap = krx_calendar.count_between(start, end, "right")
+        if gap >= 0:
+            return gap
     try:
         a = np.datetime64(pd.Timestamp(start).date(), "D")
         b = np.datetime64(pd.Timestamp(end).date(), "D")
@@ -266,11 +286,21 @@ def _business_gap(start, end) -> int:
         return max(0, int((pd.Timestamp(end) - pd.Timestamp(start)).days))
 
 
+def _business_gap_series(starts: pd.Series, end) -> pd.Series:
+    """Vectorized ``_business_gap`` for a datetime Series against one end date."""
+    if krx_calendar is not None:
+        gaps = krx_calendar.count_between_vec(starts, end, "right")
+        if not (gaps < 0).any():
+            return pd.Series(gaps, index=starts.index)
+    return starts.map(lambda x: _business_gap(x, end))
+
+
 def _naver_daily(code: str, count: int = 330, timeout: int = 8) -> pd.DataFrame:
     url = "https://fchart.stock.naver.com/sise.nhn"
     params = {"symbol": _code(code), "timeframe": "day", "count": int(count), "requestType": "0"}
     headers = {"User-Agent": "Mozilla/5.0 StockHunter-V73"}
-    r = requests.get(url, params=params, headers=headers, timeout=timeout)
+    getter = http_pool.get if http_pool is not None else requests.get
+    r = getter(url, params=params, headers=headers, timeout=timeout)
     r.raise_for_status()
     rows = re.findall(r'<item\s+data="([^"]+)"', r.text)
     parsed = []
@@ -312,140 +342,195 @@ def fetch_daily(code: str, count: int = 330, end_date: Optional[pd.Timestamp] =
     return pd.DataFrame(), "FETCH_FAIL"
 
 
+def _history_store_ok() -> bool:
+    if ohlcv_store is None or not ohlcv_store.enabled() or not _env_int("V73_HISTORY_STORE", 1, 0, 1):
+        return False
+    check = getattr(ohlcv_store, "adjusted_history", None)
+    return bool(check is not None and check())
+
+
+def fetch_daily_cached(code: str, count: int = 330, end_date: Optional[pd.Timestamp] = None) -> Tuple[pd.DataFrame, str]:
+    """``fetch_daily`` backed by the local incremental bar store (ohlcv_store).
+
+    Only bars newer than the stored last date are downloaded; a short or empty
+    store answer falls back to the Naver chart / FDR path. The store is used only
+    when it guarantees adjusted prices (``adjusted_history``): a panel-fed store
+    without the corporate-action check could mix pre/post-split bars.
+    """
+    if _history_store_ok():
+        try:
+            days = int(count * 1.5) + 30
+            df = ohlcv_store.get_history(_code(code), days=days, end=end_date)
+            if df is not None and len(df) >= 80:
+                return df.loc[:, ["Open", "High", "Low", "Close", "Volume"]].tail(int(count)), "OHLCV_STORE"
+        except Exception:
+            pass
+    return fetch_daily(code, count=count, end_date=end_date)
+
+
 def _obv(close: pd.Series, volume: pd.Series) -> pd.Series:
     direction = np.sign(close.diff()).fillna(0.0)
     return (direction * volume.fillna(0.0)).cumsum()
 
 
-def _metrics(df: pd.DataFrame) -> Optional[dict]:
-    if df is None or len(df) < 80:
-        return None
-    d = df.copy().sort_index()
-    for c in ("Open", "High", "Low", "Close", "Volume"):
-        d[c] = pd.to_numeric(d[c], errors="coerce")
-    d = d.dropna(subset=["Open", "High", "Low", "Close", "Volume"])
-    if len(d) < 80:
-        return None
-    c, o, h, l, v = (float(d[x].iloc[-1]) for x in ("Close", "Open", "High", "Low", "Volume"))
-    pc = float(d["Close"].iloc[-2])
-    if min(c, o, h, l, pc) <= 0:
-        return None
-    ma = {n: float(d["Close"].rolling(n).mean().iloc[-1]) if len(d) >= n else np.nan for n in (5, 10, 20, 60, 112, 224)}
-    prev_ma = {n: float(d["Close"].rolling(n).mean().iloc[-2]) if len(d) > n else np.nan for n in (20, 60, 112, 224)}
-    vma20 = float(d["Volume"].tail(20).mean())
-    vma5 = float(d["Volume"].tail(5).mean())
-    amount_eok = c * v / 1e8
-    amount5 = float((d["Close"] * d["Volume"]).tail(5).mean() / 1e8)
-    amount20 = float((d["Close"] * d["Volume"]).tail(20).mean() / 1e8)
-    vol_ratio = v / vma20 if vma20 > 0 else 0.0
-    ret1 = (c / pc - 1.0) * 100.0
-    body = (c / o - 1.0) * 100.0
-    range_pos = (c - l) / max(h - l, 1e-9)
-    prior5 = float(d["High"].iloc[-6:-1].max()) if len(d) >= 6 else np.nan
-    prior10 = float(d["High"].iloc[-11:-1].max()) if len(d) >= 11 else np.nan
-    prior20 = float(d["High"].iloc[-21:-1].max()) if len(d) >= 21 else np.nan
-    prior60 = float(d["High"].iloc[-61:-1].max()) if len(d) >= 61 else np.nan
-    prior5_close = float(d["Close"].iloc[-6:-1].max()) if len(d) >= 6 else np.nan
-    prior10_close = float(d["Close"].iloc[-11:-1].max()) if len(d) >= 11 else np.nan
-    prior20_close = float(d["Close"].iloc[-21:-1].max()) if len(d) >= 21 else np.nan
-    prior10_high_q80 = float(d["High"].iloc[-11:-1].quantile(0.80)) if len(d) >= 11 else np.nan
-    prior20_high_q80 = float(d["High"].iloc[-21:-1].quantile(0.80)) if len(d) >= 21 else np.nan
-    # A single historical wick must not define the whole local box.  Robust
-    # resistance uses repeated closes plus the upper body of the high
-    # distribution, while the raw max-high is retained for overhead supply.
-    robust10 = max(prior10_close, prior10_high_q80) if prior10_close > 0 and prior10_high_q80 > 0 else prior10
-    robust20 = max(prior20_close, prior20_high_q80) if prior20_close > 0 and prior20_high_q80 > 0 else prior20
-    box_low10 = float(d["Low"].iloc[-11:-1].min()) if len(d) >= 11 else np.nan
-    box_low20 = float(d["Low"].iloc[-21:-1].min()) if len(d) >= 21 else np.nan
-    box_low60 = float(d["Low"].iloc[-61:-1].min()) if len(d) >= 61 else np.nan
-    base10_width = (robust10 / box_low10 - 1.0) * 100.0 if robust10 > 0 and box_low10 > 0 else np.nan
-    base20_width = (robust20 / box_low20 - 1.0) * 100.0 if robust20 > 0 and box_low20 > 0 else np.nan
-    obv = _obv(d["Close"], d["Volume"])
-    obv_now = float(obv.iloc[-1])
-    obv_5max = float(obv.iloc[-6:-1].max()) if len(obv) >= 6 else obv_now
-
-    long_vals = [ma[n] for n in (20, 60, 112, 224) if math.isfinite(ma[n]) and ma[n] > 0]
-    cluster_pct = ((max(long_vals) - min(long_vals)) / c * 100.0) if len(long_vals) >= 3 else np.nan
-    long_top = max([ma[n] for n in (112, 224) if math.isfinite(ma[n]) and ma[n] > 0] or [np.nan])
-    prev_long_top = max([prev_ma[n] for n in (112, 224) if math.isfinite(prev_ma[n]) and prev_ma[n] > 0] or [np.nan])
-
-    impulse = None
-    # An impulse can be a moderate-volume local-box ignition.  Requiring 1.7x
-    # volume discarded valid first moves such as 119850 on 2026-06-29.
-    for ago in range(2, 13):
-        if len(d) <= ago + 21:
+_OHLCV = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _bar_matrix(frames: Mapping[str, pd.DataFrame], min_bars: int = 80) -> Tuple[List[str], List[str], np.ndarray, Dict[str, np.ndarray]]:
+    """Right-aligned (codes x bars) OHLCV matrices; incomplete bars are dropped per code, short histories skipped."""
+    keys: List[str] = []; dates: List[str] = []; blocks: List[np.ndarray] = []
+    for key, df in frames.items():
+        if df is None or len(df) < min_bars or any(c not in df.columns for c in _OHLCV):
             continue
-        i = len(d) - 1 - ago
-        ic = float(d["Close"].iloc[i]); ipc = float(d["Close"].iloc[i - 1]); io = float(d["Open"].iloc[i])
-        ih = float(d["High"].iloc[i]); il = float(d["Low"].iloc[i]); iv = float(d["Volume"].iloc[i])
-        ivma = float(d["Volume"].iloc[max(0, i - 20):i].mean())
-        iret = (ic / ipc - 1.0) * 100.0 if ipc > 0 else 0.0
-        ipos = (ic - il) / max(ih - il, 1e-9)
-        ivr = iv / ivma if ivma > 0 else 0.0
-        ihist = d.iloc[max(0, i - 20):i]
-        iprior20 = float(ihist["High"].max())
-        iprior20_close = float(ihist["Close"].max())
-        iprior20_q80 = float(ihist["High"].quantile(0.80))
-        irobust20 = max(iprior20_close, iprior20_q80) if iprior20_close > 0 and iprior20_q80 > 0 else iprior20
-        ibreak20 = (ic / iprior20 - 1.0) * 100.0 if iprior20 > 0 else -999.0
-        irobust_break20 = (ic / irobust20 - 1.0) * 100.0 if irobust20 > 0 else -999.0
-        strong_impulse = (iret >= 5.0 and ivr >= 1.50) or (iret >= 8.0 and ivr >= 1.20 and irobust_break20 >= -2.0)
-        if strong_impulse and ipos >= 0.62 and ic >= io:
-            impulse = {"ago": ago, "idx": i, "high": ih, "low": il, "close": ic, "volume": iv,
-                       "ret": iret, "vol_ratio": ivr, "break20_pct": ibreak20,
-                       "robust_break20_pct": irobust_break20}
-            break
+        d = df if df.index.is_monotonic_increasing else df.sort_index()
+        vals = d.loc[:, list(_OHLCV)].to_numpy()
+        if vals.dtype.kind != "f":
+            vals = d.loc[:, list(_OHLCV)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+        ok = ~np.isnan(vals).any(axis=1)
+        if int(ok.sum()) < min_bars:
+            continue
+        keys.append(key); dates.append(d.index[ok][-1].strftime("%Y-%m-%d")); blocks.append(vals[ok])
+    lens = np.array([len(b) for b in blocks], dtype=int)
+    width = int(lens.max()) if len(lens) else 0
+    cube = np.full((len(blocks), width, len(_OHLCV)), np.nan)
+    for j, b in enumerate(blocks):
+        cube[j, width - len(b):] = b
+    mats = {c: np.ascontiguousarray(cube[:, :, k]) for k, c in enumerate(_OHLCV)}
+    return keys, dates, lens, mats
+
+
+def _metrics_batch(frames: Mapping[str, pd.DataFrame]) -> Dict[str, Optional[dict]]:
+    """Cross-sectional ``_metrics``: one pass over a (codes x bars) matrix instead of one call per frame."""
+    out: Dict[str, Optional[dict]] = {k: None for k in frames}
+    keys, dates, lens, M = _bar_matrix(frames)
+    if not keys:
+        return out
+    O, H, L, C, V = (M[x] for x in _OHLCV)
+    T = C.shape[1]
+    c, o, h, l, v, pc = C[:, -1], O[:, -1], H[:, -1], L[:, -1], V[:, -1], C[:, -2]
+    valid = np.minimum.reduce([c, o, h, l, pc]) > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roll = pd.DataFrame(C.T)
+        ma = {n: roll.rolling(n).mean().iloc[-1].to_numpy() for n in (5, 10, 20, 60, 112, 224)}
+        prev_ma = {n: np.where(lens > n, roll.rolling(n).mean().iloc[-2].to_numpy(), np.nan) for n in (20, 60, 112, 224)}
+        vma20 = V[:, -20:].mean(axis=1); vma5 = V[:, -5:].mean(axis=1)
+        CV = C * V
+        amount_eok = c * v / 1e8
+        amount5 = CV[:, -5:].mean(axis=1) / 1e8; amount20 = CV[:, -20:].mean(axis=1) / 1e8
+        vol_ratio = np.where(vma20 > 0, v / vma20, 0.0)
+        ret1 = (c / pc - 1.0) * 100.0
+        body = (c / o - 1.0) * 100.0
+        range_pos = (c - l) / np.maximum(h - l, 1e-9)
+        prior = {n: H[:, -n - 1:-1].max(axis=1) for n in (5, 10, 20, 60)}
+        prior_close = {n: C[:, -n - 1:-1].max(axis=1) for n in (5, 10, 20)}
+        q80 = {n: np.quantile(H[:, -n - 1:-1], 0.80, axis=1) for n in (10, 20)}
+        # A single historical wick must not define the whole local box.  Robust
+        # resistance uses repeated closes plus the upper body of the high
+        # distribution, while the raw max-high is retained for overhead supply.
+        robust = {n: np.where((prior_close[n] > 0) & (q80[n] > 0), np.maximum(prior_close[n], q80[n]), prior[n]) for n in (10, 20)}
+        box_low = {n: L[:, -n - 1:-1].min(axis=1) for n in (10, 20, 60)}
+        width = {n: np.where((robust[n] > 0) & (box_low[n] > 0), (robust[n] / box_low[n] - 1.0) * 100.0, np.nan) for n in (10, 20)}
+        direction = np.nan_to_num(np.sign(np.diff(C, axis=1, prepend=np.nan)))
+        obv = np.cumsum(direction * np.nan_to_num(V), axis=1)
+        obv_now = obv[:, -1]; obv_5max = obv[:, -6:-1].max(axis=1)
+
+        long_stack = np.stack([ma[n] for n in (20, 60, 112, 224)])
+        long_ok = np.isfinite(long_stack) & (long_stack > 0)
+        long_max = np.where(long_ok, long_stack, -np.inf).max(axis=0); long_min = np.where(long_ok, long_stack, np.inf).min(axis=0)
+        cluster_pct = np.where(long_ok.sum(axis=0) >= 3, (long_max - long_min) / c * 100.0, np.nan)
+
+        def _top(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+            s = np.stack([a, b]); ok = np.isfinite(s) & (s > 0)
+            return np.where(ok.any(axis=0), np.where(ok, s, -np.inf).max(axis=0), np.nan)
+        long_top = _top(ma[112], ma[224]); prev_long_top = _top(prev_ma[112], prev_ma[224])
+
+        # An impulse can be a moderate-volume local-box ignition.  Requiring 1.7x
+        # volume discarded valid first moves such as 119850 on 2026-06-29.
+        n_codes = len(keys)
+        imp_ago = np.zeros(n_codes, dtype=int)
+        imp = {k: np.full(n_codes, np.nan) for k in ("high", "low", "volume", "ret", "vol_ratio", "break20_pct", "robust_break20_pct")}
+        for ago in range(2, 13):
+            i = T - 1 - ago
+            ic, ipc, io, ih, il, iv = C[:, i], C[:, i - 1], O[:, i], H[:, i], L[:, i], V[:, i]
+            ivma = V[:, i - 20:i].mean(axis=1)
+            iret = np.where(ipc > 0, (ic / ipc - 1.0) * 100.0, 0.0)
+            ipos = (ic - il) / np.maximum(ih - il, 1e-9)
+            ivr = np.where(ivma > 0, iv / ivma, 0.0)
+            iprior20 = H[:, i - 20:i].max(axis=1); iprior20_close = C[:, i - 20:i].max(axis=1)
+            iprior20_q80 = np.quantile(H[:, i - 20:i], 0.80, axis=1)
+            irobust20 = np.where((iprior20_close > 0) & (iprior20_q80 > 0), np.maximum(iprior20_close, iprior20_q80), iprior20)
+            ibreak20 = np.where(iprior20 > 0, (ic / iprior20 - 1.0) * 100.0, -999.0)
+            irobust_break20 = np.where(irobust20 > 0, (ic / irobust20 - 1.0) * 100.0, -999.0)
+            strong = ((iret >= 5.0) & (ivr >= 1.50)) | ((iret >= 8.0) & (ivr >= 1.20) & (irobust_break20 >= -2.0))
+            hit = (imp_ago == 0) & (lens > ago + 21) & strong & (ipos >= 0.62) & (ic >= io)
+            imp_ago[hit] = ago
+            for k, a in (("high", ih), ("low", il), ("volume", iv), ("ret", iret), ("vol_ratio", ivr),
+                         ("break20_pct", ibreak20), ("robust_break20_pct", irobust_break20)):
+                imp[k][hit] = a[hit]
+
+        found = imp_ago > 0
+        pullback_pct = np.where(found, (c / imp["high"] - 1.0) * 100.0, np.nan)
+        min_after = np.full(n_codes, np.nan); med_vol_after = np.full(n_codes, np.nan); obv_at = np.full(n_codes, np.nan)
+        for ago in np.unique(imp_ago[found]):
+            rows = np.flatnonzero(imp_ago == ago); i = T - 1 - int(ago)
+            min_after[rows] = L[rows, i + 1:].min(axis=1)
+            med_vol_after[rows] = np.median(V[rows, i + 1:T - 1], axis=1)
+            obv_at[rows] = obv[rows, i]
+        support = (min_after >= imp["low"] * 0.94) & (c >= np.minimum(ma[5], ma[20]) * 0.96) & (c >= imp["low"] * 0.96)
+        compressed = (med_vol_after <= imp["volume"] * 0.80) & (v <= imp["volume"] * 0.90)
+        obv_hold = obv_now >= obv_at - np.abs(imp["volume"]) * 0.65
+        in_zone = (pullback_pct >= -15.0) & (pullback_pct <= 3.0)
+        pullback_setup = found & in_zone & support & compressed & obv_hold
+        reentry = (ret1 >= 1.2) & (c >= o) & (v >= np.maximum(V[:, -2] * 1.05, vma5 * 0.9))
+        restart = pullback_setup & reentry
+
+        def _pct(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+            return np.where(den > 0, (num / den - 1.0) * 100.0, np.nan)
+        cols = {
+            "close": c, "open": o, "high": h, "low": l,
+            "ret1": ret1, "body_pct": body, "range_pos": range_pos,
+            "high_giveback_pct": np.where(h > 0, (h - c) / h * 100.0, 0.0), "volume": v,
+            "vol_ratio20": vol_ratio, "amount_eok": amount_eok, "amount5_eok": amount5, "amount20_eok": amount20,
+            "prior5_high": prior[5], "prior10_high": prior[10], "prior20_high": prior[20], "prior60_high": prior[60],
+            "prior5_close_high": prior_close[5], "prior10_close_high": prior_close[10], "prior20_close_high": prior_close[20],
+            "robust10_resistance": robust[10], "robust20_resistance": robust[20],
+            "box10_low": box_low[10], "box20_low": box_low[20], "box60_low": box_low[60],
+            "base10_width_pct": width[10], "base20_width_pct": width[20],
+            "break5_pct": _pct(c, prior[5]), "break5_close_pct": _pct(c, prior_close[5]),
+            "break10_pct": _pct(c, prior[10]), "break20_pct": _pct(c, prior[20]),
+            "robust_break10_pct": _pct(c, robust[10]), "robust_break20_pct": _pct(c, robust[20]),
+            "wick_overhang20_pct": np.where((prior[20] > 0) & (robust[20] > 0), (prior[20] / robust[20] - 1.0) * 100.0, np.nan),
+            "break60_pct": _pct(c, prior[60]),
+            "ma5": ma[5], "ma10": ma[10], "ma20": ma[20], "ma60": ma[60], "ma112": ma[112], "ma224": ma[224],
+            "cluster_pct": cluster_pct, "long_top": long_top, "prev_long_top": prev_long_top,
+            "obv_now": obv_now, "obv_5max": obv_5max,
+        }
+    lists = {k: a.tolist() for k, a in cols.items()}
+    for j, key in enumerate(keys):
+        if not valid[j]:
+            continue
+        m = {"date": dates[j]}
+        m.update({k: a[j] for k, a in lists.items()})
+        debug = ""
+        if found[j]:
+            debug = (f"impulseD-{int(imp_ago[j])} {imp['ret'][j]:+.1f}%/V{imp['vol_ratio'][j]:.1f} "
+                     f"raw20 {imp['break20_pct'][j]:+.1f}%/robust20 {imp['robust_break20_pct'][j]:+.1f}% · pullback {pullback_pct[j]:+.1f}% · "
+                     f"compressed={bool(compressed[j])} support={bool(support[j])} obv={bool(obv_hold[j])}")
+        m.update({
+            "obv_break": m["obv_now"] >= m["obv_5max"],
+            "impulse_found": bool(found[j]), "impulse_ago": int(imp_ago[j]) if found[j] else np.nan,
+            "impulse_ret": float(imp["ret"][j]) if found[j] else np.nan,
+            "impulse_vol_ratio": float(imp["vol_ratio"][j]) if found[j] else np.nan,
+            "pullback_setup": bool(pullback_setup[j]), "pullback_debug": debug,
+            "restart": bool(restart[j]), "restart_debug": (debug + f" reentry={bool(reentry[j])}") if found[j] else "",
+            "pullback_pct": float(pullback_pct[j]) if found[j] else np.nan,
+        })
+        out[key] = m
+    return out
 
-    restart = False
-    pullback_setup = False
-    restart_debug = ""
-    pullback_debug = ""
-    pullback_pct = np.nan
-    if impulse:
-        after = d.iloc[impulse["idx"] + 1:]
-        pullback_pct = (c / impulse["high"] - 1.0) * 100.0
-        min_after = float(after["Low"].min()) if not after.empty else c
-        middle = after["Volume"].iloc[:-1] if len(after) > 1 else pd.Series(dtype=float)
-        med_vol_after = float(middle.median()) if not middle.empty else v
-        support = min_after >= impulse["low"] * 0.94 and c >= min(ma[5], ma[20]) * 0.96 and c >= impulse["low"] * 0.96
-        compressed = med_vol_after <= impulse["volume"] * 0.80 and v <= impulse["volume"] * 0.90
-        obv_hold = obv_now >= float(obv.iloc[impulse["idx"]]) - abs(impulse["volume"]) * 0.65
-        in_pullback_zone = -15.0 <= pullback_pct <= 3.0
-        pullback_setup = in_pullback_zone and support and compressed and obv_hold
-        reentry = ret1 >= 1.2 and c >= o and v >= max(float(d["Volume"].iloc[-2]) * 1.05, vma5 * 0.9)
-        restart = pullback_setup and reentry
-        common = (f"impulseD-{impulse['ago']} {impulse['ret']:+.1f}%/V{impulse['vol_ratio']:.1f} "
-                  f"raw20 {impulse['break20_pct']:+.1f}%/robust20 {impulse.get('robust_break20_pct', impulse['break20_pct']):+.1f}% · pullback {pullback_pct:+.1f}% · "
-                  f"compressed={compressed} support={support} obv={obv_hold}")
-        pullback_debug = common
-        restart_debug = common + f" reentry={reentry}"
-
-    return {
-        "date": d.index[-1].strftime("%Y-%m-%d"), "close": c, "open": o, "high": h, "low": l,
-        "ret1": ret1, "body_pct": body, "range_pos": range_pos,
-        "high_giveback_pct": ((h - c) / h * 100.0) if h > 0 else 0.0, "volume": v,
-        "vol_ratio20": vol_ratio, "amount_eok": amount_eok, "amount5_eok": amount5, "amount20_eok": amount20,
-        "prior5_high": prior5, "prior10_high": prior10, "prior20_high": prior20, "prior60_high": prior60,
-        "prior5_close_high": prior5_close, "prior10_close_high": prior10_close, "prior20_close_high": prior20_close,
-        "robust10_resistance": robust10, "robust20_resistance": robust20,
-        "box10_low": box_low10, "box20_low": box_low20, "box60_low": box_low60,
-        "base10_width_pct": base10_width, "base20_width_pct": base20_width,
-        "break5_pct": (c / prior5 - 1.0) * 100.0 if prior5 > 0 else np.nan,
-        "break5_close_pct": (c / prior5_close - 1.0) * 100.0 if prior5_close > 0 else np.nan,
-        "break10_pct": (c / prior10 - 1.0) * 100.0 if prior10 > 0 else np.nan,
-        "break20_pct": (c / prior20 - 1.0) * 100.0 if prior20 > 0 else np.nan,
-        "robust_break10_pct": (c / robust10 - 1.0) * 100.0 if robust10 > 0 else np.nan,
-        "robust_break20_pct": (c / robust20 - 1.0) * 100.0 if robust20 > 0 else np.nan,
-        "wick_overhang20_pct": (prior20 / robust20 - 1.0) * 100.0 if prior20 > 0 and robust20 > 0 else np.nan,
-        "break60_pct": (c / prior60 - 1.0) * 100.0 if prior60 > 0 else np.nan,
-        "ma5": ma[5], "ma10": ma[10], "ma20": ma[20], "ma60": ma[60], "ma112": ma[112], "ma224": ma[224],
-        "cluster_pct": cluster_pct, "long_top": long_top, "prev_long_top": prev_long_top,
-        "obv_now": obv_now, "obv_5max": obv_5max, "obv_break": obv_now >= obv_5max,
-        "impulse_found": bool(impulse), "impulse_ago": impulse["ago"] if impulse else np.nan,
-        "impulse_ret": impulse["ret"] if impulse else np.nan, "impulse_vol_ratio": impulse["vol_ratio"] if impulse else np.nan,
-        "pullback_setup": pullback_setup, "pullback_debug": pullback_debug,
-        "restart": restart, "restart_debug": restart_debug, "pullback_pct": pullback_pct,
-    }
+
+def _metrics(df: pd.DataFrame) -> Optional[dict]:
+    return _metrics_batch({"": df})[""]
 
 def detect_profiles(m: Mapping[str, float]) -> Tuple[List[str], List[str]]:
     profiles: List[str] = []
@@ -611,7 +696,7 @@ def build_dynamic_universe(listing: pd.DataFrame, prior_lifecycle: pd.DataFrame)
             pl["signal_date"] = pd.to_datetime(pl["signal_date"], errors="coerce")
             pl = pl.dropna(subset=["signal_date"]).sort_values("signal_date").groupby("code", as_index=False).tail(1)
             now_d = pd.Timestamp.now().normalize()
-            pl["_age"] = pl["signal_date"].map(lambda x: _business_gap(x, now_d))
+            pl["_age"] = _business_gap_series(pl["signal_date"], now_d)
             active_states = {"NEW_DISCOVERY", "NEW_CYCLE", "TRACKING_CONTINUE", "TRACKING_NO_NEW_SIGNAL", "REACTIVATED", "PULLBACK_SETUP", "RESTART_CONFIRMED"}
             if "state" in pl.columns:
                 pl = pl[pl["state"].astype(str).isin(active_states)]
@@ -1329,7 +1414,7 @@ def build_dynamic_universe(listing: pd.DataFrame, prior_lifecycle: pd.DataFrame,
                 asof = pd.Timestamp(asof_date or pd.Timestamp.now().strftime("%Y-%m-%d"))
                 pl["_last"] = pd.to_datetime(pl["active_last_signal_date"], errors="coerce")
                 pl = pl.dropna(subset=["_last"])
-                pl = pl[pl["_last"].map(lambda d: _business_gap(d, asof) <= 15)]
+                pl = pl[_business_gap_series(pl["_last"], asof) <= 15]
         tracked_codes = set(pl["code"])
     explicit = set(EXPLICIT_MULTI_SECTOR)
     top_codes = set(basic.nlargest(min(top_amount_n, len(basic)), "amount_eok")["code"]) if not basic.empty else set()
@@ -1376,7 +1461,7 @@ def _macro_regime_from_sources(output_dir: Path, today: str) -> Tuple[Dict[str,
             df["regime_date"] = pd.to_datetime(df["regime_date"], errors="coerce")
             valid = df.dropna(subset=["regime_date"]).copy()
             if not valid.empty:
-                valid["_gap"] = valid["regime_date"].map(lambda d: _business_gap(d, pd.Timestamp(today)))
+                valid["_gap"] = _business_gap_series(valid["regime_date"], pd.Timestamp(today))
                 valid = valid[(valid["_gap"] >= 0) & (valid["_gap"] <= 1)]
                 if not valid.empty:
                     latest = valid["regime_date"].max(); valid = valid[valid["regime_date"].eq(latest)]
@@ -1655,7 +1740,7 @@ def _cycle_anchored_metrics(df: pd.DataFrame, metrics: Optional[dict], active_fi
 def run_discovery(
     listing_raw: pd.DataFrame,
     output_dir: str = "reports",
-    fetcher: Callable[[str, int, Optional[pd.Timestamp]], Tuple[pd.DataFrame, str]] = fetch_daily,
+    fetcher: Callable[[str, int, Optional[pd.Timestamp]], Tuple[pd.DataFrame, str]] = fetch_daily_cached,
     now: Optional[datetime] = None,
 ) -> Tuple[str, pd.DataFrame, dict]:
     started = time.monotonic(); now = now or datetime.now(); today = now.strftime("%Y-%m-%d")
@@ -1726,26 +1811,31 @@ def run_discovery(
     workers = _env_int("V73_DISCOVERY_WORKERS", 10, 1, 24); count = _env_int("V73_HISTORY_COUNT", 330, 120, 600)
     records: List[dict] = []; fetch_fail: List[dict] = []
     _active_lookup = _state_row_dict(active_state)
-    def task(row: dict):
-        df, source = fetcher(row["code"], count, None)
-        active = _active_lookup.get(str(row["code"]), {})
-        metrics = _cycle_anchored_metrics(df, _metrics(df), active.get("active_first_signal_date"))
-        return row, metrics, source
+    # Fetch first (threads, I/O bound), then compute every code in one (codes x bars) pass.
+    fetch_started = time.monotonic(); fetched: List[Tuple[dict, pd.DataFrame, str]] = []
     executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="v73disc")
-    futures = [executor.submit(task, r) for r in universe.to_dict("records")]
+    futures = {executor.submit(fetcher, r["code"], count, None): r for r in universe.to_dict("records")}
     try:
         for fut in as_completed(futures):
-            try: row, m, source = fut.result()
+            try: df, source = fut.result()
             except Exception as e:
                 fetch_fail.append({"scan_date": today, "code": "", "name": "", "stage": "HISTORY_FETCH", "result": "FAIL", "reason": type(e).__name__}); continue
-            tags = multi_sector_tags(row["code"], row["name"], row["industry"])
-            if not m:
-                fetch_fail.append({"scan_date": today, "code": row["code"], "name": row["name"], "stage": "HISTORY_METRICS", "result": "FAIL", "reason": source}); continue
-            profiles, reasons = detect_profiles(m)
-            rec = dict(row); rec.update(m); rec.update({"scan_date": today, "source": source, "sector_tags": "|".join(tags), "profiles": "|".join(profiles), "profile_labels": "|".join(PROFILE_LABELS[p] for p in profiles), "reasons": " / ".join(reasons)})
-            records.append(rec)
+            fetched.append((futures[fut], df, source))
     finally:
         executor.shutdown(wait=True, cancel_futures=True)
+    fetch_sec = time.monotonic() - fetch_started
+    compute_started = time.monotonic()
+    batch = _metrics_batch({str(row["code"]): df for row, df, _ in fetched})
+    for row, df, source in fetched:
+        active = _active_lookup.get(str(row["code"]), {})
+        m = _cycle_anchored_metrics(df, batch.get(str(row["code"])), active.get("active_first_signal_date"))
+        tags = multi_sector_tags(row["code"], row["name"], row["industry"])
+        if not m:
+            fetch_fail.append({"scan_date": today, "code": row["code"], "name": row["name"], "stage": "HISTORY_METRICS", "result": "FAIL", "reason": source}); continue
+        profiles, reasons = detect_profiles(m)
+        rec = dict(row); rec.update(m); rec.update({"scan_date": today, "source": source, "sector_tags": "|".join(tags), "profiles": "|".join(profiles), "profile_labels": "|".join(PROFILE_LABELS[p] for p in profiles), "reasons": " / ".join(reasons)})
+        records.append(rec)
+    compute_sec = time.monotonic() - compute_started
     frame = pd.DataFrame(records)
     if frame.empty:
         rejection["scan_date"] = today
@@ -1949,7 +2039,10 @@ def run_discovery(
         lines.append("")
     ready = bridge[bridge["execution_gate"].eq("PROMOTION_RESEARCH_READY")] if not bridge.empty else pd.DataFrame()
     lines += ["🧪 [연구승격 결과]", f"- PROMOTION_RESEARCH_READY {len(ready)}개 | V72.29 STRICT 자동주입 0개"]
-    lines += ["📁 [핵심 원장]", "- v73_active_cycle_state.csv: 버전 독립 활성 사이클 단일 상태", "- v73_shared_sector_registry.csv: Discovery·LIVE 표시 공용 섹터", "- v73_daily_sector_regime.csv: 시황 유리·관찰·불리 섹터", "- v73_execution_bridge.csv: 유동성·섹터·위험계약·승격 차단", "- v73_cross_layer_audit.csv: 계층 간 섹터/상태 불일치", f"⏱️ 실행 {time.monotonic()-started:.1f}초"]
-    return "\n".join(lines).strip(), signal, {"universe": len(universe), "calculated": len(frame), "signals": len(signal), "fetch_fail": len(fetch_fail), "state_source": state_source, "active_after": active_after, "same_day_refresh": same_day_refresh, "same_day_forward": same_day_forward, "promotion_ready": len(ready)}
+    lines += ["📁 [핵심 원장]", "- v73_active_cycle_state.csv: 버전 독립 활성 사이클 단일 상태", "- v73_shared_sector_registry.csv: Discovery·LIVE 표시 공용 섹터", "- v73_daily_sector_regime.csv: 시황 유리·관찰·불리 섹터", "- v73_execution_bridge.csv: 유동성·섹터·위험계약·승격 차단", "- v73_cross_layer_audit.csv: 계층 간 섹터/상태 불일치", f"⏱️ 실행 {time.monotonic()-started:.1f}초 (일봉 조회 {fetch_sec:.1f}초 · 지표 계산 {compute_sec:.1f}초)"]
+    store_hits = sum(1 for _, _, src in fetched if src == "OHLCV_STORE")
+    if store_hits and ohlcv_store is not None:
+        lines.append(f"{ohlcv_store.format_stats()} | V73 저장소 사용 {store_hits}/{len(fetched)}")
+    return "\n".join(lines).strip(), signal, {"universe": len(universe), "calculated": len(frame), "signals": len(signal), "fetch_fail": len(fetch_fail), "state_source": state_source, "active_after": active_after, "same_day_refresh": same_day_refresh, "same_day_forward": same_day_forward, "promotion_ready": len(ready), "fetch_sec": round(fetch_sec, 2), "compute_sec": round(compute_sec, 2), "store_hits": store_hits}
 
 # ✅ END V73.3 COMPLETE LIFECYCLE / SHARED SECTOR / REGIME / EXECUTION CONTRACT
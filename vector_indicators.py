@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import argparse
+import math
+from collections import deque
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+VERSION = "VECTOR_INDICATORS_V1"
+RESEARCH_ONLY = False
+LIVE_LOGIC_CHANGED = False
+REAL_ORDER_CHANGED = False
+
+# get_indicators의 이평/거래량이평/기울기 창. (HTS 장기이평 224/448 포함)
+MA_WINDOWS = (5, 10, 20, 40, 60, 112, 224, 448)
+SLOPE_LAG = 3
+RSI_COM = 13
+OBV_MA = 10
+HIGH_WINDOWS = {"High20": 20, "High52": 252}
+
+# compute_core()가 채우는 컬럼 목록. get_indicators는 이 컬럼을 더 이상 pandas rolling으로 만들지 않는다.
+CORE_COLUMNS = tuple(
+    [f"{p}{n}" for n in MA_WINDOWS for p in ("MA", "VMA", "Slope")]
+    + [
+        "BB_Upper", "BB_Lower", "BB20_Width",
+        "BB40_Upper", "BB40_Lower", "BB40_Width", "BB40_PercentB",
+        "BB30_Upper_18",
+        "High20", "High52",
+        "Tenkan_sen", "Kijun_sen", "Span_A", "Span_B", "Cloud_Top",
+        "OBV", "OBV_MA10", "RSI",
+    ]
+)
+
+
+# -----------------------------------------------------------------------------
+# 배치 모드: 누적합 1회로 모든 창을 동시에 계산
+# -----------------------------------------------------------------------------
+def _as_float(x: Any) -> np.ndarray:
+    return np.asarray(pd.to_numeric(pd.Series(x), errors="coerce"), dtype="float64")
+
+
+def _window_sums(x: np.ndarray, windows: Iterable[int], with_sq: bool = False) -> dict[int, tuple]:
+    """Shared cumulative sums for every window; NaN-containing windows stay NaN (pandas min_periods=n)."""
+    n = len(x)
+    ok = np.isfinite(x)
+    ref = float(np.nanmean(x)) if ok.any() else 0.0
+    xc = np.where(ok, x - ref, 0.0)
+    cs = np.concatenate(([0.0], np.cumsum(xc)))
+    cnt = np.concatenate(([0], np.cumsum(ok.astype(np.int64))))
+    cs2 = np.concatenate(([0.0], np.cumsum(xc * xc))) if with_sq else None
+    # 같은 값이 창 전체를 채우면(거래정지 등) 누적합 차분의 반올림 오차 대신 pandas처럼 정확히 값/0을 쓴다.
+    pos = np.arange(n)
+    brk = np.ones(n, dtype=bool)
+    brk[1:] = x[1:] != x[:-1]
+    run = pos - np.maximum.accumulate(np.where(brk, pos, 0)) + 1
+    out: dict[int, tuple] = {}
+    for w in windows:
+        mean = np.full(n, np.nan)
+        var = np.full(n, np.nan) if with_sq else None
+        if 0 < w <= n:
+            s = cs[w:] - cs[:-w]
+            c = cnt[w:] - cnt[:-w]
+            full = c == w
+            m = s / w
+            flat = run[w - 1:] >= w
+            mean[w - 1:] = np.where(full, np.where(flat, x[w - 1:], m + ref), np.nan)
+            if with_sq and w > 1:
+                s2 = cs2[w:] - cs2[:-w]
+                v = np.maximum((s2 - s * m) / (w - 1), 0.0)
+                var[w - 1:] = np.where(full, np.where(flat, 0.0, v), np.nan)
+        out[w] = (mean, var)
+    return out
+
+
+def _rolling_ext(x: np.ndarray, w: int, fn) -> np.ndarray:
+    n = len(x)
+    out = np.full(n, np.nan)
+    if 0 < w <= n:
+        out[w - 1:] = fn(np.lib.stride_tricks.sliding_window_view(x, w), axis=1)
+    return out
+
+
+def _shift(x: np.ndarray, k: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if k < len(x):
+        out[k:] = x[:len(x) - k]
+    return out
+
+
+def _ewm_adjust_false(x: np.ndarray, com: float) -> np.ndarray:
+    # 재귀 필터는 pandas C 커널을 그대로 쓴다. (get_indicators와 NaN 처리 규칙이 동일)
+    return pd.Series(x).ewm(com=com, adjust=False).mean().to_numpy()
+
+
+def compute_core(
+    high: Any,
+    low: Any,
+    close: Any,
+    volume: Any,
+    windows: Iterable[int] = MA_WINDOWS,
+    clamp_to_length: bool = False,
+) -> dict[str, np.ndarray]:
+    """Compute every MA/VMA/Slope window plus BB20/30/40, High20/52, Ichimoku, OBV and RSI in one pass.
+
+    ``clamp_to_length=True`` reproduces the ``rolling(window=min(count, n))`` variant used by indicator_engine.py.
+    """
+    h, l, c, v = _as_float(high), _as_float(low), _as_float(close), _as_float(volume)
+    count = len(c)
+    wins = [min(count, int(w)) if clamp_to_length else int(w) for w in windows]
+    c_sums = _window_sums(c, set(wins) | {20, 30, 40}, with_sq=True)
+    v_sums = _window_sums(v, set(wins))
+    out: dict[str, np.ndarray] = {}
+    for n, w in zip(windows, wins):
+        ma = c_sums[w][0] if w > 0 else np.full(count, np.nan)
+        base = _shift(ma, SLOPE_LAG)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[f"Slope{n}"] = (ma - base) / base * 100
+        out[f"MA{n}"] = ma
+        out[f"VMA{n}"] = v_sums[w][0] if w > 0 else np.full(count, np.nan)
+
+    ma20, std20 = c_sums[20][0], np.sqrt(c_sums[20][1])
+    ma40, std40 = c_sums[40][0], np.sqrt(c_sums[40][1])
+    ma30, std30 = c_sums[30][0], np.sqrt(c_sums[30][1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["BB_Upper"] = ma20 + std20 * 2
+        out["BB_Lower"] = ma20 - std20 * 2
+        out["BB20_Width"] = std20 * 4 / ma20 * 100
+        out["BB40_Upper"] = ma40 + std40 * 2
+        out["BB40_Lower"] = ma40 - std40 * 2
+        out["BB40_Width"] = std40 * 4 / ma40 * 100
+        out["BB40_PercentB"] = (c - out["BB40_Lower"]) / (out["BB40_Upper"] - out["BB40_Lower"])
+    out["BB30_Upper_18"] = ma30 + std30 * 1.8
+
+    for name, w in HIGH_WINDOWS.items():
+        out[name] = _rolling_ext(h, w, np.max)
+
+    tenkan = (_rolling_ext(h, 9, np.max) + _rolling_ext(l, 9, np.min)) / 2
+    kijun = (_rolling_ext(h, 26, np.max) + _rolling_ext(l, 26, np.min)) / 2
+    span_b_raw = (_rolling_ext(h, 52, np.max) + _rolling_ext(l, 52, np.min)) / 2
+    out["Tenkan_sen"] = tenkan
+    out["Kijun_sen"] = kijun
+    out["Span_A"] = _shift((tenkan + kijun) / 2, 26)
+    out["Span_B"] = _shift(span_b_raw, 26)
+    out["Cloud_Top"] = np.fmax(out["Span_A"], out["Span_B"])
+
+    delta = np.diff(c, prepend=np.nan)
+    step = np.sign(delta) * v
+    obv = np.cumsum(np.where(np.isfinite(step), step, 0.0))
+    out["OBV"] = obv
+    out["OBV_MA10"] = _window_sums(obv, [OBV_MA])[OBV_MA][0]
+
+    gain = _ewm_adjust_false(np.where(delta > 0, delta, 0.0), RSI_COM)
+    loss = _ewm_adjust_false(-np.where(delta < 0, delta, 0.0), RSI_COM)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["RSI"] = 100 - (100 / (1 + gain / loss))
+    return out
+
+
+def apply_core(df: pd.DataFrame, clamp_to_length: bool = False) -> pd.DataFrame:
+    """Return ``df`` with CORE_COLUMNS attached in a single concat (no per-column insert fragmentation)."""
+    core = compute_core(df["High"], df["Low"], df["Close"], df["Volume"], clamp_to_length=clamp_to_length)
+    add = pd.DataFrame(core, index=df.index)
+    keep = df.drop(columns=[c for c in add.columns if c in df.columns])
+    return pd.concat([keep, add], axis=1)
+
+
+# -----------------------------------------------------------------------------
+# 증분 모드: 캐시된 상태에 새 봉 1개를 O(windows)로 추가
+# -----------------------------------------------------------------------------
+class IncrementalIndicators:
+    """Rolling state that appends one bar at a time and returns the CORE_COLUMNS values for that bar."""
+
+    def __init__(self, windows: Iterable[int] = MA_WINDOWS):
+        self.windows = tuple(int(w) for w in windows)
+        self._sum_windows = tuple(sorted(set(self.windows) | {20, 30, 40}))
+        self._maxlen = max(max(self._sum_windows), max(HIGH_WINDOWS.values()), 52) + 1
+        self.high: deque = deque(maxlen=self._maxlen)
+        self.low: deque = deque(maxlen=self._maxlen)
+        self.close: deque = deque(maxlen=self._maxlen)
+        self.volume: deque = deque(maxlen=self._maxlen)
+        self.sum_c = {w: 0.0 for w in self._sum_windows}
+        self.sum_c2 = {w: 0.0 for w in self._sum_windows}
+        self.sum_v = {w: 0.0 for w in self.windows}
+        self.ma_hist = {w: deque(maxlen=SLOPE_LAG + 1) for w in self.windows}
+        self.mid_a: deque = deque(maxlen=27)
+        self.mid_b: deque = deque(maxlen=27)
+        self.obv_hist: deque = deque(maxlen=OBV_MA)
+        self.obv = 0.0
+        self.gain = None
+        self.loss = None
+        self.rows = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, windows: Iterable[int] = MA_WINDOWS) -> "IncrementalIndicators":
+        """Seed the state from an OHLCV frame (one vectorized pass, then O(windows) per appended bar)."""
+        st = cls(windows)
+        h, l, c, v = (_as_float(df[k]) for k in ("High", "Low", "Close", "Volume"))
+        n = len(c)
+        if n == 0:
+            return st
+        core = compute_core(h, l, c, v, windows=st.windows)
+        tail = slice(max(0, n - st._maxlen), n)
+        st.high.extend(h[tail]); st.low.extend(l[tail]); st.close.extend(c[tail]); st.volume.extend(v[tail])
+        for w in st._sum_windows:
+            seg = c[max(0, n - w):]
+            st.sum_c[w] = float(np.sum(seg)); st.sum_c2[w] = float(np.sum(seg * seg))
+        for w in st.windows:
+            st.sum_v[w] = float(np.sum(v[max(0, n - w):]))
+            st.ma_hist[w].extend(core[f"MA{w}"][max(0, n - SLOPE_LAG - 1):])
+        tenkan_kijun = (core["Tenkan_sen"] + core["Kijun_sen"]) / 2
+        mid52 = (_rolling_ext(h, 52, np.max) + _rolling_ext(l, 52, np.min)) / 2
+        st.mid_a.extend(tenkan_kijun[max(0, n - 27):])
+        st.mid_b.extend(mid52[max(0, n - 27):])
+        st.obv = float(core["OBV"][-1])
+        st.obv_hist.extend(core["OBV"][max(0, n - OBV_MA):])
+        delta = np.diff(c, prepend=np.nan)
+        st.gain = float(_ewm_adjust_false(np.where(delta > 0, delta, 0.0), RSI_COM)[-1])
+        st.loss = float(_ewm_adjust_false(-np.where(delta < 0, delta, 0.0), RSI_COM)[-1])
+        st.rows = n
+        return st
+
+    def _window(self, buf: deque, w: int) -> np.ndarray:
+        return np.fromiter((buf[i] for i in range(len(buf) - w, len(buf))), dtype="float64", count=w)
+
+    def update(self, high: float, low: float, close: float, volume: float) -> dict[str, float]:
+        h, l, c, v = float(high), float(low), float(close), float(volume)
+        prev_close = self.close[-1] if self.close else math.nan
+        # 창 밖으로 밀려나는 값만 빼고 새 값만 더한다.
+        for w in self._sum_windows:
+            if self.rows >= w:
+                old = self.close[-w]
+                self.sum_c[w] -= old; self.sum_c2[w] -= old * old
+            self.sum_c[w] += c; self.sum_c2[w] += c * c
+        for w in self.windows:
+            if self.rows >= w:
+                self.sum_v[w] -= self.volume[-w]
+            self.sum_v[w] += v
+        self.high.append(h); self.low.append(l); self.close.append(c); self.volume.append(v)
+        self.rows += 1
+        n = self.rows
+
+        out: dict[str, float] = {}
+        means: dict[int, float] = {}
+        stds: dict[int, float] = {}
+        for w in self._sum_windows:
+            if n >= w:
+                m = self.sum_c[w] / w
+                means[w] = m
+                stds[w] = math.sqrt(max((self.sum_c2[w] - self.sum_c[w] * m) / (w - 1), 0.0)) if w > 1 else math.nan
+            else:
+                means[w] = stds[w] = math.nan
+        for w in self.windows:
+            ma = means[w]
+            self.ma_hist[w].append(ma)
+            base = self.ma_hist[w][0] if len(self.ma_hist[w]) == SLOPE_LAG + 1 else math.nan
+            out[f"MA{w}"] = ma
+            out[f"VMA{w}"] = self.sum_v[w] / w if n >= w else math.nan
+            out[f"Slope{w}"] = (ma - base) / base * 100 if base and not math.isnan(base) else math.nan
+
+        ma20, s20, ma40, s40 = means[20], stds[20], means[40], stds[40]
+        out["BB_Upper"] = ma20 + s20 * 2
+        out["BB_Lower"] = ma20 - s20 * 2
+        out["BB20_Width"] = s20 * 4 / ma20 * 100 if ma20 else math.nan
+        out["BB40_Upper"] = ma40 + s40 * 2
+        out["BB40_Lower"] = ma40 - s40 * 2
+        out["BB40_Width"] = s40 * 4 / ma40 * 100 if ma40 else math.nan
+        span = out["BB40_Upper"] - out["BB40_Lower"]
+        out["BB40_PercentB"] = (c - out["BB40_Lower"]) / span if span else math.nan
+        out["BB30_Upper_18"] = means[30] + stds[30] * 1.8
+
+        for name, w in HIGH_WINDOWS.items():
+            out[name] = float(np.max(self._window(self.high, w))) if n >= w else math.nan
+
+        def _mid(w: int) -> float:
+            if n < w:
+                return math.nan
+            return (float(np.max(self._window(self.high, w))) + float(np.min(self._window(self.low, w)))) / 2
+
+        tenkan, kijun = _mid(9), _mid(26)
+        out["Tenkan_sen"] = tenkan
+        out["Kijun_sen"] = kijun
+        self.mid_a.append((tenkan + kijun) / 2)
+        self.mid_b.append(_mid(52))
+        out["Span_A"] = self.mid_a[0] if len(self.mid_a) == 27 else math.nan
+        out["Span_B"] = self.mid_b[0] if len(self.mid_b) == 27 else math.nan
+        out["Cloud_Top"] = float(np.fmax(out["Span_A"], out["Span_B"]))
+
+        delta = c - prev_close
+        if np.isfinite(delta) and np.isfinite(v):
+            self.obv += float(np.sign(delta)) * v
+        self.obv_hist.append(self.obv)
+        out["OBV"] = self.obv
+        out["OBV_MA10"] = float(np.mean(self.obv_hist)) if len(self.obv_hist) == OBV_MA else math.nan
+
+        alpha = 1.0 / (1.0 + RSI_COM)
+        g = delta if delta > 0 else 0.0
+        lo = -delta if delta < 0 else 0.0
+        self.gain = g if self.gain is None else (1 - alpha) * self.gain + alpha * g
+        self.loss = lo if self.loss is None else (1 - alpha) * self.loss + alpha * lo
+        out["RSI"] = 100 - (100 / (1 + self.gain / self.loss)) if self.loss else (100.0 if self.gain else math.nan)
+        return out
+
+
+def append_bar(frame: pd.DataFrame, state: IncrementalIndicators, when: Any, bar: Mapping[str, float]) -> pd.DataFrame:
+    """Append one OHLCV bar to an indicator frame, filling CORE_COLUMNS from ``state`` in O(windows)."""
+    row = {k: bar.get(k, np.nan) for k in ("Open", "High", "Low", "Close", "Volume")}
+    row.update(state.update(row["High"], row["Low"], row["Close"], row["Volume"]))
+    add = pd.DataFrame([row], index=pd.DatetimeIndex([pd.Timestamp(when)], name=frame.index.name))
+    return pd.concat([frame, add], axis=0)
+
+
+# -----------------------------------------------------------------------------
+# 기존 pandas 경로와의 정합성 검증
+# -----------------------------------------------------------------------------
+def reference_core_pandas(df: pd.DataFrame) -> pd.DataFrame:
+    """The pre-vectorization get_indicators code path, kept verbatim for parity checks."""
+    out = pd.DataFrame(index=df.index)
+    high, low, close = df["High"], df["Low"], df["Close"]
+    for n in MA_WINDOWS:
+        out[f"MA{n}"] = close.rolling(window=n, min_periods=n).mean()
+        out[f"VMA{n}"] = df["Volume"].rolling(window=n, min_periods=n).mean()
+        out[f"Slope{n}"] = (out[f"MA{n}"] - out[f"MA{n}"].shift(3)) / out[f"MA{n}"].shift(3) * 100
+    std20 = close.rolling(20).std()
+    std40 = close.rolling(40).std()
+    out["BB_Upper"] = out["MA20"] + std20 * 2
+    out["BB_Lower"] = out["MA20"] - std20 * 2
+    out["BB20_Width"] = std20 * 4 / out["MA20"] * 100
+    out["BB40_Upper"] = out["MA40"] + std40 * 2
+    out["BB40_Lower"] = out["MA40"] - std40 * 2
+    out["BB40_Width"] = std40 * 4 / out["MA40"] * 100
+    out["BB40_PercentB"] = (close - out["BB40_Lower"]) / (out["BB40_Upper"] - out["BB40_Lower"])
+    std30 = close.rolling(30).std()
+    out["BB30_Upper_18"] = close.rolling(30).mean() + std30 * 1.8
+    out["High20"] = df["High"].rolling(20).max()
+    out["High52"] = df["High"].rolling(252).max()
+    out["Tenkan_sen"] = (high.rolling(9).max() + low.rolling(9).min()) / 2
+    out["Kijun_sen"] = (high.rolling(26).max() + low.rolling(26).min()) / 2
+    out["Span_A"] = ((out["Tenkan_sen"] + out["Kijun_sen"]) / 2).shift(26)
+    out["Span_B"] = ((high.rolling(52).max() + low.rolling(52).min()) / 2).shift(26)
+    out["Cloud_Top"] = out[["Span_A", "Span_B"]].max(axis=1)
+    out["OBV"] = (np.sign(close.diff()) * df["Volume"]).fillna(0).cumsum()
+    out["OBV_MA10"] = out["OBV"].rolling(10).mean()
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).ewm(com=13, adjust=False).mean()
+    loss = (-delta.where(delta < 0, 0)).ewm(com=13, adjust=False).mean()
+    out["RSI"] = 100 - (100 / (1 + gain / loss))
+    return out
+
+
+def _max_rel_diff(a: np.ndarray, b: np.ndarray) -> float:
+    a = np.asarray(a, dtype="float64"); b = np.asarray(b, dtype="float64")
+    nan_mismatch = np.isnan(a) != np.isnan(b)
+    if nan_mismatch.any():
+        return math.inf
+    m = ~np.isnan(a)
+    if not m.any():
+        return 0.0
+    return float(np.max(np.abs(a[m] - b[m]) / np.maximum(1.0, np.abs(b[m]))))
+
+
+def parity_check(df: pd.DataFrame, incremental_tail: int = 20) -> dict[str, float]:
+    """Max relative difference per column: batch vs pandas reference, and incremental vs batch on the last bars."""
+    ref = reference_core_pandas(df)
+    core = compute_core(df["High"], df["Low"], df["Close"], df["Volume"])
+    res = {f"batch:{k}": _max_rel_diff(core[k], ref[k].to_numpy()) for k in CORE_COLUMNS}
+    k = len(df) - int(incremental_tail)
+    if int(incremental_tail) > 0 and k > 0:
+        st = IncrementalIndicators.from_frame(df.iloc[:k])
+        rows = [st.update(*df[["High", "Low", "Close", "Volume"]].iloc[i].tolist()) for i in range(k, len(df))]
+        inc = pd.DataFrame(rows, index=df.index[k:])
+        for c in CORE_COLUMNS:
+            res[f"incremental:{c}"] = _max_rel_diff(inc[c].to_numpy(), core[c][k:])
+    return res
+
+
+def _synthetic_frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.round(10_000 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), 0)
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    vol = rng.integers(0, 3_000_000, n).astype(float)
+    vol[rng.random(n) < 0.01] = 0
+    idx = pd.bdate_range("2022-01-03", periods=n, name="Date")
+    return pd.DataFrame({"Open": close, "High": close + spread, "Low": close - spread, "Close": close, "Volume": vol}, index=idx)
+
+
+def _cli() -> int:
+    ap = argparse.ArgumentParser(description="vector_indicators parity check against the pandas get_indicators path")
+    ap.add_argument("--parity", action="store_true")
+    ap.add_argument("--csv", default="", help="OHLCV csv (Date index) to check instead of synthetic frames")
+    ap.add_argument("--tol", type=float, default=1e-7)
+    args = ap.parse_args()
+    frames = [pd.read_csv(args.csv, index_col=0, parse_dates=True)] if args.csv else [_synthetic_frame(n, s) for s, n in enumerate((60, 500, 900, 1200))]
+    worst = 0.0
+    for i, df in enumerate(frames):
+        res = parity_check(df)
+        bad = {k: v for k, v in res.items() if v > args.tol}
+        worst = max([worst] + list(res.values()))
+        print(f"frame#{i} rows={len(df)} checked={len(res)} worst={max(res.values()):.3e} fail={len(bad)}")
+        for k, v in sorted(bad.items()):
+            print(f"  ❌ {k}: {v:.3e}")
+    print(f"VECTOR_INDICATORS_PARITY {'OK' if worst <= args.tol else 'FAIL'} worst={worst:.3e} tol={args.tol:g}")
+    return 0 if worst <= args.tol else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(_cli())